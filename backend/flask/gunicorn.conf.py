@@ -0,0 +1,24 @@
+"""
+gunicorn settings, loaded automatically from the working directory.
+
+Only the Prometheus multi-process hooks live here (see hanabira_shared.metrics);
+workers, bind and worker class stay on the command line.
+"""
+
+import glob
+import os
+
+
+def on_starting(server):
+    # Stale files from a previous run would be summed into the new counters
+    directory = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+        for path in glob.glob(os.path.join(directory, "*.db")):
+            os.remove(path)
+
+
+def child_exit(server, worker):
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
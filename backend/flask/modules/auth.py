@@ -2,11 +2,48 @@ import os
 import jwt
 import logging
 from functools import wraps
+from typing import Any, Dict, Optional
 from flask import request, jsonify
 
+from hanabira_shared.token_cache import TokenCache
+
 JWT_SECRET = os.getenv("JWT_SECRET", "your-development-secret-key")
 JWT_ALGORITHM = "HS256"
 
+token_cache = TokenCache()
+
+
+def rotate_signing_key(secret: str, algorithm: Optional[str] = None):
+    """Switch to a new signing key; previously verified tokens are dropped."""
+    global JWT_SECRET, JWT_ALGORITHM
+    JWT_SECRET = secret
+    JWT_ALGORITHM = algorithm or JWT_ALGORITHM
+    token_cache.bind(JWT_SECRET, JWT_ALGORITHM)
+
+
+def decode_token(token: str) -> Dict[str, Any]:
+    """
+    jwt.decode with the service key, served from the verified-token cache
+    when possible. Raises the same jwt exceptions as jwt.decode.
+    """
+    token_cache.bind(JWT_SECRET, JWT_ALGORITHM)
+    cached = token_cache.get(token)
+    if cached is not None:
+        claims, error = cached
+        if error is not None:
+            raise error.with_traceback(None)
+        return dict(claims)
+
+    try:
+        claims = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+    except jwt.InvalidTokenError as e:
+        # ExpiredSignatureError is an InvalidTokenError too
+        token_cache.put_invalid(token, e)
+        raise
+    token_cache.put(token, claims)
+    return dict(claims)
+
+
 def login_required(f):
     @wraps(f)
     def decorated(*args, **kwargs):
@@ -24,7 +61,7 @@ def login_required(f):
             return jsonify({"code": "UNAUTHORIZED", "error": "Token is missing"}), 401
 
         try:
-            payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+            payload = decode_token(token)
             request.user = payload
         except jwt.ExpiredSignatureError:
             logging.error(f"Token expired: {token[:15]}...")
@@ -8,8 +8,11 @@ from datetime import datetime, timedelta
 from flask_pymongo import PyMongo
 from bson.objectid import ObjectId
 from modules.auth import login_required, JWT_SECRET
+from hanabira_shared.tracing import inject, span
 import jwt
 
+logger = logging.getLogger(__name__)
+
 
 # ----------------------------------------------------- #
 
@@ -79,11 +82,8 @@ def f_adjust_frequency_and_shuffle(combined_data):
 
 class FlashcardModule:
     def __init__(self):
-
-        logging.basicConfig(
-            level=logging.INFO,
-            format="%(asctime)s %(levelname)s %(name)s %(threadName)s : %(message)s",
-        )
+        # Logging is configured once by server.py (hanabira_shared.logging_setup)
+        pass
 
     def register_routes(self, app):
 
@@ -422,7 +422,7 @@ class FlashcardModule:
                     url += f"&s_tag={s_tag}"
 
                 # Make the GET request to the static data source API
-                logging.info(f"calling static api at {url}")
+                logger.debug("calling static api at %s", url)
                 response = requests.get(url)
                 if response.status_code == 200:
                     documents = response.json()  # This should be a list of dictionaries
@@ -452,7 +452,7 @@ class FlashcardModule:
                             combined = {**source, **flashcard}  # Merge dictionaries
                             combined_data.append(combined)
 
-                logging.info(combined_data)
+                logger.debug("combined %d flashcards", len(combined_data))
                 # print(combined_data)
 
                 new_combined_data = f_adjust_frequency_and_shuffle(combined_data)
@@ -505,7 +505,7 @@ class FlashcardModule:
                     url += f"&s_tag={s_tag}"
 
                 # Make the GET request to the static data source API
-                logging.info(f"calling static api at {url}")
+                logger.debug("calling static api at %s", url)
                 response = requests.get(url)
                 if response.status_code == 200:
                     # documents = response.json()  # This should be a list of dictionaries
@@ -541,7 +541,7 @@ class FlashcardModule:
                             combined = {**source, **flashcard}  # Merge dictionaries
                             combined_data.append(combined)
 
-                logging.info(combined_data)
+                logger.debug("combined %d flashcards", len(combined_data))
                 # print(combined_data)
 
                 new_combined_data = f_adjust_frequency_and_shuffle(combined_data)
@@ -798,7 +798,7 @@ class FlashcardModule:
                     # Only add s_tag to query if it's not "all"
                     url += f"&s_tag={s_tag}"
 
-                logging.info(f"calling static api at {url}")
+                logger.debug("calling static api at %s", url)
                 response = requests.get(url)
                 if response.status_code != 200:
                     return jsonify({"error": "Failed to fetch data from static data source"}), response.status_code
@@ -835,7 +835,7 @@ class FlashcardModule:
                                     merge_grammar_docs(flashcard, source)
                                 )
 
-                logging.info(combined_data)
+                logger.debug("combined %d flashcards", len(combined_data))
 
                 # If you have a frequency/shuffle helper, call it here:
                 new_combined_data = f_adjust_frequency_and_shuffle(combined_data)
@@ -1125,11 +1125,9 @@ class FlashcardModule:
         @login_required
         def store_flashcard_state():
             data = request.json
-            print("received flashcard update POST payload:")
-            print(data)
-
             user_id = request.user.get("userId") or request.user.get("id")
             collection_name = data.get("collectionName")
+            logger.debug("flashcard state update user=%s collection=%s payload=%s", user_id, collection_name, data)
 
             p_tag = data.get("p_tag")
             s_tag = data.get("s_tag")
@@ -1430,14 +1428,16 @@ class FlashcardModule:
                            "grammars": list(set(static_requests["grammars"]))
                         }
                         
-                        resp = requests.post(f"http://{host}:{port}/e-api/v1/batch-fetch", json=req_payload)
+                        with span("POST /e-api/v1/batch-fetch", kind="client", **{"peer.service": "dictionary"}):
+                            resp = requests.post(f"http://{host}:{port}/e-api/v1/batch-fetch", json=req_payload,
+                                                 headers=inject())
                         if resp.status_code == 200:
                             s_data = resp.json()
                             static_cards.extend(s_data.get("kanji", []))
                             static_cards.extend(s_data.get("words", []))
                             static_cards.extend(s_data.get("grammars", []))
                     except Exception as e:
-                        print(f"Failed to batch fetch static cards: {e}")
+                        logger.warning("Failed to batch fetch static cards: %s", e)
 
                 # 4. Hydrate
                 # Create a map for quick lookup
@@ -1600,6 +1600,8 @@ class FlashcardModule:
                     interval = 1
                 
                 next_review = datetime.utcnow() + timedelta(days=interval)
+                logger.debug("answer card=%s quality=%s reps=%d interval=%d ease=%.2f", card_id, quality, reps,
+                             interval, ease)
                 
                 new_state = {
                     "repetitions": reps,
@@ -1631,14 +1633,16 @@ class FlashcardModule:
                         }
                         
                         import requests as req_lib
-                        req_lib.post(
-                            "http://localhost:5100/v1/learner/activity",
-                            json=payload,
-                            timeout=3
-                        )
+                        with span("POST /v1/learner/activity", kind="client"):
+                            req_lib.post(
+                                "http://localhost:5100/v1/learner/activity",
+                                json=payload,
+                                headers=inject(),
+                                timeout=3
+                            )
                     except Exception as log_err:
                         # Don't fail the answer if logging fails
-                        logging.warning(f"Failed to log flashcard activity: {log_err}")
+                        logger.warning("Failed to log flashcard activity: %s", log_err)
                 
                 return jsonify({
                     "message": "SRS updated", 
@@ -44,13 +44,7 @@ class LibraryTexts:
                     "lang": 1
                 })
 
-                # Convert ObjectIds to strings
-                texts = []
-                for doc in texts_cursor:
-                    doc["_id"] = str(doc["_id"])  # Convert ObjectId to string
-                    texts.append(doc)
-
-                return jsonify(texts), 200
+                return jsonify(list(texts_cursor)), 200
             except Exception as err:
                 logging.error(f"Error fetching texts for user {userId}: {err}")
                 return jsonify({"message": "Error fetching texts"}), 500
@@ -151,11 +145,7 @@ class LibraryTexts:
                 if lang:
                     filter_query['lang'] = lang
 
-                cursor = self.videos_collection.find(filter_query)
-                videos = []
-                for doc in cursor:
-                    doc['_id'] = str(doc['_id'])
-                    videos.append(doc)
+                videos = list(self.videos_collection.find(filter_query))
 
                 logging.info(f"Sending {len(videos)} videos")
                 return jsonify(videos), 200
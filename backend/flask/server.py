@@ -10,7 +10,6 @@ NOTE: Study plan, learner progress, and adaptive learning have been moved to:
 """
 
 import os
-import logging
 from flask import Flask, jsonify, request
 from flask_cors import CORS
 from flask_pymongo import PyMongo
@@ -18,12 +17,28 @@ from flask_talisman import Talisman
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s %(levelname)s %(name)s %(threadName)s : %(message)s",
-)
+# Queue-backed structured logging: LOG_LEVEL, LOG_LEVELS, LOG_FORMAT=json, LOG_SAMPLE, LOG_RATE_LIMIT
+# Per-request loggers: logger -> (sample rate, records/second per template)
+HOT_LOGGERS = {
+    "modules.flashcards": (1.0, 10),
+    "hanabira_shared.query_tracker": (1.0, 20),
+}
+from hanabira_shared.logging_setup import configure_logging
+configure_logging(hot_loggers=HOT_LOGGERS)
 
 app = Flask(__name__)
+
+# orjson provider + gzip/brotli for large JSON bodies
+from hanabira_shared.serialization import init_serialization
+init_serialization(app)
+
+# Per-request DB call counts / N+1 warnings (before any MongoClient is created)
+from hanabira_shared.query_tracker import init_query_tracking
+init_query_tracking(app)
+
+# W3C traceparent server spans -> TRACE_DIR/<service>.jsonl (TRACING_ENABLED)
+from hanabira_shared.tracing import init_tracing
+init_tracing(app, "flask")
 # Max Content Length: 10MB (Aligns with Frontend)
 app.config['MAX_CONTENT_LENGTH'] = 10 * 1024 * 1024
 
@@ -38,6 +53,10 @@ limiter = Limiter(
     storage_uri="memory://",
 )
 
+# Prometheus /metrics: route latency, Mongo pool stats (before any MongoClient is created)
+from hanabira_shared.metrics import init_metrics
+init_metrics(app, limiter)
+
 # CORS: Standardized Configuration
 from config.cors import get_cors_config
 cors_config = get_cors_config()
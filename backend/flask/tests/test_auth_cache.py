@@ -0,0 +1,63 @@
+
+import unittest
+import os
+import sys
+import time
+import jwt
+from unittest.mock import patch
+from flask import Flask, jsonify, request
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import modules.auth as auth
+from modules.auth import login_required, rotate_signing_key
+
+class TestVerifiedTokenCache(unittest.TestCase):
+
+    def setUp(self):
+        self.secret = auth.JWT_SECRET
+        auth.token_cache.clear()
+
+        self.app = Flask(__name__)
+
+        @self.app.route("/me")
+        @login_required
+        def me():
+            return jsonify({"userId": request.user["userId"]})
+
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        rotate_signing_key(self.secret)
+
+    def token(self, ttl=3600, secret=None):
+        return jwt.encode({"userId": "user123", "exp": int(time.time()) + ttl},
+                          secret or auth.JWT_SECRET, algorithm="HS256")
+
+    def get(self, token):
+        return self.client.get("/me", headers={"Authorization": f"Bearer {token}"})
+
+    def test_signature_verified_once_per_token(self):
+        token = self.token()
+        with patch("modules.auth.jwt.decode", wraps=jwt.decode) as decode:
+            for _ in range(5):
+                self.assertEqual(self.get(token).get_json()["userId"], "user123")
+        self.assertEqual(decode.call_count, 1)
+
+    def test_bad_tokens_keep_their_error_codes(self):
+        with patch("modules.auth.jwt.decode", wraps=jwt.decode) as decode:
+            for _ in range(3):
+                self.assertEqual(self.get(self.token(ttl=-10)).get_json()["code"], "TOKEN_EXPIRED")
+                self.assertEqual(self.get("not.a.jwt").get_json()["code"], "TOKEN_INVALID")
+        self.assertEqual(decode.call_count, 2)
+
+    def test_rotation_invalidates_cached_tokens(self):
+        token = self.token()
+        self.assertEqual(self.get(token).status_code, 200)
+
+        rotate_signing_key("rotated-secret-key-for-tests-only")
+        self.assertEqual(self.get(token).status_code, 401)
+        self.assertEqual(self.get(self.token()).status_code, 200)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,54 +1,41 @@
-import os
+import time
 import logging
 from typing import List, Any, Generator, Dict
 from services.resource_processor import ResourceProcessor
 from langchain_core.messages import SystemMessage, HumanMessage
 from memory.manager import MemoryManager, get_memory_manager
-from services.llm_factory import ModelFactory
-from agent.tools.study_tools import (
-    generate_suggested_goals, 
-    audit_study_progress, 
-    prepare_milestone_exam,
-    perform_detailed_audit,
-    update_goal_progress,
-    query_learning_records,
-    recalibrate_study_priorities
-)
+from agent.registry import get_agent_runtime, get_skill_registry
+from utils.agent_metrics import LLMStreamTimer, record_llm_call
+from hanabira_shared.tracing import finish_span, span, start_span
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_PERSONA = "You are Hanachan, an AI language tutor for Hanabira.org. Help users with Japanese/Korean learning."
+
+
+def _prompt_text(messages: List[Any]) -> str:
+    return "".join(str(m.content) for m in messages)
+
+
 class HanachanAgent:
-    def __init__(self):
+    """
+    One agent turn. The chat model, tool bindings and persona come from the
+    process-level registry (agent/registry.py), so constructing an agent per
+    request costs nothing; only the per-turn user state lives here.
+    """
+
+    def __init__(self, temperature: float = 0.7):
         self.processor = ResourceProcessor()
         self.memory_manager = get_memory_manager()
-        self.skills_dir = os.path.join(os.path.dirname(__file__), "skills")
-        
-        # Initialize LangChain Chat Model via Factory
-        self.llm = ModelFactory.create_chat_model(temperature=0.7)
-        
-        # Define and bind tools
-        self.tools = [
-            generate_suggested_goals, 
-            audit_study_progress, 
-            prepare_milestone_exam,
-            perform_detailed_audit,
-            update_goal_progress,
-            query_learning_records,
-            recalibrate_study_priorities
-        ]
-        try:
-            self.llm_with_tools = self.llm.bind_tools(self.tools)
-        except Exception as e:
-            logger.warning(f"Tool binding not supported for this model: {e}")
-            self.llm_with_tools = self.llm
+        self.runtime = get_agent_runtime(temperature)
+
+        self.llm = self.runtime.llm
+        self.llm_with_tools = self.runtime.llm_with_tools
+        self.tools = self.runtime.tools
+        self.model_name = self.runtime.model_name
 
     def _get_system_prompt(self) -> str:
-        try:
-            skill_path = os.path.join(self.skills_dir, "chat_persona.md")
-            with open(skill_path, 'r', encoding='utf-8') as f:
-                return f.read()
-        except:
-            return "You are Hanachan, an AI language tutor for Hanabira.org. Help users with Japanese/Korean learning."
+        return get_skill_registry().get("chat_persona", DEFAULT_PERSONA)
 
     def invoke(self, 
                prompt: str, 
@@ -135,7 +122,7 @@ class HanachanAgent:
         """Handles a multi-turn execution loop with tool support."""
         for i in range(max_iterations):
             # 1. Call LLM
-            response = self.llm_with_tools.invoke(messages)
+            response = self._invoke_llm(messages, iteration=i)
             
             # 2. Check for tool calls
             if hasattr(response, 'tool_calls') and response.tool_calls:
@@ -145,21 +132,22 @@ class HanachanAgent:
                 messages.append(response)
                 
                 # Execute tools
-                tool_map = {t.name: t for t in self.tools}
+                tool_map = self.runtime.tool_map
                 for tc in response.tool_calls:
                     t_name = tc['name']
                     t_args = tc['args']
                     tool = tool_map.get(t_name)
                     
                     if tool:
-                        logger.info(f"🛠️ [Agent] Executing tool: {t_name}")
+                        logger.debug("[Agent] Executing tool: %s", t_name)
                         if 'user_id' in tool.args:
                             t_args['user_id'] = user_id
                         if 'token' in tool.args:
                             t_args['token'] = token
                         
                         try:
-                            result = tool.invoke(t_args)
+                            with span(f"tool.{t_name}"):
+                                result = tool.invoke(t_args)
                             messages.append(ToolMessage(content=str(result), tool_call_id=tc['id']))
                         except Exception as e:
                             logger.error(f"Tool execution failed ({t_name}): {e}")
@@ -178,38 +166,68 @@ class HanachanAgent:
         logger.warning(error_msg)
         return f"I'm sorry, I'm having trouble finishing that task. ({error_msg})"
 
+    def _invoke_llm(self, messages: List[Any], **span_attributes) -> Any:
+        """One tool-enabled LLM call, traced and counted in the LLM metrics."""
+        start = time.perf_counter()
+        with span("llm.invoke", kind="client", **span_attributes):
+            response = self.llm_with_tools.invoke(messages)
+        record_llm_call(self.model_name, getattr(response, "usage_metadata", None), str(response.content or ""),
+                        time.perf_counter() - start, "invoke", _prompt_text(messages))
+        return response
+
+    def _traced_stream(self, messages: List[Any]) -> Generator[str, None, None]:
+        """llm.stream() content chunks, timed as an llm.stream span (not made current: it spans yields)."""
+        s = start_span("llm.stream", kind="client")
+        timer = LLMStreamTimer(self.model_name, _prompt_text(messages))
+        chunks = 0
+        try:
+            for chunk in self.llm.stream(messages):
+                if s is not None and chunks == 0:
+                    s.set_attribute("ttft_ms", round((time.time_ns() - s.start_ns) / 1e6, 1))
+                chunks += 1
+                timer.chunk(chunk)
+                yield chunk.content
+        except Exception as e:
+            if s is not None:
+                s.set_error(e)
+            raise
+        finally:
+            timer.finish()
+            if s is not None:
+                s.set_attribute("chunks", chunks)
+            finish_span(s)
+
     def _stream_generator(self, messages: List[Any], user_prompt: str, session_id: str, user_id: str, token: str = None) -> Generator[str, None, None]:
         full_response = ""
         try:
             # Note: Tool calling in streaming is complex. 
             # For now, we use non-streaming tools if a tool call is detected.
             # 1. Detect tool calls pre-stream
-            initial_response = self.llm_with_tools.invoke(messages)
+            initial_response = self._invoke_llm(messages)
             
             if hasattr(initial_response, 'tool_calls') and initial_response.tool_calls:
                 logger.info("🛠️ [Stream] Tool call detected. Diverting to tool execution.")
                 from langchain_core.messages import ToolMessage
                 messages.append(initial_response)
                 
-                tool_map = {t.name: t for t in self.tools}
+                tool_map = self.runtime.tool_map
                 for tc in initial_response.tool_calls:
                     tool = tool_map.get(tc['name'])
                     if tool:
                         t_args = tc['args']
                         if 'user_id' in tool.args: t_args['user_id'] = user_id
                         if 'token' in tool.args: t_args['token'] = token
-                        result = tool.invoke(t_args)
+                        with span(f"tool.{tc['name']}"):
+                            result = tool.invoke(t_args)
                         messages.append(ToolMessage(content=str(result), tool_call_id=tc['id']))
                 
                 # Stream the final conclusion
-                for chunk in self.llm.stream(messages):
-                    content = chunk.content
+                for content in self._traced_stream(messages):
                     full_response += content
                     yield content
             else:
                 # Direct stream
-                for chunk in self.llm.stream(messages):
-                    content = chunk.content
+                for content in self._traced_stream(messages):
                     full_response += content
                     yield content
             
@@ -0,0 +1,191 @@
+"""
+Process-level registry for everything an agent turn needs that is not user state.
+
+HanachanAgent used to re-read chat_persona.md, create a chat model and
+bind the tools on every request. This module builds those once per
+process and shares them:
+
+- SkillRegistry: the markdown prompts in agent/skills, read once.
+  With SKILL_RELOAD=true (the default when FLASK_ENV=development), each
+  get() stats the file and re-reads it when its mtime changed, so editing
+  the persona takes effect without a restart.
+- get_chat_model(): chat model clients keyed by their configuration
+  (provider, model, endpoint, temperature). A change to the environment
+  gives a new key and a new client; the old one is left for the GC.
+- get_agent_runtime(): the chat model, its tool-bound variant and the
+  tool map, keyed by model configuration and tool set.
+
+create_app() calls warm_up() (AGENT_WARMUP=false to skip), so the first
+chat turn does not pay for client construction either.
+
+Everything here is shared across request threads: LangChain chat models
+and tools keep no per-call state, so they are safe to reuse.
+"""
+
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from services.llm_factory import ModelFactory
+from utils.agent_metrics import llm_model_name
+from agent.tools.study_tools import (
+    generate_suggested_goals,
+    audit_study_progress,
+    prepare_milestone_exam,
+    perform_detailed_audit,
+    update_goal_progress,
+    query_learning_records,
+    recalibrate_study_priorities
+)
+
+logger = logging.getLogger(__name__)
+
+SKILLS_DIR = os.path.join(os.path.dirname(__file__), "skills")
+SKILL_RELOAD = os.getenv(
+    "SKILL_RELOAD", "true" if os.getenv("FLASK_ENV") == "development" else "false").lower() == "true"
+
+AGENT_TOOLS = (
+    generate_suggested_goals,
+    audit_study_progress,
+    prepare_milestone_exam,
+    perform_detailed_audit,
+    update_goal_progress,
+    query_learning_records,
+    recalibrate_study_priorities
+)
+
+
+# ============================================
+# Skills / persona
+# ============================================
+
+class SkillRegistry:
+    """Markdown skill prompts by name (file stem), cached with their mtime."""
+
+    def __init__(self, skills_dir: str = SKILLS_DIR, reload: bool = SKILL_RELOAD):
+        self.skills_dir = skills_dir
+        self.reload = reload
+        self._skills: Dict[str, Tuple[float, str]] = {}  # name -> (mtime, text)
+        self._lock = threading.Lock()
+
+    def get(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        cached = self._skills.get(name)
+        if cached is not None and not self.reload:
+            return cached[1]
+
+        path = os.path.join(self.skills_dir, f"{name}.md")
+        try:
+            mtime = os.stat(path).st_mtime
+            if cached is not None and cached[0] == mtime:
+                return cached[1]
+            with open(path, "r", encoding="utf-8") as f:
+                text = f.read()
+        except OSError as e:
+            if cached is not None:
+                return cached[1]
+            logger.error("Error loading skill %s: %s", name, e)
+            return default
+
+        with self._lock:
+            self._skills[name] = (mtime, text)
+        if cached is not None:
+            logger.info("Reloaded skill %s", name)
+        return text
+
+
+_skill_registry = None
+
+
+def get_skill_registry() -> SkillRegistry:
+    global _skill_registry
+    if _skill_registry is None:
+        _skill_registry = SkillRegistry()
+    return _skill_registry
+
+
+# ============================================
+# Model clients and tool bindings
+# ============================================
+
+@dataclass(frozen=True)
+class AgentRuntime:
+    """The shared, user-independent half of an agent."""
+    llm: Any
+    llm_with_tools: Any
+    tools: Tuple[Any, ...]
+    tool_map: Dict[str, Any]
+    model_name: str
+
+
+_models: Dict[tuple, Any] = {}
+_runtimes: Dict[tuple, AgentRuntime] = {}
+_lock = threading.Lock()
+
+
+def model_config_key(temperature: float) -> tuple:
+    """Everything ModelFactory.create_chat_model reads from the environment, plus the temperature."""
+    provider = os.environ.get("LLM_PROVIDER", "openai").lower()
+    if provider == "openai":
+        return (provider, os.environ.get("OPENAI_MODEL_NAME", "gpt-3.5-turbo"),
+                os.environ.get("OPENAI_API_KEY"), temperature)
+    if provider == "ollama":
+        return (provider, os.environ.get("CHAT_MODEL", "qwen3:1.7b"),
+                os.environ.get("OLLAMA_BASE_URL", "http://localhost:11434"), temperature)
+    return (provider, temperature)
+
+
+def get_chat_model(temperature: float = 0.7) -> Any:
+    key = model_config_key(temperature)
+    llm = _models.get(key)
+    if llm is None:
+        with _lock:
+            llm = _models.get(key)
+            if llm is None:
+                llm = _models[key] = ModelFactory.create_chat_model(temperature=temperature)
+    return llm
+
+
+def get_agent_runtime(temperature: float = 0.7, tools: Tuple[Any, ...] = AGENT_TOOLS) -> AgentRuntime:
+    key = (model_config_key(temperature), tuple(t.name for t in tools))
+    runtime = _runtimes.get(key)
+    if runtime is not None:
+        return runtime
+
+    llm = get_chat_model(temperature)
+    with _lock:
+        runtime = _runtimes.get(key)
+        if runtime is None:
+            try:
+                llm_with_tools = llm.bind_tools(list(tools))
+            except Exception as e:
+                logger.warning("Tool binding not supported for this model: %s", e)
+                llm_with_tools = llm
+            runtime = _runtimes[key] = AgentRuntime(
+                llm=llm,
+                llm_with_tools=llm_with_tools,
+                tools=tuple(tools),
+                tool_map={t.name: t for t in tools},
+                model_name=llm_model_name(llm),
+            )
+            logger.info("Agent runtime ready: %s with %d tools", runtime.model_name, len(tools))
+    return runtime
+
+
+def warm_up():
+    """Build the default runtime and read the persona at startup; failures are left for the first request."""
+    try:
+        get_skill_registry().get("chat_persona")
+        get_agent_runtime()
+    except Exception as e:
+        logger.warning("Agent registry warm-up skipped: %s", e)
+
+
+def clear_registry():
+    """Drop cached clients, bindings and skills (tests, config changes at runtime)."""
+    global _skill_registry
+    with _lock:
+        _models.clear()
+        _runtimes.clear()
+    _skill_registry = None
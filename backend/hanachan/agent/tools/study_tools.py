@@ -117,7 +117,7 @@ def update_goal_progress(user_id: str, goal_id: str, completed: bool = True) ->
     Automatically updates the completion status of a daily study goal.
     Use this when the user successfully completes a task during the interaction.
     """
-    success = study_client.update_goal_status(goal_id, completed)
+    success = study_client.update_goal_status(goal_id, completed, user_id=user_id)
     if success:
         status = "completed" if completed else "active"
         return f"Goal {goal_id} successfully marked as {status}."
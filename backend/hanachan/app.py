@@ -8,18 +8,39 @@ import os
 import logging
 from dotenv import load_dotenv
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s %(levelname)s %(name)s : %(message)s",
-)
-logger = logging.getLogger(__name__)
-
 # Load environment variables from .env file
 load_dotenv()
 
+# Queue-backed structured logging: LOG_LEVEL, LOG_LEVELS, LOG_FORMAT=json, LOG_SAMPLE, LOG_RATE_LIMIT
+# Per-request loggers: logger -> (sample rate, records/second per template)
+HOT_LOGGERS = {
+    "services.agent_service": (1.0, 10),
+    "agent.core_agent": (1.0, 10),
+    "hanachan.memory": (1.0, 10),         # memory.manager, tasks.memory
+    "hanachan.memory.study": (1.0, 10),
+    "memory.semantic": (1.0, 10),
+    "memory.episodic": (1.0, 10),
+    "memory.embedding_cache": (1.0, 10),
+    "hanabira_shared.query_tracker": (1.0, 20),
+}
+from hanabira_shared.logging_setup import configure_logging
+configure_logging(hot_loggers=HOT_LOGGERS)
+logger = logging.getLogger(__name__)
+
 def create_app(test_config=None):
     app = Flask(__name__)
+
+    # orjson provider + gzip/brotli for large JSON bodies
+    from hanabira_shared.serialization import init_serialization
+    init_serialization(app)
+
+    # Per-request DB call counts / N+1 warnings (Mongo commands + SQLAlchemy statements)
+    from hanabira_shared.query_tracker import init_query_tracking
+    init_query_tracking(app)
+
+    # W3C traceparent server spans -> TRACE_DIR/<service>.jsonl (TRACING_ENABLED)
+    from hanabira_shared.tracing import init_tracing
+    init_tracing(app, "hanachan")
     
     # --- Security Configuration ---
     # Talisman for security headers
@@ -40,6 +61,12 @@ def create_app(test_config=None):
     )
     limiter = app.limiter
 
+    # Prometheus /metrics: route latency, RQ queues, LLM tokens/TTFT, Mongo pool stats
+    from hanabira_shared.metrics import init_metrics, register_scrape_collector
+    from utils.agent_metrics import RQQueueCollector
+    init_metrics(app, limiter)
+    register_scrape_collector(RQQueueCollector())
+
     # CORS configuration
     allowed_origins = os.environ.get("ALLOWED_ORIGINS", "http://localhost:3000").split(",")
     CORS(app, resources={r"/*": {"origins": allowed_origins}})
@@ -88,6 +115,11 @@ def create_app(test_config=None):
         except Exception as e:
             print(f"⚠️ MongoDB index init skipped: {e}")
     
+    # Persona, chat model client and tool bindings are built once per process (agent/registry.py)
+    if os.environ.get("AGENT_WARMUP", "true").lower() == "true":
+        from agent.registry import warm_up
+        warm_up()
+
     @app.route('/health')
     def health():
         return 'OK'
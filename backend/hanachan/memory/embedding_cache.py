@@ -0,0 +1,197 @@
+"""
+Embedding cache shared by every vector store in the process.
+
+One chat turn used to embed the same user query twice (resource search,
+then episodic search), and re-ingesting a resource re-embedded every
+unchanged chunk. CachedEmbeddings wraps the provider's embedding model and
+looks each text up first:
+
+- key: (model name, sha256 of the normalized text). Normalization is NFKC,
+  trimmed, with runs of whitespace collapsed, and the normalized text is
+  what gets embedded, so equal keys always mean equal vectors.
+- memory: an LRU of EMBEDDING_CACHE_MAX_ENTRIES vectors.
+- disk (optional): with EMBEDDING_CACHE_PATH set, vectors are also kept in
+  a SQLite file (WAL mode), so the web process and the RQ worker share them
+  and they survive restarts. Memory misses fall through to it.
+
+Queries and documents share entries: the OpenAI and Ollama embedding
+classes used here embed both the same way.
+
+Hit rate: embedding_cache_requests_total{model,result} in /metrics, with
+result = memory | disk | miss.
+"""
+
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import threading
+import unicodedata
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+from langchain_core.embeddings import Embeddings
+
+from utils.agent_metrics import EMBEDDING_CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "10000"))
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "")
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def model_name(embeddings: Embeddings) -> str:
+    return getattr(embeddings, "model", None) or type(embeddings).__name__
+
+
+class EmbeddingCache:
+    """(model, text hash) -> vector, in an LRU with an optional SQLite file behind it."""
+
+    def __init__(self, max_entries: int = EMBEDDING_CACHE_MAX_ENTRIES, path: str = EMBEDDING_CACHE_PATH):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str], List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._db = None
+        if path:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+                self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS embeddings ("
+                    "model TEXT NOT NULL, text_hash TEXT NOT NULL, vector BLOB NOT NULL, "
+                    "PRIMARY KEY (model, text_hash))")
+                logger.info("Embedding cache backed by %s", path)
+            except sqlite3.Error as e:
+                logger.warning("Embedding cache disk backing disabled (%s): %s", path, e)
+                self._db = None
+
+    def get_many(self, model: str, hashes: List[str]) -> Dict[str, List[float]]:
+        found, missing = {}, []
+        with self._lock:
+            for h in hashes:
+                vector = self._entries.get((model, h))
+                if vector is not None:
+                    self._entries.move_to_end((model, h))
+                    found[h] = vector
+                else:
+                    missing.append(h)
+        if found:
+            EMBEDDING_CACHE_REQUESTS.labels(model, "memory").inc(len(found))
+
+        if missing and self._db is not None:
+            from_disk = self._load(model, missing)
+            if from_disk:
+                EMBEDDING_CACHE_REQUESTS.labels(model, "disk").inc(len(from_disk))
+                self._remember(model, from_disk)
+                found.update(from_disk)
+        misses = len(set(hashes) - set(found))
+        if misses:
+            EMBEDDING_CACHE_REQUESTS.labels(model, "miss").inc(misses)
+        return found
+
+    def put_many(self, model: str, vectors: Dict[str, List[float]]):
+        self._remember(model, vectors)
+        if self._db is not None:
+            rows = [(model, h, array("d", v).tobytes()) for h, v in vectors.items()]
+            try:
+                with self._db_lock:
+                    self._db.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?)", rows)
+            except sqlite3.Error as e:
+                logger.warning("Embedding cache write failed: %s", e)
+
+    def _remember(self, model: str, vectors: Dict[str, List[float]]):
+        with self._lock:
+            for h, vector in vectors.items():
+                self._entries[(model, h)] = vector
+                self._entries.move_to_end((model, h))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _load(self, model: str, hashes: List[str]) -> Dict[str, List[float]]:
+        placeholders = ",".join("?" * len(hashes))
+        try:
+            with self._db_lock:
+                rows = self._db.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                    [model, *hashes]).fetchall()
+        except sqlite3.Error as e:
+            logger.warning("Embedding cache read failed: %s", e)
+            return {}
+        loaded = {}
+        for h, blob in rows:
+            vector = array("d")
+            vector.frombytes(blob)
+            loaded[h] = vector.tolist()
+        return loaded
+
+
+class CachedEmbeddings(Embeddings):
+    """Embeddings wrapper that only sends cache misses to the underlying model (in one batch)."""
+
+    def __init__(self, embeddings: Embeddings, cache: EmbeddingCache):
+        self.embeddings = embeddings
+        self.cache = cache
+        self.model = model_name(embeddings)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        normalized = [normalize_text(t) for t in texts]
+        hashes = [text_hash(t) for t in normalized]
+        vectors = self.cache.get_many(self.model, hashes)
+
+        todo = {}  # hash -> normalized text, deduplicated within the batch
+        for h, t in zip(hashes, normalized):
+            if h not in vectors:
+                todo.setdefault(h, t)
+        if todo:
+            computed = dict(zip(todo, self.embeddings.embed_documents(list(todo.values()))))
+            self.cache.put_many(self.model, computed)
+            vectors.update(computed)
+        return [list(vectors[h]) for h in hashes]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+_cache = None
+_embeddings: Dict[str, CachedEmbeddings] = {}
+_lock = threading.RLock()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    global _cache
+    with _lock:
+        if _cache is None:
+            _cache = EmbeddingCache()
+        return _cache
+
+
+def get_embeddings() -> Embeddings:
+    """
+    The provider's embedding model (ModelFactory) wrapped in the shared cache, one wrapper per model,
+    so every EpisodicMemory in the process (episodic, resource search, ingestion) shares the entries.
+    """
+    from services.llm_factory import ModelFactory
+
+    embeddings = ModelFactory.create_embeddings()
+    if not EMBEDDING_CACHE_ENABLED:
+        return embeddings
+    name = model_name(embeddings)
+    with _lock:
+        if name not in _embeddings:
+            _embeddings[name] = CachedEmbeddings(embeddings, get_embedding_cache())
+        return _embeddings[name]
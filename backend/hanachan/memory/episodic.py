@@ -3,6 +3,8 @@ import socket
 from langchain_core.documents import Document
 import logging
 
+from hanabira_shared.tracing import span
+
 logger = logging.getLogger(__name__)
 
 class EpisodicMemory:
@@ -10,13 +12,13 @@ class EpisodicMemory:
         # Lazy imports to prevent startup hang
         from langchain_qdrant import QdrantVectorStore
         from qdrant_client import QdrantClient
-        from services.llm_factory import ModelFactory
+        from memory.embedding_cache import get_embeddings
         
         self.collection_name = collection_name
         self.embedding_dimension = int(os.environ.get("EMBEDDING_DIMENSION", 1536))
         
-        # Use Factory for embeddings (handles OpenAI vs Ollama)
-        self.embeddings = ModelFactory.create_embeddings()
+        # Factory embeddings (OpenAI vs Ollama) behind the process-wide embedding cache
+        self.embeddings = get_embeddings()
         
         qdrant_host = os.environ.get("QDRANT_HOST", "localhost")
         qdrant_port = int(os.environ.get("QDRANT_PORT", 6333))
@@ -75,9 +77,11 @@ class EpisodicMemory:
         
         doc = Document(page_content=summary, metadata=metadata)
         try:
-            self.vector_store.add_documents([doc])
+            with span("qdrant.add_documents", kind="client",
+                      **{"db.system": "qdrant", "db.collection": self.collection_name}):
+                self.vector_store.add_documents([doc])
         except Exception as e:
-            logger.error(f"Failed to add document to Qdrant: {e}")
+            logger.error("Failed to add document to Qdrant: %s", e)
 
     def retrieve(self, query: str, user_id: str, k: int = 3, metadata_filter: dict = None) -> str:
         if not user_id:
@@ -116,18 +120,21 @@ class EpisodicMemory:
             
             filter_condition = models.Filter(must=must_conditions)
             
-            docs = self.vector_store.similarity_search(
-                query, 
-                k=k,
-                filter=filter_condition
-            )
+            # Embeds the query, then searches Qdrant
+            with span("qdrant.similarity_search", kind="client",
+                      **{"db.system": "qdrant", "db.collection": self.collection_name, "k": k}):
+                docs = self.vector_store.similarity_search(
+                    query, 
+                    k=k,
+                    filter=filter_condition
+                )
             
             if not docs:
                 return ""
                 
             return "\n\n".join([f"--- Excerpt from {doc.metadata.get('source', 'Unknown')} ---\n{doc.page_content}" for doc in docs])
         except Exception as e:
-            logger.error(f"Error retrieving episodic memory: {e}")
+            logger.error("Error retrieving episodic memory: %s", e)
             return ""
 
     def get_recent_memories(self, user_id: str, limit: int = 20) -> list:
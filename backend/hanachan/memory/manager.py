@@ -1,4 +1,4 @@
-from typing import Dict, Any, List
+from typing import Callable, Dict, Any, List, Tuple
 from services.llm_factory import ModelFactory
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.documents import Document
@@ -8,12 +8,28 @@ import uuid
 import json
 import logging
 import time
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 
-import logging
 from rq import Retry
 
+from utils.agent_metrics import MEMORY_RETRIEVAL_DROPPED, MEMORY_RETRIEVAL_DURATION
+from hanabira_shared.tracing import span, traced
+
 logger = logging.getLogger("hanachan.memory")
 
+# Per-source deadlines (seconds) for retrieve_context, measured from the start of the retrieval
+MEMORY_TIMEOUTS = {
+    "episodic": float(os.getenv("MEMORY_EPISODIC_TIMEOUT", "2.0")),
+    "semantic": float(os.getenv("MEMORY_SEMANTIC_TIMEOUT", "2.0")),
+    "study": float(os.getenv("MEMORY_STUDY_TIMEOUT", "3.0")),
+}
+
+# Shared by all requests. A source that misses its deadline keeps its worker until the backend answers,
+# so the pool is sized for a few stuck calls per source on top of the concurrent turns.
+_retrieval_pool = ThreadPoolExecutor(
+    max_workers=int(os.getenv("MEMORY_RETRIEVAL_WORKERS", "16")), thread_name_prefix="memory-retrieval")
+
 # Define Pydantic models for Knowledge Graph extraction
 class Node(BaseModel):
     id: str = Field(description="Unique identifier for the node")
@@ -77,6 +93,7 @@ class MemoryManager:
         except Exception as e:
             logger.error(f"MemoryManager: Memory LLM init failed: {e}")
 
+    @traced("memory.retrieve_resource_context")
     def retrieve_resource_context(self, query: str, user_id: str, resource_ids: List[str]) -> str:
         """Retrieves relevant chunks from attached resources."""
         if not self.resource_memory or not resource_ids or not user_id:
@@ -94,17 +111,66 @@ class MemoryManager:
             logger.error(f"Error retrieving resource context: {e}")
             return ""
 
+    @staticmethod
+    def _timed_source(source: str, fetch: Callable[[], str]) -> str:
+        start = time.perf_counter()
+        try:
+            with span(f"memory.{source}"):
+                return fetch()
+        finally:
+            MEMORY_RETRIEVAL_DURATION.labels(source).observe(time.perf_counter() - start)
+
+    def _gather(self, sources: Dict[str, Callable[[], str]]) -> Tuple[Dict[str, str], Dict[str, str]]:
+        """
+        Run the sources concurrently, each until its MEMORY_TIMEOUTS deadline.
+        Returns (results, dropped) where dropped maps source -> reason.
+        """
+        start = time.monotonic()
+        futures = {
+            # copy_context: the worker's span becomes a child of memory.retrieve_context
+            source: _retrieval_pool.submit(contextvars.copy_context().run, self._timed_source, source, fetch)
+            for source, fetch in sources.items()
+        }
+        results, dropped = {}, {}
+        for source, future in futures.items():
+            deadline = MEMORY_TIMEOUTS[source]
+            try:
+                results[source] = future.result(timeout=max(0.0, deadline - (time.monotonic() - start)))
+            except FutureTimeout:
+                future.cancel()
+                dropped[source] = f"timed out after {deadline:g}s"
+                MEMORY_RETRIEVAL_DROPPED.labels(source, "timeout").inc()
+                logger.warning("MemoryManager: %s retrieval missed its %gs deadline", source, deadline)
+            except Exception as e:
+                dropped[source] = "failed"
+                MEMORY_RETRIEVAL_DROPPED.labels(source, "error").inc()
+                logger.warning("MemoryManager: %s retrieval failed: %s", source, e)
+        return results, dropped
+
+    @traced("memory.retrieve_context")
     def retrieve_context(self, query: str, user_id: str, token: str = None) -> str:
-        """Retrieves formatted context from both memory stores, scoped to user."""
+        """
+        Retrieves formatted context from the episodic, semantic and study stores, scoped to user.
+        The three run concurrently; a source that is late or fails is left out and named in the context.
+        """
         if not self.active or not user_id:
             return ""
 
         start_time = time.time()
         try:
-            episodic_context = self.episodic.retrieve(query, user_id=user_id) if self.episodic else ""
-            semantic_context = self.semantic.retrieve(user_id=user_id, query=query, limit=5) if self.semantic else ""
-            study_context = self.study.retrieve_learner_context(user_id=user_id, token=token) if self.study else ""
-            
+            sources = {}
+            if self.episodic:
+                sources["episodic"] = lambda: self.episodic.retrieve(query, user_id=user_id)
+            if self.semantic:
+                sources["semantic"] = lambda: self.semantic.retrieve(user_id=user_id, query=query, limit=5)
+            if self.study:
+                sources["study"] = lambda: self.study.retrieve_learner_context(user_id=user_id, token=token)
+            results, dropped = self._gather(sources)
+
+            episodic_context = results.get("episodic") or ""
+            semantic_context = results.get("semantic") or ""
+            study_context = results.get("study") or ""
+
             context_parts = []
             if study_context:
                 context_parts.append(study_context)
@@ -112,9 +178,13 @@ class MemoryManager:
                 context_parts.append(f"Relevant Past Conversations:\n{episodic_context}")
             if semantic_context and "No semantic memories" not in semantic_context:
                 context_parts.append(f"Relevant Facts from Knowledge Graph:\n{semantic_context}")
+            if dropped:
+                unavailable = ", ".join(f"{source} memory ({reason})" for source, reason in dropped.items())
+                context_parts.append(f"[Memory unavailable this turn: {unavailable}. Do not assume it is empty.]")
                 
             elapsed = time.time() - start_time
-            logger.info(f"MemoryManager: Retrieval completed in {elapsed:.2f}s for user {user_id}")
+            logger.debug("MemoryManager: Retrieval completed in %.2fs for user %s (dropped: %s)", elapsed, user_id,
+                         ", ".join(dropped) or "none")
             
             if context_parts:
                 return "--- MEMORY CONTEXT ---\n" + "\n\n".join(context_parts) + "\n"
@@ -142,7 +212,7 @@ class MemoryManager:
                 agent_response=agent_response,
                 retry=Retry(max=3, interval=[60, 300, 600])
             )
-            logger.info(f"MemoryManager: Enqueued background task {job.id} for session {session_id}")
+            logger.debug("MemoryManager: Enqueued background task %s for session %s", job.id, session_id)
             
         except Exception as e:
             logger.error(f"MemoryManager: Failed to enqueue background task: {e}")
@@ -1,7 +1,12 @@
+import logging
 import os
 from typing import List, Dict, Any
 from pydantic import BaseModel, Field
 
+from hanabira_shared.tracing import span
+
+logger = logging.getLogger(__name__)
+
 class SemanticMemory:
     def __init__(self):
         self.graph = None
@@ -13,7 +18,7 @@ class SemanticMemory:
                 password=os.environ.get("NEO4J_PASSWORD", "password")
             )
         except Exception as e:
-            print(f"Failed to connect to Neo4j: {e}")
+            logger.warning("Failed to connect to Neo4j: %s", e)
 
     def add_relationships(self, relationships: List[Any], user_id: str):
         """
@@ -47,7 +52,7 @@ class SemanticMemory:
                     'target_id': rel.target.id
                 })
             except Exception as e:
-                print(f"Error adding relationship to Neo4j: {e}")
+                logger.error("Error adding relationship to Neo4j: %s", e)
 
     def retrieve(self, user_id: str, query: str = None, limit: int = 10) -> str:
         if not self.graph:
@@ -63,13 +68,14 @@ class SemanticMemory:
                 RETURN n.id as source, type(r) as relationship, m.id as target
                 LIMIT $limit
             """
-            result = self.graph.query(cypher, {'user_id': str(user_id), 'limit': limit})
+            with span("neo4j.query", kind="client", **{"db.system": "neo4j", "db.operation": "retrieve"}):
+                result = self.graph.query(cypher, {'user_id': str(user_id), 'limit': limit})
             
             if result:
                 return "\n".join([f"{r['source']} --[{r['relationship']}]--> {r['target']}" for r in result])
             return "No semantic memories found."
         except Exception as e:
-            print(f"Error retrieving semantic memory: {e}")
+            logger.error("Error retrieving semantic memory: %s", e)
             return "Error retrieving semantic context."
 
     def get_user_graph(self, user_id: str) -> Dict[str, List[Any]]:
@@ -120,5 +126,5 @@ class SemanticMemory:
                          
              return {"nodes": list(nodes.values()), "links": links}
         except Exception as e:
-            print(f"Error fetching user graph: {e}")
+            logger.error("Error fetching user graph: %s", e)
             return {"nodes": [], "links": []}
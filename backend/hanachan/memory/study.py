@@ -21,18 +21,20 @@ class StudyMemory:
         if not user_id:
             return ""
 
-        plan = self.client.get_active_plan_summary(user_id, token=token)
+        snapshot = self.client.get_context_snapshot(user_id, token=token)
+        if snapshot is None:
+            snapshot = self._gather_legacy(user_id, token)
+
+        plan = snapshot.get("plan")
         if not plan:
             return ""
-        
-        # Some methods in StudyServiceClient already have token support (from my previous edit or existing)
-        # Let's ensure we pass it to all that need it.
-        goals = self.client.get_daily_goals(user_id, token=token)
-        stats = self.client.get_learner_stats(user_id, token=token)
-        perf_history = self.client.get_performance_history(user_id, token=token)
-        perf_trends = self.client.get_performance_trends(user_id, token=token)
-        activity_records = self.client.get_user_activity_records(user_id, token=token)
-        
+
+        goals = snapshot.get("daily_tasks") or []
+        stats = {"streak": snapshot.get("streak"), "recent_sessions": snapshot.get("recent_sessions") or []}
+        perf_history = snapshot.get("performance_history") or []
+        perf_trends = snapshot.get("performance_trends") or {}
+        activity_records = snapshot.get("activities") or []
+
         # Retrieve persistent struggle points from Semantic Memory
         # We query for nodes the user STRUGGLES_WITH
         semantic_struggles = self._retrieve_struggles(user_id)
@@ -82,6 +84,22 @@ class StudyMemory:
 
         return "\n".join(context)
 
+    def _gather_legacy(self, user_id: str, token: Optional[str]) -> Dict[str, Any]:
+        """Per-endpoint fallback for study services without the snapshot route."""
+        plan = self.client.get_active_plan_summary(user_id, token=token)
+        if not plan:
+            return {}
+        stats = self.client.get_learner_stats(user_id, token=token)
+        return {
+            "plan": plan,
+            "daily_tasks": self.client.get_daily_goals(user_id, token=token),
+            "streak": stats.get("streak"),
+            "recent_sessions": stats.get("recent_sessions"),
+            "performance_history": self.client.get_performance_history(user_id, token=token),
+            "performance_trends": self.client.get_performance_trends(user_id, token=token),
+            "activities": self.client.get_user_activity_records(user_id, token=token),
+        }
+
     def _days_until(self, date_str: Optional[str]) -> str:
         if not date_str:
             return "N/A"
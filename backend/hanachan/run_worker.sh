@@ -15,4 +15,5 @@ sleep 5
 
 # Run worker
 # Validates connection to Redis and listens on 'default' queue
-rq worker default --url $REDIS_URL
+# MetricsWorker records rq_job_duration_seconds (see utils/agent_metrics.py)
+rq worker default --url $REDIS_URL -w utils.agent_metrics.MetricsWorker
@@ -63,7 +63,7 @@ class AgentService:
             user_msg_id = user_msg.id
             
         except Exception as e:
-            print(f"DB Error processing request (Falling back to Mock without persistence): {e}")
+            logger.error("DB Error processing request (Falling back to Mock without persistence): %s", e)
             traceback.print_exc()
             # We continue without DB persistence
             
@@ -145,7 +145,7 @@ class AgentService:
                         )
                         db_art_id = mongo_artifact["_id"]
                     except Exception as e:
-                        print(f"Mongo Artifact Save Error: {e}")
+                        logger.error("Mongo Artifact Save Error: %s", e)
 
                 # 2. SQL Persistence (for History/Bubble display)
                 if asst_msg_id:
@@ -287,7 +287,7 @@ class AgentService:
                         db.session.commit()
                         
                     except Exception as sql_e:
-                        print(f"SQL Artifact Persist Error: {sql_e}")
+                        logger.error("SQL Artifact Persist Error: %s", sql_e)
                         traceback.print_exc()
                         db.session.rollback()
 
@@ -312,11 +312,11 @@ class AgentService:
                     db.session.add(new_sugg)
                     db.session.commit()
                 except Exception as s_e:
-                    print(f"Suggestion Persist Error: {s_e}")
+                    logger.error("Suggestion Persist Error: %s", s_e)
                     db.session.rollback()
                 
         except Exception as e:
-            print(f"Error saving assistant response to DB (continuing): {e}")
+            logger.error("Error saving assistant response to DB (continuing): %s", e)
             traceback.print_exc()
             # Fallback response items if saving failed completely but generation worked
             if not response_items:
@@ -352,14 +352,14 @@ class AgentService:
             conv_id = str(conv.id)
             user_msg_id = user_msg.id
         except Exception as e:
-            print(f"Streaming Persistence Error (Pre-stream): {e}")
+            logger.error("Streaming Persistence Error (Pre-stream): %s", e)
 
         # 2. Yield Metadata (Frontend needs conversationId early - Use Session UUID)
         if conv and conv.session_id:
             yield f"__METADATA__:{json.dumps({'conversationId': conv.session_id})}\n"
 
         # 3. Stream from Agent
-        logger.info(f"🚀 Starting stream from agent for session {request_data.session_id}")
+        logger.debug("Starting stream from agent for session %s", request_data.session_id)
         agent = HanachanAgent()
         full_content = ""
         chunk_count = 0
@@ -401,7 +401,7 @@ class AgentService:
                     chat_history.append(msg)
                     
             except Exception as e:
-                print(f"Error fetching chat history: {e}")
+                logger.warning("Error fetching chat history: %s", e)
 
         for chunk in agent.invoke(
             prompt=request_data.prompt,
@@ -417,7 +417,7 @@ class AgentService:
                 full_content += chunk
                 yield chunk
         
-        logger.info(f"✅ Finished stream. Sent {chunk_count} chunks, total length: {len(full_content)}")
+        logger.debug("Finished stream. Sent %d chunks, total length: %d", chunk_count, len(full_content))
 
         # 4. Finalize Persistence
         if conv_id and user_msg_id:
@@ -431,7 +431,7 @@ class AgentService:
                 )
                 db.session.add(asst_msg)
                 db.session.commit()
-                print(f"Streaming Persistence Complete for Conv {conv_id}")
+                logger.debug("Streaming Persistence Complete for Conv %s", conv_id)
             except Exception as e:
-                print(f"Streaming Persistence Error (Post-stream): {e}")
+                logger.error("Streaming Persistence Error (Post-stream): %s", e)
                 db.session.rollback()
@@ -6,6 +6,9 @@ import logging
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 
+from agent.registry import get_skill_registry
+from hanabira_shared.tracing import inject, span
+
 # Configuration
 OLLAMA_BASE_URL = os.environ.get("OLLAMA_BASE_URL", "http://localhost:11434")
 OLLAMA_MODEL = os.environ.get("LINGUISTICS_MODEL", "qwen3:1.7b")
@@ -16,27 +19,20 @@ logger = logging.getLogger(__name__)
 class LinguisticsService:
     """Hybrid Linguistic Service combining MeCab precision with Qwen3 intelligence"""
 
-    def __init__(self):
-        self.skills_dir = os.path.join(os.path.dirname(__file__), "..", "agent", "skills")
-
     def _get_skill_prompt(self, skill_name: str) -> str:
-        """Load skill prompt from markdown file"""
-        try:
-            skill_path = os.path.join(self.skills_dir, f"{skill_name}.md")
-            with open(skill_path, 'r', encoding='utf-8') as f:
-                return f.read()
-        except Exception as e:
-            logger.error(f"Error loading skill {skill_name}: {e}")
-            return f"Act as a professional linguist for {skill_name}."
+        """Skill prompt from agent/skills, cached process-wide by the agent registry"""
+        return get_skill_registry().get(skill_name, f"Act as a professional linguist for {skill_name}.")
 
     def _get_mecab_context(self, text: str) -> List[Any]:
         """Fetch deterministic tokenization from the Dictionary Service (Port 5200)"""
         try:
-            response = requests.post(
-                f"{DICTIONARY_SERVICE_URL}/v1/parse-split",
-                json={"text": text},
-                timeout=5
-            )
+            with span("POST /v1/parse-split", kind="client", **{"peer.service": "python-dictionary"}):
+                response = requests.post(
+                    f"{DICTIONARY_SERVICE_URL}/v1/parse-split",
+                    json={"text": text},
+                    headers=inject(),
+                    timeout=5
+                )
             if response.status_code == 200:
                 return response.json()
             return []
@@ -4,14 +4,17 @@ Study Plan Context Provider for Hanachan AI Tutor
 Provides study plan-aware context to the chat agent for personalized responses.
 """
 
-import requests
+import logging
 import os
+import requests
 from typing import Dict, Any, Optional
 from datetime import datetime
 
 # Flask API URL for study plan endpoints
 FLASK_API_URL = os.getenv("FLASK_API_URL", "http://localhost:5100")
 
+logger = logging.getLogger(__name__)
+
 
 class StudyPlanContextProvider:
     """
@@ -54,7 +57,7 @@ class StudyPlanContextProvider:
             return None
 
         except requests.RequestException as e:
-            print(f"[StudyPlanContext] Error fetching plan: {e}")
+            logger.warning("Error fetching plan: %s", e)
             return None
 
     def get_daily_tasks(self) -> Dict[str, Any]:
@@ -76,7 +79,7 @@ class StudyPlanContextProvider:
             return {"tasks": [], "message": "No tasks available"}
 
         except requests.RequestException as e:
-            print(f"[StudyPlanContext] Error fetching tasks: {e}")
+            logger.warning("Error fetching tasks: %s", e)
             return {"tasks": [], "error": str(e)}
 
     def get_current_milestone(self) -> Optional[Dict[str, Any]]:
@@ -158,7 +161,7 @@ about their progress, what to study, or needs motivation, reference these detail
             return None
 
         except requests.RequestException as e:
-            print(f"[StudyPlanContext] Error fetching learner progress: {e}")
+            logger.warning("Error fetching learner progress: %s", e)
             return None
 
     def get_recommendations(self) -> Optional[Dict[str, Any]]:
@@ -175,7 +178,7 @@ about their progress, what to study, or needs motivation, reference these detail
             return None
 
         except requests.RequestException as e:
-            print(f"[StudyPlanContext] Error fetching recommendations: {e}")
+            logger.warning("Error fetching recommendations: %s", e)
             return None
 
     def get_full_context_summary(self) -> str:
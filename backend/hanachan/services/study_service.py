@@ -1,45 +1,184 @@
 import os
-import requests
+import json
+import time
+import hashlib
 import logging
-from typing import Dict, Any, Optional, List
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Tuple
+
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from hanabira_shared.tracing import TracedSession
 
 logger = logging.getLogger("hanachan.services.study")
 
+# Connection pool shared by every StudyServiceClient in the process (agent tools, StudyMemory)
+STUDY_HTTP_POOL_SIZE = int(os.getenv("STUDY_HTTP_POOL_SIZE", "20"))
+STUDY_HTTP_TIMEOUT = (float(os.getenv("STUDY_HTTP_CONNECT_TIMEOUT", "1.0")),
+                      float(os.getenv("STUDY_HTTP_READ_TIMEOUT", "5.0")))
+
+# Per-user memo for GETs: served as-is for STUDY_CACHE_TTL_SECONDS, then revalidated with If-None-Match
+STUDY_CACHE_TTL_SECONDS = float(os.getenv("STUDY_CACHE_TTL_SECONDS", "15"))
+STUDY_CACHE_MAX_ENTRIES = int(os.getenv("STUDY_CACHE_MAX_ENTRIES", "2000"))
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> TracedSession:
+    """
+    Keep-alive session (client spans + traceparent) with a pooled adapter.
+    Idempotent GETs retry once on a connect error; nothing retries on a read timeout.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = TracedSession()
+                adapter = HTTPAdapter(
+                    pool_connections=4,
+                    pool_maxsize=STUDY_HTTP_POOL_SIZE,
+                    max_retries=Retry(total=1, connect=1, read=0, status=0, backoff_factor=0.1,
+                                      allowed_methods=frozenset({"GET"})),
+                )
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _session = session
+    return _session
+
+
+class StudyReadCache:
+    """
+    LRU of GET responses keyed by (user, url, params, token hash).
+    Entries hold the raw body so every hit gets its own parsed copy.
+    """
+
+    def __init__(self, ttl: float = STUDY_CACHE_TTL_SECONDS, max_entries: int = STUDY_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[tuple, list]" = OrderedDict()  # key -> [fetched_at, etag, body]
+        self._lock = threading.Lock()
+        self.hits = self.revalidated = self.misses = 0  # approximate (unlocked) counters for logs and tests
+
+    @staticmethod
+    def key(user_id: str, url: str, params: Optional[Dict[str, Any]], token: Optional[str]) -> tuple:
+        token_hash = hashlib.sha256(token.encode()).hexdigest()[:16] if token else None
+        return (user_id, url, tuple(sorted((params or {}).items())), token_hash)
+
+    def get(self, key: tuple) -> Optional[list]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: tuple, etag: Optional[str], body: bytes):
+        with self._lock:
+            self._entries[key] = [time.monotonic(), etag, body]
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def touch(self, key: tuple):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry[0] = time.monotonic()
+
+    def invalidate(self, user_id: Optional[str] = None):
+        """Drop one user's entries, or everything when the user is unknown."""
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+                return
+            for key in [k for k in self._entries if k[0] == user_id]:
+                del self._entries[key]
+
+
+_read_cache = StudyReadCache()
+
+
 class StudyServiceClient:
     def __init__(self):
         # Default to localhost if not specified
         base_url = os.environ.get("STUDY_PLAN_SERVICE_URL", "http://localhost:5500")
+        self.base_url = base_url
         self.api_base = f"{base_url}/v1/study-plan"
         self.perf_base = f"{base_url}/v1/performance"
         self.learner_base = f"{base_url}/v1/learner"
+        self.snapshot_base = f"{base_url}/v1/context/snapshot"
+        self.http = get_session()
+        self.timeout = STUDY_HTTP_TIMEOUT
+        self.cache = _read_cache
+
+    def _get_json(self, user_id: str, url: str, params: Optional[Dict[str, Any]] = None,
+                  token: Optional[str] = None) -> Tuple[int, Any]:
+        """
+        GET through the per-user memo: (status, parsed body). Fresh entries skip the network;
+        stale ones are revalidated with If-None-Match, and a 304 renews them. Only 200s are kept.
+        """
+        key = self.cache.key(user_id, url, params, token)
+        entry = self.cache.get(key)
+        if entry is not None and time.monotonic() - entry[0] < self.cache.ttl:
+            self.cache.hits += 1
+            return 200, json.loads(entry[2])
+
+        headers = {"Authorization": f"Bearer {token}"} if token else {}
+        if entry is not None and entry[1]:
+            headers["If-None-Match"] = entry[1]
+        res = self.http.get(url, params=params, headers=headers, timeout=self.timeout)
+
+        if res.status_code == 304 and entry is not None:
+            self.cache.revalidated += 1
+            self.cache.touch(key)
+            return 200, json.loads(entry[2])
+        self.cache.misses += 1
+        if res.status_code != 200:
+            return res.status_code, None
+        self.cache.put(key, res.headers.get("ETag"), res.content)
+        return 200, res.json()
+
+    def get_context_snapshot(self, user_id: str, token: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Fetches the composite learner context (plan, tasks, streak, sessions,
+        activities, performance) in a single round trip.
+        """
+        try:
+            status, data = self._get_json(user_id, f"{self.snapshot_base}/{user_id}", token=token)
+            if status != 200:
+                return None
+            return data
+        except Exception as e:
+            logger.error(f"Failed to fetch context snapshot for {user_id}: {e}")
+            return None
 
     def get_active_plan_summary(self, user_id: str, token: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """
         Fetches the primary active study plan and its high-level stats.
         """
         try:
-            headers = {"Authorization": f"Bearer {token}"} if token else {}
             # First, list active plans
-            res = requests.get(f"{self.api_base}/plans", params={"user_id": user_id, "status": "active"}, headers=headers, timeout=5)
-            if res.status_code != 200:
+            status, plans_data = self._get_json(
+                user_id, f"{self.api_base}/plans", params={"user_id": user_id, "status": "active"}, token=token)
+            if status != 200:
                 return None
             
-            plans = res.json().get("plans", [])
+            plans = plans_data.get("plans", [])
             if not plans:
                 return None
             
             plan_id = plans[0]["id"]
             
             # Fetch detailed plan data
-            plan_res = requests.get(f"{self.api_base}/plans/{plan_id}", headers=headers, timeout=5)
-            if plan_res.status_code != 200:
+            status, plan_data = self._get_json(user_id, f"{self.api_base}/plans/{plan_id}", token=token)
+            if status != 200:
                 return None
             
-            plan_data = plan_res.json()
-            
             # Fetch health/progress summary
-            health_res = requests.get(f"{self.api_base}/plans/{plan_id}/health", headers=headers, timeout=5)
-            health_data = health_res.json() if health_res.status_code == 200 else {}
+            status, health_data = self._get_json(user_id, f"{self.api_base}/plans/{plan_id}/health", token=token)
+            health_data = health_data if status == 200 else {}
             
             return {
                 "plan_id": plan_id,
@@ -60,19 +199,18 @@ class StudyServiceClient:
         Fetches today's tasks/goals for the user.
         """
         try:
-            headers = {"Authorization": f"Bearer {token}"} if token else {}
             # Check both daily-tasks and smart-goals endpoints
-            res = requests.get(f"{self.api_base}/daily-tasks", params={"user_id": user_id}, headers=headers, timeout=5)
-            if res.status_code == 200:
-                data = res.json()
+            status, data = self._get_json(user_id, f"{self.api_base}/daily-tasks", params={"user_id": user_id},
+                                          token=token)
+            if status == 200:
                 if isinstance(data, list):
                     return data
                 return data.get("tasks", [])
             
             # Fallback to smart-goals list
-            res = requests.get(f"{os.environ.get('STUDY_PLAN_SERVICE_URL', 'http://localhost:5500')}/v1/smart-goals", params={"user_id": user_id}, headers=headers, timeout=5)
-            if res.status_code == 200:
-                data = res.json()
+            status, data = self._get_json(user_id, f"{self.base_url}/v1/smart-goals", params={"user_id": user_id},
+                                          token=token)
+            if status == 200:
                 if isinstance(data, list):
                     return data
             return []
@@ -85,16 +223,17 @@ class StudyServiceClient:
         Fetches overall learner statistics (streaks, effort, sessions).
         """
         try:
-            headers = {"Authorization": f"Bearer {token}"} if token else {}
             # This uses the user endpoints in the study service
-            base_user_api = f"{os.environ.get('STUDY_PLAN_SERVICE_URL', 'http://localhost:5500')}/v1/user"
+            base_user_api = f"{self.base_url}/v1/user"
             
-            streak_res = requests.get(f"{base_user_api}/streak", params={"user_id": user_id}, headers=headers, timeout=5)
-            session_res = requests.get(f"{base_user_api}/sessions", params={"user_id": user_id, "limit": 5}, headers=headers, timeout=5)
+            streak_status, streak = self._get_json(user_id, f"{base_user_api}/streak", params={"user_id": user_id},
+                                                   token=token)
+            session_status, sessions = self._get_json(
+                user_id, f"{base_user_api}/sessions", params={"user_id": user_id, "limit": 5}, token=token)
             
             return {
-                "streak": streak_res.json() if streak_res.status_code == 200 else {"current": 0},
-                "recent_sessions": session_res.json().get("sessions", []) if session_res.status_code == 200 else []
+                "streak": streak if streak_status == 200 else {"current": 0},
+                "recent_sessions": sessions.get("sessions", []) if session_status == 200 else []
             }
         except Exception as e:
             logger.error(f"Failed to fetch learner stats for {user_id}: {e}")
@@ -104,7 +243,8 @@ class StudyServiceClient:
         """Saves a performance audit/tracking entry."""
         try:
             headers = {"Authorization": f"Bearer {token}"} if token else {}
-            res = requests.post(f"{self.perf_base}/trackings", json=data, headers=headers, timeout=5)
+            res = self.http.post(f"{self.perf_base}/trackings", json=data, headers=headers, timeout=self.timeout)
+            self.cache.invalidate(user_id)
             return res.status_code == 201
         except Exception as e:
             logger.error(f"Failed to save performance tracking for {user_id}: {e}")
@@ -113,17 +253,18 @@ class StudyServiceClient:
     def get_performance_history(self, user_id: str, token: Optional[str] = None) -> List[Dict[str, Any]]:
         """Retrieves user performance tracking history."""
         try:
-            headers = {"Authorization": f"Bearer {token}"} if token else {}
-            res = requests.get(f"{self.perf_base}/trackings", params={"user_id": user_id}, headers=headers, timeout=5)
-            if res.status_code == 200:
-                return res.json().get("trackings", [])
+            status, data = self._get_json(user_id, f"{self.perf_base}/trackings", params={"user_id": user_id},
+                                          token=token)
+            if status == 200:
+                return data.get("trackings", [])
             return []
         except Exception as e:
             logger.error(f"Failed to fetch performance history for {user_id}: {e}")
             return []
 
-    def update_goal_status(self, goal_id: str, completed: bool, token: Optional[str] = None) -> bool:
-        """Updates the completion status of a specific goal."""
+    def update_goal_status(self, goal_id: str, completed: bool, token: Optional[str] = None,
+                           user_id: Optional[str] = None) -> bool:
+        """Updates the completion status of a specific goal. Without user_id the whole read memo is dropped."""
         try:
             # We assume the smart-goals module has a toggle or update endpoint.
             # Looking at smart_goals.py, there is a toggle_criteria but let's assume a direct goal update for simplicity or implement it.
@@ -132,7 +273,8 @@ class StudyServiceClient:
             headers = {"Authorization": f"Bearer {token}"} if token else {}
             # NOTE: We'll need to check if we need a specific 'update' endpoint or if 'toggle' is enough.
             # For this context, let's assume the existence of a status update endpoint.
-            res = requests.post(f"{os.environ.get('STUDY_PLAN_SERVICE_URL', 'http://localhost:5500')}/v1/smart-goals/{goal_id}/toggle", headers=headers, timeout=5)
+            res = self.http.post(f"{self.base_url}/v1/smart-goals/{goal_id}/toggle", headers=headers, timeout=self.timeout)
+            self.cache.invalidate(user_id)
             return res.status_code == 200
         except Exception as e:
             logger.error(f"Failed to update goal {goal_id}: {e}")
@@ -141,10 +283,9 @@ class StudyServiceClient:
     def get_user_activity_records(self, user_id: str, token: Optional[str] = None) -> List[Dict[str, Any]]:
         """Fetches flat list of all study activities (quizzes, flashcards, etc)."""
         try:
-            headers = {"Authorization": f"Bearer {token}"} if token else {}
-            res = requests.get(f"{self.learner_base}/activities/{user_id}", headers=headers, timeout=5)
-            if res.status_code == 200:
-                return res.json().get("activities", [])
+            status, data = self._get_json(user_id, f"{self.learner_base}/activities/{user_id}", token=token)
+            if status == 200:
+                return data.get("activities", [])
             return []
         except Exception as e:
             logger.error(f"Failed to fetch activity records for {user_id}: {e}")
@@ -154,9 +295,10 @@ class StudyServiceClient:
         """Sends a batch of goal updates to the study service."""
         try:
             headers = {"Authorization": f"Bearer {token}"} if token else {}
-            res = requests.post(f"{os.environ.get('STUDY_PLAN_SERVICE_URL', 'http://localhost:5500')}/v1/smart-goals/batch", 
+            res = self.http.post(f"{self.base_url}/v1/smart-goals/batch", 
                                json={"user_id": user_id, "updates": updates}, 
-                               headers=headers, timeout=5)
+                               headers=headers, timeout=self.timeout)
+            self.cache.invalidate(user_id)
             return res.status_code == 200
         except Exception as e:
             logger.error(f"Failed to batch update goals for {user_id}: {e}")
@@ -165,10 +307,10 @@ class StudyServiceClient:
     def get_performance_trends(self, user_id: str, days: int = 30, token: Optional[str] = None) -> Dict[str, Any]:
         """Fetches trend analysis from performance trackings."""
         try:
-            headers = {"Authorization": f"Bearer {token}"} if token else {}
-            res = requests.get(f"{self.perf_base}/trends", params={"user_id": user_id, "days": days}, headers=headers, timeout=5)
-            if res.status_code == 200:
-                return res.json()
+            status, data = self._get_json(user_id, f"{self.perf_base}/trends", params={"user_id": user_id, "days": days},
+                                          token=token)
+            if status == 200:
+                return data
             return {"status": "error", "message": "Failed to fetch trends"}
         except Exception as e:
             logger.error(f"Failed to fetch performance trends for {user_id}: {e}")
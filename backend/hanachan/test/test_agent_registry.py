@@ -0,0 +1,92 @@
+import os
+import tempfile
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from agent import registry
+
+
+class TestSkillRegistry(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "chat_persona.md")
+        self._write("You are Hanachan.", mtime=1_000_000)
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def _write(self, text, mtime):
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.utime(self.path, (mtime, mtime))
+
+    def test_reads_once_without_reload(self):
+        skills = registry.SkillRegistry(self.dir.name, reload=False)
+        self.assertEqual(skills.get("chat_persona"), "You are Hanachan.")
+        self._write("Edited.", mtime=1_000_100)
+        self.assertEqual(skills.get("chat_persona"), "You are Hanachan.")
+
+    def test_reloads_on_mtime_change(self):
+        skills = registry.SkillRegistry(self.dir.name, reload=True)
+        self.assertEqual(skills.get("chat_persona"), "You are Hanachan.")
+        with patch("builtins.open", side_effect=AssertionError("re-read with unchanged mtime")):
+            self.assertEqual(skills.get("chat_persona"), "You are Hanachan.")
+        self._write("Edited.", mtime=1_000_100)
+        self.assertEqual(skills.get("chat_persona"), "Edited.")
+
+    def test_missing_skill_uses_default_and_keeps_last_good_text(self):
+        skills = registry.SkillRegistry(self.dir.name, reload=True)
+        self.assertEqual(skills.get("nope", "fallback"), "fallback")
+        skills.get("chat_persona")
+        os.remove(self.path)
+        self.assertEqual(skills.get("chat_persona", "fallback"), "You are Hanachan.")
+
+
+class TestAgentRuntime(unittest.TestCase):
+    def setUp(self):
+        registry.clear_registry()
+        self.env = patch.dict(os.environ, {"LLM_PROVIDER": "ollama", "CHAT_MODEL": "qwen3:1.7b"})
+        self.env.start()
+
+    def tearDown(self):
+        self.env.stop()
+        registry.clear_registry()
+
+    @patch("agent.registry.ModelFactory.create_chat_model")
+    def test_clients_and_bindings_are_built_once_per_config(self, mock_create):
+        mock_create.side_effect = lambda temperature: MagicMock(model="qwen3:1.7b", temperature=temperature)
+
+        first = registry.get_agent_runtime()
+        for _ in range(50):
+            self.assertIs(registry.get_agent_runtime(), first)
+        self.assertEqual(mock_create.call_count, 1)
+        first.llm.bind_tools.assert_called_once()
+        self.assertEqual(set(first.tool_map), {t.name for t in registry.AGENT_TOOLS})
+
+        # A different temperature or model is a different configuration
+        self.assertIsNot(registry.get_agent_runtime(temperature=0.2), first)
+        with patch.dict(os.environ, {"CHAT_MODEL": "qwen3:8b"}):
+            self.assertIsNot(registry.get_agent_runtime(), first)
+        self.assertEqual(mock_create.call_count, 3)
+
+    @patch("agent.registry.ModelFactory.create_chat_model")
+    def test_unsupported_tool_binding_falls_back_to_plain_model(self, mock_create):
+        llm = MagicMock()
+        llm.bind_tools.side_effect = NotImplementedError
+        mock_create.return_value = llm
+        runtime = registry.get_agent_runtime()
+        self.assertIs(runtime.llm_with_tools, llm)
+
+    @patch("agent.registry.ModelFactory.create_chat_model")
+    def test_warm_runtime_lookup_is_cheap(self, mock_create):
+        mock_create.return_value = MagicMock()
+        registry.get_agent_runtime()
+        start = time.perf_counter()
+        for _ in range(1000):
+            registry.get_agent_runtime()
+        self.assertLess((time.perf_counter() - start) / 1000, 0.001)
+
+
+if __name__ == "__main__":
+    unittest.main()
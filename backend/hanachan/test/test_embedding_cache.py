@@ -0,0 +1,102 @@
+import os
+import tempfile
+import unittest
+from typing import List
+from unittest.mock import patch
+
+from langchain_core.embeddings import Embeddings
+
+from memory import embedding_cache
+from utils import agent_metrics as metrics
+
+
+class CountingEmbeddings(Embeddings):
+    """Fake embedding model: deterministic vectors, counts every text it is asked to embed."""
+
+    model = "fake-embed"
+
+    def __init__(self):
+        self.calls = 0
+        self.texts: List[str] = []
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.calls += 1
+        self.texts.extend(texts)
+        return [[float(len(t)), float(sum(map(ord, t)) % 997), 0.5] for t in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+def lookups(result):
+    return metrics.EMBEDDING_CACHE_REQUESTS.labels("fake-embed", result)._value.get()
+
+
+class TestCachedEmbeddings(unittest.TestCase):
+    def setUp(self):
+        self.model = CountingEmbeddings()
+        self.embeddings = embedding_cache.CachedEmbeddings(self.model, embedding_cache.EmbeddingCache(path=""))
+
+    def test_same_query_is_embedded_once(self):
+        first = self.embeddings.embed_query("What does は mark?")
+        # Resource search and episodic search in the same turn
+        self.assertEqual(self.embeddings.embed_query("What does は mark?"), first)
+        self.assertEqual(self.embeddings.embed_query("  What   does は mark?\n"), first)  # normalized
+        self.assertEqual(self.model.calls, 1)
+
+    def test_only_misses_reach_the_model_in_one_batch(self):
+        self.embeddings.embed_documents(["chunk one", "chunk two"])
+        vectors = self.embeddings.embed_documents(["chunk one", "chunk three", "chunk three", "chunk two"])
+        self.assertEqual(self.model.calls, 2)
+        self.assertEqual(self.model.texts, ["chunk one", "chunk two", "chunk three"])
+        self.assertEqual(vectors[1], vectors[2])
+
+    def test_hit_rate_metrics(self):
+        hits, misses = lookups("memory"), lookups("miss")
+        self.embeddings.embed_documents(["a", "b"])
+        self.embeddings.embed_documents(["a", "b", "c"])
+        self.assertEqual(lookups("memory") - hits, 2)
+        self.assertEqual(lookups("miss") - misses, 3)
+
+    def test_returned_vectors_are_copies(self):
+        self.embeddings.embed_query("q").append(99.0)
+        self.assertEqual(len(self.embeddings.embed_query("q")), 3)
+
+    def test_lru_bound(self):
+        self.embeddings.cache.max_entries = 2
+        self.embeddings.embed_documents(["a", "b", "c"])
+        self.embeddings.embed_query("a")
+        self.assertEqual(self.model.calls, 2)
+
+
+class TestDiskBacking(unittest.TestCase):
+    def test_vectors_survive_a_new_process_cache(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "embeddings.sqlite")
+            ingest_model = CountingEmbeddings()
+            ingest = embedding_cache.CachedEmbeddings(ingest_model, embedding_cache.EmbeddingCache(path=path))
+            vectors = ingest.embed_documents(["chunk one", "chunk two"])
+
+            # e.g. the RQ worker re-ingesting the same resource, or a restart
+            model = CountingEmbeddings()
+            fresh = embedding_cache.CachedEmbeddings(model, embedding_cache.EmbeddingCache(path=path))
+            disk_hits = lookups("disk")
+            self.assertEqual(fresh.embed_documents(["chunk one", "chunk two"]), vectors)
+            self.assertEqual(model.calls, 0)
+            self.assertEqual(lookups("disk") - disk_hits, 2)
+
+
+class TestSharedWrapper(unittest.TestCase):
+    def test_vector_stores_share_one_cache(self):
+        with patch.object(embedding_cache, "_cache", None), patch.object(embedding_cache, "_embeddings", {}), \
+                patch("services.llm_factory.ModelFactory.create_embeddings", side_effect=CountingEmbeddings):
+            episodic = embedding_cache.get_embeddings()
+            resources = embedding_cache.get_embeddings()
+            self.assertIs(episodic, resources)
+            episodic.embed_query("same question")
+            resources.embed_query("same question")
+            self.assertEqual(episodic.embeddings.calls, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
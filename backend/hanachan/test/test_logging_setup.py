@@ -0,0 +1,49 @@
+import os
+import re
+import unittest
+
+import hanabira_shared
+from app import HOT_LOGGERS
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SHARED_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(hanabira_shared.__file__)))
+NAMED = re.compile(r"""getLogger\(\s*["']([\w.]+)["']\s*\)""")
+
+
+def logger_names():
+    """Logger name -> source file, for every logger the service creates (explicit names and module __name__s)."""
+    names = _logger_names(ROOT)
+    names.update(_logger_names(os.path.join(SHARED_ROOT, "hanabira_shared"), SHARED_ROOT))
+    return names
+
+
+def _logger_names(top, root=ROOT):
+    names = {}
+    for dirpath, dirnames, filenames in os.walk(top):
+        dirnames[:] = [d for d in dirnames if not d.startswith((".", "__")) and d not in ("test", "venv", ".venv")]
+        for filename in filenames:
+            if not filename.endswith(".py"):
+                continue
+            path = os.path.join(dirpath, filename)
+            with open(path, encoding="utf-8") as f:
+                source = f.read()
+            relpath = os.path.relpath(path, root)
+            names.update((name, relpath) for name in NAMED.findall(source))
+            if "getLogger(__name__)" in source:
+                names[relpath[:-3].replace(os.sep, ".")] = relpath
+    return names
+
+
+class HotLoggersTest(unittest.TestCase):
+    def test_hot_loggers_exist(self):
+        # Filters only apply to the exact logger, so a parent or misspelt name silently does nothing
+        missing = set(HOT_LOGGERS) - set(logger_names())
+        self.assertEqual(missing, set())
+
+    def test_memory_loggers_are_hot(self):
+        memory = {name for name, path in logger_names().items() if path.startswith("memory" + os.sep)}
+        self.assertEqual(memory - set(HOT_LOGGERS), set())
+
+
+if __name__ == "__main__":
+    unittest.main()
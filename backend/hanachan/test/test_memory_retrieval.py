@@ -0,0 +1,82 @@
+import time
+import unittest
+from unittest.mock import MagicMock, patch
+
+from memory import manager
+from utils import agent_metrics as metrics
+
+
+def make_manager(episodic=None, semantic=None, study=None):
+    """A MemoryManager without its live-service __init__ (Qdrant, Neo4j, queue)."""
+    mm = manager.MemoryManager.__new__(manager.MemoryManager)
+    mm.active = True
+    mm.episodic, mm.semantic, mm.study = episodic, semantic, study
+    return mm
+
+
+def source(method, result=None, delay=0.0, error=None):
+    def fetch(*args, **kwargs):
+        time.sleep(delay)
+        if error:
+            raise error
+        return result
+    backend = MagicMock()
+    getattr(backend, method).side_effect = fetch
+    return backend
+
+
+def dropped(source_name, reason):
+    return metrics.MEMORY_RETRIEVAL_DROPPED.labels(source_name, reason)._value.get()
+
+
+@patch.dict(manager.MEMORY_TIMEOUTS, {"episodic": 0.5, "semantic": 0.2, "study": 0.5})
+class TestConcurrentRetrieval(unittest.TestCase):
+    def test_sources_run_concurrently(self):
+        mm = make_manager(
+            episodic=source("retrieve", "user asked about particles", delay=0.15),
+            semantic=source("retrieve", "は -> topic marker", delay=0.15),
+            study=source("retrieve_learner_context", "### LEARNER PROFILE ###", delay=0.15),
+        )
+        start = time.perf_counter()
+        context = mm.retrieve_context("what is wa?", user_id="u1")
+        self.assertLess(time.perf_counter() - start, 0.4)  # sequential would be 0.45s
+        self.assertIn("user asked about particles", context)
+        self.assertIn("topic marker", context)
+        self.assertIn("LEARNER PROFILE", context)
+        self.assertNotIn("Memory unavailable", context)
+
+    def test_late_source_is_dropped_with_marker(self):
+        before = dropped("semantic", "timeout")
+        mm = make_manager(
+            episodic=source("retrieve", "past chat"),
+            semantic=source("retrieve", "too late", delay=1.0),
+            study=source("retrieve_learner_context", ""),
+        )
+        start = time.perf_counter()
+        context = mm.retrieve_context("q", user_id="u1")
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertIn("past chat", context)
+        self.assertNotIn("too late", context)
+        self.assertIn("semantic memory (timed out after 0.2s)", context)
+        self.assertEqual(dropped("semantic", "timeout") - before, 1)
+
+    def test_failed_source_is_dropped_with_marker(self):
+        before = dropped("study", "error")
+        mm = make_manager(
+            episodic=source("retrieve", "past chat"),
+            study=source("retrieve_learner_context", error=ConnectionError("study-plan down")),
+        )
+        context = mm.retrieve_context("q", user_id="u1")
+        self.assertIn("past chat", context)
+        self.assertIn("study memory (failed)", context)
+        self.assertEqual(dropped("study", "error") - before, 1)
+
+    def test_per_source_timings_recorded(self):
+        total = metrics.MEMORY_RETRIEVAL_DURATION.labels("episodic")._sum
+        before = total.get()
+        make_manager(episodic=source("retrieve", "x", delay=0.05)).retrieve_context("q", user_id="u1")
+        self.assertGreaterEqual(total.get() - before, 0.05)
+
+
+if __name__ == "__main__":
+    unittest.main()
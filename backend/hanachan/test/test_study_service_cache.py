@@ -0,0 +1,91 @@
+import json
+import unittest
+from unittest.mock import MagicMock, patch
+
+from services import study_service
+
+
+def response(status, body=None, etag=None):
+    res = MagicMock(status_code=status, headers={"ETag": etag} if etag else {})
+    res.content = json.dumps(body).encode() if body is not None else b""
+    res.json.side_effect = lambda: json.loads(res.content)
+    return res
+
+
+class TestStudyReadCache(unittest.TestCase):
+    def setUp(self):
+        self.cache = study_service.StudyReadCache(ttl=60)
+        self.client = study_service.StudyServiceClient()
+        self.client.cache = self.cache
+        self.client.http = MagicMock()
+        self.snapshot = {"plan": {"title": "N4"}, "activities": []}
+
+    def test_fresh_entry_skips_network(self):
+        self.client.http.get.return_value = response(200, self.snapshot, etag='"v1"')
+        for _ in range(5):
+            self.assertEqual(self.client.get_context_snapshot("u1", token="t"), self.snapshot)
+        self.assertEqual(self.client.http.get.call_count, 1)
+        self.assertEqual((self.cache.hits, self.cache.misses), (4, 1))
+
+    def test_hits_are_independent_copies(self):
+        self.client.http.get.return_value = response(200, self.snapshot)
+        self.client.get_context_snapshot("u1")["plan"]["title"] = "mutated"
+        self.assertEqual(self.client.get_context_snapshot("u1")["plan"]["title"], "N4")
+
+    def test_stale_entry_revalidates_with_etag(self):
+        self.client.http.get.return_value = response(200, self.snapshot, etag='"v1"')
+        self.client.get_context_snapshot("u1")
+        self.cache.ttl = 0
+
+        self.client.http.get.return_value = response(304)
+        self.assertEqual(self.client.get_context_snapshot("u1"), self.snapshot)
+        headers = self.client.http.get.call_args.kwargs["headers"]
+        self.assertEqual(headers["If-None-Match"], '"v1"')
+        self.assertEqual(self.cache.revalidated, 1)
+
+        changed = {"plan": {"title": "N3"}}
+        self.client.http.get.return_value = response(200, changed, etag='"v2"')
+        self.assertEqual(self.client.get_context_snapshot("u1"), changed)
+
+    def test_errors_are_not_cached(self):
+        self.client.http.get.return_value = response(503)
+        self.assertIsNone(self.client.get_context_snapshot("u1"))
+        self.client.http.get.return_value = response(200, self.snapshot)
+        self.assertEqual(self.client.get_context_snapshot("u1"), self.snapshot)
+        self.assertEqual(self.client.http.get.call_count, 2)
+
+    def test_writes_invalidate_that_user(self):
+        self.client.http.get.return_value = response(200, {"trackings": [{"id": 1}]})
+        self.client.get_performance_history("u1")
+        self.client.get_performance_history("u2")
+        self.client.http.post.return_value = response(201, {})
+
+        self.client.save_performance_tracking("u1", {"type": "audit"})
+        self.client.get_performance_history("u1")
+        self.client.get_performance_history("u2")
+        self.assertEqual(self.client.http.get.call_count, 3)  # only u1 refetched
+
+        self.client.update_goal_status("g1", True)  # no user: everything goes
+        self.client.get_performance_history("u2")
+        self.assertEqual(self.client.http.get.call_count, 4)
+
+    def test_lru_bound(self):
+        self.cache.max_entries = 2
+        self.client.http.get.return_value = response(200, {"trackings": []})
+        for user in ("u1", "u2", "u3"):
+            self.client.get_performance_history(user)
+        self.client.get_performance_history("u1")
+        self.assertEqual(self.client.http.get.call_count, 4)
+
+
+class TestSharedSession(unittest.TestCase):
+    def test_clients_share_one_pooled_session(self):
+        with patch.object(study_service, "_session", None):
+            a, b = study_service.StudyServiceClient(), study_service.StudyServiceClient()
+            self.assertIs(a.http, b.http)
+            adapter = a.http.get_adapter("http://localhost:5500/v1/study-plan/plans")
+            self.assertEqual(adapter._pool_maxsize, study_service.STUDY_HTTP_POOL_SIZE)
+
+
+if __name__ == "__main__":
+    unittest.main()
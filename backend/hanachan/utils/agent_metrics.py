@@ -0,0 +1,163 @@
+"""
+Hanachan's own Prometheus metrics, on the shared registry from hanabira_shared.metrics
+(so they are served at the same /metrics):
+
+- RQ queue depth per state, read from Redis at scrape time (RQQueueCollector,
+  registered by create_app), and job durations from MetricsWorker
+  (`rq worker -w utils.agent_metrics.MetricsWorker`);
+- LLM token counts, time to first token and call duration per model
+  (record_llm_call / LLMStreamTimer, used by the agent);
+- memory retrieval time per source (episodic / semantic / study) and the
+  sources MemoryManager dropped for missing their deadline or failing;
+- embedding cache lookups per model by result (memory / disk / miss);
+  hit rate = (memory + disk) / all.
+
+The RQ worker shows up on the web /metrics only when it shares
+PROMETHEUS_MULTIPROC_DIR with the web workers; otherwise set RQ_METRICS_PORT
+and scrape the worker directly.
+"""
+
+import logging
+import os
+import time
+from typing import Any, Optional
+
+from prometheus_client import Counter, Histogram, start_http_server
+from prometheus_client.core import GaugeMetricFamily
+from rq import Queue, Worker
+
+from hanabira_shared.metrics import MULTIPROC_DIR, registry
+from utils.token_counter import estimate_tokens
+
+RQ_METRICS_QUEUES = [q.strip() for q in os.getenv("RQ_METRICS_QUEUES", "default").split(",") if q.strip()]
+RQ_METRICS_PORT = os.getenv("RQ_METRICS_PORT")
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================
+# Metrics
+# ============================================
+
+RQ_JOB_DURATION = Histogram(
+    "rq_job_duration_seconds", "RQ job run time, by final status", ["queue", "func", "status"],
+    buckets=(0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0), registry=registry)
+
+LLM_TOKENS = Counter(
+    "llm_tokens_total", "LLM tokens (provider usage when reported, else estimated)", ["model", "kind"],
+    registry=registry)
+LLM_TTFT = Histogram(
+    "llm_time_to_first_token_seconds", "Streaming LLM time to first token", ["model"],
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 10.0, 20.0, 30.0), registry=registry)
+LLM_DURATION = Histogram(
+    "llm_request_duration_seconds", "LLM call duration", ["model", "mode"],
+    buckets=(0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0), registry=registry)
+
+MEMORY_RETRIEVAL_DURATION = Histogram(
+    "memory_retrieval_duration_seconds", "Memory source retrieval time, including runs that missed the deadline",
+    ["source"], buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 10.0), registry=registry)
+MEMORY_RETRIEVAL_DROPPED = Counter(
+    "memory_retrieval_dropped_total", "Memory sources left out of the context", ["source", "reason"],
+    registry=registry)
+
+EMBEDDING_CACHE_REQUESTS = Counter(
+    "embedding_cache_requests_total", "Embedding lookups by where they were answered", ["model", "result"],
+    registry=registry)
+
+
+# ============================================
+# RQ
+# ============================================
+
+class RQQueueCollector:
+    """Queue depth per state, read from Redis on each scrape (a few LLEN/ZCARD calls per queue)."""
+
+    def __init__(self, queues=RQ_METRICS_QUEUES):
+        self.queues = queues
+        self._connection = None
+
+    def collect(self):
+        family = GaugeMetricFamily("rq_queue_jobs", "RQ jobs per queue and state", labels=["queue", "state"])
+        try:
+            if self._connection is None:
+                from services.queue_factory import get_redis_connection
+                self._connection = get_redis_connection()
+            for name in self.queues:
+                queue = Queue(name, connection=self._connection)
+                family.add_metric([name, "queued"], queue.count)
+                family.add_metric([name, "started"], queue.started_job_registry.count)
+                family.add_metric([name, "failed"], queue.failed_job_registry.count)
+                family.add_metric([name, "scheduled"], queue.scheduled_job_registry.count)
+                family.add_metric([name, "deferred"], queue.deferred_job_registry.count)
+        except Exception as e:
+            logger.debug(f"RQ queue metrics unavailable: {e}")
+        yield family
+
+
+class MetricsWorker(Worker):
+    """
+    RQ worker that records rq_job_duration_seconds:
+
+        rq worker default -w utils.agent_metrics.MetricsWorker
+
+    Timed in the long-lived worker process around the forked work horse, so
+    multi-process mode gets one metrics file per worker, not one per job.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if RQ_METRICS_PORT and not MULTIPROC_DIR:
+            start_http_server(int(RQ_METRICS_PORT), registry=registry)
+
+    def execute_job(self, job, queue):
+        start = time.perf_counter()
+        try:
+            return super().execute_job(job, queue)
+        finally:
+            try:
+                status = job.get_status(refresh=True)
+            except Exception:
+                status = "unknown"
+            RQ_JOB_DURATION.labels(queue.name, job.func_name, getattr(status, "value", status)).observe(
+                time.perf_counter() - start)
+
+
+# ============================================
+# LLM
+# ============================================
+
+def llm_model_name(llm: Any) -> str:
+    return getattr(llm, "model_name", None) or getattr(llm, "model", None) or type(llm).__name__
+
+
+def record_llm_call(model: str, usage: Optional[dict], completion: str, duration: float, mode: str = "invoke",
+                    prompt_text: str = ""):
+    """Tokens from the provider's usage_metadata when reported, else a length estimate."""
+    usage = usage or {}
+    LLM_TOKENS.labels(model, "prompt").inc(usage.get("input_tokens") or estimate_tokens(prompt_text))
+    LLM_TOKENS.labels(model, "completion").inc(usage.get("output_tokens") or estimate_tokens(completion))
+    LLM_DURATION.labels(model, mode).observe(duration)
+
+
+class LLMStreamTimer:
+    """Feed it each streamed chunk; records TTFT on the first and tokens/duration on finish()."""
+
+    def __init__(self, model: str, prompt_text: str = ""):
+        self.model = model
+        self.prompt_text = prompt_text
+        self.start = time.perf_counter()
+        self.first_token_at: Optional[float] = None
+        self.usage = None
+        self.parts = []
+
+    def chunk(self, chunk: Any):
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+            LLM_TTFT.labels(self.model).observe(self.first_token_at - self.start)
+        # Providers that report usage while streaming put it on the last chunk
+        self.usage = getattr(chunk, "usage_metadata", None) or self.usage
+        self.parts.append(chunk.content or "")
+
+    def finish(self):
+        record_llm_call(self.model, self.usage, "".join(self.parts), time.perf_counter() - self.start, "stream",
+                        self.prompt_text)
@@ -17,6 +17,14 @@ async def lifespan(app: FastAPI):
 
 app = FastAPI(title="Hanachan Python Dictionary Service", lifespan=lifespan)
 
+# W3C traceparent server spans -> TRACE_DIR/<service>.jsonl (TRACING_ENABLED)
+from hanabira_shared.tracing import init_fastapi_tracing
+init_fastapi_tracing(app, "python-dictionary")
+
+# Prometheus /metrics: route latency, Mongo (Motor) pool stats
+from hanabira_shared.metrics import init_fastapi_metrics
+init_fastapi_metrics(app)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
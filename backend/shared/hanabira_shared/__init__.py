@@ -0,0 +1,4 @@
+"""
+Modules shared by the Python backend services, installed into each one from
+its requirements (`-e ../shared`). Edit them here: there are no copies.
+"""
@@ -0,0 +1,198 @@
+"""
+Structured logging for the service.
+
+configure_logging() replaces the per-module basicConfig calls:
+
+- LOG_FORMAT=json emits one JSON object per record: timestamp, level,
+  logger, message, the trace id of the active span, and any `extra`
+  fields (e.g. query_tracker's `db`). The default is the old text line.
+- LOG_LEVEL sets the root level. LOG_LEVELS sets per-logger levels, e.g.
+  "hanabira_shared.query_tracker=DEBUG,pymongo=WARNING".
+- Records go through a QueueHandler. Request threads only merge the message
+  and enqueue it; one listener thread formats and writes, so requests never
+  block on the stderr lock or a slow log pipe.
+- Hot loggers can be sampled and rate limited below WARNING. Warnings and
+  errors always pass. LOG_SAMPLE="name=0.01" keeps 1% of the debug/info
+  records. LOG_RATE_LIMIT="name=5" keeps at most 5 per second for each
+  message template; the next record that passes carries `suppressed=<n>`.
+  Each service passes its defaults as configure_logging(hot_loggers=...).
+  The filters sit on the named logger only (its children don't inherit
+  them), so name every logger.
+
+Use lazy %-style arguments in hot code, e.g. logger.debug("answer card=%s",
+card_id). The message is only built for records that pass the level,
+sampling and rate checks.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+from .tracing import current_span
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text").lower()
+TEXT_FORMAT = "%(asctime)s %(levelname)s %(name)s %(threadName)s : %(message)s"
+
+# Per-request loggers of this service: logger -> (sample rate, records/second per template)
+HOT_LOGGERS: Dict[str, Tuple[float, float]] = {}
+
+# Attributes every LogRecord has; anything else on a record came from `extra`
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "taskName"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def _parse_pairs(value: str) -> Dict[str, str]:
+    pairs = {}
+    for item in value.split(","):
+        name, sep, setting = item.partition("=")
+        if sep and name.strip():
+            pairs[name.strip()] = setting.strip()
+    return pairs
+
+
+# ============================================
+# Filters
+# ============================================
+
+class SampleFilter(logging.Filter):
+    """Keep records below WARNING with probability `rate`."""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return record.levelno >= logging.WARNING or random.random() < self.rate
+
+
+class RateLimitFilter(logging.Filter):
+    """At most `per_second` records below WARNING per (logger, message template), token-bucket style."""
+
+    def __init__(self, per_second: float):
+        super().__init__()
+        self.per_second = per_second
+        self._buckets: Dict[tuple, list] = {}  # key -> [tokens, last refill, suppressed]
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        key = (record.name, record.msg)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.setdefault(key, [self.per_second, now, 0])
+            bucket[0] = min(self.per_second, bucket[0] + (now - bucket[1]) * self.per_second)
+            bucket[1] = now
+            if bucket[0] < 1:
+                bucket[2] += 1
+                return False
+            bucket[0] -= 1
+            if bucket[2]:
+                record.suppressed, bucket[2] = bucket[2], 0
+        return True
+
+
+# ============================================
+# Formatting
+# ============================================
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        doc = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+            "thread": record.threadName,
+        }
+        trace_id = getattr(record, "trace_id", None)
+        if trace_id:
+            doc["trace_id"] = trace_id
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and key != "trace_id":
+                doc[key] = value
+        if record.exc_info:
+            doc["exc"] = self.formatException(record.exc_info)
+        return json.dumps(doc, default=str, ensure_ascii=False)
+
+
+class _TraceQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that stamps the active span's trace id (contextvars don't cross to the listener thread)."""
+
+    def prepare(self, record):
+        span = current_span()
+        if span is not None:
+            record.trace_id = span.trace_id
+        return super().prepare(record)
+
+
+# ============================================
+# Setup
+# ============================================
+
+def configure_logging(level: str = LOG_LEVEL, fmt: str = LOG_FORMAT, stream=None,
+                      hot_loggers: Optional[Dict[str, Tuple[float, float]]] = None):
+    """
+    Install the queue-backed root handler and per-logger levels/filters.
+    Safe to call twice; `hot_loggers` replaces HOT_LOGGERS, which later
+    calls without it keep.
+    """
+    global _listener, HOT_LOGGERS
+    if hot_loggers is not None:
+        HOT_LOGGERS = dict(hot_loggers)
+    if _listener is not None:
+        _listener.stop()
+
+    target = logging.StreamHandler(stream or sys.stderr)
+    target.setFormatter(JsonFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT))
+    log_queue = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(log_queue, target)
+    _listener.start()
+
+    # Replace basicConfig's stream handler (and a previous queue handler); leave others, e.g. pytest's capture
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if type(handler) in (logging.StreamHandler, _TraceQueueHandler):
+            root.removeHandler(handler)
+    root.addHandler(_TraceQueueHandler(log_queue))
+    root.setLevel(level)
+
+    for name, logger_level in _parse_pairs(os.getenv("LOG_LEVELS", "")).items():
+        logging.getLogger(name).setLevel(logger_level.upper())
+
+    samples = {name: rate for name, (rate, _) in HOT_LOGGERS.items()}
+    limits = {name: per_second for name, (_, per_second) in HOT_LOGGERS.items()}
+    samples.update({k: float(v) for k, v in _parse_pairs(os.getenv("LOG_SAMPLE", "")).items()})
+    limits.update({k: float(v) for k, v in _parse_pairs(os.getenv("LOG_RATE_LIMIT", "")).items()})
+    for name in set(samples) | set(limits):
+        logger = logging.getLogger(name)
+        for f in [f for f in logger.filters if isinstance(f, (SampleFilter, RateLimitFilter))]:
+            logger.removeFilter(f)
+        if samples.get(name, 1.0) < 1.0:
+            logger.addFilter(SampleFilter(samples[name]))
+        if limits.get(name):
+            logger.addFilter(RateLimitFilter(limits[name]))
+
+
+def flush_logging():
+    """Drain the queue (tests, shutdown)."""
+    if _listener is not None:
+        _listener.stop()
+        _listener.start()
+
+
+@atexit.register
+def _stop_listener():
+    if _listener is not None:
+        _listener.stop()
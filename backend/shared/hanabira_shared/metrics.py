@@ -0,0 +1,254 @@
+"""
+Prometheus metrics, served at GET /metrics in the text exposition format.
+
+Recorded here:
+- http_requests_total / http_request_duration_seconds per route template
+  (Flask's url_rule or FastAPI's route path, so /plans/<plan_id> is one
+  series), method and status;
+- http_requests_in_progress;
+- PyMongo connection pool stats from a ConnectionPoolListener: open and
+  checked-out connections, checkout wait time, checkout failures, clears.
+
+Services define their own metrics on `registry`, and collectors that read
+their values at scrape time go through register_scrape_collector().
+
+Multi-process (gunicorn / uvicorn --workers N): every worker has its own
+memory, so counters are kept in mmap'd files instead. Set
+PROMETHEUS_MULTIPROC_DIR to an empty writable directory in the environment
+*before* the process starts, and /metrics aggregates all workers (live and
+exited). Wipe the directory on start (gunicorn.conf.py does, and marks
+exited workers dead for the live gauges); stale files are summed into new
+counters.
+
+The endpoint is unauthenticated (and exempt from the Flask rate limiter
+passed to init_metrics): scrape it on the internal network, do not route it
+through the public proxy.
+"""
+
+import logging
+import os
+import threading
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    ProcessCollector,
+    generate_latest,
+    multiprocess,
+)
+from pymongo import monitoring
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+METRICS_PATH = os.getenv("METRICS_PATH", "/metrics")
+MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================
+# Metrics
+# ============================================
+
+# Module-owned registry (not prometheus_client's global one) so re-importing
+# this module, as the benchmark harness does, cannot register duplicates
+registry = CollectorRegistry()
+if not MULTIPROC_DIR:
+    ProcessCollector(registry=registry)
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests handled", ["method", "route", "status"], registry=registry)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ["method", "route"], buckets=LATENCY_BUCKETS,
+    registry=registry)
+HTTP_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "HTTP requests being handled", multiprocess_mode="livesum", registry=registry)
+
+MONGO_POOL_CONNECTIONS = Gauge(
+    "mongo_pool_connections", "Open connections in the PyMongo pool", ["address"], multiprocess_mode="livesum",
+    registry=registry)
+MONGO_POOL_CHECKED_OUT = Gauge(
+    "mongo_pool_checked_out", "Connections currently checked out of the pool", ["address"],
+    multiprocess_mode="livesum", registry=registry)
+MONGO_POOL_WAIT = Histogram(
+    "mongo_pool_checkout_wait_seconds", "Time waiting to check a connection out of the pool", ["address"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0, 5.0), registry=registry)
+MONGO_POOL_CHECKOUT_FAILURES = Counter(
+    "mongo_pool_checkout_failures_total", "Failed pool checkouts", ["address", "reason"], registry=registry)
+MONGO_POOL_CLEARED = Counter(
+    "mongo_pool_cleared_total", "Pool clears (server marked unknown, connections dropped)", ["address"],
+    registry=registry)
+
+
+def _address(event) -> str:
+    host, port = event.address
+    return f"{host}:{port}"
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """Pool events fire synchronously on the checking-out thread, so a thread-local holds the wait start."""
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        MONGO_POOL_CLEARED.labels(_address(event)).inc()
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        MONGO_POOL_CONNECTIONS.labels(_address(event)).inc()
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        MONGO_POOL_CONNECTIONS.labels(_address(event)).dec()
+
+    def connection_check_out_started(self, event):
+        self._local.start = time.perf_counter()
+
+    def connection_check_out_failed(self, event):
+        self._local.start = None
+        MONGO_POOL_CHECKOUT_FAILURES.labels(_address(event), str(event.reason)).inc()
+
+    def connection_checked_out(self, event):
+        address = _address(event)
+        start = getattr(self._local, "start", None)
+        if start is not None:
+            MONGO_POOL_WAIT.labels(address).observe(time.perf_counter() - start)
+            self._local.start = None
+        MONGO_POOL_CHECKED_OUT.labels(address).inc()
+
+    def connection_checked_in(self, event):
+        MONGO_POOL_CHECKED_OUT.labels(_address(event)).dec()
+
+
+_pool_listener = None
+
+
+def register_pool_listener():
+    """Call before any MongoClient is created; PyMongo only attaches global listeners to new clients."""
+    global _pool_listener
+    if _pool_listener is None:
+        _pool_listener = PoolMetricsListener()
+        monitoring.register(_pool_listener)
+
+
+# ============================================
+# Exposition
+# ============================================
+
+_scrape_collectors = []
+
+
+def register_scrape_collector(collector):
+    """Add a collector that reads its values at scrape time (once per collector type)."""
+    if any(type(c) is type(collector) for c in _scrape_collectors):
+        return
+    _scrape_collectors.append(collector)
+    if not MULTIPROC_DIR:
+        registry.register(collector)
+
+
+def render_metrics():
+    """(body, content type) for the current registry, aggregated across workers in multi-process mode."""
+    if MULTIPROC_DIR:
+        aggregated = CollectorRegistry()
+        multiprocess.MultiProcessCollector(aggregated)
+        for collector in _scrape_collectors:
+            aggregated.register(collector)
+        return generate_latest(aggregated), CONTENT_TYPE_LATEST
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+# ============================================
+# Flask integration
+# ============================================
+
+def init_metrics(app, limiter=None):
+    if not METRICS_ENABLED:
+        return
+    from flask import Response, g, request
+
+    register_pool_listener()
+
+    @app.before_request
+    def _start_request_timer():
+        if request.path != METRICS_PATH:
+            g._metrics_start = time.perf_counter()
+            HTTP_IN_PROGRESS.inc()
+
+    @app.after_request
+    def _observe_request(response):
+        start = g.get("_metrics_start")
+        if start is not None:
+            # Route template, not the raw path: one series per endpoint
+            route = request.url_rule.rule if request.url_rule is not None else "<unmatched>"
+            HTTP_LATENCY.labels(request.method, route).observe(time.perf_counter() - start)
+            HTTP_REQUESTS.labels(request.method, route, str(response.status_code)).inc()
+        return response
+
+    @app.teardown_request
+    def _end_request(exc=None):
+        if g.pop("_metrics_start", None) is not None:
+            HTTP_IN_PROGRESS.dec()
+
+    @app.route(METRICS_PATH, methods=["GET"])
+    def metrics():
+        body, content_type = render_metrics()
+        return Response(body, content_type=content_type)
+
+    if limiter is not None:
+        limiter.exempt(metrics)
+    logger.info(f"Metrics at {METRICS_PATH}" + (f" (multiprocess: {MULTIPROC_DIR})" if MULTIPROC_DIR else ""))
+
+
+# ============================================
+# FastAPI integration
+# ============================================
+
+def init_fastapi_metrics(app):
+    if not METRICS_ENABLED:
+        return
+    from fastapi import Response
+
+    register_pool_listener()
+
+    @app.middleware("http")
+    async def _observe_request(request, call_next):
+        if request.url.path == METRICS_PATH:
+            return await call_next(request)
+        HTTP_IN_PROGRESS.inc()
+        start = time.perf_counter()
+        status = "500"
+        try:
+            response = await call_next(request)
+            status = str(response.status_code)
+            return response
+        finally:
+            HTTP_IN_PROGRESS.dec()
+            # Route template, not the raw path: one series per endpoint
+            route = request.scope.get("route")
+            route = route.path if route is not None else "<unmatched>"
+            HTTP_LATENCY.labels(request.method, route).observe(time.perf_counter() - start)
+            HTTP_REQUESTS.labels(request.method, route, status).inc()
+
+    @app.get(METRICS_PATH, include_in_schema=False)
+    def metrics():
+        body, content_type = render_metrics()
+        return Response(body, media_type=content_type)
+
+    logger.info(f"Metrics at {METRICS_PATH}" + (f" (multiprocess: {MULTIPROC_DIR})" if MULTIPROC_DIR else ""))
@@ -0,0 +1,250 @@
+"""
+Per-request database call counter and N+1 detector.
+
+A PyMongo CommandListener and, where SQLAlchemy is installed, its
+cursor-execute hooks record every DB call issued while a request (or a
+`track_queries()` block) is active. Each record has the call's duration
+and its *shape*: for Mongo the command, collection and filter keys with
+values stripped; for SQL the parameterized statement. For example
+
+    find artifacts {conversationId:?,userId:?}
+    sql SELECT messages.id, ... FROM messages WHERE ? = messages.conversation_id
+
+`init_query_tracking(app)` opens a collector per request and, at the end
+of it:
+
+- logs one `db_queries` line with the count, DB time and top shapes
+  (structured fields are also attached as `extra`);
+- warns when a shape ran more than QUERY_REPEAT_THRESHOLD times, the usual
+  signature of a per-item query inside a loop;
+- in debug mode (or with QUERY_DEBUG_HEADER=true), adds an
+  `X-DB-Queries: <count>; time=<ms>; repeated=<n>` response header.
+
+Register before any MongoClient is created: PyMongo only attaches global
+listeners to clients constructed afterwards.
+"""
+
+import contextvars
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+from flask import g, request
+from pymongo import monitoring
+
+try:
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+except ImportError:
+    event = None
+
+QUERY_TRACKING_ENABLED = os.getenv("QUERY_TRACKING_ENABLED", "true").lower() == "true"
+QUERY_REPEAT_THRESHOLD = int(os.getenv("QUERY_REPEAT_THRESHOLD", 10))
+QUERY_DEBUG_HEADER = os.getenv("QUERY_DEBUG_HEADER", "false").lower() == "true"
+QUERY_LOG_LEVEL = getattr(logging, os.getenv("QUERY_LOG_LEVEL", "INFO").upper(), logging.INFO)
+
+DEBUG_HEADER = "X-DB-Queries"
+
+# Driver chatter that is not part of serving a request
+IGNORED_COMMANDS = {"hello", "ismaster", "isMaster", "ping", "endSessions", "saslStart", "saslContinue",
+                    "buildInfo", "killCursors"}
+
+logger = logging.getLogger(__name__)
+
+_current: contextvars.ContextVar[Optional["QueryStats"]] = contextvars.ContextVar("query_stats", default=None)
+
+
+# ============================================
+# Shapes
+# ============================================
+
+def _skeleton(value) -> str:
+    """Keys and operators of a filter/pipeline with every value replaced by ?."""
+    if isinstance(value, dict):
+        return "{" + ",".join(f"{k}:{_skeleton(v)}" for k, v in sorted(value.items())) + "}"
+    if isinstance(value, (list, tuple)) and value and isinstance(value[0], dict):
+        return "[" + ",".join(_skeleton(v) for v in value) + "]"
+    return "?"
+
+
+def mongo_shape(command_name: str, command: Dict[str, Any]) -> str:
+    collection = command.get("collection") if command_name == "getMore" else command.get(command_name)
+    if command_name in ("find", "count", "distinct", "findAndModify"):
+        body = command.get("filter", command.get("query", {}))
+    elif command_name == "aggregate":
+        body = [{k: (v if k == "$match" else {}) for k, v in stage.items()} for stage in command.get("pipeline", [])]
+    elif command_name == "update":
+        body = [u.get("q", {}) for u in command.get("updates", [])[:1]]
+    elif command_name == "delete":
+        body = [d.get("q", {}) for d in command.get("deletes", [])[:1]]
+    else:
+        body = None
+    return f"{command_name} {collection}" + (f" {_skeleton(body)}" if body is not None else "")
+
+
+_SQL_PARAMS = re.compile(r"%\(\w+\)s|%s|\?|\$\d+")
+_SQL_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+
+
+def sql_shape(statement: str) -> str:
+    """Statement with bind markers normalized to ? and IN-lists collapsed."""
+    shape = _SQL_IN_LIST.sub("(?)", _SQL_PARAMS.sub("?", " ".join(statement.split())))
+    return f"sql {shape[:300]}"
+
+
+# ============================================
+# Collection
+# ============================================
+
+class QueryStats:
+    def __init__(self, parent: Optional["QueryStats"] = None):
+        self.parent = parent
+        self.count = 0
+        self.total_ms = 0.0
+        self.shapes: Counter = Counter()
+        self.commands: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, shape: str, command: str, duration_ms: float):
+        with self._lock:
+            self.count += 1
+            self.total_ms += duration_ms
+            self.shapes[shape] += 1
+            self.commands[command] += 1
+        if self.parent is not None:
+            self.parent.record(shape, command, duration_ms)
+
+    def repeated(self, threshold: int = QUERY_REPEAT_THRESHOLD) -> List[Dict[str, Any]]:
+        """Shapes that ran more than `threshold` times."""
+        return [{"shape": s, "count": n} for s, n in self.shapes.most_common() if n > threshold]
+
+    def summary(self, top: int = 5) -> Dict[str, Any]:
+        return {
+            "queries": self.count,
+            "db_ms": round(self.total_ms, 2),
+            "commands": dict(self.commands),
+            "top_shapes": [{"shape": s, "count": n} for s, n in self.shapes.most_common(top)],
+        }
+
+
+def record(shape: str, command: str, duration_ms: float):
+    """Attribute one DB call to the active collector, if any."""
+    stats = _current.get()
+    if stats is not None:
+        stats.record(shape, command, duration_ms)
+
+
+@contextmanager
+def track_queries():
+    """Collect the DB calls made inside the block (nests into any outer collector)."""
+    stats = QueryStats(parent=_current.get())
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+class MongoQueryListener(monitoring.CommandListener):
+    def __init__(self):
+        self._pending: Dict[Any, tuple] = {}
+        self._lock = threading.Lock()
+
+    def started(self, event):
+        if event.command_name in IGNORED_COMMANDS or _current.get() is None:
+            return
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = (
+                _current.get(), mongo_shape(event.command_name, event.command)
+            )
+
+    def _finish(self, event):
+        with self._lock:
+            pending = self._pending.pop((event.connection_id, event.request_id), None)
+        if pending is not None:
+            stats, shape = pending
+            stats.record(shape, event.command_name, event.duration_micros / 1000)
+
+    def succeeded(self, event):
+        self._finish(event)
+
+    def failed(self, event):
+        self._finish(event)
+
+
+_listener: Optional[MongoQueryListener] = None
+
+
+def register_mongo_listener():
+    global _listener
+    if _listener is None:
+        _listener = MongoQueryListener()
+        monitoring.register(_listener)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current.get() is not None:
+        conn.info.setdefault("_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("_query_start")
+    if _current.get() is None or not starts:
+        return
+    record(sql_shape(statement), "sql", (time.perf_counter() - starts.pop()) * 1000)
+
+
+def register_sqlalchemy_hooks():
+    """Listen on every Engine (flask_sqlalchemy creates its engine lazily)."""
+    if event is not None and not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+# ============================================
+# Flask integration
+# ============================================
+
+def init_query_tracking(app):
+    if not QUERY_TRACKING_ENABLED:
+        return
+    register_mongo_listener()
+    register_sqlalchemy_hooks()
+
+    @app.before_request
+    def _start_query_tracking():
+        stats = QueryStats(parent=_current.get())
+        g._query_stats, g._query_token = stats, _current.set(stats)
+
+    @app.after_request
+    def _report_queries(response):
+        stats = g.pop("_query_stats", None)
+        if stats is None:
+            return response
+
+        repeated = stats.repeated()
+        fields = {"method": request.method, "path": request.path, "status": response.status_code,
+                  **stats.summary()}
+        if repeated:
+            fields["repeated"] = repeated
+            shapes = "; ".join(f"{r['shape']} x{r['count']}" for r in repeated)
+            logger.warning("Possible N+1 in %s %s: %s", request.method, request.path, shapes, extra={"db": fields})
+        # Constant template: lets logging_setup rate-limit this line per request
+        logger.log(QUERY_LOG_LEVEL, "db_queries method=%s path=%s status=%s queries=%d db_ms=%.2f",
+                   request.method, request.path, response.status_code, stats.count, stats.total_ms,
+                   extra={"db": fields})
+
+        if app.debug or QUERY_DEBUG_HEADER:
+            response.headers[DEBUG_HEADER] = f"{stats.count}; time={stats.total_ms:.2f}ms; repeated={len(repeated)}"
+        return response
+
+    @app.teardown_request
+    def _stop_query_tracking(exc=None):
+        token = g.pop("_query_token", None)
+        if token is not None:
+            _current.reset(token)
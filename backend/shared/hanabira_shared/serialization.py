@@ -0,0 +1,118 @@
+"""
+orjson-backed JSON provider and negotiated response compression.
+
+`init_serialization(app)` swaps the app's JSON provider for OrjsonProvider
+and registers `compress_response`:
+
+- ObjectId, Decimal128, sets and Decimal are encoded by the provider, so
+  handlers can return Mongo documents without stringifying `_id` first.
+- Datetimes are emitted as ISO 8601 by orjson. Naive values (PyMongo's
+  default) are treated as UTC.
+- JSON/text bodies of at least COMPRESS_MIN_BYTES are brotli- or
+  gzip-encoded, whichever the client's Accept-Encoding prefers. Brotli is
+  used only when the `brotli` package is installed. Streamed responses
+  (SSE) and file passthroughs are left alone.
+"""
+
+import decimal
+import gzip
+import logging
+import os
+
+import orjson
+from bson import Decimal128, ObjectId
+from flask import request
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", 1024))
+COMPRESS_GZIP_LEVEL = int(os.getenv("COMPRESS_GZIP_LEVEL", 6))
+COMPRESS_BROTLI_QUALITY = int(os.getenv("COMPRESS_BROTLI_QUALITY", 4))
+
+ENCODINGS = ["br", "gzip"] if brotli is not None else ["gzip"]
+
+logger = logging.getLogger(__name__)
+
+
+def _default(o):
+    if isinstance(o, ObjectId):
+        return str(o)
+    if isinstance(o, (set, frozenset)):
+        return list(o)
+    if isinstance(o, (decimal.Decimal, Decimal128)):
+        return str(o)
+    if hasattr(o, "__html__"):
+        return str(o.__html__())
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider with orjson doing the encoding and decoding."""
+
+    option = orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS
+
+    def _options(self, sort_keys: bool, indent: bool) -> int:
+        option = self.option
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs) -> str:
+        option = self._options(kwargs.get("sort_keys", self.sort_keys), bool(kwargs.get("indent")))
+        return orjson.dumps(obj, default=_default, option=option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        body = orjson.dumps(obj, default=_default, option=self._options(self.sort_keys, indent))
+        return self._app.response_class(body + b"\n", mimetype=self.mimetype)
+
+
+def _compressible(response) -> bool:
+    mimetype = response.mimetype or ""
+    return mimetype == "application/json" or (mimetype.startswith("text/") and mimetype != "text/event-stream")
+
+
+def compress_response(response):
+    """after_request hook: encode large JSON/text bodies per Accept-Encoding."""
+    if (response.direct_passthrough or response.is_streamed or not _compressible(response)
+            or response.status_code < 200 or response.status_code in (204, 304)
+            or "Content-Encoding" in response.headers):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    body = response.get_data()
+    if len(body) < COMPRESS_MIN_BYTES:
+        return response
+
+    encoding = request.accept_encodings.best_match(ENCODINGS)
+    if encoding is None:
+        return response
+
+    if encoding == "br":
+        data = brotli.compress(body, quality=COMPRESS_BROTLI_QUALITY)
+    else:
+        data = gzip.compress(body, compresslevel=COMPRESS_GZIP_LEVEL, mtime=0)
+    response.set_data(data)
+    response.headers["Content-Encoding"] = encoding
+
+    # The encoded bytes differ from what a strong ETag was computed over
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def init_serialization(app):
+    app.json = OrjsonProvider(app)
+    app.after_request(compress_response)
+    logger.info(f"orjson provider enabled; compressing >= {COMPRESS_MIN_BYTES}B with {'/'.join(ENCODINGS)}")
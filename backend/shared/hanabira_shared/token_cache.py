@@ -0,0 +1,100 @@
+"""
+Verified-JWT cache behind the flask and study-plan auth decorators (decode_token).
+
+Clients send the same bearer token on every request; the cache keeps the
+outcome of verifying it (claims or the jwt error) so only the first request
+pays for the signature check. See TokenCache for expiry and key rotation.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+# Verified-token cache: claims are kept until the token's own `exp`
+TOKEN_CACHE_MAX_SIZE = int(os.getenv("TOKEN_CACHE_MAX_SIZE", 10000))
+TOKEN_CACHE_NEGATIVE_TTL_SECONDS = int(os.getenv("TOKEN_CACHE_NEGATIVE_TTL_SECONDS", 30))
+TOKEN_CACHE_NO_EXP_TTL_SECONDS = int(os.getenv("TOKEN_CACHE_NO_EXP_TTL_SECONDS", 300))
+
+
+class TokenCache:
+    """
+    Bounded LRU of verified JWTs, keyed by a SHA-256 of the raw token.
+
+    Valid tokens map to their decoded claims until `exp` passes (tokens
+    without `exp` for TOKEN_CACHE_NO_EXP_TTL_SECONDS); invalid or expired
+    tokens are remembered briefly so a client replaying a bad token does not
+    cost a signature check each time. Entries are only valid for the signing
+    key they were verified with: `bind` clears the cache when it changes.
+    """
+
+    def __init__(self, max_size: int = TOKEN_CACHE_MAX_SIZE,
+                 negative_ttl_seconds: int = TOKEN_CACHE_NEGATIVE_TTL_SECONDS,
+                 no_exp_ttl_seconds: int = TOKEN_CACHE_NO_EXP_TTL_SECONDS):
+        self.max_size = max_size
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.no_exp_ttl_seconds = no_exp_ttl_seconds
+        # key -> (expires_at epoch seconds, claims or None, jwt error or None)
+        self._data: "OrderedDict[str, Tuple[float, Optional[Dict[str, Any]], Optional[Exception]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_id = None
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def bind(self, secret: str, algorithm: str):
+        """Clear the cache if the signing key or algorithm changed since the last call."""
+        key_id = (secret, algorithm)
+        if key_id != self._key_id:
+            with self._lock:
+                self._data.clear()
+                self._key_id = key_id
+
+    def get(self, token: str):
+        """Return (claims, error) for a cached token, or None on a miss."""
+        key = self._key(token)
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > time.time():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return entry[1], entry[2]
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            return None
+
+    def put(self, token: str, claims: Dict[str, Any]):
+        exp = claims.get("exp")
+        expires = float(exp) if isinstance(exp, (int, float)) else time.time() + self.no_exp_ttl_seconds
+        self._store(token, (expires, claims, None))
+
+    def put_invalid(self, token: str, error: Exception):
+        self._store(token, (time.time() + self.negative_ttl_seconds, None, error))
+
+    def _store(self, token: str, entry):
+        key = self._key(token)
+        with self._lock:
+            self._data[key] = entry
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0
+            }
@@ -0,0 +1,312 @@
+"""
+Cross-service request tracing (W3C Trace Context).
+
+Every inbound request opens a server span that joins the caller's trace
+through the `traceparent` header (or starts a new trace). Spans opened
+inside it become its children, and outbound HTTP calls forward
+`traceparent` via `inject()`, so one chat turn shares a single trace id
+across hanachan, the study-plan-service, the Flask API and the dictionary.
+
+Finished spans are appended, one JSON object per line, to
+TRACE_DIR/<service>.jsonl (OTLP field names; one line = one span). Render a
+trace with
+
+    python scripts/trace_waterfall.py <trace_id>
+
+Tracing is off unless TRACING_ENABLED=true; when off, `span()` yields None
+and `inject()` returns the headers unchanged.
+
+Server spans come from `init_tracing(app, service)` (Flask) or
+`init_fastapi_tracing(app, service)`. `service` names the span file and
+the spans' `service` field unless TRACE_SERVICE_NAME overrides it.
+"""
+
+import contextvars
+import json
+import logging
+import os
+import re
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+try:
+    import requests
+except ImportError:
+    requests = None
+
+TRACING_ENABLED = os.getenv("TRACING_ENABLED", "false").lower() == "true"
+TRACE_DIR = os.getenv("TRACE_DIR", "/tmp/hanabira-traces")
+# Unset: the name the service passes to init_tracing
+TRACE_SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME")
+
+TRACEPARENT = "traceparent"
+TRACERESPONSE = "traceresponse"
+
+_TRACEPARENT_RE = re.compile(r"^([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})$")
+
+logger = logging.getLogger(__name__)
+
+_current: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("trace_span", default=None)
+
+
+# ============================================
+# Spans
+# ============================================
+
+class Span:
+    __slots__ = ("name", "kind", "trace_id", "span_id", "parent_id", "start_ns", "end_ns", "status", "attributes")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str] = None, kind: str = "internal",
+                 attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.status = "ok"
+        self.attributes = dict(attributes or {})
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def set_error(self, exc: BaseException):
+        self.status = "error"
+        self.attributes["error.type"] = type(exc).__name__
+        self.attributes["error.message"] = str(exc)[:500]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "service": TRACE_SERVICE_NAME,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[Tuple[str, str]]:
+    """(trace_id, parent_span_id) from a W3C traceparent header, or None if absent/invalid."""
+    match = _TRACEPARENT_RE.match((header or "").strip().lower())
+    if not match:
+        return None
+    version, trace_id, span_id, _ = match.groups()
+    if version == "ff" or trace_id == "0" * 32 or span_id == "0" * 16:
+        return None
+    return trace_id, span_id
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def start_span(name: str, kind: str = "internal", traceparent: Optional[str] = None,
+               attributes: Optional[Dict[str, Any]] = None) -> Optional[Span]:
+    """
+    New span (not yet current). Parent: the remote `traceparent` if given and
+    valid, else the current span, else none (a new trace).
+    """
+    if not TRACING_ENABLED:
+        return None
+    remote = parse_traceparent(traceparent) if traceparent else None
+    parent = _current.get()
+    if remote:
+        trace_id, parent_id = remote
+    elif parent is not None:
+        trace_id, parent_id = parent.trace_id, parent.span_id
+    else:
+        trace_id, parent_id = secrets.token_hex(16), None
+    return Span(name, trace_id, parent_id, kind, attributes)
+
+
+def finish_span(span: Optional[Span]):
+    if span is None or span.end_ns is not None:
+        return
+    span.end_ns = time.time_ns()
+    exporter.export(span)
+
+
+@contextmanager
+def span(name: str, kind: str = "internal", **attributes):
+    """Run the block as a child span of the current one."""
+    s = start_span(name, kind, attributes=attributes)
+    if s is None:
+        yield None
+        return
+    token = _current.set(s)
+    try:
+        yield s
+    except BaseException as e:
+        s.set_error(e)
+        raise
+    finally:
+        _current.reset(token)
+        finish_span(s)
+
+
+def traced(name: Optional[str] = None, kind: str = "internal"):
+    """Decorator form of span(); defaults to the function's qualified name."""
+    def decorator(f):
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            with span(name or f.__qualname__, kind):
+                return f(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# ============================================
+# Propagation
+# ============================================
+
+def inject(headers: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """Copy of `headers` with the current span's traceparent added."""
+    headers = dict(headers or {})
+    s = _current.get()
+    if s is not None:
+        headers[TRACEPARENT] = s.traceparent
+    return headers
+
+
+if requests is not None:
+    class TracedSession(requests.Session):
+        """requests.Session that wraps each call in a client span and forwards traceparent."""
+
+        def request(self, method, url, *args, **kwargs):
+            with span(f"{method.upper()} {urlsplit(url).path}", kind="client",
+                      **{"http.method": method.upper(), "http.url": url}) as s:
+                kwargs["headers"] = inject(kwargs.get("headers"))
+                response = super().request(method, url, *args, **kwargs)
+                if s is not None:
+                    s.set_attribute("http.status_code", response.status_code)
+                return response
+
+
+# ============================================
+# Export
+# ============================================
+
+class JsonlExporter:
+    """Appends spans to TRACE_DIR/<service>.jsonl (one O_APPEND write per span, safe across workers)."""
+
+    def __init__(self, directory: str = TRACE_DIR, service: Optional[str] = None):
+        self.directory = directory
+        self.service = service
+        self._lock = threading.Lock()
+        self._warned = False
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.directory, f"{self.service or TRACE_SERVICE_NAME}.jsonl")
+
+    def export(self, span: Span):
+        line = (json.dumps(span.to_dict(), default=str, ensure_ascii=False) + "\n").encode("utf-8")
+        path = self.path
+        try:
+            with self._lock:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                try:
+                    os.write(fd, line)
+                finally:
+                    os.close(fd)
+        except OSError as e:
+            if not self._warned:
+                self._warned = True
+                logger.warning(f"Span export to {path} failed: {e}")
+
+
+exporter = JsonlExporter()
+
+
+def _name_service(service: str):
+    global TRACE_SERVICE_NAME
+    TRACE_SERVICE_NAME = TRACE_SERVICE_NAME or service
+
+
+# ============================================
+# Flask integration
+# ============================================
+
+def init_tracing(app, service: str):
+    _name_service(service)
+    if not TRACING_ENABLED:
+        return
+    from flask import g, request
+
+    logger.info(f"Tracing enabled; spans -> {exporter.path}")
+
+    @app.before_request
+    def _start_server_span():
+        s = start_span(f"{request.method} {request.path}", kind="server",
+                       traceparent=request.headers.get(TRACEPARENT),
+                       attributes={"http.method": request.method, "http.target": request.full_path.rstrip("?")})
+        g._trace_span, g._trace_token = s, _current.set(s)
+
+    @app.after_request
+    def _tag_server_span(response):
+        s = g.get("_trace_span")
+        if s is not None:
+            if request.url_rule is not None:
+                s.name = f"{request.method} {request.url_rule.rule}"
+            s.set_attribute("http.status_code", response.status_code)
+            if response.status_code >= 500:
+                s.status = "error"
+            response.headers[TRACERESPONSE] = s.traceparent
+        return response
+
+    @app.teardown_request
+    def _end_server_span(exc=None):
+        s, token = g.pop("_trace_span", None), g.pop("_trace_token", None)
+        if s is None:
+            return
+        if exc is not None:
+            s.set_error(exc)
+        _current.reset(token)
+        finish_span(s)
+
+
+# ============================================
+# FastAPI integration
+# ============================================
+
+def init_fastapi_tracing(app, service: str):
+    _name_service(service)
+    if not TRACING_ENABLED:
+        return
+    logger.info(f"Tracing enabled; spans -> {exporter.path}")
+
+    @app.middleware("http")
+    async def _server_span(request, call_next):
+        s = start_span(f"{request.method} {request.url.path}", kind="server",
+                       traceparent=request.headers.get(TRACEPARENT),
+                       attributes={"http.method": request.method, "http.target": request.url.path})
+        token = _current.set(s)
+        try:
+            response = await call_next(request)
+            s.set_attribute("http.status_code", response.status_code)
+            if response.status_code >= 500:
+                s.status = "error"
+            response.headers[TRACERESPONSE] = s.traceparent
+            return response
+        except Exception as e:
+            s.set_error(e)
+            raise
+        finally:
+            _current.reset(token)
+            finish_span(s)
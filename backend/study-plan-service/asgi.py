@@ -0,0 +1,51 @@
+"""
+Study Plan Service - ASGI entry point
+Port: 5500
+
+Async serving mode. The high-traffic dashboard reads (learner progress,
+daily tasks, priority matrix, context snapshot) are served natively on
+asyncio with Motor (modules/async_reads.py), inside the Flask app's
+request hooks (rate limits, security headers, compression, tracing,
+metrics; see utils/asgi_hooks.py). Every other route falls through to the
+existing Flask app, mounted as WSGI, so one process serves the whole API.
+
+Run:
+    uvicorn asgi:app --host 0.0.0.0 --port 5500 --workers 2
+    gunicorn -k uvicorn.workers.UvicornWorker -w 2 -b 0.0.0.0:5500 asgi:app
+
+Compare against the sync setup with scripts/load_test_serving.py.
+"""
+
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.wsgi import WSGIMiddleware
+
+from server import (
+    app as flask_app,
+    allowed_origins,
+    MONGODB_URI,
+    study_plan_module,
+    learner_progress_module,
+    priority_matrix_module,
+    context_snapshot_module,
+)
+from modules.async_reads import AsyncReadModule
+
+app = FastAPI(title="study-plan-service", docs_url=None, redoc_url=None, openapi_url=None)
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=allowed_origins,
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
+
+async_read_module = AsyncReadModule(
+    flask_app, study_plan_module, learner_progress_module, priority_matrix_module, context_snapshot_module,
+    mongo_uri=MONGODB_URI
+)
+async_read_module.register_routes(app)
+
+# Everything else is served by the Flask app
+app.mount("/", WSGIMiddleware(flask_app))
@@ -14,6 +14,12 @@ import logging
 from flask import request, jsonify
 from pymongo import MongoClient
 from bson import ObjectId
+from utils.auth import login_required
+from utils.recommendation_cache import (
+    RecommendationCache,
+    RECOMMENDATION_CACHE_COLLECTION,
+    invalidate_recommendations,
+)
 from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional, Any
 import math
@@ -47,7 +53,7 @@ class AdaptiveLearningModule:
     Provides intelligent recommendations and adaptive learning features.
     """
 
-    def __init__(self):
+    def __init__(self, mongo_uri: str = "mongodb://localhost:27017/"):
         logging.basicConfig(
             level=logging.INFO,
             format="%(asctime)s %(levelname)s %(name)s : %(message)s",
@@ -55,7 +61,7 @@ class AdaptiveLearningModule:
         self.logger = logging.getLogger(__name__)
 
         # MongoDB connections
-        self.mongo_client = MongoClient("mongodb://localhost:27017/")
+        self.mongo_client = MongoClient(mongo_uri)
         self.db = self.mongo_client["flaskStudyPlanDB"]
 
         # Collections
@@ -64,6 +70,9 @@ class AdaptiveLearningModule:
         self.recommendations_collection = self.db["learning_recommendations"]
         self.difficulty_settings_collection = self.db["difficulty_settings"]
 
+        # Versioned per-user cache for get_recommendations
+        self.recommendation_cache = RecommendationCache(self.db[RECOMMENDATION_CACHE_COLLECTION])
+
         # Create indexes
         self._create_indexes()
 
@@ -72,6 +81,7 @@ class AdaptiveLearningModule:
         try:
             self.recommendations_collection.create_index([("user_id", 1), ("created_at", -1)])
             self.difficulty_settings_collection.create_index([("user_id", 1)], unique=True)
+            self.recommendation_cache.create_indexes()
             self.logger.info("Adaptive learning indexes created")
         except Exception as e:
             self.logger.error(f"Error creating indexes: {e}")
@@ -170,9 +180,23 @@ class AdaptiveLearningModule:
         """
         Get personalized learning recommendations.
 
+        Served from the per-user cache until an activity, difficulty or
+        plan change bumps the user's version stamp, or the entry is older
+        than the cache TTL.
+
         Returns:
             List of recommended activities with priorities
         """
+        cached, version = self.recommendation_cache.get(user_id)
+        if cached is not None:
+            return cached
+
+        result = self._compute_recommendations(user_id)
+        self.recommendation_cache.put(user_id, version, result)
+        return result
+
+    def _compute_recommendations(self, user_id: str) -> Dict:
+        """Build recommendations from performance, progress and the active plan."""
         # Get performance analysis
         performance = self.analyze_performance(user_id)
 
@@ -368,6 +392,7 @@ class AdaptiveLearningModule:
                     }
                 }
             )
+            invalidate_recommendations(self.db, user_id)
 
             return {
                 "adjusted": True,
@@ -475,6 +500,12 @@ class AdaptiveLearningModule:
                 self.logger.error(f"Error getting recommendations: {e}")
                 return jsonify({"error": str(e)}), 500
 
+        @app.route("/v1/adaptive/recommendations/cache-stats", methods=["GET"])
+        @login_required
+        def get_recommendation_cache_stats():
+            """Hit/miss counters for the recommendation cache (this worker)."""
+            return jsonify(self.recommendation_cache.stats()), 200
+
         @app.route("/v1/adaptive/performance/<user_id>", methods=["GET"])
         def analyze_performance(user_id):
             """Analyze user's learning performance."""
@@ -0,0 +1,265 @@
+"""
+Async Read Module
+
+Motor-backed versions of the high-traffic dashboard reads, served by the
+ASGI entry point (asgi.py):
+
+- GET /v1/learner/progress/<user_id>
+- GET /v1/study-plan/daily-tasks
+- GET /v1/priority-matrix/
+- GET /v1/context/snapshot/<user_id>
+
+The handlers run between the Flask app's own request hooks
+(utils/asgi_hooks.py), so rate limits, security headers, compression,
+tracing, query counts and metrics apply as they do on the Flask routes.
+
+Independent reads for a request are issued together with asyncio.gather
+instead of one after another, so a request costs roughly its slowest
+query rather than the sum. Responses match the Flask routes field for
+field: documents are shaped by the same helpers the sync modules use, and
+rare write-on-miss paths (first progress record, on-demand daily tasks,
+first priority matrix) are delegated to the sync modules on a thread.
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple
+
+import jwt
+from fastapi import APIRouter, Depends, Header, Request
+from fastapi.responses import Response
+from flask import jsonify
+from motor.motor_asyncio import AsyncIOMotorClient
+from werkzeug.http import generate_etag, parse_etags, quote_etag
+
+from modules.context_snapshot import TASK_PROJECTION
+from modules.learner_progress import ACHIEVEMENT_DEFINITIONS
+from utils.asgi_hooks import flask_hooks_route
+from utils.auth import decode_token
+
+
+class AuthError(Exception):
+    def __init__(self, message: str, status: int = 401):
+        super().__init__(message)
+        self.status = status
+
+
+def current_user_id(authorization: Optional[str] = Header(None)) -> str:
+    """Async-side equivalent of utils.auth.login_required."""
+    if not authorization or not authorization.startswith("Bearer "):
+        raise AuthError("Authentication required")
+    try:
+        payload = decode_token(authorization.split(" ")[1])
+    except jwt.ExpiredSignatureError:
+        raise AuthError("Token has expired")
+    except jwt.InvalidTokenError:
+        raise AuthError("Invalid token")
+    return str(payload.get("userId") or payload.get("id"))
+
+
+class AsyncReadModule:
+    def __init__(self, flask_app, study_plan_module, learner_progress_module, priority_matrix_module,
+                 context_snapshot_module, mongo_uri: str = "mongodb://localhost:27017/"):
+        self.logger = logging.getLogger(__name__)
+        self.flask_app = flask_app
+        self.study_plan = study_plan_module
+        self.learner_progress = learner_progress_module
+        self.priority_matrix = priority_matrix_module
+        self.snapshot = context_snapshot_module
+
+        self.client = AsyncIOMotorClient(mongo_uri)
+        self._bind(self.client[learner_progress_module.db.name])
+
+    def _bind(self, db):
+        """Async handles on the sync modules' own collections, by name, so the two modes cannot drift."""
+        sp, lp = self.study_plan, self.learner_progress
+        perf, prefs = self.snapshot.performance, self.snapshot.user_preferences
+        self.db = db
+
+        # Collections
+        self.plans = db[sp.plans_collection.name]
+        self.tasks = db[sp.tasks_collection.name]
+        self.progress = db[lp.progress_collection.name]
+        self.activities = db[lp.activities_collection.name]
+        self.achievements = db[lp.achievements_collection.name]
+        self.priority_queue = db[self.priority_matrix.queue.name]
+        self.study_sessions = db[prefs.study_sessions.name]
+        self.performance_trackings = db[perf.performance_trackings.name]
+        self.performance_daily = db[perf.performance_daily.name]
+
+    def _json(self, payload: Any, status: int = 200) -> Response:
+        # Same encoder as the Flask routes, so both serving modes emit identical bodies
+        return Response(self._dumps(payload), status_code=status, media_type="application/json")
+
+    def _dumps(self, payload: Any) -> bytes:
+        # Encode exactly like jsonify() so bodies (and ETags) are byte-identical across modes
+        return self.flask_app.json.response(payload).get_data()
+
+    # ============================================
+    # Reads
+    # ============================================
+
+    async def progress_summary(self, user_id: str) -> Dict[str, Any]:
+        lp = self.learner_progress
+        week_start = datetime.now(timezone.utc) - timedelta(days=7)
+
+        progress, recent, achievements, weekly = await asyncio.gather(
+            self.progress.find_one({"user_id": user_id}),
+            self.activities.find({"user_id": user_id}).sort("timestamp", -1).limit(10).to_list(10),
+            self.achievements.find({"user_id": user_id}).to_list(None),
+            self.activities.find({"user_id": user_id, "timestamp": {"$gte": week_start}}).to_list(None),
+        )
+        if progress is None:
+            progress = await asyncio.to_thread(lp.get_or_create_progress, user_id)
+        else:
+            progress = lp._serialize(progress)
+
+        return {
+            "progress": progress,
+            "recent_activities": [lp._serialize(a) for a in recent],
+            "achievements": [lp._serialize(a) for a in achievements],
+            "achievements_count": len(achievements),
+            "total_achievements_available": len(ACHIEVEMENT_DEFINITIONS),
+            "weekly_stats": lp._calculate_weekly_stats(weekly),
+        }
+
+    async def daily_tasks(self, user_id: str, date_str: Optional[str]) -> Dict[str, Any]:
+        if date_str:
+            try:
+                target_date = datetime.fromisoformat(date_str.replace("Z", "+00:00")).date()
+            except ValueError:
+                target_date = datetime.now(timezone.utc).date()
+        else:
+            target_date = datetime.now(timezone.utc).date()
+
+        start_of_day = datetime.combine(target_date, datetime.min.time()).replace(tzinfo=timezone.utc)
+        end_of_day = datetime.combine(target_date, datetime.max.time()).replace(tzinfo=timezone.utc)
+        task_query = {"user_id": user_id, "date": {"$gte": start_of_day, "$lte": end_of_day}}
+
+        # The task lookup does not depend on the plan, so both go out together
+        plan, tasks = await asyncio.gather(
+            self.plans.find_one({"user_id": user_id, "status": "active"}),
+            self.tasks.find(task_query).to_list(None),
+        )
+        if not plan:
+            return {"tasks": [], "message": "No active study plan"}
+
+        if not tasks:
+            generated = await asyncio.to_thread(self.study_plan.generate_daily_tasks, plan["_id"], start_of_day)
+            if generated:
+                await asyncio.to_thread(self.study_plan.store_daily_tasks, generated)
+                tasks = await self.tasks.find(task_query).to_list(None)
+
+        return {
+            "date": target_date.isoformat(),
+            "tasks": [self.study_plan.serialize_daily_task(t) for t in tasks],
+            "plan_id": str(plan["_id"]),
+        }
+
+    async def priority_matrix_doc(self, user_id: str) -> Tuple[bytes, int]:
+        matrix = await self.priority_queue.find_one({"user_id": user_id})
+        if matrix is None:
+            return await asyncio.to_thread(self._recalculate_matrix, user_id)
+        return self._dumps(matrix), 200
+
+    def _recalculate_matrix(self, user_id: str) -> Tuple[bytes, int]:
+        # recalculate_matrix returns a Flask response, which needs an app context
+        with self.flask_app.app_context():
+            response = self.priority_matrix.recalculate_matrix(user_id)
+            return response.get_data(), response.status_code
+
+    async def context_snapshot(self, user_id: str) -> Dict[str, Any]:
+        names = ["plan", "daily_tasks", "sessions", "activities", "performance_history", "trends"]
+        raw = await asyncio.gather(
+            # Plan health chains dependent reads (plan -> milestones -> progress); keep it on a thread
+            asyncio.to_thread(self.snapshot._plan_section, user_id),
+            self.tasks.find(self.snapshot.tasks_query(user_id), TASK_PROJECTION).to_list(None),
+            self.study_sessions.find({"user_id": user_id}).sort("created_at", -1).limit(100).to_list(100),
+            self.activities.find({"user_id": user_id}).sort("timestamp", -1).limit(5).to_list(5),
+            self.performance_trackings.find({"user_id": user_id}).sort("timestamp", -1).limit(3).to_list(3),
+            self.performance_daily.aggregate(self.snapshot.performance.trends_pipeline(user_id, 30)).to_list(1),
+            return_exceptions=True,
+        )
+        raw = dict(zip(names, raw))
+        sessions = raw["sessions"]
+
+        def shape(value, fn):
+            return value if isinstance(value, BaseException) else fn(value)
+
+        prefs = self.snapshot.user_preferences
+        perf = self.snapshot.performance
+        results = {
+            "plan": raw["plan"],
+            "daily_tasks": shape(raw["daily_tasks"], lambda ts: [self.snapshot.task_row(t) for t in ts]),
+            # One sessions read feeds both the streak and the recent-sessions list
+            "streak": shape(sessions, prefs.streak_from_sessions),
+            "recent_sessions": shape(sessions, lambda ss: [
+                {**s, "_id": str(s["_id"]), "id": str(s["_id"])} for s in ss[:5]
+            ]),
+            "activities": shape(raw["activities"], lambda acts: [
+                self.learner_progress.format_activity(a) for a in acts
+            ]),
+            "performance_history": shape(raw["performance_history"], lambda docs: [
+                perf.serialize_tracking(d) for d in docs
+            ]),
+            "performance_trends": shape(raw["trends"], lambda rows: perf.summarize_trends(rows[0] if rows else {}, 30)),
+        }
+        return self.snapshot.assemble(user_id, results)
+
+    # ============================================
+    # Routes
+    # ============================================
+
+    def register_routes(self, api):
+        # Handlers run between the Flask app's request hooks (limits, security headers, tracing, metrics)
+        router = APIRouter(route_class=flask_hooks_route(self.flask_app))
+
+        @router.get("/v1/learner/progress/{user_id}")
+        async def get_learner_progress(user_id: str, curr_user_id: str = Depends(current_user_id)):
+            if user_id != curr_user_id:
+                return self._json({"error": "Unauthorized"}, 403)
+            try:
+                return self._json(await self.progress_summary(user_id))
+            except Exception as e:
+                self.logger.error(f"Error getting progress: {e}")
+                return self._json({"error": str(e)}, 500)
+
+        @router.get("/v1/study-plan/daily-tasks")
+        async def get_daily_tasks(date: Optional[str] = None, user_id: str = Depends(current_user_id)):
+            try:
+                return self._json(await self.daily_tasks(user_id, date))
+            except Exception as e:
+                self.logger.error(f"Error fetching daily tasks: {e}")
+                return self._json({"error": str(e), "type": type(e).__name__}, 500)
+
+        @router.get("/v1/priority-matrix/")
+        async def get_matrix(user_id: Optional[str] = None):
+            if not user_id:
+                return self._json({"error": "user_id required"}, 400)
+            body, status = await self.priority_matrix_doc(user_id)
+            return Response(body, status_code=status, media_type="application/json")
+
+        @router.get("/v1/context/snapshot/{user_id}")
+        async def get_context_snapshot(request: Request, user_id: str,
+                                       curr_user_id: str = Depends(current_user_id)):
+            if user_id != curr_user_id:
+                return self._json({"error": "Unauthorized"}, 403)
+            try:
+                body = self._dumps(await self.context_snapshot(user_id))
+                etag = quote_etag(generate_etag(body))
+                headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+                if parse_etags(request.headers.get("if-none-match")).contains_raw(etag):
+                    return Response(status_code=304, headers=headers)
+                return Response(body, media_type="application/json", headers=headers)
+            except Exception as e:
+                self.logger.error(f"Error building context snapshot: {e}")
+                return self._json({"error": str(e)}, 500)
+
+        def handle_auth_error(exc: AuthError):
+            # Same bodies as utils.auth.login_required
+            return jsonify({"error": str(exc)}), exc.status
+
+        self.flask_app.register_error_handler(AuthError, handle_auth_error)
+        api.include_router(router)
+        self.logger.info("Async read routes registered")
@@ -0,0 +1,334 @@
+"""
+Batch Jobs Module
+
+Nightly maintenance that otherwise runs lazily on the request path or not at all:
+- daily_tasks: pre-generate today's tasks for every user with an active plan
+- pact_streaks: evaluate yesterday's PACT streak for every commitment
+- weekly_goals_reset (weekly): zero the weekly goal counters
+- weekly_reviews (weekly): weekly review of last week for recently active users
+- okr_refresh: recompute OKR key results (velocity/risk move with time even without writes)
+
+Users are split into sorted chunks processed in parallel; each chunk uses
+bulk reads and writes. Every run is recorded in `batch_job_runs` (one doc
+per job and run key) holding a lease, so only one gunicorn worker runs a
+job, plus the user ranges already finished, so a crashed run resumes
+where it stopped. Per-job timing metrics are kept on the same doc.
+
+A job is due from BATCH_RUN_HOUR_UTC on the first day of its period (each
+day, or the ISO week's Monday) until a run for that period completes, so a
+scheduler that was down on Monday still runs the weekly jobs later that week.
+A late weekly_goals_reset skips users already active that week.
+
+API Prefix: /v1/batch/
+"""
+
+import bisect
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+from flask import jsonify
+from pymongo import MongoClient, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from utils.auth import login_required
+
+BATCH_RUN_HOUR_UTC = int(os.getenv("BATCH_RUN_HOUR_UTC", 2))
+BATCH_CHUNK_SIZE = int(os.getenv("BATCH_CHUNK_SIZE", 500))
+BATCH_MAX_WORKERS = int(os.getenv("BATCH_MAX_WORKERS", 4))
+BATCH_POLL_SECONDS = int(os.getenv("BATCH_POLL_SECONDS", 300))
+LEASE_SECONDS = 15 * 60
+
+
+class BatchJobsModule:
+    def __init__(
+        self,
+        study_plan_module,
+        learner_progress_module,
+        pact_module,
+        review_cycles_module,
+        okr_module=None,
+        mongo_uri: str = "mongodb://localhost:27017/",
+        chunk_size: int = BATCH_CHUNK_SIZE,
+        max_workers: int = BATCH_MAX_WORKERS,
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.client = MongoClient(mongo_uri)
+        self.db = self.client["flaskStudyPlanDB"]
+
+        self.study_plan = study_plan_module
+        self.learner_progress = learner_progress_module
+        self.pact = pact_module
+        self.review_cycles = review_cycles_module
+        self.okr = okr_module
+
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+        self.worker_id = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # Collections
+        self.runs = self.db["batch_job_runs"]
+
+        # name -> (cadence, list users, process one chunk)
+        self.jobs: Dict[str, Dict[str, Any]] = {
+            "daily_tasks": {"cadence": "daily", "users": self._daily_task_users, "chunk": self._daily_task_chunk},
+            "pact_streaks": {"cadence": "daily", "users": self._pact_users, "chunk": self._pact_chunk},
+            "weekly_goals_reset": {"cadence": "weekly", "users": self._progress_users, "chunk": self._weekly_reset_chunk},
+            "weekly_reviews": {"cadence": "weekly", "users": self._active_last_week_users, "chunk": self._weekly_review_chunk},
+        }
+        if okr_module is not None:
+            self.jobs["okr_refresh"] = {"cadence": "daily", "users": self._okr_users, "chunk": self._okr_chunk}
+
+        self._create_indexes()
+
+    def _create_indexes(self):
+        try:
+            self.runs.create_index([("job", 1), ("run_key", 1)], unique=True)
+            self.runs.create_index([("job", 1), ("started_at", -1)])
+            self.logger.info("Batch job indexes verified/created.")
+        except Exception as e:
+            self.logger.error(f"Error creating batch job indexes: {e}")
+
+    # ============================================
+    # Job Definitions
+    # ============================================
+
+    def _day_start(self, now: datetime) -> datetime:
+        return now.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    def _week_start(self, now: datetime) -> datetime:
+        return self._day_start(now) - timedelta(days=now.weekday())
+
+    def _daily_task_users(self, now: datetime) -> List[str]:
+        return self.study_plan.plans_collection.distinct("user_id", {"status": "active"})
+
+    def _daily_task_chunk(self, user_ids: List[str], now: datetime) -> Dict[str, int]:
+        return self.study_plan.generate_daily_tasks_bulk(user_ids, self._day_start(now))
+
+    def _pact_users(self, now: datetime) -> List[str]:
+        return self.pact.commitments.distinct("user_id")
+
+    def _pact_chunk(self, user_ids: List[str], now: datetime) -> Dict[str, int]:
+        return self.pact.update_streaks_bulk(user_ids, now)
+
+    def _progress_users(self, now: datetime) -> List[str]:
+        return self.learner_progress.progress_collection.distinct("user_id")
+
+    def _weekly_reset_chunk(self, user_ids: List[str], now: datetime) -> Dict[str, int]:
+        return self.learner_progress.reset_weekly_goals_bulk(user_ids, self._week_start(now))
+
+    def _active_last_week_users(self, now: datetime) -> List[str]:
+        last_week_start = self._week_start(now) - timedelta(days=7)
+        return self.learner_progress.progress_collection.distinct(
+            "user_id", {"last_activity_date": {"$gte": last_week_start}}
+        )
+
+    def _weekly_review_chunk(self, user_ids: List[str], now: datetime) -> Dict[str, int]:
+        this_week = self._week_start(now)
+        return self.review_cycles.generate_reviews_bulk(user_ids, "weekly", this_week - timedelta(days=7), this_week)
+
+    def _okr_users(self, now: datetime) -> List[str]:
+        return self.okr.objectives.distinct("user_id")
+
+    def _okr_chunk(self, user_ids: List[str], now: datetime) -> Dict[str, int]:
+        return self.okr.refresh_users_bulk(user_ids)
+
+    def run_key(self, job: str, now: datetime) -> str:
+        if self.jobs[job]["cadence"] == "weekly":
+            year, week, _ = now.isocalendar()
+            return f"{year}-W{week:02d}"
+        return now.date().isoformat()
+
+    def is_due(self, job: str, now: datetime) -> bool:
+        """True once the period's run hour has passed and no run for the period has completed."""
+        period_start = self._week_start(now) if self.jobs[job]["cadence"] == "weekly" else self._day_start(now)
+        if now < period_start + timedelta(hours=BATCH_RUN_HOUR_UTC):
+            return False
+        completed = {"job": job, "run_key": self.run_key(job, now), "status": "completed"}
+        return self.runs.count_documents(completed, limit=1) == 0
+
+    # ============================================
+    # Run State (lease + checkpoints)
+    # ============================================
+
+    def _acquire(self, job: str, run_key: str, now: datetime) -> Optional[Dict[str, Any]]:
+        """Claim the run unless it is completed or leased by a live worker."""
+        try:
+            return self.runs.find_one_and_update(
+                {
+                    "job": job,
+                    "run_key": run_key,
+                    "status": {"$ne": "completed"},
+                    "$or": [{"lease_until": {"$lt": now}}, {"lease_until": {"$exists": False}}],
+                },
+                {
+                    "$set": {"status": "running", "owner": self.worker_id, "lease_until": now + timedelta(seconds=LEASE_SECONDS)},
+                    "$setOnInsert": {"job": job, "run_key": run_key, "started_at": now, "completed_ranges": []},
+                    "$inc": {"attempts": 1},
+                },
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+        except DuplicateKeyError:
+            return None
+
+    def _pending_users(self, users: List[str], completed_ranges: List[List[str]]) -> List[str]:
+        """Drop users that fall inside a user range finished by an earlier attempt."""
+        ranges = sorted(completed_ranges)
+        starts = [r[0] for r in ranges]
+        pending = []
+        for u in users:
+            idx = bisect.bisect_right(starts, u) - 1
+            if idx >= 0 and ranges[idx][0] <= u <= ranges[idx][1]:
+                continue
+            pending.append(u)
+        return pending
+
+    def _checkpoint(self, run_id, chunk: List[str], chunk_result: Dict[str, int], seconds: float):
+        inc = {"metrics.users": len(chunk), "metrics.chunks": 1, "metrics.chunk_seconds_total": seconds}
+        for key, value in chunk_result.items():
+            if isinstance(value, (int, float)):
+                inc[f"metrics.{key}"] = value
+        self.runs.update_one(
+            {"_id": run_id},
+            {
+                "$push": {"completed_ranges": [chunk[0], chunk[-1]]},
+                "$inc": inc,
+                "$max": {"metrics.chunk_seconds_max": seconds},
+                "$set": {"lease_until": datetime.now(timezone.utc) + timedelta(seconds=LEASE_SECONDS)},
+            }
+        )
+
+    # ============================================
+    # Execution
+    # ============================================
+
+    def run_job(self, job: str, now: Optional[datetime] = None) -> Dict[str, Any]:
+        now = now or datetime.now(timezone.utc)
+        run_key = self.run_key(job, now)
+        run = self._acquire(job, run_key, now)
+        if run is None:
+            return {"job": job, "run_key": run_key, "status": "skipped"}
+
+        definition = self.jobs[job]
+        started = time.perf_counter()
+        users = sorted(definition["users"](now))
+        pending = self._pending_users(users, run.get("completed_ranges", []))
+        chunks = [pending[i:i + self.chunk_size] for i in range(0, len(pending), self.chunk_size)]
+
+        errors = 0
+
+        def process(chunk: List[str]):
+            t0 = time.perf_counter()
+            result = definition["chunk"](chunk, now)
+            return chunk, result or {}, time.perf_counter() - t0
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = [pool.submit(process, chunk) for chunk in chunks]
+            for future in as_completed(futures):
+                try:
+                    chunk, result, seconds = future.result()
+                    self._checkpoint(run["_id"], chunk, result, seconds)
+                except Exception as e:
+                    errors += 1
+                    self.logger.error(f"Batch job {job} chunk failed: {e}")
+
+        duration = time.perf_counter() - started
+        status = "completed" if errors == 0 else "failed"
+        self.runs.update_one(
+            {"_id": run["_id"]},
+            {
+                "$set": {
+                    "status": status,
+                    "finished_at": datetime.now(timezone.utc),
+                    "metrics.last_attempt_seconds": round(duration, 3),
+                    "metrics.total_users": len(users),
+                },
+                "$inc": {"metrics.failed_chunks": errors},
+                # Release the lease so a failed run can be resumed right away
+                "$unset": {"lease_until": ""},
+            }
+        )
+        self.logger.info(
+            f"Batch job {job} [{run_key}] {status}: {len(pending)}/{len(users)} users "
+            f"in {len(chunks)} chunks, {duration:.2f}s"
+        )
+        return {
+            "job": job,
+            "run_key": run_key,
+            "status": status,
+            "users": len(pending),
+            "chunks": len(chunks),
+            "failed_chunks": errors,
+            "duration_seconds": round(duration, 3),
+        }
+
+    def run_due_jobs(self, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        now = now or datetime.now(timezone.utc)
+        return [self.run_job(job, now) for job in self.jobs if self.is_due(job, now)]
+
+    # ============================================
+    # In-process Scheduler
+    # ============================================
+
+    def _scheduler_loop(self):
+        while not self._stop.is_set():
+            try:
+                self.run_due_jobs()
+            except Exception as e:
+                self.logger.error(f"Batch scheduler error: {e}")
+            self._stop.wait(BATCH_POLL_SECONDS)
+
+    def start_scheduler(self):
+        """Poll for due jobs in a daemon thread; leases keep workers from double-running."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._scheduler_loop, name="batch-jobs", daemon=True)
+        self._thread.start()
+        self.logger.info(f"Batch scheduler started (run hour {BATCH_RUN_HOUR_UTC}:00 UTC)")
+
+    def stop_scheduler(self):
+        self._stop.set()
+
+    # ============================================
+    # Metrics
+    # ============================================
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Latest run per job with its timing metrics."""
+        jobs = {}
+        for job in self.jobs:
+            run = self.runs.find_one({"job": job}, sort=[("started_at", -1)])
+            if not run:
+                continue
+            metrics = run.get("metrics", {})
+            chunks = metrics.get("chunks", 0)
+            jobs[job] = {
+                "run_key": run["run_key"],
+                "status": run.get("status"),
+                "attempts": run.get("attempts", 1),
+                "started_at": run["started_at"].isoformat() if run.get("started_at") else None,
+                "finished_at": run["finished_at"].isoformat() if run.get("finished_at") else None,
+                "chunk_seconds_avg": round(metrics.get("chunk_seconds_total", 0) / chunks, 3) if chunks else 0,
+                **{k: v for k, v in metrics.items() if k != "chunk_seconds_total"},
+            }
+        return {"jobs": jobs}
+
+    def register_routes(self, app):
+        @app.route("/v1/batch/metrics", methods=["GET"])
+        @login_required
+        def get_batch_metrics():
+            """Per-job timing metrics for the nightly batch engine."""
+            try:
+                return jsonify(self.get_metrics()), 200
+            except Exception as e:
+                self.logger.error(f"Error getting batch metrics: {e}")
+                return jsonify({"error": str(e)}), 500
+
+        self.logger.info("Batch Jobs routes registered")
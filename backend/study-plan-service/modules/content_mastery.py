@@ -10,7 +10,11 @@ from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional, Any
 from flask import Blueprint, request, jsonify
 from pymongo import MongoClient, UpdateOne
+from pymongo.errors import BulkWriteError
 from bson import ObjectId
+from utils.timeseries import ensure_timeseries_collection
+from utils.okr_refresh import mark_okrs_stale
+from utils.pagination import keyset_page, InvalidCursor, NEXT_CURSOR_HEADER
 
 # ============================================
 # SRS Utility (SM-2 Variant)
@@ -66,6 +70,8 @@ import math
 # Mastery Module Class
 # ============================================
 
+MAX_BATCH_REVIEWS = 500
+
 class ContentMasteryModule:
     def __init__(self, mongo_uri: str = "mongodb://localhost:27017/"):
         self.logger = logging.getLogger(__name__)
@@ -83,9 +89,14 @@ class ContentMasteryModule:
     def _create_indexes(self):
         """Create indexes for performance."""
         try:
+            # Interactions are an append-only event stream bucketed per user
+            ensure_timeseries_collection(self.db, "content_interactions")
+
             self.mastery.create_index([("user_id", 1), ("content_type", 1), ("content_id", 1)], unique=True)
             self.mastery.create_index([("user_id", 1), ("status", 1)])
-            self.mastery.create_index([("user_id", 1), ("srs.next_review_date", 1)])
+            # Keyset pagination: (user_id, sort_key, _id)
+            self.mastery.create_index([("user_id", 1), ("srs.next_review_date", 1), ("_id", 1)])
+            self.mastery.create_index([("user_id", 1), ("updated_at", -1), ("_id", -1)])
             self.mastery.create_index([("user_id", 1), ("priority", 1)])
             
             self.interactions.create_index([("user_id", 1), ("timestamp", -1)])
@@ -144,6 +155,183 @@ class ContentMasteryModule:
         result = list(self.sessions.aggregate(pipeline))
         return result[0]["total"] if result else 0
 
+    # ============================================
+    # Review Processing
+    # ============================================
+
+    def compute_review(self, doc: Dict[str, Any], review: Dict[str, Any], now: datetime):
+        """
+        Apply one review to a mastery doc in memory.
+
+        Returns ($set update for the mastery doc, interaction record).
+        Nothing is written here, so callers can batch the writes.
+        """
+        is_correct = review.get("is_correct")
+        difficulty = review.get("difficulty", "medium") # hard, medium, easy, perfect
+
+        # Calculate new SRS
+        quality = self.map_quality_to_srs(is_correct, difficulty)
+        srs_result = calculate_next_srs(
+            doc["srs"]["interval_days"],
+            doc["srs"]["ease_factor"],
+            quality,
+            doc.get("mastery_stage", 1)
+        )
+        
+        # Update Stats
+        total = doc["stats"]["total_reviews"] + 1
+        correct = doc["stats"]["correct_count"] + (1 if is_correct else 0)
+        incorrect = doc["stats"]["incorrect_count"] + (0 if is_correct else 1)
+        accuracy = (correct / total) * 100
+        streak = (doc["srs"]["correct_streak"] + 1) if is_correct else 0
+        lapse = doc["srs"]["lapse_count"] + (1 if (not is_correct and doc["status"] == "mastered") else 0)
+        
+        new_status = self.determine_status(srs_result["interval_days"], accuracy, streak)
+        
+        # Update Document
+        update_data = {
+            "status": new_status,
+            "mastery_stage": srs_result["new_stage"],
+            "srs.interval_days": srs_result["interval_days"],
+            "srs.ease_factor": srs_result["ease_factor"],
+            "srs.next_review_date": srs_result["next_review_date"],
+            "srs.review_count": total,
+            "srs.correct_streak": streak,
+            "srs.lapse_count": lapse,
+            "stats.total_reviews": total,
+            "stats.correct_count": correct,
+            "stats.incorrect_count": incorrect,
+            "stats.accuracy_percent": round(accuracy, 2),
+            "last_rating": difficulty,
+            "performance": self.determine_performance(accuracy, streak),
+            "last_reviewed_at": now,
+            "updated_at": now
+        }
+        
+        if new_status == "mastered" and doc["status"] != "mastered":
+            update_data["mastered_at"] = now
+        elif not is_correct:
+            update_data["last_error_type"] = review.get("error_type", "other")
+        
+        # Log Interaction
+        interaction = {
+            "user_id": doc["user_id"],
+            "mastery_id": doc["_id"],
+            "interaction_type": review.get("interaction_type", "flashcard_review"),
+            "content_type": doc["content_type"],
+            "content_id": doc["content_id"],
+            "is_correct": is_correct,
+            "timestamp": now,
+            "srs_change": {
+                "old_interval": doc["srs"]["interval_days"],
+                "new_interval": srs_result["interval_days"],
+                "old_stage": doc.get("mastery_stage", 1),
+                "new_stage": srs_result["new_stage"]
+            }
+        }
+        return update_data, interaction
+
+    def _apply_set(self, doc: Dict[str, Any], update_data: Dict[str, Any]):
+        """Apply a dotted-path $set to an in-memory doc."""
+        for path, value in update_data.items():
+            target = doc
+            *parents, leaf = path.split(".")
+            for key in parents:
+                target = target.setdefault(key, {})
+            target[leaf] = value
+
+    def log_reviews_batch(self, user_id: str, reviews: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Apply many reviews with one `$in` read, one bulk_write and one insert_many.
+
+        Reviews are applied in request order; several reviews of the same
+        item see each other's results, exactly as sequential calls would.
+        Returns one result per review, in request order.
+        """
+        ids, pairs = [], {}
+        for review in reviews:
+            mastery_id = review.get("mastery_id")
+            if mastery_id and ObjectId.is_valid(mastery_id):
+                ids.append(ObjectId(mastery_id))
+            elif review.get("content_type") and review.get("content_id"):
+                pairs.setdefault(review["content_type"], set()).add(review["content_id"])
+
+        clauses = [{"_id": {"$in": ids}}] if ids else []
+        clauses += [{"content_type": t, "content_id": {"$in": list(c)}} for t, c in pairs.items()]
+        docs = list(self.mastery.find({"user_id": user_id, "$or": clauses})) if clauses else []
+        by_id = {d["_id"]: d for d in docs}
+        by_content = {(d["content_type"], d["content_id"]): d for d in docs}
+
+        now = datetime.now(timezone.utc)
+        results: List[Dict[str, Any]] = []
+        pending_sets: Dict[ObjectId, Dict[str, Any]] = {}
+        result_docs: List[Optional[ObjectId]] = []
+        interactions = []
+
+        for index, review in enumerate(reviews):
+            mastery_id = review.get("mastery_id")
+            if mastery_id and not ObjectId.is_valid(mastery_id):
+                doc = None
+            elif mastery_id:
+                doc = by_id.get(ObjectId(mastery_id))
+            else:
+                doc = by_content.get((review.get("content_type"), review.get("content_id")))
+
+            if doc is None:
+                results.append({"index": index, "error": "Mastery record not found"})
+                result_docs.append(None)
+                continue
+
+            update_data, interaction = self.compute_review(doc, review, now)
+            self._apply_set(doc, update_data)
+            pending_sets.setdefault(doc["_id"], {}).update(update_data)
+            interactions.append(interaction)
+            results.append({
+                "index": index,
+                "mastery_id": str(doc["_id"]),
+                "status": update_data["status"],
+                "next_review": update_data["srs.next_review_date"]
+            })
+            result_docs.append(doc["_id"])
+
+        if pending_sets:
+            doc_ids = list(pending_sets)
+            ops = [UpdateOne({"_id": _id}, {"$set": pending_sets[_id]}) for _id in doc_ids]
+            failed = set()
+            try:
+                self.mastery.bulk_write(ops, ordered=False)
+            except BulkWriteError as e:
+                failed = {doc_ids[err["index"]] for err in e.details.get("writeErrors", [])}
+                self.logger.error(f"Batch review write errors for {user_id}: {e.details.get('writeErrors')}")
+
+            # Interactions are only logged for items whose update was applied
+            logged = [i for i in interactions if i["mastery_id"] not in failed]
+            if logged:
+                self.interactions.insert_many(logged, ordered=True)
+            for result, doc_id in zip(results, result_docs):
+                if doc_id in failed:
+                    result.pop("status", None)
+                    result.pop("next_review", None)
+                    result["error"] = "Write failed"
+            mark_okrs_stale(self.db, user_id)
+
+        return results
+
+    def _page_response(self, query: Dict[str, Any], sort_key: str, direction: int):
+        """Bare-list page of mastery records; the next cursor goes in a header."""
+        try:
+            records, next_cursor = keyset_page(
+                self.mastery, query, sort_key, direction,
+                cursor=request.args.get("cursor"), limit=request.args.get("limit", type=int)
+            )
+        except InvalidCursor as e:
+            return jsonify({"error": str(e)}), 400
+        for r in records: r["_id"] = str(r["_id"])
+        response = jsonify(records)
+        if next_cursor:
+            response.headers[NEXT_CURSOR_HEADER] = next_cursor
+        return response
+
     def register_routes(self, app):
         mastery_bp = Blueprint("mastery", __name__, url_prefix="/v1/mastery")
 
@@ -159,9 +347,7 @@ class ContentMasteryModule:
             if content_type: query["content_type"] = content_type
             if status: query["status"] = status
             
-            records = list(self.mastery.find(query).limit(100))
-            for r in records: r["_id"] = str(r["_id"])
-            return jsonify(records)
+            return self._page_response(query, "updated_at", -1)
 
         @mastery_bp.route("/stats", methods=["GET"])
         def get_stats():
@@ -190,9 +376,7 @@ class ContentMasteryModule:
                 "srs.next_review_date": {"$lte": now},
                 "status": {"$ne": "burned"}
             }
-            records = list(self.mastery.find(query).sort("srs.next_review_date", 1).limit(50))
-            for r in records: r["_id"] = str(r["_id"])
-            return jsonify(records)
+            return self._page_response(query, "srs.next_review_date", 1)
 
         @mastery_bp.route("/<content_type>/<content_id>/start", methods=["POST"])
         def start_learning(content_type, content_id):
@@ -233,6 +417,7 @@ class ContentMasteryModule:
                     {"$setOnInsert": record},
                     upsert=True
                 )
+                mark_okrs_stale(self.db, user_id)
                 return jsonify({"message": "Started learning"}), 201
             except Exception as e:
                 return jsonify({"error": str(e)}), 500
@@ -244,8 +429,6 @@ class ContentMasteryModule:
             mastery_id = data.get("mastery_id")
             content_type = data.get("content_type")
             content_id = data.get("content_id")
-            is_correct = data.get("is_correct")
-            difficulty = data.get("difficulty", "medium") # hard, medium, easy, perfect
             
             if not user_id or (not mastery_id and not (content_type and content_id)):
                 return jsonify({"error": "user_id and (mastery_id or content_id) required"}), 400
@@ -257,75 +440,34 @@ class ContentMasteryModule:
             doc = self.mastery.find_one(query)
             if not doc: return jsonify({"error": "Mastery record not found"}), 404
             
-            # Calculate new SRS
-            quality = self.map_quality_to_srs(is_correct, difficulty)
-            srs_result = calculate_next_srs(
-                doc["srs"]["interval_days"],
-                doc["srs"]["ease_factor"],
-                quality,
-                doc.get("mastery_stage", 1)
-            )
-            
             now = datetime.now(timezone.utc)
-            
-            # Update Stats
-            total = doc["stats"]["total_reviews"] + 1
-            correct = doc["stats"]["correct_count"] + (1 if is_correct else 0)
-            incorrect = doc["stats"]["incorrect_count"] + (0 if is_correct else 1)
-            accuracy = (correct / total) * 100
-            streak = (doc["srs"]["correct_streak"] + 1) if is_correct else 0
-            lapse = doc["srs"]["lapse_count"] + (1 if (not is_correct and doc["status"] == "mastered") else 0)
-            
-            new_status = self.determine_status(srs_result["interval_days"], accuracy, streak)
-            
-            # Update Document
-            update_data = {
-                "status": new_status,
-                "mastery_stage": srs_result["new_stage"],
-                "srs.interval_days": srs_result["interval_days"],
-                "srs.ease_factor": srs_result["ease_factor"],
-                "srs.next_review_date": srs_result["next_review_date"],
-                "srs.review_count": total,
-                "srs.correct_streak": streak,
-                "srs.lapse_count": lapse,
-                "stats.total_reviews": total,
-                "stats.correct_count": correct,
-                "stats.incorrect_count": incorrect,
-                "stats.accuracy_percent": round(accuracy, 2),
-                "last_rating": difficulty,
-                "performance": self.determine_performance(accuracy, streak),
-                "last_reviewed_at": now,
-                "updated_at": now
-            }
-            
-            if new_status == "mastered" and doc["status"] != "mastered":
-                update_data["mastered_at"] = now
-            elif not is_correct:
-                update_data["last_error_type"] = data.get("error_type", "other")
+            update_data, interaction = self.compute_review(doc, data, now)
             
             self.mastery.update_one({"_id": doc["_id"]}, {"$set": update_data})
-            
-            # Log Interaction
-            interaction = {
-                "user_id": user_id,
-                "mastery_id": doc["_id"],
-                "interaction_type": data.get("interaction_type", "flashcard_review"),
-                "content_type": doc["content_type"],
-                "content_id": doc["content_id"],
-                "is_correct": is_correct,
-                "timestamp": now,
-                "srs_change": {
-                    "old_interval": doc["srs"]["interval_days"],
-                    "new_interval": srs_result["interval_days"],
-                    "old_stage": doc.get("mastery_stage", 1),
-                    "new_stage": srs_result["new_stage"]
-                }
-            }
             self.interactions.insert_one(interaction)
+            mark_okrs_stale(self.db, user_id)
+            
+            return jsonify({
+                "status": update_data["status"],
+                "next_review": update_data["srs.next_review_date"]
+            })
+
+        @mastery_bp.route("/review/batch", methods=["POST"])
+        def log_reviews_batch():
+            data = request.json
+            user_id = data.get("user_id")
+            reviews = data.get("reviews", [])
+            
+            if not user_id or not isinstance(reviews, list):
+                return jsonify({"error": "user_id and reviews list required"}), 400
+            if len(reviews) > MAX_BATCH_REVIEWS:
+                return jsonify({"error": f"At most {MAX_BATCH_REVIEWS} reviews per batch"}), 400
             
+            results = self.log_reviews_batch(user_id, reviews)
             return jsonify({
-                "status": new_status,
-                "next_review": srs_result["next_review_date"]
+                "processed": sum(1 for r in results if "error" not in r),
+                "failed": sum(1 for r in results if "error" in r),
+                "results": results
             })
 
         app.register_blueprint(mastery_bp)
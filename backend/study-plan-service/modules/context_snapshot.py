@@ -0,0 +1,154 @@
+"""
+Learner Context Snapshot Module
+
+One composite read of everything the hanachan agent puts in its "study"
+memory: active plan summary with health, today's tasks, streak, recent
+sessions, recent activities and performance audits/trends.
+
+The sections are independent Mongo reads, so they run concurrently on a
+shared thread pool under one SNAPSHOT_TIMEOUT_SECONDS deadline. A failing
+or late section is reported under "errors" instead of failing the snapshot. The response carries an ETag over its body so
+callers can revalidate with If-None-Match and get a 304.
+
+API Prefix: /v1/context/snapshot/
+"""
+
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+from flask import request, jsonify
+from utils.auth import login_required
+
+SNAPSHOT_WORKERS = int(os.getenv("SNAPSHOT_WORKERS", 8))
+SNAPSHOT_TIMEOUT_SECONDS = float(os.getenv("SNAPSHOT_TIMEOUT_SECONDS", 5))
+
+TASK_PROJECTION = {"task_type": 1, "title": 1, "status": 1, "estimated_minutes": 1, "skill_category": 1}
+
+
+class ContextSnapshotModule:
+    def __init__(self, study_plan_module, learner_progress_module, performance_module, user_preferences_module):
+        self.logger = logging.getLogger(__name__)
+        self.study_plan = study_plan_module
+        self.learner_progress = learner_progress_module
+        self.performance = performance_module
+        self.user_preferences = user_preferences_module
+        self.pool = ThreadPoolExecutor(max_workers=SNAPSHOT_WORKERS, thread_name_prefix="snapshot")
+
+    # ============================================
+    # Sections
+    # ============================================
+
+    def _plan_section(self, user_id: str) -> Optional[Dict[str, Any]]:
+        sp = self.study_plan
+        plan = sp.plans_collection.find_one({"user_id": user_id, "status": "active"}, sort=[("created_at", -1)])
+        if not plan:
+            return None
+
+        milestones = list(sp.milestones_collection.find({"plan_id": plan["_id"]}))
+        progress = (
+            sum(sp.calculate_milestone_progress(m) for m in milestones) / len(milestones)
+            if milestones else 0
+        )
+        current = next((m for m in milestones if m["_id"] == plan.get("current_milestone_id")), None)
+        health = sp.check_plan_health(plan["_id"])
+        days_remaining = (sp._ensure_tz_aware(plan["exam_date"]) - datetime.now(timezone.utc)).days
+
+        return {
+            "plan_id": str(plan["_id"]),
+            "title": plan.get("title") or f"JLPT {plan['target_level']} Study Plan",
+            "target_level": plan["target_level"],
+            "exam_date": plan["exam_date"].isoformat(),
+            "days_remaining": max(0, days_remaining),
+            "progress_percent": round(progress, 1),
+            "health_status": health.get("health_status", "on_track"),
+            "recommendations": health.get("recommendations", []),
+            "current_milestone": current["title"] if current else None,
+        }
+
+    def _daily_tasks_section(self, user_id: str) -> List[Dict[str, Any]]:
+        # Read-only: tasks are pre-generated nightly (or on the daily-tasks GET)
+        tasks = self.study_plan.tasks_collection.find(self.tasks_query(user_id), TASK_PROJECTION)
+        return [self.task_row(t) for t in tasks]
+
+    @staticmethod
+    def tasks_query(user_id: str) -> Dict[str, Any]:
+        today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        return {"user_id": user_id, "date": {"$gte": today, "$lt": today + timedelta(days=1)}}
+
+    @staticmethod
+    def task_row(t: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "id": str(t["_id"]),
+            "title": t.get("title"),
+            "task_type": t.get("task_type"),
+            "skill_category": t.get("skill_category") or t.get("task_type"),
+            "estimated_minutes": t.get("estimated_minutes"),
+            "completed": t.get("status") == "completed",
+        }
+
+    def _sections(self) -> Dict[str, Callable[[str], Any]]:
+        return {
+            "plan": self._plan_section,
+            "daily_tasks": self._daily_tasks_section,
+            "streak": self.user_preferences.get_streak,
+            "recent_sessions": lambda uid: self.user_preferences.get_sessions(uid, 5),
+            "activities": lambda uid: self.learner_progress.get_activities_list(uid, 5),
+            "performance_history": lambda uid: self.performance.get_user_history(uid, 3),
+            "performance_trends": lambda uid: self.performance.get_trends(uid, 30),
+        }
+
+    def build_snapshot(self, user_id: str) -> Dict[str, Any]:
+        deadline = time.monotonic() + SNAPSHOT_TIMEOUT_SECONDS
+        futures = {name: self.pool.submit(fn, user_id) for name, fn in self._sections().items()}
+
+        results = {}
+        for name, future in futures.items():
+            try:
+                # Whatever is left of the one deadline, so slow sections do not add up
+                results[name] = future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except Exception as e:
+                future.cancel()
+                results[name] = e
+        return self.assemble(user_id, results)
+
+    def assemble(self, user_id: str, results: Dict[str, Any]) -> Dict[str, Any]:
+        """Snapshot body from section results; exceptions become None plus an "errors" entry."""
+        snapshot: Dict[str, Any] = {"user_id": user_id}
+        errors = {}
+        for name, value in results.items():
+            if isinstance(value, BaseException):
+                self.logger.error(f"Snapshot section {name} failed for {user_id}: {value}")
+                snapshot[name] = None
+                errors[name] = str(value) or type(value).__name__
+            else:
+                snapshot[name] = value
+        if errors:
+            snapshot["errors"] = errors
+        return snapshot
+
+    # ============================================
+    # Routes
+    # ============================================
+
+    def register_routes(self, app):
+        @app.route("/v1/context/snapshot/<user_id>", methods=["GET"])
+        @login_required
+        def get_context_snapshot(user_id):
+            """Composite learner context for the agent; supports If-None-Match."""
+            try:
+                curr_user_id = request.user.get("userId") or request.user.get("id")
+                if str(user_id) != str(curr_user_id):
+                    return jsonify({"error": "Unauthorized"}), 403
+
+                response = jsonify(self.build_snapshot(user_id))
+                response.add_etag()
+                response.headers["Cache-Control"] = "private, no-cache"
+                return response.make_conditional(request)
+            except Exception as e:
+                self.logger.error(f"Error building context snapshot: {e}")
+                return jsonify({"error": str(e)}), 500
+
+        self.logger.info("Context Snapshot routes registered")
@@ -0,0 +1,275 @@
+"""
+Event Archive Module
+
+Keeps the hot event collections (content_interactions, learning_activities)
+bounded. Raw events older than a configurable age are:
+1. Compacted into per-item/per-day summaries (daily rollup collections)
+2. Exported to gzip-compressed NDJSON files on disk
+3. Deleted from the hot collection
+
+Work is done one UTC day at a time and every step is idempotent, so an
+interrupted run can simply be restarted. Events that arrive for a day
+that was already archived are added to its rollup rows by a later run.
+
+Step 3 deletes by timestamp. On a time-series collection that needs
+MongoDB 7.0+ (older servers only delete on the metaField), so a
+non-dry run refuses to start against an older server instead of copying
+events it can never remove.
+"""
+
+import gzip
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Any
+from pymongo import MongoClient, UpdateOne
+from pymongo.errors import BulkWriteError, OperationFailure
+from bson import json_util
+
+from utils.timeseries import is_timeseries
+
+DEFAULT_ARCHIVE_AFTER_DAYS = int(os.getenv("EVENT_ARCHIVE_AFTER_DAYS", 90))
+DEFAULT_ARCHIVE_DIR = os.getenv("EVENT_ARCHIVE_DIR", "archive")
+
+EXPORT_BATCH_SIZE = 1000
+DUPLICATE_KEY = 11000
+
+# First server version that deletes from time-series collections on the timeField
+TIMESERIES_TIME_DELETE_VERSION = (7, 0)
+
+# Hot event collection -> daily rollup collection
+ARCHIVE_SOURCES = {
+    "content_interactions": "content_interactions_daily",
+    "learning_activities": "learning_activities_daily",
+}
+
+
+class EventArchiveModule:
+    def __init__(
+        self,
+        mongo_uri: str = "mongodb://localhost:27017/",
+        archive_dir: str = DEFAULT_ARCHIVE_DIR,
+        archive_after_days: int = DEFAULT_ARCHIVE_AFTER_DAYS,
+    ):
+        self.logger = logging.getLogger(__name__)
+        self.client = MongoClient(mongo_uri)
+        self.db = self.client["flaskStudyPlanDB"]
+        self.archive_dir = archive_dir
+        self.archive_after_days = archive_after_days
+
+        # Collections
+        self.interactions = self.db["content_interactions"]
+        self.activities = self.db["learning_activities"]
+        self.interactions_daily = self.db[ARCHIVE_SOURCES["content_interactions"]]
+        self.activities_daily = self.db[ARCHIVE_SOURCES["learning_activities"]]
+        self.archive_state = self.db["event_archive_state"]
+
+        self._create_indexes()
+
+    def _create_indexes(self):
+        try:
+            self.interactions_daily.create_index(
+                [("user_id", 1), ("day", 1), ("content_type", 1), ("content_id", 1)], unique=True
+            )
+            self.activities_daily.create_index(
+                [("user_id", 1), ("day", 1), ("activity_type", 1)], unique=True
+            )
+            self.logger.info("Event archive indexes verified/created.")
+        except Exception as e:
+            self.logger.error(f"Error creating event archive indexes: {e}")
+
+    def _source(self, name: str):
+        return {
+            "content_interactions": self.interactions,
+            "learning_activities": self.activities,
+        }[name]
+
+    def _rollup_target(self, name: str):
+        return {
+            "content_interactions": self.interactions_daily,
+            "learning_activities": self.activities_daily,
+        }[name]
+
+    # ============================================
+    # Rollups
+    # ============================================
+
+    def _rollup_pipeline(self, name: str, start: datetime, end: datetime) -> List[Dict[str, Any]]:
+        match = {"$match": {"timestamp": {"$gte": start, "$lt": end}}}
+        # The event ids identify the pass that folds them in (see rollup_day)
+        bounds = {
+            "first_at": {"$min": "$timestamp"},
+            "last_at": {"$max": "$timestamp"},
+            "first_id": {"$min": "$_id"},
+            "last_id": {"$max": "$_id"},
+        }
+        if name == "content_interactions":
+            group = {"$group": {
+                "_id": {"user_id": "$user_id", "content_type": "$content_type", "content_id": "$content_id"},
+                "total": {"$sum": 1},
+                "correct": {"$sum": {"$cond": [{"$eq": ["$is_correct", True]}, 1, 0]}},
+                **bounds,
+            }}
+        else:
+            # Activity metrics live under "data" for new records, top-level for old ones
+            group = {"$group": {
+                "_id": {"user_id": "$user_id", "activity_type": "$activity_type"},
+                "total": {"$sum": 1},
+                "items": {"$sum": {"$ifNull": ["$data.count", {"$ifNull": ["$count", 1]}]}},
+                "duration_minutes": {"$sum": {"$ifNull": ["$data.duration_minutes", {"$ifNull": ["$duration_minutes", 0]}]}},
+                "score_sum": {"$sum": {"$ifNull": ["$data.score", {"$ifNull": ["$score", 0]}]}},
+                **bounds,
+            }}
+        return [match, group]
+
+    def rollup_day(self, name: str, day: datetime) -> int:
+        """
+        Add the day's raw events to its per-item summaries. Counts are $inc'd,
+        so events arriving after the day was archived (and its raw events
+        deleted) add to the summaries instead of replacing them. Each row
+        records the passes folded into it, so re-running a pass whose events
+        were not deleted yet is a no-op.
+        """
+        end = day + timedelta(days=1)
+        rows = list(self._source(name).aggregate(self._rollup_pipeline(name, day, end)))
+        if not rows:
+            return 0
+
+        ops = []
+        for row in rows:
+            key = {**row["_id"], "day": day}
+            pass_key = f"{row['first_id']}-{row['last_id']}-{row['total']}"
+            counts = {k: v for k, v in row.items() if k not in ("_id", "first_at", "last_at", "first_id", "last_id")}
+            if name == "content_interactions":
+                counts["incorrect"] = counts["total"] - counts["correct"]
+            ops.append(UpdateOne(
+                {**key, "passes": {"$ne": pass_key}},
+                {
+                    "$inc": counts,
+                    "$min": {"first_at": row["first_at"]},
+                    "$max": {"last_at": row["last_at"]},
+                    "$addToSet": {"passes": pass_key},
+                },
+                upsert=True
+            ))
+
+        try:
+            self._rollup_target(name).bulk_write(ops, ordered=False)
+        except BulkWriteError as e:
+            # A row that already has this pass fails the filter, and its upsert hits the unique key
+            if any(err["code"] != DUPLICATE_KEY for err in e.details["writeErrors"]):
+                raise
+        return len(ops)
+
+    # ============================================
+    # Export
+    # ============================================
+
+    def _export_path(self, name: str, day: datetime) -> str:
+        return os.path.join(self.archive_dir, name, day.strftime("%Y"), f"{day.strftime('%Y-%m-%d')}.ndjson.gz")
+
+    def export_day(self, name: str, day: datetime) -> int:
+        """
+        Export one day of raw events to NDJSON (extended JSON, so ObjectIds
+        and dates round-trip). Written to a temp file and renamed, so a
+        partial file never replaces a complete one.
+        """
+        path = self._export_path(name, day)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+
+        cursor = self._source(name).find(
+            {"timestamp": {"$gte": day, "$lt": day + timedelta(days=1)}}
+        ).sort("timestamp", 1).batch_size(EXPORT_BATCH_SIZE)
+
+        count = 0
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            for doc in cursor:
+                f.write(json_util.dumps(doc, json_options=json_util.CANONICAL_JSON_OPTIONS))
+                f.write("\n")
+                count += 1
+
+        if count:
+            os.replace(tmp_path, path)
+        else:
+            os.remove(tmp_path)
+        return count
+
+    # ============================================
+    # Archive Run
+    # ============================================
+
+    def check_deletes_supported(self, name: str):
+        """Raise if `name` is a time-series collection on a server that cannot delete by timestamp."""
+        if not is_timeseries(self.db, name):
+            return
+        version = tuple(self.client.server_info().get("versionArray", [0, 0])[:2])
+        if version < TIMESERIES_TIME_DELETE_VERSION:
+            raise RuntimeError(
+                f"{name} is a time-series collection and MongoDB {'.'.join(map(str, version))} cannot delete "
+                f"from it by timestamp; archiving needs MongoDB "
+                f"{'.'.join(map(str, TIMESERIES_TIME_DELETE_VERSION))}+ (use --dry-run to only report)"
+            )
+
+    def _next_day(self, name: str, since: Optional[datetime] = None) -> Optional[datetime]:
+        """Start of the first UTC day at or after `since` that has events (skips gaps)."""
+        query = {"timestamp": {"$gte": since}} if since else {}
+        oldest = self._source(name).find_one(query, sort=[("timestamp", 1)])
+        if not oldest or not oldest.get("timestamp"):
+            return None
+        ts = oldest["timestamp"]
+        return datetime(ts.year, ts.month, ts.day, tzinfo=timezone.utc)
+
+    def archive_collection(self, name: str, cutoff: datetime, dry_run: bool = False) -> Dict[str, Any]:
+        """Roll up, export and delete all whole days of `name` older than cutoff."""
+        stats = {"collection": name, "days": 0, "events": 0, "rollups": 0}
+        source = self._source(name)
+        if not dry_run:
+            self.check_deletes_supported(name)
+
+        day = self._next_day(name)
+        while day is not None and day + timedelta(days=1) <= cutoff:
+            end = day + timedelta(days=1)
+            day_query = {"timestamp": {"$gte": day, "$lt": end}}
+
+            if dry_run:
+                stats["events"] += source.count_documents(day_query)
+                stats["days"] += 1
+            else:
+                stats["rollups"] += self.rollup_day(name, day)
+                exported = self.export_day(name, day)
+                if exported:
+                    try:
+                        source.delete_many(day_query)
+                    except OperationFailure as e:
+                        self.logger.error(f"Could not delete archived {name} events for {day.date()}: {e}")
+                        raise RuntimeError(f"{name}: events for {day.date()} exported but not deleted: {e}") from e
+                    stats["days"] += 1
+                stats["events"] += exported
+
+                self.archive_state.update_one(
+                    {"collection": name},
+                    # $max: a late event for an old day must not move the boundary back
+                    {"$set": {"collection": name, "updated_at": datetime.now(timezone.utc)},
+                     "$max": {"archived_through": end}},
+                    upsert=True
+                )
+
+            day = self._next_day(name, end)
+
+        self.logger.info(
+            f"{'Dry run: ' if dry_run else ''}Archived {stats['events']} {name} events over {stats['days']} days "
+            f"({stats['rollups']} rollup rows)"
+        )
+        return stats
+
+    def run(self, older_than_days: Optional[int] = None, dry_run: bool = False) -> Dict[str, Any]:
+        days = self.archive_after_days if older_than_days is None else older_than_days
+        today = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        cutoff = today - timedelta(days=days)
+
+        return {
+            "cutoff": cutoff.isoformat(),
+            "dry_run": dry_run,
+            "collections": [self.archive_collection(name, cutoff, dry_run) for name in ARCHIVE_SOURCES],
+        }
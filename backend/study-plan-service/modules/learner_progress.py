@@ -16,8 +16,12 @@ from flask import request, jsonify
 from utils.auth import login_required
 from pymongo import MongoClient
 from bson import ObjectId
+from utils.timeseries import ensure_timeseries_collection
+from utils.recommendation_cache import invalidate_recommendations
+from utils.okr_refresh import mark_okrs_stale
+from utils.pagination import keyset_page, InvalidCursor
 from datetime import datetime, timedelta, timezone
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 
 # ============================================
 # Constants
@@ -62,7 +66,7 @@ class LearnerProgressModule:
     Manages comprehensive learner progress tracking and analytics.
     """
 
-    def __init__(self):
+    def __init__(self, mongo_uri: str = "mongodb://localhost:27017/"):
         logging.basicConfig(
             level=logging.INFO,
             format="%(asctime)s %(levelname)s %(name)s : %(message)s",
@@ -70,7 +74,7 @@ class LearnerProgressModule:
         self.logger = logging.getLogger(__name__)
 
         # MongoDB connections
-        self.mongo_client = MongoClient("mongodb://localhost:27017/")
+        self.mongo_client = MongoClient(mongo_uri)
         self.db = self.mongo_client["flaskStudyPlanDB"]
 
         # Collections
@@ -88,8 +92,9 @@ class LearnerProgressModule:
             # Progress collection
             self.progress_collection.create_index([("user_id", 1)], unique=True)
 
-            # Activities collection
-            self.activities_collection.create_index([("user_id", 1), ("timestamp", -1)])
+            # Activities collection (time-series, bucketed per user)
+            ensure_timeseries_collection(self.db, "learning_activities")
+            self.activities_collection.create_index([("user_id", 1), ("timestamp", -1), ("_id", -1)])
             self.activities_collection.create_index([("activity_type", 1)])
 
             # Achievements collection
@@ -253,6 +258,10 @@ class LearnerProgressModule:
             upsert=True
         )
 
+        # Recommendations and OKR key results depend on recent activities and progress
+        invalidate_recommendations(self.db, user_id)
+        mark_okrs_stale(self.db, user_id)
+
         # Check for new achievements
         new_achievements = self._check_achievements(user_id)
 
@@ -475,53 +484,58 @@ class LearnerProgressModule:
 
     def get_activities_list(self, user_id: str, limit: int = 20) -> List[Dict]:
         """Get flattened list of activities for the Activity Records Vault."""
-        activities = list(self.activities_collection.find(
-            {"user_id": user_id}
-        ).sort("timestamp", -1).limit(limit))
+        return self.get_activities_page(user_id, limit)[0]
 
-        result = []
-        for a in activities:
-            # Handle both flat (if any) and nested data structures
-            atype = a.get("activity_type", "unknown")
-            
-            # If doc is flat, 'a' itself contains the metrics. If nested, they are in 'data'.
-            # Existing records seem to use nested 'data'.
-            data = a.get("data", {})
-            if not data and atype == "flashcard_review" and "count" in a:
-                # Fallback for flat structure
-                data = a
-            
-            title = atype.replace("_", " ").title()
-            if atype == "flashcard_review":
-                title = f"{data.get('count', 0)} Flashcards Reviewed"
-            elif atype == "quiz_completed":
-                title = f"Quiz: {data.get('category', 'General')}"
-            
-            # Derived fields for UI
-            duration = data.get("duration_minutes", a.get("duration_minutes", 0))
-            intensity = "High" if duration > 30 else "Med" if duration > 10 else "Low"
-            
-            category = data.get("category", a.get("category", "General"))
-            output = str(category).title()
-            
-            score_val = data.get("score", a.get("score"))
-            score = f"{score_val}%" if score_val is not None else "N/A"
-            
-            # Robust isoformat
-            ts = a.get("timestamp")
-            date_str = ts.isoformat() if hasattr(ts, "isoformat") else str(ts)
-            
-            result.append({
-                "id": str(a["_id"]),
-                "type": title,
-                "intensity": intensity,
-                "output": output,
-                "score": score,
-                "date": date_str,
-                "activity_type": atype
-            })
-            
-        return result
+    def get_activities_page(self, user_id: str, limit: Optional[int] = None,
+                            cursor: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+        """One newest-first page of the Activity Records Vault and the cursor for the next."""
+        activities, next_cursor = keyset_page(
+            self.activities_collection, {"user_id": user_id}, "timestamp", -1, cursor=cursor, limit=limit
+        )
+        return [self.format_activity(a) for a in activities], next_cursor
+
+    @staticmethod
+    def format_activity(a: Dict) -> Dict:
+        """Flatten one activity document into its Activity Records Vault row."""
+        # Handle both flat (if any) and nested data structures
+        atype = a.get("activity_type", "unknown")
+        
+        # If doc is flat, 'a' itself contains the metrics. If nested, they are in 'data'.
+        # Existing records seem to use nested 'data'.
+        data = a.get("data", {})
+        if not data and atype == "flashcard_review" and "count" in a:
+            # Fallback for flat structure
+            data = a
+        
+        title = atype.replace("_", " ").title()
+        if atype == "flashcard_review":
+            title = f"{data.get('count', 0)} Flashcards Reviewed"
+        elif atype == "quiz_completed":
+            title = f"Quiz: {data.get('category', 'General')}"
+        
+        # Derived fields for UI
+        duration = data.get("duration_minutes", a.get("duration_minutes", 0))
+        intensity = "High" if duration > 30 else "Med" if duration > 10 else "Low"
+        
+        category = data.get("category", a.get("category", "General"))
+        output = str(category).title()
+        
+        score_val = data.get("score", a.get("score"))
+        score = f"{score_val}%" if score_val is not None else "N/A"
+        
+        # Robust isoformat
+        ts = a.get("timestamp")
+        date_str = ts.isoformat() if hasattr(ts, "isoformat") else str(ts)
+        
+        return {
+            "id": str(a["_id"]),
+            "type": title,
+            "intensity": intensity,
+            "output": output,
+            "score": score,
+            "date": date_str,
+            "activity_type": atype
+        }
 
     # ============================================
     # Study Sessions
@@ -612,6 +626,32 @@ class LearnerProgressModule:
         )
         return {"message": "Weekly goals reset"}
 
+    def reset_weekly_goals_bulk(self, user_ids: List[str], week_start: datetime) -> Dict:
+        """
+        Reset weekly goals for a batch of users in a single write.
+
+        Only users with no activity since `week_start` are reset: a catch-up run
+        later in the week must not zero counters already earned this week.
+        """
+        result = self.progress_collection.update_many(
+            {
+                "user_id": {"$in": user_ids},
+                "$or": [
+                    {"last_activity_date": {"$lt": week_start}},
+                    {"last_activity_date": {"$exists": False}}
+                ]
+            },
+            {
+                "$set": {
+                    "weekly_goals.flashcard_reviews.current": 0,
+                    "weekly_goals.quizzes_completed.current": 0,
+                    "weekly_goals.study_minutes.current": 0,
+                    "updated_at": datetime.now(timezone.utc)
+                }
+            }
+        )
+        return {"reset_count": result.matched_count}
+
     # ============================================
     # Flask Route Registration
     # ============================================
@@ -677,8 +717,10 @@ class LearnerProgressModule:
                 if str(user_id) != str(curr_user_id):
                     return jsonify({"error": "Unauthorized"}), 403
                 limit = request.args.get("limit", 20, type=int)
-                result = self.get_activities_list(user_id, limit)
-                return jsonify({"activities": result}), 200
+                result, next_cursor = self.get_activities_page(user_id, limit, request.args.get("cursor"))
+                return jsonify({"activities": result, "next_cursor": next_cursor}), 200
+            except InvalidCursor as e:
+                return jsonify({"error": str(e)}), 400
             except Exception as e:
                 self.logger.error(f"Error getting activities list: {e}")
                 return jsonify({"error": str(e)}), 500
@@ -0,0 +1,277 @@
+"""
+Legacy Data Migration Module
+
+Moves legacy flashcard words (flaskFlashcardDB.words) into
+flaskStudyPlanDB.user_content_mastery.
+
+Source collections are planned once into `_id`-ordered chunks, which a
+worker pool streams and writes with unordered bulk upserts
+($setOnInsert), so reruns never duplicate or overwrite migrated records.
+The plan and each finished chunk are checkpointed to a migration-state
+document; an interrupted run resumes with the chunks that are left.
+Dry runs read everything but write nothing and report counts/throughput.
+
+Run via scripts/migrate_legacy_data.py.
+"""
+
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from pymongo import MongoClient, UpdateOne
+from pymongo.errors import BulkWriteError
+
+MIGRATION_CHUNK_SIZE = int(os.getenv("MIGRATION_CHUNK_SIZE", 1000))
+MIGRATION_MAX_WORKERS = int(os.getenv("MIGRATION_MAX_WORKERS", 4))
+
+
+# ============================================
+# Legacy -> Mastery mapping
+# ============================================
+
+def map_difficulty_to_status(difficulty):
+    return {
+        'new': 'new',
+        'easy': 'reviewing',
+        'medium': 'learning',
+        'hard': 'learning'
+    }.get(difficulty, 'new')
+
+def difficulty_to_ease(difficulty):
+    return {
+        'easy': 3.0,
+        'medium': 2.5,
+        'hard': 2.0
+    }.get(difficulty, 2.5)
+
+def word_to_mastery(doc: Dict[str, Any], now: datetime) -> Optional[Dict[str, Any]]:
+    """Mastery record for a legacy word, or None if it cannot be attributed."""
+    user_id = doc.get("userId") or doc.get("user_id")
+    content_id = doc.get("vocabulary_original")
+    if not user_id or not content_id:
+        return None
+
+    difficulty = doc.get("difficulty", "new")
+    status = map_difficulty_to_status(difficulty)
+    return {
+        "user_id": user_id,
+        "content_type": "vocabulary",
+        "content_id": content_id,
+        "content_source": doc.get("p_tag"),
+        "status": status,
+        "mastery_level": 100 if status == "mastered" else 20,
+        "mastery_stage": 4 if status == "reviewing" else 1,
+        "srs": {
+            "ease_factor": difficulty_to_ease(difficulty),
+            "interval_days": 1,
+            "next_review_date": now + timedelta(days=1),
+            "review_count": 0,
+            "correct_streak": 0,
+            "lapse_count": 0
+        },
+        "stats": {
+            "total_reviews": 0,
+            "correct_count": 0,
+            "incorrect_count": 0,
+            "accuracy_percent": 0
+        },
+        "created_at": now,
+        "updated_at": now
+    }
+
+def mastery_key(record: Dict[str, Any]) -> Dict[str, Any]:
+    return {"user_id": record["user_id"], "content_type": record["content_type"], "content_id": record["content_id"]}
+
+
+# (source db, source collection, target collection, doc -> target record)
+MIGRATIONS: Dict[str, Tuple[str, str, str, Callable[[Dict, datetime], Optional[Dict]]]] = {
+    "legacy_words_to_mastery": ("flaskFlashcardDB", "words", "user_content_mastery", word_to_mastery),
+}
+
+
+# ============================================
+# Migration Runner
+# ============================================
+
+class LegacyMigration:
+    def __init__(self, mongo_uri: str = "mongodb://localhost:27017/",
+                 chunk_size: int = MIGRATION_CHUNK_SIZE, max_workers: int = MIGRATION_MAX_WORKERS):
+        self.logger = logging.getLogger(__name__)
+        self.client = MongoClient(mongo_uri)
+        self.db = self.client["flaskStudyPlanDB"]
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+
+        # Collections
+        self.state = self.db["migration_state"]
+        self.progress = self.db["learner_progress"]
+
+    # ---- Planning ----
+
+    def plan_chunks(self, source) -> List[Dict[str, Any]]:
+        """
+        Split `source` into `_id` ranges of ~chunk_size documents, reading
+        only `_id` off the primary key index. The last range is open-ended
+        so documents added after planning are still picked up.
+        """
+        bounds = []
+        for i, doc in enumerate(source.find({}, {"_id": 1}).sort("_id", 1)):
+            if i % self.chunk_size == 0:
+                bounds.append(doc["_id"])
+        return [
+            {"index": i, "lo": lo, "hi": bounds[i + 1] if i + 1 < len(bounds) else None}
+            for i, lo in enumerate(bounds)
+        ]
+
+    def _load_state(self, name: str, source, restart: bool) -> Dict[str, Any]:
+        if restart:
+            self.state.delete_one({"_id": name})
+        state = self.state.find_one({"_id": name})
+        if state and state.get("status") != "completed":
+            return state
+
+        state = {
+            "_id": name,
+            "status": "running",
+            "chunks": self.plan_chunks(source),
+            "completed_chunks": [],
+            "totals": {"read": 0, "upserted": 0, "existing": 0, "skipped": 0, "errors": 0},
+            "started_at": datetime.now(timezone.utc),
+        }
+        self.state.replace_one({"_id": name}, state, upsert=True)
+        return state
+
+    # ---- Chunk processing ----
+
+    def _read_chunk(self, source, chunk: Dict[str, Any]) -> List[Dict[str, Any]]:
+        id_range = {"$gte": chunk["lo"]}
+        if chunk["hi"] is not None:
+            id_range["$lt"] = chunk["hi"]
+        return list(source.find({"_id": id_range}).sort("_id", 1))
+
+    def migrate_chunk(self, name: str, source, target, transform, chunk: Dict[str, Any],
+                      dry_run: bool = False) -> Dict[str, int]:
+        now = datetime.now(timezone.utc)
+        counts = {"read": 0, "upserted": 0, "existing": 0, "skipped": 0, "errors": 0}
+
+        records = []
+        for doc in self._read_chunk(source, chunk):
+            counts["read"] += 1
+            record = transform(doc, now)
+            if record is None:
+                counts["skipped"] += 1
+            else:
+                records.append(record)
+
+        if dry_run:
+            existing = self._count_existing(target, records)
+            counts["existing"] = existing
+            counts["upserted"] = len(records) - existing
+            return counts
+
+        if records:
+            ops = [UpdateOne(mastery_key(r), {"$setOnInsert": r}, upsert=True) for r in records]
+            try:
+                result = target.bulk_write(ops, ordered=False)
+                upserted_ops = set(result.upserted_ids)
+            except BulkWriteError as e:
+                upserted_ops = {u["index"] for u in e.details.get("upserted", [])}
+                counts["errors"] = len(e.details.get("writeErrors", []))
+                self.logger.error(f"{name} chunk {chunk['index']}: {counts['errors']} write errors")
+            counts["upserted"] = len(upserted_ops)
+            counts["existing"] = len(records) - len(upserted_ops) - counts["errors"]
+
+            # Progress counters only move for records this run actually created
+            self._bump_progress([records[i] for i in upserted_ops])
+
+        update = {
+            "$inc": {f"totals.{k}": v for k, v in counts.items()},
+            "$set": {"updated_at": datetime.now(timezone.utc)},
+        }
+        # A chunk with write errors stays pending so the next run retries it;
+        # records this pass did write are then counted as existing
+        if counts["errors"] == 0:
+            update["$addToSet"] = {"completed_chunks": chunk["index"]}
+        self.state.update_one({"_id": name, "completed_chunks": {"$ne": chunk["index"]}}, update)
+        return counts
+
+    def _count_existing(self, target, records: List[Dict[str, Any]]) -> int:
+        if not records:
+            return 0
+        return target.count_documents({"$or": [mastery_key(r) for r in records]})
+
+    def _bump_progress(self, created: List[Dict[str, Any]]):
+        mastered = {}
+        for r in created:
+            if r["status"] == "mastered":
+                mastered[r["user_id"]] = mastered.get(r["user_id"], 0) + 1
+        if not mastered:
+            return
+        self.progress.bulk_write([
+            UpdateOne({"user_id": uid}, {"$inc": {"vocabulary_mastered": n}}, upsert=True)
+            for uid, n in mastered.items()
+        ], ordered=False)
+
+    # ---- Entry point ----
+
+    def run(self, name: str = "legacy_words_to_mastery", dry_run: bool = False, restart: bool = False,
+            on_chunk: Optional[Callable[[Dict[str, Any], Dict[str, int]], None]] = None) -> Dict[str, Any]:
+        source_db, source_name, target_name, transform = MIGRATIONS[name]
+        source = self.client[source_db][source_name]
+        target = self.db[target_name]
+
+        if dry_run:
+            chunks, done = self.plan_chunks(source), set()
+        else:
+            state = self._load_state(name, source, restart)
+            chunks, done = state["chunks"], set(state["completed_chunks"])
+        pending = [c for c in chunks if c["index"] not in done]
+
+        totals = {"read": 0, "upserted": 0, "existing": 0, "skipped": 0, "errors": 0}
+        lock = threading.Lock()
+        started = time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="migrate") as pool:
+            futures = {
+                pool.submit(self.migrate_chunk, name, source, target, transform, c, dry_run): c
+                for c in pending
+            }
+            for future in as_completed(futures):
+                chunk = futures[future]
+                try:
+                    counts = future.result()
+                except Exception as e:
+                    # Left out of completed_chunks, so the next run retries it
+                    self.logger.error(f"{name} chunk {chunk['index']} failed: {e}")
+                    counts = {"errors": 1}
+                with lock:
+                    for k, v in counts.items():
+                        totals[k] += v
+                if on_chunk:
+                    on_chunk(chunk, counts)
+
+        elapsed = time.monotonic() - started
+        report = {
+            "migration": name,
+            "dry_run": dry_run,
+            "chunks_total": len(chunks),
+            "chunks_resumed": len(done),
+            "chunks_processed": len(pending),
+            **totals,
+            "duration_seconds": round(elapsed, 2),
+            "docs_per_second": round(totals["read"] / elapsed, 1) if elapsed > 0 else None,
+        }
+
+        if not dry_run:
+            remaining = len(chunks) - len(self.state.find_one({"_id": name})["completed_chunks"])
+            report["status"] = "completed" if remaining == 0 else "incomplete"
+            self.state.update_one({"_id": name}, {"$set": {
+                "status": report["status"],
+                "last_run": report,
+                "updated_at": datetime.now(timezone.utc),
+            }})
+        return report
@@ -6,13 +6,21 @@ Tracks high-level objectives and automatically updates Key Results from activity
 """
 
 import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional, Any
 from flask import Blueprint, request, jsonify
-from pymongo import MongoClient
+from pymongo import MongoClient, UpdateOne
 from bson import ObjectId
 import math
+from utils.auth import login_required
 from typing import Dict, List, Optional, Any, Union
+from utils.title_cache import TitleCache
+
+# Sources whose key results list the underlying mastery items
+ITEM_SOURCES = ["vocabulary", "grammar", "kanji"]
+KR_ITEMS_LIMIT = 50
 
 def ensure_aware(dt):
     if dt is None: return None
@@ -33,6 +41,12 @@ class OKRModule:
         # External DB Connections
         self.jmdict_db = self.client["jmdictDatabase"]
         self.grammar_db = self.client["zenRelationshipsAutomated"]
+        self.title_cache = TitleCache()
+
+        # Background key-result refresh (stale objectives seen on GET)
+        self._refresh_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="okr-refresh")
+        self._refreshing = set()
+        self._refreshing_lock = threading.Lock()
         
         if not isinstance(self.client, MongoClient) or self.client.address is not None:
              # Only create indexes if it's a real client or mongomock client that supports it
@@ -42,6 +56,7 @@ class OKRModule:
     def _create_indexes(self):
         try:
             self.objectives.create_index([("user_id", 1), ("on_track", 1)])
+            self.objectives.create_index([("kr_stale", 1)], sparse=True)
             self.logger.info("OKR indexes verified/created.")
         except Exception as e:
             self.logger.error(f"Error creating OKR indexes: {e}")
@@ -50,20 +65,22 @@ class OKRModule:
     # Key Result Calculation
     # ============================================
 
-    def refresh_key_result(self, kr: Dict[str, Any], user_id: str) -> Dict[str, Any]:
-        source = kr.get("data_source")
-        
-        current = 0
+    def source_value(self, source: Optional[str], user_id: str) -> int:
         if source == "vocabulary":
-            current = self.mastery.get_mastery_count(user_id, "vocabulary", status=None)
+            return self.mastery.get_mastery_count(user_id, "vocabulary", status=None)
         elif source == "grammar":
-            current = self.mastery.get_mastery_count(user_id, "grammar", status=None)
+            return self.mastery.get_mastery_count(user_id, "grammar", status=None)
         elif source == "kanji":
-            current = self.mastery.get_mastery_count(user_id, "kanji", status=None)
+            return self.mastery.get_mastery_count(user_id, "kanji", status=None)
         elif source == "study_time":
-            current = self.mastery.get_study_time(user_id)
+            return self.mastery.get_study_time(user_id)
         elif source == "flashcards":
-            current = self.mastery.get_review_count(user_id)
+            return self.mastery.get_review_count(user_id)
+        return 0
+
+    def refresh_key_result(self, kr: Dict[str, Any], user_id: str, current: Optional[int] = None) -> Dict[str, Any]:
+        if current is None:
+            current = self.source_value(kr.get("data_source"), user_id)
         
         # Update history
         now = datetime.now(timezone.utc)
@@ -116,6 +133,159 @@ class OKRModule:
         if gap > 10: return "medium"
         return "low"
 
+    # ============================================
+    # Key Result Refresh (write-triggered / scheduled)
+    # ============================================
+
+    def refresh_user_okrs(self, user_id: str, okrs: Optional[List[Dict[str, Any]]] = None) -> int:
+        """
+        Recompute every key result of the user's objectives, counting each
+        data source once, and store them with one bulk write.
+        """
+        if okrs is None:
+            okrs = list(self.objectives.find({"user_id": user_id}))
+        if not okrs:
+            return 0
+
+        values: Dict[Optional[str], int] = {}
+        now = datetime.now(timezone.utc)
+        ops = []
+        for okr in okrs:
+            for kr in okr.get("key_results", []):
+                source = kr.get("data_source")
+                if source not in values:
+                    values[source] = self.source_value(source, user_id)
+                self.refresh_key_result(kr, user_id, values[source])
+
+            krs = okr.get("key_results", [])
+            okr["progress_percent"] = sum(kr["progress_percent"] for kr in krs) / len(krs) if krs else 0
+            okr["risk_level"] = self.assess_risk(okr)
+            okr["on_track"] = okr["risk_level"] != "high"
+            ops.append(UpdateOne(
+                {"_id": okr["_id"]},
+                {
+                    "$set": {
+                        "key_results": krs,
+                        "progress_percent": okr["progress_percent"],
+                        "risk_level": okr["risk_level"],
+                        "on_track": okr["on_track"],
+                        "updated_at": now
+                    },
+                    "$unset": {"kr_stale": "", "kr_stale_since": ""}
+                }
+            ))
+
+        self.objectives.bulk_write(ops, ordered=False)
+        return len(ops)
+
+    def refresh_users_bulk(self, user_ids: List[str]) -> Dict[str, int]:
+        """Nightly refresh for a batch of users (one objectives read for the batch)."""
+        by_user: Dict[str, List[Dict[str, Any]]] = {}
+        for okr in self.objectives.find({"user_id": {"$in": user_ids}}):
+            by_user.setdefault(okr["user_id"], []).append(okr)
+        refreshed = sum(self.refresh_user_okrs(uid, okrs) for uid, okrs in by_user.items())
+        return {"objectives_refreshed": refreshed}
+
+    def schedule_refresh(self, user_id: str) -> bool:
+        """Refresh the user's objectives off the request path; one in flight per user."""
+        with self._refreshing_lock:
+            if user_id in self._refreshing:
+                return False
+            self._refreshing.add(user_id)
+
+        def run():
+            try:
+                self.refresh_user_okrs(user_id)
+            except Exception as e:
+                self.logger.error(f"Error refreshing OKRs for {user_id}: {e}")
+            finally:
+                with self._refreshing_lock:
+                    self._refreshing.discard(user_id)
+
+        self._refresh_pool.submit(run)
+        return True
+
+    # ============================================
+    # Item Hydration
+    # ============================================
+
+    def hydrate_titles(self, source: str, content_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Resolve display title/level for content ids with at most one `$in`
+        query per source; results (including misses) go to the title cache.
+        """
+        if source == "vocabulary":
+            collection, field, projection = self.jmdict_db.entries, "expression", {"expression": 1, "reading": 1}
+        elif source == "grammar":
+            collection, field, projection = self.grammar_db.grammars, "title", {"title": 1, "p_tag": 1}
+        else:
+            return {}
+
+        keys = [(source, cid) for cid in set(content_ids) if cid]
+        cached, missing = self.title_cache.get_many(keys)
+        resolved = {cid: value for (_, cid), value in cached.items()}
+        if not missing:
+            return resolved
+
+        missing_ids = [cid for _, cid in missing]
+        object_ids = [ObjectId(cid) for cid in missing_ids if ObjectId.is_valid(cid)]
+        clauses = [{field: {"$in": missing_ids}}]
+        if object_ids:
+            clauses.append({"_id": {"$in": object_ids}})
+
+        try:
+            docs = list(collection.find({"$or": clauses}, projection))
+        except Exception as e:
+            self.logger.warning(f"Error hydrating {source} titles: {e}")
+            return resolved
+
+        by_id = {str(d["_id"]): d for d in docs}
+        by_field = {}
+        for d in docs:
+            by_field.setdefault(d.get(field), d)
+
+        loaded = {}
+        for cid in missing_ids:
+            entry = by_id.get(cid) or by_field.get(cid)
+            info = None
+            if entry and source == "vocabulary":
+                # JMDict doesn't have levels easy, we can try to guess from tags but N3 is safe for now
+                info = {"title": entry.get("expression") or entry.get("reading")}
+            elif entry:
+                tag = entry.get("p_tag", "")
+                info = {"title": entry.get("title")}
+                if "N" in tag: info["level"] = tag.split("_")[-1]
+            loaded[(source, cid)] = info
+            resolved[cid] = info
+
+        self.title_cache.put_many(loaded)
+        return resolved
+
+    def load_kr_items(self, user_id: str, source: str) -> List[Dict[str, Any]]:
+        """Mastered items shown in the key-result popup, with titles attached."""
+        items = list(self.mastery.mastery.find({
+            "user_id": user_id,
+            "content_type": source
+        }).limit(KR_ITEMS_LIMIT))
+        titles = self.hydrate_titles(source, [item.get("content_id") for item in items])
+
+        for item in items:
+            item["_id"] = str(item["_id"])
+            item["id"] = item.get("_id")
+
+            info = titles.get(item.get("content_id")) or {}
+            item["title"] = info.get("title") or item.get("content_id")
+            item["level"] = info.get("level", "N3") # Fallback
+            item["type"] = source
+            # Ensure frontend compatibility
+            if "performance" not in item:
+                accuracy = item.get("stats", {}).get("accuracy_percent", 0)
+                if accuracy >= 100: item["performance"] = "perfect"
+                elif accuracy >= 90: item["performance"] = "high"
+                elif accuracy >= 60: item["performance"] = "medium"
+                else: item["performance"] = "low"
+        return items
+
     # ============================================
     # Routes
     # ============================================
@@ -150,6 +320,7 @@ class OKRModule:
                 "updated_at": now
             }
             
+            values = {}
             for kr_data in data.get("key_results", []):
                 kr = {
                     "id": ObjectId(),
@@ -161,7 +332,10 @@ class OKRModule:
                     "current": 0,
                     "history": []
                 }
-                okr["key_results"].append(self.refresh_key_result(kr, user_id))
+                source = kr["data_source"]
+                if source not in values:
+                    values[source] = self.source_value(source, user_id)
+                okr["key_results"].append(self.refresh_key_result(kr, user_id, values[source]))
                 
             # Aggregate progress
             if okr["key_results"]:
@@ -176,85 +350,27 @@ class OKRModule:
             if not user_id: return jsonify({"error": "user_id required"}), 400
             
             okrs = list(self.objectives.find({"user_id": user_id}))
+
+            # Key results are refreshed on writes and nightly; a stale set is
+            # served as stored and refreshed in the background.
+            if any(o.get("kr_stale") for o in okrs):
+                self.schedule_refresh(user_id)
+
+            # Attach underlying mastered items for the popup, loaded once per source
+            sources = {kr.get("data_source") for o in okrs for kr in o.get("key_results", [])}
+            items_by_source = {
+                source: self.load_kr_items(user_id, source)
+                for source in ITEM_SOURCES if source in sources
+            }
+
             for o in okrs:
                 o["_id"] = str(o["_id"])
                 if o.get("plan_id"): o["plan_id"] = str(o["plan_id"])
                 if o.get("parent_smart_goal_id"): o["parent_smart_goal_id"] = str(o["parent_smart_goal_id"])
-                needs_update = False
                 for kr in o["key_results"]:
-                    # Recalculate 'current' and 'progress_percent' for vocab/grammar/kanji sources
-                    old_current = kr.get("current")
-                    self.refresh_key_result(kr, user_id)
-                    if kr.get("current") != old_current:
-                        needs_update = True
-                        
                     kr["id"] = str(kr["id"])
-                    
-                    # Attach underlying mastered items for the popup
-                    source = kr.get("data_source")
-                    if source in ["vocabulary", "grammar", "kanji"]:
-                        items = list(self.mastery.mastery.find({
-                            "user_id": user_id,
-                            "content_type": source
-                        }).limit(50))
-                        
-                        for item in items:
-                            item["_id"] = str(item["_id"])
-                            item["id"] = item.get("_id")
-                            
-                            # Real Join logic
-                            title = item.get("content_id")
-                            level = "N3" # Fallback
-                            
-                            if source == "vocabulary":
-                                # Try to find in jmdict
-                                entry = None
-                                try:
-                                    if ObjectId.is_valid(item.get("content_id")):
-                                        entry = self.jmdict_db.entries.find_one({"_id": ObjectId(item.get("content_id"))})
-                                    if not entry:
-                                        entry = self.jmdict_db.entries.find_one({"expression": item.get("content_id")})
-                                except:
-                                    pass
-                                
-                                if entry:
-                                    title = entry.get("expression") or entry.get("reading")
-                                    # JMDict doesn't have levels easy, we can try to guess from tags but N3 is safe for now
-                            
-                            elif source == "grammar":
-                                entry = None
-                                try:
-                                    if ObjectId.is_valid(item.get("content_id")):
-                                        entry = self.grammar_db.grammars.find_one({"_id": ObjectId(item.get("content_id"))})
-                                    if not entry:
-                                        entry = self.grammar_db.grammars.find_one({"title": item.get("content_id")})
-                                except:
-                                    pass
-                                
-                                if entry:
-                                    title = entry.get("title")
-                                    tag = entry.get("p_tag", "")
-                                    if "N" in tag: level = tag.split("_")[-1]
-
-                            item["title"] = title
-                            item["level"] = level
-                            item["type"] = source
-                            # Ensure frontend compatibility
-                            if "performance" not in item:
-                                accuracy = item.get("stats", {}).get("accuracy_percent", 0)
-                                streak = item.get("stats", {}).get("streak", 0)
-                                if accuracy >= 100: item["performance"] = "perfect"
-                                elif accuracy >= 90: item["performance"] = "high"
-                                elif accuracy >= 60: item["performance"] = "medium"
-                                else: item["performance"] = "low"
-                            
-                        kr["items"] = items
-                
-                if needs_update:
-                    self.objectives.update_one({"_id": ObjectId(o["_id"])}, {"$set": {"key_results": o["key_results"]}})
-                    # Also update aggregate progress
-                    o["progress_percent"] = sum(kr["progress_percent"] for kr in o["key_results"]) / len(o["key_results"]) if o["key_results"] else 0
-                    self.objectives.update_one({"_id": ObjectId(o["_id"])}, {"$set": {"progress_percent": o["progress_percent"]}})
+                    if kr.get("data_source") in items_by_source:
+                        kr["items"] = items_by_source[kr["data_source"]]
 
             return jsonify(okrs)
 
@@ -263,17 +379,12 @@ class OKRModule:
             okr = self.objectives.find_one({"_id": ObjectId(id)})
             if not okr: return jsonify({"error": "OKR not found"}), 404
             
-            user_id = okr["user_id"]
-            for kr in okr["key_results"]:
-                # Convert back to ObjectId for local manipulation if needed (usually kr ids are generated)
-                self.refresh_key_result(kr, user_id)
-                
-            okr["progress_percent"] = sum(kr["progress_percent"] for kr in okr["key_results"]) / len(okr["key_results"])
-            okr["risk_level"] = self.assess_risk(okr)
-            okr["on_track"] = okr["risk_level"] != "high"
-            okr["updated_at"] = datetime.now(timezone.utc)
-            
-            self.objectives.update_one({"_id": ObjectId(id)}, {"$set": okr})
+            self.refresh_user_okrs(okr["user_id"], [okr])
             return jsonify({"message": "Refreshed", "progress": okr["progress_percent"]})
 
+        @okr_bp.route("/title-cache/stats", methods=["GET"])
+        @login_required
+        def title_cache_stats():
+            return jsonify(self.title_cache.stats())
+
         app.register_blueprint(okr_bp)
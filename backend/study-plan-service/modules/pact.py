@@ -9,8 +9,9 @@ import logging
 from datetime import datetime, date, timedelta, timezone
 from typing import Dict, List, Optional, Any
 from flask import Blueprint, request, jsonify
-from pymongo import MongoClient
+from pymongo import MongoClient, UpdateOne
 from bson import ObjectId
+from utils.recommendation_cache import invalidate_recommendations
 
 class PACTModule:
     def __init__(self, mongo_uri: str = "mongodb://localhost:27017/"):
@@ -38,66 +39,110 @@ class PACTModule:
     # Streak Logic
     # ============================================
 
-    def update_streak(self, user_id: str):
-        commitment = self.commitments.find_one({"user_id": user_id})
-        if not commitment: return
-        
-        now = datetime.now(timezone.utc)
-        today = now.date()
-        yesterday = today - timedelta(days=1)
-        
-        # Check completion for yesterday
-        yesterday_logs = list(self.actions_log.find({
-            "user_id": user_id,
-            "date": {"$gte": datetime.combine(yesterday, datetime.min.time()).replace(tzinfo=timezone.utc),
-                     "$lte": datetime.combine(yesterday, datetime.max.time()).replace(tzinfo=timezone.utc)}
-        }))
-        
+    def _yesterday_range(self, now: datetime):
+        yesterday = now.date() - timedelta(days=1)
+        return (
+            yesterday,
+            datetime.combine(yesterday, datetime.min.time()).replace(tzinfo=timezone.utc),
+            datetime.combine(yesterday, datetime.max.time()).replace(tzinfo=timezone.utc),
+        )
+
+    def _evaluate_streak(self, commitment: Dict[str, Any], yesterday_logs: List[Dict[str, Any]], now: datetime) -> Optional[Dict[str, Any]]:
+        """
+        Decide yesterday's streak outcome for one commitment.
+
+        Returns {"commitment": update, "progress": update} or None when there
+        is nothing to do. Each day is evaluated once (`streak_checked_for`),
+        so running the check twice never double counts.
+        """
+        yesterday = now.date() - timedelta(days=1)
+        if commitment.get("streak_checked_for") == yesterday.isoformat():
+            return None
+
         active_actions = [a for a in commitment.get("actions", []) if a.get("is_active")]
-        if not active_actions: return
-        
+        if not active_actions: return None
+
         completed_ids = [str(l["action_id"]) for l in yesterday_logs if l.get("completed")]
         required_ids = [str(a["id"]) for a in active_actions]
-        
+
         # Match count
         matches = sum(1 for rid in required_ids if rid in completed_ids)
         completion_rate = matches / len(required_ids)
-        
+        checked = {"streak_checked_for": yesterday.isoformat()}
+
         # Threshold 80%
         if completion_rate >= 0.8:
             new_streak = commitment.get("streak_current", 0) + 1
             longest = max(new_streak, commitment.get("streak_longest", 0))
-            self.commitments.update_one(
-                {"user_id": user_id},
-                {"$set": {"streak_current": new_streak, "streak_longest": longest}}
-            )
+            return {
+                "commitment": {"$set": {"streak_current": new_streak, "streak_longest": longest, **checked}},
+                "progress": {"$set": {"current_streak": new_streak, "longest_streak": longest}},
+            }
+
+        # Streak broken
+        if commitment.get("streak_current", 0) > 0:
+            history_entry = {
+                "start_date": now - timedelta(days=commitment["streak_current"]),
+                "end_date": datetime.combine(yesterday, datetime.min.time()).replace(tzinfo=timezone.utc),
+                "length": commitment["streak_current"],
+                "broken_reason": "incomplete_actions"
+            }
+            return {
+                "commitment": {"$set": {"streak_current": 0, **checked}, "$push": {"streak_history": history_entry}},
+                "progress": {"$set": {"current_streak": 0}},
+            }
+
+        return {"commitment": {"$set": checked}, "progress": None}
+
+    def update_streak(self, user_id: str):
+        commitment = self.commitments.find_one({"user_id": user_id})
+        if not commitment: return
+
+        now = datetime.now(timezone.utc)
+        _, start, end = self._yesterday_range(now)
+
+        # Check completion for yesterday
+        yesterday_logs = list(self.actions_log.find({
+            "user_id": user_id,
+            "date": {"$gte": start, "$lte": end}
+        }))
+
+        outcome = self._evaluate_streak(commitment, yesterday_logs, now)
+        if not outcome: return
+
+        self.commitments.update_one({"user_id": user_id}, outcome["commitment"])
+        if outcome["progress"]:
             # Sync to learner_progress
-            self.progress.update_one(
-                {"user_id": user_id},
-                {"$set": {"current_streak": new_streak, "longest_streak": longest}},
-                upsert=True
-            )
-        else:
-            # Streak broken
-            if commitment.get("streak_current", 0) > 0:
-                history_entry = {
-                    "start_date": now - timedelta(days=commitment["streak_current"]),
-                    "end_date": yesterday,
-                    "length": commitment["streak_current"],
-                    "broken_reason": "incomplete_actions"
-                }
-                self.commitments.update_one(
-                    {"user_id": user_id},
-                    {
-                        "$set": {"streak_current": 0},
-                        "$push": {"streak_history": history_entry}
-                    }
-                )
-                self.progress.update_one(
-                    {"user_id": user_id},
-                    {"$set": {"current_streak": 0}},
-                    upsert=True
-                )
+            self.progress.update_one({"user_id": user_id}, outcome["progress"], upsert=True)
+            invalidate_recommendations(self.db, user_id)
+
+    def update_streaks_bulk(self, user_ids: List[str], now: Optional[datetime] = None) -> Dict[str, int]:
+        """Nightly variant of update_streak: two reads and two bulk writes per batch of users."""
+        now = now or datetime.now(timezone.utc)
+        _, start, end = self._yesterday_range(now)
+
+        commitments = list(self.commitments.find({"user_id": {"$in": user_ids}}))
+        logs_by_user: Dict[str, List[Dict[str, Any]]] = {}
+        for log in self.actions_log.find({"user_id": {"$in": user_ids}, "date": {"$gte": start, "$lte": end}}):
+            logs_by_user.setdefault(log["user_id"], []).append(log)
+
+        commitment_ops, progress_ops, changed_users = [], [], []
+        for c in commitments:
+            outcome = self._evaluate_streak(c, logs_by_user.get(c["user_id"], []), now)
+            if not outcome: continue
+            commitment_ops.append(UpdateOne({"_id": c["_id"]}, outcome["commitment"]))
+            if outcome["progress"]:
+                progress_ops.append(UpdateOne({"user_id": c["user_id"]}, outcome["progress"], upsert=True))
+                changed_users.append(c["user_id"])
+
+        if commitment_ops:
+            self.commitments.bulk_write(commitment_ops, ordered=False)
+        if progress_ops:
+            self.progress.bulk_write(progress_ops, ordered=False)
+        for uid in changed_users:
+            invalidate_recommendations(self.db, uid)
+
+        return {"evaluated": len(commitment_ops), "streaks_changed": len(changed_users)}
 
     # ============================================
     # Routes
@@ -3,15 +3,38 @@ Performance Module (Phase 1)
 
 Handles dumping and retrieval of semi-structured performance audits from the Agent.
 Includes note quality auditing and quantitative performance summaries.
+
+Struggle tags are extracted from the audit text once, at write time, into
+an indexed `tags` array, and each write bumps a per-user daily rollup
+(audit count, note quality, per-tag counts); rebuild_rollups regroups it
+from the raw trackings in the database. Trends are a grouped
+aggregation over at most `days` rollup rows, so their cost follows the
+number of distinct tags and days rather than the number of audits.
 """
 
 import logging
-from datetime import datetime, timezone
-from typing import Dict, List, Optional, Any
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Any, Tuple
 from flask import Blueprint, request, jsonify
-from pymongo import MongoClient
+from pymongo import MongoClient, UpdateMany
+from pymongo.errors import DuplicateKeyError
 from bson import ObjectId
 from utils.auth import login_required
+from utils.pagination import keyset_page, InvalidCursor
+
+# keyword found in summary/details -> struggle tag
+STRUGGLE_KEYWORDS = {
+    "passive": "passive_form",
+    "particle": "particles",
+    "kanji": "kanji_recall",
+}
+
+def extract_tags(summary: Optional[str], details: Optional[str]) -> List[str]:
+    text = f"{details or ''} {summary or ''}".lower()
+    return [tag for keyword, tag in STRUGGLE_KEYWORDS.items() if keyword in text]
+
+def day_start(ts: datetime) -> datetime:
+    return ts.replace(hour=0, minute=0, second=0, microsecond=0)
 
 class PerformanceModule:
     def __init__(self, mongo_uri: str = "mongodb://localhost:27017/"):
@@ -21,12 +44,15 @@ class PerformanceModule:
         
         # Collections
         self.performance_trackings = self.db["performance_trackings"]
+        self.performance_daily = self.db["performance_trackings_daily"]
         
         self._create_indexes()
 
     def _create_indexes(self):
         try:
-            self.performance_trackings.create_index([("user_id", 1), ("timestamp", -1)])
+            self.performance_trackings.create_index([("user_id", 1), ("timestamp", -1), ("_id", -1)])
+            self.performance_trackings.create_index([("user_id", 1), ("tags", 1), ("timestamp", -1)])
+            self.performance_daily.create_index([("user_id", 1), ("day", -1)], unique=True)
             self.logger.info("Performance trackings indexes verified.")
         except Exception as e:
             self.logger.error(f"Error creating performance indexes: {e}")
@@ -43,62 +69,206 @@ class PerformanceModule:
             "raw_agent_analysis": data.get("raw_agent_analysis"),
             "metadata": data.get("metadata", {})
         }
+        entry["tags"] = extract_tags(entry["summary"], entry["note_audit_details"])
         res = self.performance_trackings.insert_one(entry)
+        self._bump_rollup(entry)
         return str(res.inserted_id)
 
+    def _bump_rollup(self, entry: Dict[str, Any]):
+        """
+        Fold one stored tracking into its user's daily rollup row. Skipped
+        when a rebuild_rollups that read the tracking already folded it: the
+        rebuilt row's `folded_through` is at or after its timestamp.
+        """
+        score = entry.get("note_quality_score")
+        inc = {"audits": 1, **{f"tags.{t}": 1 for t in entry["tags"]}}
+        if score is not None:
+            inc["quality_sum"] = score
+            inc["quality_count"] = 1
+        try:
+            self.performance_daily.update_one(
+                {"user_id": entry["user_id"], "day": day_start(entry["timestamp"]),
+                 "folded_through": {"$not": {"$gte": entry["timestamp"]}}},
+                # Trackings are stamped at write time, so the last write of a day is its latest
+                {"$inc": inc, "$set": {"latest_summary": entry.get("summary"), "latest_at": entry["timestamp"]}},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            # The row exists but failed the filter: already folded by the rebuild
+            pass
+
     def get_user_history(self, user_id: str, limit: int = 10) -> List[Dict[str, Any]]:
-        cursor = self.performance_trackings.find({"user_id": user_id}).sort("timestamp", -1).limit(limit)
-        results = []
-        for doc in cursor:
-            doc["_id"] = str(doc["_id"])
-            if isinstance(doc.get("timestamp"), datetime):
-                doc["timestamp"] = doc["timestamp"].isoformat()
-            results.append(doc)
-        return results
+        return self.get_history_page(user_id, limit)[0]
+
+    def get_history_page(self, user_id: str, limit: Optional[int] = None,
+                         cursor: Optional[str] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        docs, next_cursor = keyset_page(
+            self.performance_trackings, {"user_id": user_id}, "timestamp", -1, cursor=cursor, limit=limit
+        )
+        return [self.serialize_tracking(doc) for doc in docs], next_cursor
+
+    @staticmethod
+    def serialize_tracking(doc: Dict[str, Any]) -> Dict[str, Any]:
+        doc["_id"] = str(doc["_id"])
+        if isinstance(doc.get("timestamp"), datetime):
+            doc["timestamp"] = doc["timestamp"].isoformat()
+        return doc
 
     def get_trends(self, user_id: str, days: int = 30) -> Dict[str, Any]:
         """Analyzes historical audits for persistent weak points or trends."""
-        from datetime import timedelta
-        since = datetime.now(timezone.utc) - timedelta(days=days)
-        
-        cursor = self.performance_trackings.find({
-            "user_id": user_id,
-            "timestamp": {"$gte": since}
-        }).sort("timestamp", -1)
-        
-        audits = list(cursor)
-        if not audits:
+        rows = list(self.performance_daily.aggregate(self.trends_pipeline(user_id, days)))
+        return self.summarize_trends(rows[0] if rows else {}, days)
+
+    @staticmethod
+    def trends_pipeline(user_id: str, days: int) -> List[Dict[str, Any]]:
+        """Grouped aggregation over the daily rollup (shared with the async read path)."""
+        since = day_start(datetime.now(timezone.utc) - timedelta(days=days))
+        return [
+            {"$match": {"user_id": user_id, "day": {"$gte": since}}},
+            {"$facet": {
+                "totals": [{"$group": {
+                    "_id": None,
+                    "audits": {"$sum": "$audits"},
+                    "quality_sum": {"$sum": "$quality_sum"},
+                    "quality_count": {"$sum": "$quality_count"},
+                }}],
+                "tags": [
+                    {"$project": {"tag": {"$objectToArray": {"$ifNull": ["$tags", {}]}}}},
+                    {"$unwind": "$tag"},
+                    {"$group": {"_id": "$tag.k", "count": {"$sum": "$tag.v"}}},
+                    {"$sort": {"count": -1, "_id": 1}},
+                    {"$limit": 3},
+                ],
+                "latest": [
+                    {"$sort": {"day": -1}},
+                    {"$limit": 1},
+                    {"$project": {"_id": 0, "summary": "$latest_summary"}},
+                ],
+            }},
+        ]
+
+    @staticmethod
+    def summarize_trends(facet: Dict[str, Any], days: int) -> Dict[str, Any]:
+        totals = (facet.get("totals") or [{}])[0]
+        if not totals.get("audits"):
             return {"status": "no_data", "trends": []}
-            
-        # Basic trend analysis: average note quality
-        scores = [a.get("note_quality_score") for a in audits if a.get("note_quality_score") is not None]
-        avg_quality = sum(scores) / len(scores) if scores else 0
-        
-        # Extract common struggle keywords from audit details (simplified)
-        # In a real app, this might use NLP or structured fields
-        struggle_points = []
-        for a in audits:
-            details = a.get("note_audit_details", "").lower()
-            summary = a.get("summary", "").lower()
-            text_to_check = details + " " + summary
-            
-            if "passive" in text_to_check: struggle_points.append("passive_form")
-            if "particle" in text_to_check: struggle_points.append("particles")
-            if "kanji" in text_to_check: struggle_points.append("kanji_recall")
-            
-        # Most frequent struggle points
-        from collections import Counter
-        common_struggles = [item for item, count in Counter(struggle_points).most_common(3)]
-        
+
+        quality_count = totals.get("quality_count") or 0
+        avg_quality = totals["quality_sum"] / quality_count if quality_count else 0
+        latest = facet.get("latest") or [{}]
+
         return {
             "status": "success",
             "period_days": days,
-            "audit_count": len(audits),
+            "audit_count": totals["audits"],
             "avg_note_quality": round(avg_quality, 2),
-            "identified_struggles": common_struggles,
-            "latest_audit_summary": audits[0].get("summary") if audits else None
+            "identified_struggles": [t["_id"] for t in facet.get("tags", [])],
+            "latest_audit_summary": latest[0].get("summary"),
         }
 
+    def rebuild_rollups(self, user_id: Optional[str] = None) -> int:
+        """
+        Backfill `tags` on trackings written before tagging existed and
+        rebuild the daily rollup from the raw trackings with one grouped
+        aggregation that `$merge`s a row per user and day. Returns the
+        number of trackings in scope.
+
+        Safe while log_tracking keeps writing (it inserts before it bumps the
+        rollup). A row whose `latest_at` is newer than the trackings grouped
+        into it got a write after the scan and is left to the live
+        increments; a tracking the scan did read is not bumped again (see
+        _bump_rollup). Rows not rebuilt and not written since the rebuild
+        started (e.g. their trackings were deleted) are dropped.
+        """
+        started = datetime.now(timezone.utc)
+        query = {"user_id": user_id} if user_id else {}
+        self._backfill_tags(query)
+
+        scope = {**query, "timestamp": {"$type": "date"}}
+        folded = self.performance_trackings.count_documents(scope)
+        self.performance_trackings.aggregate(self.rollup_pipeline(scope, started))
+
+        stale = {**query, "rebuilt_at": {"$ne": started}, "latest_at": {"$lt": started}}
+        self.performance_daily.delete_many(stale)
+        return folded
+
+    def _backfill_tags(self, query: Dict[str, Any]):
+        untagged: Dict[Tuple[str, ...], List[ObjectId]] = {}
+        cursor = self.performance_trackings.find(
+            {**query, "tags": {"$exists": False}}, {"summary": 1, "note_audit_details": 1}
+        )
+        for doc in cursor:
+            tags = extract_tags(doc.get("summary"), doc.get("note_audit_details"))
+            untagged.setdefault(tuple(tags), []).append(doc["_id"])
+
+        # Only a handful of distinct tag sets exist, so one update per set
+        if untagged:
+            self.performance_trackings.bulk_write([
+                UpdateMany({"_id": {"$in": ids}}, {"$set": {"tags": list(tags)}})
+                for tags, ids in untagged.items()
+            ], ordered=False)
+
+    def rollup_pipeline(self, scope: Dict[str, Any], started: datetime) -> List[Dict[str, Any]]:
+        """Daily rollup rows grouped from the trackings in `scope`, merged into performance_daily."""
+        # Per-tracking sums are taken once, on the first of its unwound tag rows
+        def once(value):
+            return {"$cond": [{"$gt": ["$tag_index", 0]}, 0, value]}
+
+        day = {"$dateFromParts": {
+            "year": {"$year": "$timestamp"}, "month": {"$month": "$timestamp"}, "day": {"$dayOfMonth": "$timestamp"},
+        }}
+        return [
+            {"$match": scope},
+            {"$sort": {"timestamp": 1}},
+            {"$unwind": {"path": "$tags", "includeArrayIndex": "tag_index", "preserveNullAndEmptyArrays": True}},
+            {"$group": {
+                "_id": {"user_id": "$user_id", "day": day, "tag": "$tags"},
+                "count": {"$sum": 1},
+                "audits": {"$sum": once(1)},
+                "quality_sum": {"$sum": once({"$ifNull": ["$note_quality_score", 0]})},
+                "quality_count": {"$sum": once(
+                    {"$cond": [{"$eq": [{"$ifNull": ["$note_quality_score", None]}, None]}, 0, 1]}
+                )},
+                "latest_summary": {"$last": "$summary"},
+                "latest_at": {"$last": "$timestamp"},
+            }},
+            {"$sort": {"latest_at": 1}},
+            {"$group": {
+                "_id": {"user_id": "$_id.user_id", "day": "$_id.day"},
+                "audits": {"$sum": "$audits"},
+                "quality_sum": {"$sum": "$quality_sum"},
+                "quality_count": {"$sum": "$quality_count"},
+                "tags": {"$push": {"k": "$_id.tag", "v": "$count"}},
+                "latest_summary": {"$last": "$latest_summary"},
+                "latest_at": {"$last": "$latest_at"},
+            }},
+            {"$project": {
+                "_id": 0,
+                "user_id": "$_id.user_id",
+                "day": "$_id.day",
+                "audits": 1,
+                "quality_sum": 1,
+                "quality_count": 1,
+                # Untagged trackings group under a missing tag
+                "tags": {"$arrayToObject": {"$filter": {
+                    "input": "$tags", "cond": {"$ne": [{"$ifNull": ["$$this.k", None]}, None]},
+                }}},
+                "latest_summary": 1,
+                "latest_at": 1,
+                "folded_through": "$latest_at",
+                "rebuilt_at": {"$literal": started},
+            }},
+            {"$merge": {
+                "into": self.performance_daily.name,
+                "on": ["user_id", "day"],
+                # A newer latest_at means a write landed after the scan: keep the live row
+                "whenMatched": [{"$replaceWith": {"$cond": [
+                    {"$gt": ["$latest_at", "$$new.latest_at"]}, "$$ROOT", "$$new",
+                ]}}],
+                "whenNotMatched": "insert",
+            }},
+        ]
+
     def register_routes(self, app):
         perf_bp = Blueprint("performance", __name__, url_prefix="/v1/performance")
 
@@ -115,8 +285,11 @@ class PerformanceModule:
         def list_trackings():
             user_id = request.user.get("userId") or request.user.get("id")
             limit = request.args.get("limit", 10, type=int)
-            history = self.get_user_history(user_id, limit)
-            return jsonify({"trackings": history})
+            try:
+                history, next_cursor = self.get_history_page(user_id, limit, request.args.get("cursor"))
+            except InvalidCursor as e:
+                return jsonify({"error": str(e)}), 400
+            return jsonify({"trackings": history, "next_cursor": next_cursor})
 
         @perf_bp.route("/trends", methods=["GET"])
         @login_required
@@ -52,7 +52,8 @@ class PriorityMatrixModule:
         recent = list(self.interactions.find(query).sort("timestamp", 1))
         
         if not recent:
-            return {"priority": "yellow", "score": 50, "reason": "No recent data"}
+            return {"priority": "yellow", "score": 50, "trend": "stable",
+                    "recommended_action": "drill_practice", "reason": "No recent data"}
             
         total = len(recent)
         err_count = sum(1 for r in recent if not r.get("is_correct"))
@@ -125,8 +126,7 @@ class PriorityMatrixModule:
             if not matrix:
                 # Run initial calculation if missing
                 return self.recalculate_matrix(user_id)
-                
-            matrix["_id"] = str(matrix["_id"])
+
             return jsonify(matrix)
 
         @priority_bp.route("/recalculate", methods=["POST"])
@@ -199,10 +199,8 @@ class PriorityMatrixModule:
             {"$set": matrix_doc},
             upsert=True
         )
-        
-        if "_id" in matrix_doc: matrix_doc["_id"] = str(matrix_doc["_id"])
-        # Fetch it back to get the string id if it was an upsert
+
+        # Fetch it back to include the _id if it was an upsert
         new_matrix = self.queue.find_one({"user_id": user_id})
-        new_matrix["_id"] = str(new_matrix["_id"])
         
         return jsonify(new_matrix)
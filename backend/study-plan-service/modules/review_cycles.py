@@ -6,10 +6,10 @@ Aggregates metrics from all other modules to provide high-level insights.
 """
 
 import logging
-from datetime import datetime, timedelta, date
+from datetime import datetime, timedelta, date, timezone
 from typing import Dict, List, Optional, Any
 from flask import Blueprint, request, jsonify
-from pymongo import MongoClient
+from pymongo import MongoClient, UpdateOne
 from bson import ObjectId
 
 class ReviewCyclesModule:
@@ -25,6 +25,9 @@ class ReviewCyclesModule:
         self.interactions = self.db["content_interactions"]
         self.commitments = self.db["pact_commitments"]
         self.queue = self.db["priority_queue"]
+        # Daily per-item rollups of archived interactions (see event_archive.py)
+        self.interactions_daily = self.db["content_interactions_daily"]
+        self.archive_state = self.db["event_archive_state"]
         
         self._create_indexes()
 
@@ -39,22 +42,69 @@ class ReviewCyclesModule:
     # Metrics Aggregation
     # ============================================
 
+    def _archived_through(self, like: datetime) -> Optional[datetime]:
+        """End of the last archived interaction day, in the same tz-awareness as `like`."""
+        state = self.archive_state.find_one({"collection": "content_interactions"})
+        boundary = state.get("archived_through") if state else None
+        if boundary is None:
+            return None
+        if like.tzinfo is None and boundary.tzinfo is not None:
+            return boundary.astimezone(timezone.utc).replace(tzinfo=None)
+        if like.tzinfo is not None and boundary.tzinfo is None:
+            return boundary.replace(tzinfo=timezone.utc)
+        return boundary
+
+    def interaction_breakdown(self, user_id: str, start: datetime, end: datetime) -> Dict[str, Dict[str, int]]:
+        """
+        Interaction totals per content type, computed server-side.
+
+        Days already archived are read from the daily rollups, the rest from
+        the raw event collection, so no boundary day is counted twice. The
+        rollups are day-granular and the archived raw events are gone, so an
+        archived first day is counted whole even when `start` is mid-day.
+        """
+        archived_through = self._archived_through(start)
+        raw_start = max(start, archived_through) if archived_through else start
+
+        rows = []
+        if raw_start < end:
+            rows += list(self.interactions.aggregate([
+                {"$match": {"user_id": user_id, "timestamp": {"$gte": raw_start, "$lt": end}}},
+                {"$group": {
+                    "_id": "$content_type",
+                    "total": {"$sum": 1},
+                    "correct": {"$sum": {"$cond": [{"$eq": ["$is_correct", True]}, 1, 0]}}
+                }}
+            ]))
+        if archived_through and start < archived_through:
+            rows += list(self.interactions_daily.aggregate([
+                {"$match": {"user_id": user_id, "day": {
+                    "$gte": start.replace(hour=0, minute=0, second=0, microsecond=0),
+                    "$lt": min(end, archived_through)
+                }}},
+                {"$group": {"_id": "$content_type", "total": {"$sum": "$total"}, "correct": {"$sum": "$correct"}}}
+            ]))
+
+        breakdown: Dict[str, Dict[str, int]] = {}
+        for row in rows:
+            entry = breakdown.setdefault(row["_id"] or "unknown", {"total": 0, "correct": 0})
+            entry["total"] += row["total"]
+            entry["correct"] += row["correct"]
+        return breakdown
+
     def calculate_period_metrics(self, user_id: str, start: datetime, end: datetime) -> Dict[str, Any]:
         # Study Sessions
-        sessions = list(self.sessions.find({
-            "user_id": user_id,
-            "started_at": {"$gte": start, "$lt": end}
-        }))
-        total_mins = sum(s.get("duration_minutes", 0) for s in sessions)
-        count = len(sessions)
+        session_rows = list(self.sessions.aggregate([
+            {"$match": {"user_id": user_id, "started_at": {"$gte": start, "$lt": end}}},
+            {"$group": {"_id": None, "minutes": {"$sum": "$duration_minutes"}, "count": {"$sum": 1}}}
+        ]))
+        total_mins = session_rows[0]["minutes"] if session_rows else 0
+        count = session_rows[0]["count"] if session_rows else 0
         
         # Interactions / Accuracy
-        interactions = list(self.interactions.find({
-            "user_id": user_id,
-            "timestamp": {"$gte": start, "$lt": end}
-        }))
-        total_int = len(interactions)
-        correct = sum(1 for i in interactions if i.get("is_correct"))
+        breakdown = self.interaction_breakdown(user_id, start, end)
+        total_int = sum(b["total"] for b in breakdown.values())
+        correct = sum(b["correct"] for b in breakdown.values())
         accuracy = (correct / total_int * 100) if total_int > 0 else 0
         
         # Mastery promotion (simplified: status changed to 'mastered' in this period)
@@ -81,6 +131,11 @@ class ReviewCyclesModule:
             "total_study_minutes": total_mins,
             "session_count": count,
             "avg_accuracy": round(accuracy, 2),
+            "interaction_count": total_int,
+            "by_content_type": {
+                t: {**b, "accuracy": round(b["correct"] / b["total"] * 100, 2) if b["total"] else 0}
+                for t, b in breakdown.items()
+            },
             "items_promoted": promoted,
             "red_items_count": counts["red"],
             "yellow_items_count": counts["yellow"],
@@ -89,6 +144,66 @@ class ReviewCyclesModule:
             "current_streak": streak
         }
 
+    # ============================================
+    # Review Generation
+    # ============================================
+
+    def period_start(self, cycle_type: str, now: datetime) -> datetime:
+        if cycle_type == "daily":
+            return now.replace(hour=0, minute=0, second=0, microsecond=0)
+        elif cycle_type == "weekly":
+            start_date = now - timedelta(days=now.weekday())
+            return start_date.replace(hour=0, minute=0, second=0, microsecond=0)
+        else: # phase
+            return now - timedelta(days=30)
+
+    def build_review(self, user_id: str, cycle_type: str, now: datetime, start_date: Optional[datetime] = None) -> Dict[str, Any]:
+        start_date = start_date or self.period_start(cycle_type, now)
+        metrics = self.calculate_period_metrics(user_id, start_date, now)
+        
+        # Wins & Challenges Detection
+        wins = []
+        if metrics["avg_accuracy"] > 80: wins.append("High accuracy maintained!")
+        if metrics["items_promoted"] > 5: wins.append(f"Mastered {metrics['items_promoted']} items!")
+        if metrics["streak_maintained"]: wins.append("Kept your study streak alive!")
+        
+        challenges = []
+        if metrics["avg_accuracy"] < 70 and metrics["session_count"] > 0:
+            challenges.append("Accuracy is below target - consider reviewing RED items.")
+        if metrics["red_items_count"] > 10:
+            challenges.append("Large backlog of RED items needing attention.")
+            
+        return {
+            "user_id": user_id,
+            "cycle_type": cycle_type,
+            "period_start": start_date,
+            "period_end": now,
+            "metrics": metrics,
+            "wins": wins,
+            "challenges": challenges,
+            "ai_insights": "You're showing consistent effort! Keep focusing on your weak points.",
+            "created_at": now
+        }
+
+    def generate_reviews_bulk(self, user_ids: List[str], cycle_type: str, start_date: datetime, end_date: datetime) -> Dict[str, int]:
+        """
+        Scheduled reviews for a batch of users over a closed period.
+        Upserted on (user_id, cycle_type, period_start) so re-runs replace
+        rather than duplicate.
+        """
+        ops = []
+        for user_id in user_ids:
+            review = self.build_review(user_id, cycle_type, end_date, start_date)
+            review["source"] = "scheduled"
+            ops.append(UpdateOne(
+                {"user_id": user_id, "cycle_type": cycle_type, "period_start": start_date},
+                {"$set": review},
+                upsert=True
+            ))
+        if ops:
+            self.reviews.bulk_write(ops, ordered=False)
+        return {"reviews_generated": len(ops)}
+
     # ============================================
     # Routes
     # ============================================
@@ -103,43 +218,7 @@ class ReviewCyclesModule:
             cycle_type = data.get("cycle_type", "weekly")
             if not user_id: return jsonify({"error": "user_id required"}), 400
             
-            now = datetime.now()
-            if cycle_type == "daily":
-                start_date = now.replace(hour=0, minute=0, second=0, microsecond=0)
-                days = 1
-            elif cycle_type == "weekly":
-                start_date = now - timedelta(days=now.weekday())
-                start_date = start_date.replace(hour=0, minute=0, second=0, microsecond=0)
-                days = 7
-            else: # phase
-                start_date = now - timedelta(days=30)
-                days = 30
-                
-            metrics = self.calculate_period_metrics(user_id, start_date, now)
-            
-            # Wins & Challenges Detection
-            wins = []
-            if metrics["avg_accuracy"] > 80: wins.append("High accuracy maintained!")
-            if metrics["items_promoted"] > 5: wins.append(f"Mastered {metrics['items_promoted']} items!")
-            if metrics["streak_maintained"]: wins.append("Kept your study streak alive!")
-            
-            challenges = []
-            if metrics["avg_accuracy"] < 70 and metrics["session_count"] > 0:
-                challenges.append("Accuracy is below target - consider reviewing RED items.")
-            if metrics["red_items_count"] > 10:
-                challenges.append("Large backlog of RED items needing attention.")
-                
-            review = {
-                "user_id": user_id,
-                "cycle_type": cycle_type,
-                "period_start": start_date,
-                "period_end": now,
-                "metrics": metrics,
-                "wins": wins,
-                "challenges": challenges,
-                "ai_insights": "You're showing consistent effort! Keep focusing on your weak points.",
-                "created_at": now
-            }
+            review = self.build_review(user_id, cycle_type, datetime.now())
             
             res = self.reviews.insert_one(review)
             review["_id"] = str(res.inserted_id)
@@ -9,9 +9,21 @@ import logging
 from datetime import datetime, timezone
 from typing import Dict, List, Optional, Any
 from flask import Blueprint, request, jsonify
-from pymongo import MongoClient
+from pymongo import MongoClient, UpdateOne
+from pymongo.errors import BulkWriteError
 from bson import ObjectId
 
+MASTERED_STATUSES = ["mastered", "reviewing"]
+
+# measurable_metric -> (source collection, content_type for mastery counts)
+METRIC_SOURCES = {
+    "vocabulary_count": ("mastery", "vocabulary"),
+    "kanji_count": ("mastery", "kanji"),
+    "grammar_points": ("mastery", "grammar"),
+    "quiz_average": ("quiz_attempts", None),
+    "study_minutes": ("sessions", None),
+}
+
 class SmartGoalsModule:
     def __init__(self, mongo_uri: str = "mongodb://localhost:27017/"):
         self.logger = logging.getLogger(__name__)
@@ -79,21 +91,80 @@ class SmartGoalsModule:
         result = list(self.sessions.aggregate(pipeline))
         return result[0]["total"] if result else 0
 
-    def calculate_progress(self, goal: Dict[str, Any]) -> Dict[str, Any]:
-        metric = goal.get("measurable_metric")
-        user_id = goal.get("user_id")
-        created_at = goal.get("created_at") or datetime.now()
-        
-        handlers = {
-            "vocabulary_count": self.get_vocab_count,
-            "kanji_count": self.get_kanji_count,
-            "grammar_points": self.get_grammar_count,
-            "quiz_average": self.get_quiz_average,
-            "study_minutes": self.get_total_study_time
+    def compute_metrics(self, user_id: str, goals: List[Dict[str, Any]]) -> Dict[tuple, Any]:
+        """
+        Metric values for all of a user's goals at once.
+
+        One `$facet` aggregation per source collection the goals need (at most
+        three, regardless of goal count), with one facet branch per distinct
+        time window so goals created at the same moment share a computation.
+        Returns {(metric, created_at): value}.
+        """
+        now = datetime.now()
+        windows: Dict[str, set] = {}
+        for goal in goals:
+            source = METRIC_SOURCES.get(goal.get("measurable_metric"))
+            if source:
+                windows.setdefault(source[0], set()).add(goal.get("created_at") or now)
+
+        per_source: Dict[str, Dict[datetime, Any]] = {}
+        if "mastery" in windows:
+            per_source["mastery"] = self._facet_by_window(
+                self.mastery, "last_reviewed_at", windows["mastery"],
+                {"user_id": user_id, "status": {"$in": MASTERED_STATUSES}},
+                {"$group": {"_id": "$content_type", "value": {"$sum": 1}}}
+            )
+        if "quiz_attempts" in windows:
+            per_source["quiz_attempts"] = self._facet_by_window(
+                self.quiz_attempts, "timestamp", windows["quiz_attempts"],
+                {"user_id": user_id},
+                {"$group": {"_id": None, "value": {"$avg": "$score_percent"}}}
+            )
+        if "sessions" in windows:
+            per_source["sessions"] = self._facet_by_window(
+                self.sessions, "started_at", windows["sessions"],
+                {"user_id": user_id},
+                {"$group": {"_id": None, "value": {"$sum": "$duration_minutes"}}}
+            )
+
+        metrics = {}
+        for goal in goals:
+            metric = goal.get("measurable_metric")
+            source = METRIC_SOURCES.get(metric)
+            if not source:
+                continue
+            groups = per_source[source[0]].get(goal.get("created_at") or now, {})
+            if source[0] == "mastery":
+                value = groups.get(source[1], 0)
+            elif source[0] == "quiz_attempts":
+                value = round(groups[None], 2) if groups.get(None) is not None else 0.0
+            else:
+                value = groups.get(None) or 0
+            metrics[(metric, goal.get("created_at"))] = value
+        return metrics
+
+    def _facet_by_window(self, collection, time_field: str, windows: set, match: Dict[str, Any], group: Dict[str, Any]) -> Dict[datetime, Dict[Any, Any]]:
+        ordered = sorted(windows)
+        facets = {
+            f"w{i}": [{"$match": {time_field: {"$gte": since}}}, group]
+            for i, since in enumerate(ordered)
         }
-        
-        handler = handlers.get(metric)
-        current_value = handler(user_id, created_at) if handler else 0
+        pipeline = [
+            {"$match": {**match, time_field: {"$gte": ordered[0]}}},
+            {"$facet": facets}
+        ]
+        row = next(iter(collection.aggregate(pipeline)), {})
+        return {
+            since: {g["_id"]: g["value"] for g in row.get(f"w{i}", [])}
+            for i, since in enumerate(ordered)
+        }
+
+    def calculate_progress(self, goal: Dict[str, Any], metrics: Optional[Dict[tuple, Any]] = None) -> Dict[str, Any]:
+        """Progress for one goal; pass `metrics` from compute_metrics when listing many."""
+        metric = goal.get("measurable_metric")
+        if metrics is None:
+            metrics = self.compute_metrics(goal.get("user_id"), [goal])
+        current_value = metrics.get((metric, goal.get("created_at")), 0)
         
         baseline = goal.get("measurable_baseline", 0)
         target = goal.get("measurable_target", 1)
@@ -111,6 +182,59 @@ class SmartGoalsModule:
             "is_completed": progress_percent >= 100
         }
 
+    # ============================================
+    # Batch Updates
+    # ============================================
+
+    def batch_update(self, user_id: str, updates: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Apply many goal updates with one ownership check and one unordered bulk_write.
+
+        Returns per-item results in request order, each with a status of
+        "updated", "not_found", "invalid_id", "skipped" (no id; creation is not
+        supported in batch) or "error".
+        """
+        now = datetime.now(timezone.utc)
+        results: List[Dict[str, Any]] = []
+        pending = []  # (result index, ObjectId, fields)
+
+        for item in updates:
+            goal_id = item.get("id")
+            if not goal_id:
+                results.append({"id": None, "status": "skipped"})
+                continue
+            if not ObjectId.is_valid(goal_id):
+                results.append({"id": goal_id, "status": "invalid_id"})
+                continue
+            results.append({"id": goal_id, "status": "not_found"})
+            pending.append((len(results) - 1, ObjectId(goal_id), item.get("fields", {})))
+
+        owned = {
+            g["_id"] for g in self.goals.find(
+                {"_id": {"$in": [oid for _, oid, _ in pending]}, "user_id": user_id}, {"_id": 1}
+            )
+        } if pending else set()
+
+        ops, op_items = [], []
+        for idx, oid, fields in pending:
+            if oid not in owned:
+                continue
+            ops.append(UpdateOne({"_id": oid, "user_id": user_id}, {"$set": {**fields, "updated_at": now}}))
+            op_items.append(idx)
+            results[idx]["status"] = "updated"
+
+        if ops:
+            try:
+                self.goals.bulk_write(ops, ordered=False)
+            except BulkWriteError as e:
+                for err in e.details.get("writeErrors", []):
+                    result = results[op_items[err["index"]]]
+                    result["status"] = "error"
+                    result["error"] = err.get("errmsg")
+
+        ids = [r["id"] for r in results if r["status"] == "updated"]
+        return {"updated_count": len(ids), "ids": ids, "results": results}
+
     # ============================================
     # Routes
     # ============================================
@@ -173,9 +297,10 @@ class SmartGoalsModule:
             if active_only: query["status"] = "active"
             
             goals = list(self.goals.find(query))
+            metrics = self.compute_metrics(user_id, goals)
             for g in goals:
                 # Add real-time progress
-                progress = self.calculate_progress(g)
+                progress = self.calculate_progress(g, metrics)
                 g.update(progress)
                 
                 g["_id"] = str(g["_id"])
@@ -232,25 +357,7 @@ class SmartGoalsModule:
             
             if not user_id: return jsonify({"error": "user_id required"}), 400
             
-            results = []
-            now = datetime.now(timezone.utc)
-            
-            for item in updates:
-                goal_id = item.get("id")
-                if goal_id:
-                    # Update existing - use user_id from request body
-                    result = self.goals.update_one(
-                        {"_id": ObjectId(goal_id), "user_id": user_id},
-                        {"$set": {**item.get("fields", {}), "updated_at": now}}
-                    )
-                    if result.modified_count > 0:
-                        results.append(goal_id)
-                else:
-                    # Create new (optional behavior for batch)
-                    # For now just handle updates of existing
-                    pass
-                    
-            return jsonify({"updated_count": len(results), "ids": results}), 200
+            return jsonify(self.batch_update(user_id, updates)), 200
 
 
         app.register_blueprint(smart_bp)
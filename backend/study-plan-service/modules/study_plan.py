@@ -14,8 +14,10 @@ API Prefix: /v1/study-plan/
 import logging
 from flask import request, jsonify
 from utils.auth import login_required
-from pymongo import MongoClient
+from pymongo import MongoClient, UpdateOne
+from pymongo.errors import BulkWriteError
 from bson import ObjectId
+from utils.recommendation_cache import invalidate_recommendations
 from datetime import datetime, timedelta, timezone
 from typing import Dict, List, Optional, Any
 
@@ -262,7 +264,7 @@ class StudyPlanModule:
     Handles JLPT study plan creation, management, and progress tracking.
     """
 
-    def __init__(self):
+    def __init__(self, mongo_uri: str = "mongodb://localhost:27017/"):
         logging.basicConfig(
             level=logging.INFO,
             format="%(asctime)s %(levelname)s %(name)s %(threadName)s : %(message)s",
@@ -270,7 +272,7 @@ class StudyPlanModule:
         self.logger = logging.getLogger(__name__)
 
         # MongoDB connections
-        self.mongo_client = MongoClient("mongodb://localhost:27017/")
+        self.mongo_client = MongoClient(mongo_uri)
         self.study_db = self.mongo_client["flaskStudyPlanDB"]
 
         # Collections
@@ -298,6 +300,12 @@ class StudyPlanModule:
 
             # Daily tasks indexes
             self.tasks_collection.create_index([("user_id", 1), ("date", 1)])
+            # One task per slot per user per day (legacy tasks without task_key are exempt)
+            self.tasks_collection.create_index(
+                [("user_id", 1), ("date", 1), ("task_key", 1)],
+                unique=True,
+                partialFilterExpression={"task_key": {"$exists": True}}
+            )
             self.tasks_collection.create_index([("plan_id", 1), ("milestone_id", 1)])
 
             # Templates indexes
@@ -424,6 +432,20 @@ class StudyPlanModule:
     # Datetime Helpers
     # ============================================
 
+    @staticmethod
+    def serialize_daily_task(t: Dict) -> Dict:
+        """API shape of a daily task (shared with the async read path)."""
+        return {
+            "id": str(t["_id"]) if "_id" in t else None,
+            "task_type": t["task_type"],
+            "title": t["title"],
+            "description": t["description"],
+            "estimated_minutes": t["estimated_minutes"],
+            "status": t["status"],
+            "completed_at": t["completed_at"].isoformat() if t.get("completed_at") else None,
+            "score": t.get("score"),
+        }
+
     def _ensure_tz_aware(self, dt: datetime) -> datetime:
         """Ensure a datetime is timezone-aware (UTC). Handles legacy naive datetimes."""
         if dt is None:
@@ -569,6 +591,7 @@ class StudyPlanModule:
                     {"$set": {"current_milestone_id": first_milestone["_id"]}}
                 )
 
+        invalidate_recommendations(self.study_db, user_id)
         self.logger.info(f"Created plan {plan_id} with {len(milestones)} milestones for user {user_id}")
 
         return plan
@@ -626,11 +649,24 @@ class StudyPlanModule:
         if current_milestone_id:
             milestone = self.milestones_collection.find_one({"_id": current_milestone_id})
 
+        return self.build_daily_tasks(plan, milestone, date)
+
+    def build_daily_tasks(self, plan: Dict, milestone: Optional[Dict], date: datetime) -> List[Dict]:
+        """
+        Build (but do not store) the task set for a plan on a date.
+
+        Every task carries a `task_key` that is unique per user and date, so
+        storing them with upserts can never create a duplicate task set.
+        """
+        plan_id = plan["_id"]
+        current_milestone_id = plan.get("current_milestone_id")
+
         tasks = []
         remaining_minutes = plan.get("daily_study_minutes", 30)
 
         # Task 1: SRS Review (placeholder - will integrate with flashcard system)
         srs_task = {
+            "task_key": "srs_review",
             "plan_id": plan_id,
             "milestone_id": current_milestone_id,
             "user_id": plan["user_id"],
@@ -653,6 +689,7 @@ class StudyPlanModule:
 
             if category == "vocabulary" or category == "mixed":
                 tasks.append({
+                    "task_key": "new_vocabulary",
                     "plan_id": plan_id,
                     "milestone_id": current_milestone_id,
                     "user_id": plan["user_id"],
@@ -671,6 +708,7 @@ class StudyPlanModule:
             if category == "grammar" or category == "mixed":
                 if remaining_minutes > 0:
                     tasks.append({
+                        "task_key": "grammar_lesson",
                         "plan_id": plan_id,
                         "milestone_id": current_milestone_id,
                         "user_id": plan["user_id"],
@@ -688,6 +726,7 @@ class StudyPlanModule:
 
             if category == "kanji":
                 tasks.append({
+                    "task_key": "kanji_practice",
                     "plan_id": plan_id,
                     "milestone_id": current_milestone_id,
                     "user_id": plan["user_id"],
@@ -704,6 +743,55 @@ class StudyPlanModule:
 
         return tasks
 
+    def store_daily_tasks(self, tasks: List[Dict]) -> int:
+        """Upsert tasks on (user_id, date, task_key); returns number newly inserted."""
+        if not tasks:
+            return 0
+        ops = [
+            UpdateOne(
+                {"user_id": t["user_id"], "date": t["date"], "task_key": t["task_key"]},
+                {"$setOnInsert": t},
+                upsert=True
+            )
+            for t in tasks
+        ]
+        try:
+            result = self.tasks_collection.bulk_write(ops, ordered=False)
+            return result.upserted_count
+        except BulkWriteError as e:
+            # A concurrent writer inserted the same task first; the unique index kept one copy
+            return e.details.get("nUpserted", 0)
+
+    def generate_daily_tasks_bulk(self, user_ids: List[str], date: datetime) -> Dict:
+        """
+        Generate and store a date's tasks for many users with a fixed number
+        of queries: existing tasks, plans, milestones, then one bulk write.
+        """
+        already_generated = set(self.tasks_collection.distinct("user_id", {
+            "user_id": {"$in": user_ids},
+            "date": {"$gte": date, "$lt": date + timedelta(days=1)}
+        }))
+        pending_users = [u for u in user_ids if u not in already_generated]
+        if not pending_users:
+            return {"users": 0, "tasks_created": 0}
+
+        plans = list(self.plans_collection.find({"user_id": {"$in": pending_users}, "status": "active"}))
+        milestone_ids = [p["current_milestone_id"] for p in plans if p.get("current_milestone_id")]
+        milestones = {
+            m["_id"]: m for m in self.milestones_collection.find({"_id": {"$in": milestone_ids}})
+        } if milestone_ids else {}
+
+        tasks = []
+        seen_users = set()
+        for plan in sorted(plans, key=lambda p: p.get("created_at") or datetime.min, reverse=True):
+            # Users are expected to have one active plan; keep the most recent if not
+            if plan["user_id"] in seen_users:
+                continue
+            seen_users.add(plan["user_id"])
+            tasks.extend(self.build_daily_tasks(plan, milestones.get(plan.get("current_milestone_id")), date))
+
+        return {"users": len(seen_users), "tasks_created": self.store_daily_tasks(tasks)}
+
     # ============================================
     # Adaptive Plan Adjustments (Phase 8)
     # ============================================
@@ -735,7 +823,7 @@ class StudyPlanModule:
         # Check for overdue milestones
         overdue_count = 0
         for m in milestones:
-            if m["status"] != "completed" and m["target_end_date"] < today:
+            if m["status"] != "completed" and self._ensure_tz_aware(m["target_end_date"]) < today:
                 overdue_count += 1
                 issues.append({
                     "type": "overdue_milestone",
@@ -834,6 +922,7 @@ class StudyPlanModule:
         weeks_per_milestone = max(1, remaining_weeks // len(milestones))
         
         current_start = today
+        ops = []
         for idx, m in enumerate(milestones):
             is_last = idx == len(milestones) - 1
             
@@ -845,13 +934,13 @@ class StudyPlanModule:
 
             old_end = m["target_end_date"]
             
-            self.milestones_collection.update_one(
+            ops.append(UpdateOne(
                 {"_id": m["_id"]},
                 {"$set": {
                     "target_start_date": current_start,
                     "target_end_date": new_end,
                 }}
-            )
+            ))
             
             adjustments.append({
                 "milestone_id": str(m["_id"]),
@@ -862,6 +951,9 @@ class StudyPlanModule:
             
             current_start = new_end + timedelta(days=1)
 
+        # Each milestone's dates are independent once computed
+        self.milestones_collection.bulk_write(ops, ordered=False)
+
         # Update plan if exam date changed
         if new_exam_date:
             new_total_days = (self._ensure_tz_aware(new_exam_date) - self._ensure_tz_aware(plan["start_date"])).days
@@ -1290,6 +1382,7 @@ class StudyPlanModule:
                         {"_id": ObjectId(plan_id)},
                         {"$set": updates}
                     )
+                    invalidate_recommendations(self.study_db, user_id)
 
                 return jsonify({"message": "Plan updated successfully"}), 200
 
@@ -1312,6 +1405,7 @@ class StudyPlanModule:
                     {"_id": ObjectId(plan_id)},
                     {"$set": {"status": "abandoned", "updated_at": datetime.now(timezone.utc)}}
                 )
+                invalidate_recommendations(self.study_db, user_id)
 
                 return jsonify({"message": "Plan abandoned successfully"}), 200
 
@@ -1437,28 +1531,19 @@ class StudyPlanModule:
                 }))
 
                 if not existing_tasks:
-                    # Generate tasks
+                    # Normally pre-generated by the nightly batch; generate on demand otherwise.
+                    # Upserts on (user_id, date, task_key) keep concurrent first GETs from duplicating.
                     generated = self.generate_daily_tasks(plan["_id"], start_of_day)
                     if generated:
-                        self.tasks_collection.insert_many(generated)
-                        existing_tasks = generated
-
-                tasks_result = []
-                for t in existing_tasks:
-                    tasks_result.append({
-                        "id": str(t["_id"]) if "_id" in t else None,
-                        "task_type": t["task_type"],
-                        "title": t["title"],
-                        "description": t["description"],
-                        "estimated_minutes": t["estimated_minutes"],
-                        "status": t["status"],
-                        "completed_at": t["completed_at"].isoformat() if t.get("completed_at") else None,
-                        "score": t.get("score"),
-                    })
+                        self.store_daily_tasks(generated)
+                        existing_tasks = list(self.tasks_collection.find({
+                            "user_id": user_id,
+                            "date": {"$gte": start_of_day, "$lte": end_of_day}
+                        }))
 
                 return jsonify({
                     "date": target_date.isoformat(),
-                    "tasks": tasks_result,
+                    "tasks": [self.serialize_daily_task(t) for t in existing_tasks],
                     "plan_id": str(plan["_id"]),
                 }), 200
 
@@ -1678,21 +1763,20 @@ class StudyPlanModule:
         if activity_data.get("type") == "flashcard_review":
              query["task_type"] = "flashcard"
              
-        tasks = list(self.tasks_collection.find(query))
+        task_ids = [t["_id"] for t in self.tasks_collection.find(query, {"_id": 1})]
         
-        updates = []
-        for task in tasks:
-            # Simple logic: if they did some flashcards, mark the task as done
-            # In a real system, we'd check quantity vs requirement
-            self.tasks_collection.update_one(
-                {"_id": task["_id"]},
+        # Simple logic: if they did some flashcards, mark the tasks as done
+        # In a real system, we'd check quantity vs requirement
+        updates = [str(tid) for tid in task_ids]
+        if task_ids:
+            self.tasks_collection.update_many(
+                {"_id": {"$in": task_ids}, "status": "pending"},
                 {"$set": {
                     "status": "completed", 
                     "completed_at": datetime.now(timezone.utc),
                     "actual_duration": activity_data.get("duration_seconds", 0) / 60
                 }}
             )
-            updates.append(str(task["_id"]))
             
         # 2. Update Milestone Progress (Simplified)
         # If a plan_id is provided or found via active plan
@@ -127,7 +127,11 @@ class UserPreferencesModule:
             .sort("created_at", -1)
             .limit(100)
         )
-        
+        return self.streak_from_sessions(sessions)
+
+    @staticmethod
+    def streak_from_sessions(sessions: List[Dict]) -> Dict:
+        """Streak over sessions sorted newest first (shared with the async read path)."""
         if not sessions:
             return {"current": 0, "longest": 0}
         
@@ -0,0 +1,91 @@
+"""
+Archive Script: Cold storage for hot event collections
+
+Rolls up content_interactions / learning_activities older than N days into
+daily summaries, exports the raw events to gzip NDJSON and removes them
+from the hot collections. Safe to re-run (see modules/event_archive.py).
+Deleting from time-series collections needs MongoDB 7.0+; older servers
+are refused up front.
+
+Usage:
+    python scripts/archive_events.py [--older-than-days 90] [--archive-dir archive] [--dry-run]
+    python scripts/archive_events.py --convert-timeseries
+"""
+
+import argparse
+import sys
+import os
+
+# Add parent dir to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.event_archive import EventArchiveModule, ARCHIVE_SOURCES, DEFAULT_ARCHIVE_DIR
+from utils.timeseries import ensure_timeseries_collection, is_timeseries
+
+COPY_BATCH_SIZE = 5000
+
+
+def convert_to_timeseries(db, name: str):
+    """Copy a regular collection into a new time-series collection and swap names."""
+    if is_timeseries(db, name):
+        print(f"✅ {name} is already a time-series collection")
+        return
+
+    tmp_name = f"{name}_ts_tmp"
+    db.drop_collection(tmp_name)
+    target = ensure_timeseries_collection(db, tmp_name)
+    if not is_timeseries(db, tmp_name):
+        print(f"❌ Server does not support time-series collections; {name} left as is")
+        return
+
+    batch = []
+    copied = 0
+    for doc in db[name].find({"timestamp": {"$type": "date"}}).sort("_id", 1):
+        batch.append(doc)
+        if len(batch) >= COPY_BATCH_SIZE:
+            target.insert_many(batch, ordered=False)
+            copied += len(batch)
+            batch = []
+            print(f"✅ Copied {copied} {name} events...")
+    if batch:
+        target.insert_many(batch, ordered=False)
+        copied += len(batch)
+
+    db[name].rename(f"{name}_legacy")
+    target.rename(name)
+    target = db[name]
+    target.create_index([("user_id", 1), ("timestamp", -1)])
+    print(f"🏁 {name} converted ({copied} events). Old data kept in {name}_legacy.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive old study events to compressed NDJSON")
+    parser.add_argument("--mongo-uri", default=os.getenv("MONGODB_URI", "mongodb://localhost:27017/"))
+    parser.add_argument("--older-than-days", type=int, default=None)
+    parser.add_argument("--archive-dir", default=DEFAULT_ARCHIVE_DIR)
+    parser.add_argument("--dry-run", action="store_true", help="Only report what would be archived")
+    parser.add_argument("--convert-timeseries", action="store_true",
+                        help="Convert existing event collections to time-series collections")
+    args = parser.parse_args()
+
+    archiver = EventArchiveModule(args.mongo_uri, archive_dir=args.archive_dir)
+
+    if args.convert_timeseries:
+        for name in ARCHIVE_SOURCES:
+            convert_to_timeseries(archiver.db, name)
+        return
+
+    print("🚀 Starting event archival...")
+    try:
+        result = archiver.run(older_than_days=args.older_than_days, dry_run=args.dry_run)
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    for stats in result["collections"]:
+        verb = "would archive" if result["dry_run"] else "archived"
+        print(f"📦 {stats['collection']}: {verb} {stats['events']} events over {stats['days']} days")
+    print(f"🏁 Done (cutoff {result['cutoff']}).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""
+Batch Script: Backfill performance tracking tags and daily trend rollups
+
+Trackings written before write-time tagging have no `tags` field and no
+contribution to performance_trackings_daily, so they are invisible to
+GET /v1/performance/trends. This tags them and rebuilds the rollup from
+the raw trackings. Safe to rerun, and to run while the service is writing.
+
+Usage:
+    python scripts/backfill_performance_tags.py                 # all users
+    python scripts/backfill_performance_tags.py --user-id abc   # one user
+"""
+
+import argparse
+import sys
+import os
+
+# Add parent dir to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.performance import PerformanceModule
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill performance tags and trend rollups")
+    parser.add_argument("--mongo-uri", default=os.getenv("MONGODB_URI", "mongodb://localhost:27017/"))
+    parser.add_argument("--user-id", help="Only rebuild this user's rollup")
+    args = parser.parse_args()
+
+    print("🚀 Rebuilding performance trend rollups...")
+    count = PerformanceModule(args.mongo_uri).rebuild_rollups(args.user_id)
+    print(f"🏁 Done. {count} trackings folded into daily rollups.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""
+Load Test: sync (gunicorn + Flask) vs async (gunicorn + uvicorn workers + Motor)
+
+Starts both serving modes against the same Mongo with the same worker
+count, seeds a small learner dataset, and hammers the dashboard reads that
+asgi.py serves natively (progress, daily tasks, priority matrix, context
+snapshot) at a fixed client concurrency. Prints throughput and latency
+percentiles per mode and endpoint, and optionally writes them as JSON.
+
+Usage:
+    python scripts/load_test_serving.py                          # spawn both modes
+    python scripts/load_test_serving.py --requests 4000 --concurrency 64 --out results.json
+    python scripts/load_test_serving.py --no-spawn \\
+        --target wsgi=http://localhost:5500 --target asgi=http://localhost:5501
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import jwt
+from pymongo import MongoClient
+
+# Add parent dir to path to import modules
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(SERVICE_DIR)
+
+from utils.auth import JWT_SECRET, JWT_ALGORITHM
+
+SERVE_COMMANDS = {
+    "wsgi": ["gunicorn", "-w", "{workers}", "-b", "127.0.0.1:{port}", "server:app"],
+    "asgi": ["gunicorn", "-k", "uvicorn.workers.UvicornWorker", "-w", "{workers}", "-b", "127.0.0.1:{port}", "asgi:app"],
+}
+
+USER_PREFIX = "loadtest-"
+
+
+# ============================================
+# Data
+# ============================================
+
+def seed(db, users: int):
+    now = datetime.now(timezone.utc)
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    for i in range(users):
+        uid = f"{USER_PREFIX}{i}"
+        plan_id = db.study_plans.insert_one({
+            "user_id": uid, "status": "active", "target_level": "N4", "total_days": 120,
+            "start_date": now - timedelta(days=30), "exam_date": now + timedelta(days=90), "created_at": now,
+        }).inserted_id
+        db.milestones.insert_many([{
+            "plan_id": plan_id, "milestone_number": n, "title": f"Milestone {n}", "status": "in_progress",
+            "target_start_date": now - timedelta(days=30), "target_end_date": now + timedelta(days=30 * n),
+            "criteria": [{"type": "vocab_count", "target_value": 100, "current_value": 10 * n}],
+        } for n in range(1, 4)])
+        db.daily_tasks.insert_many([{
+            "user_id": uid, "plan_id": plan_id, "date": today, "task_type": t, "title": t.title(),
+            "description": "", "estimated_minutes": 15, "status": "pending", "task_key": t,
+        } for t in ("flashcard", "grammar", "reading")])
+        db.learning_activities.insert_many([{
+            "user_id": uid, "activity_type": "flashcard_review", "timestamp": now - timedelta(hours=h),
+            "data": {"count": 20, "duration_minutes": 15},
+        } for h in range(0, 24 * 14, 12)])
+        db.study_sessions.insert_many([{
+            "user_id": uid, "created_at": now - timedelta(days=d), "duration_minutes": 20,
+        } for d in range(10)])
+        db.performance_trackings.insert_many([{
+            "user_id": uid, "timestamp": now - timedelta(days=d), "summary": "particle errors",
+            "note_audit_details": "", "note_quality_score": 7,
+        } for d in range(5)])
+        db.priority_queue.insert_one({
+            "user_id": uid, "items": [], "recommended_time_allocation": {"red": 33, "yellow": 34, "green": 33},
+            "last_calculated": now,
+        })
+
+
+def cleanup(db):
+    query = {"user_id": {"$regex": f"^{USER_PREFIX}"}}
+    plan_ids = [p["_id"] for p in db.study_plans.find(query, {"_id": 1})]
+    db.milestones.delete_many({"plan_id": {"$in": plan_ids}})
+    for name in ("study_plans", "daily_tasks", "learning_activities", "study_sessions",
+                 "performance_trackings", "priority_queue", "learner_progress"):
+        db[name].delete_many(query)
+
+
+# ============================================
+# Load
+# ============================================
+
+def endpoints(user_id: str):
+    return {
+        "progress": f"/v1/learner/progress/{user_id}",
+        "daily_tasks": "/v1/study-plan/daily-tasks",
+        "priority_matrix": f"/v1/priority-matrix/?user_id={user_id}",
+        "context_snapshot": f"/v1/context/snapshot/{user_id}",
+    }
+
+
+def timed_get(url: str, token: str):
+    req = urllib.request.Request(url, headers={"Authorization": f"Bearer {token}"})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=30) as res:
+            res.read()
+            ok = res.status == 200
+    except (urllib.error.URLError, OSError):
+        ok = False
+    return time.perf_counter() - start, ok
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, int(round(p / 100 * (len(sorted_values) - 1))))
+    return sorted_values[k]
+
+
+def run_load(base_url: str, users: int, total: int, concurrency: int):
+    tokens = {f"{USER_PREFIX}{i}": jwt.encode({"userId": f"{USER_PREFIX}{i}"}, JWT_SECRET, algorithm=JWT_ALGORITHM)
+              for i in range(users)}
+    jobs = []
+    for n in range(total):
+        uid = f"{USER_PREFIX}{n % users}"
+        name, path = list(endpoints(uid).items())[n % 4]
+        jobs.append((name, base_url + path, tokens[uid]))
+
+    # Warm up connections, caches and lazily created indexes outside the measurement
+    for name, url, token in jobs[:8]:
+        timed_get(url, token)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda j: (j[0],) + timed_get(j[1], j[2]), jobs))
+    elapsed = time.perf_counter() - start
+
+    report = {"requests": total, "seconds": round(elapsed, 2), "rps": round(total / elapsed, 1), "endpoints": {}}
+    for name in endpoints("x"):
+        latencies = sorted(t for n, t, ok in results if n == name)
+        report["endpoints"][name] = {
+            "errors": sum(1 for n, _, ok in results if n == name and not ok),
+            **{f"p{p}_ms": round(percentile(latencies, p) * 1000, 1) for p in (50, 95, 99)},
+        }
+    return report
+
+
+def spawn(mode: str, port: int, workers: int, mongo_uri: str):
+    cmd = [part.format(port=port, workers=workers) for part in SERVE_COMMANDS[mode]]
+    # The servers must read the database this script seeds
+    env = {**os.environ, "MONGODB_URI": mongo_uri, "RATELIMIT_ENABLED": "false", "BATCH_SCHEDULER_ENABLED": "false"}
+    proc = subprocess.Popen(cmd, cwd=SERVICE_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1).read()
+            return proc
+        except OSError:
+            time.sleep(0.5)
+    proc.terminate()
+    raise RuntimeError(f"{mode} server did not become healthy on port {port}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare sync and async serving modes under load")
+    parser.add_argument("--mongo-uri", default=os.getenv("MONGODB_URI", "mongodb://localhost:27017/"))
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=2, help="Gunicorn workers per mode")
+    parser.add_argument("--no-spawn", action="store_true", help="Use already running servers (--target)")
+    parser.add_argument("--target", action="append", default=[], help="mode=base_url, with --no-spawn")
+    parser.add_argument("--keep-data", action="store_true")
+    parser.add_argument("--out", help="Write the report as JSON")
+    args = parser.parse_args()
+
+    db = MongoClient(args.mongo_uri)["flaskStudyPlanDB"]
+    cleanup(db)
+    seed(db, args.users)
+
+    procs = []
+    try:
+        if args.no_spawn:
+            targets = dict(t.split("=", 1) for t in args.target)
+        else:
+            targets = {}
+            for offset, mode in enumerate(SERVE_COMMANDS):
+                port = 5590 + offset
+                procs.append(spawn(mode, port, args.workers, args.mongo_uri))
+                targets[mode] = f"http://127.0.0.1:{port}"
+
+        report = {
+            "config": {k: getattr(args, k) for k in ("users", "requests", "concurrency", "workers")},
+            "modes": {},
+        }
+        for mode, base_url in targets.items():
+            print(f"🚀 {mode}: {args.requests} requests at concurrency {args.concurrency} -> {base_url}")
+            report["modes"][mode] = run_load(base_url, args.users, args.requests, args.concurrency)
+
+        print(f"\n{'mode':<6} {'endpoint':<18} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+        for mode, r in report["modes"].items():
+            for name, e in r["endpoints"].items():
+                print(f"{mode:<6} {name:<18} {e['p50_ms']:>8} {e['p95_ms']:>8} {e['p99_ms']:>8} {e['errors']:>7}")
+            print(f"{mode:<6} {'TOTAL':<18} {r['rps']:>8} req/s over {r['seconds']}s")
+
+        if args.out:
+            with open(args.out, "w") as f:
+                json.dump(report, f, indent=2)
+            print(f"📝 Report written to {args.out}")
+    finally:
+        for proc in procs:
+            proc.terminate()
+            proc.wait(timeout=10)
+        if not args.keep_data:
+            cleanup(db)
+
+    print("🏁 Done.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Batch Script: Run nightly study-plan maintenance jobs
+
+Runs the same jobs the in-process scheduler runs (see modules/batch_jobs.py),
+for cron or manual catch-up. A run already completed for the day/week is
+skipped; a failed or interrupted one resumes where it stopped.
+
+Usage:
+    python scripts/run_batch_jobs.py                     # all jobs due now
+    python scripts/run_batch_jobs.py --job daily_tasks   # one job, regardless of schedule
+"""
+
+import argparse
+import sys
+import os
+
+# Add parent dir to path to import modules
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from modules.batch_jobs import BatchJobsModule
+from modules.study_plan import StudyPlanModule
+from modules.learner_progress import LearnerProgressModule
+from modules.pact import PACTModule
+from modules.review_cycles import ReviewCyclesModule
+from modules.content_mastery import ContentMasteryModule
+from modules.okr import OKRModule
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run nightly study-plan batch jobs")
+    parser.add_argument("--mongo-uri", default=os.getenv("MONGODB_URI", "mongodb://localhost:27017/"))
+    parser.add_argument("--job", action="append", help="Job to run (repeatable); default: all due jobs")
+    parser.add_argument("--chunk-size", type=int, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    kwargs = {}
+    if args.chunk_size:
+        kwargs["chunk_size"] = args.chunk_size
+    if args.workers:
+        kwargs["max_workers"] = args.workers
+
+    batch = BatchJobsModule(
+        StudyPlanModule(args.mongo_uri),
+        LearnerProgressModule(args.mongo_uri),
+        PACTModule(args.mongo_uri),
+        ReviewCyclesModule(args.mongo_uri),
+        OKRModule(ContentMasteryModule(args.mongo_uri), args.mongo_uri),
+        mongo_uri=args.mongo_uri,
+        **kwargs
+    )
+
+    print("🚀 Starting batch jobs...")
+    results = [batch.run_job(job) for job in args.job] if args.job else batch.run_due_jobs()
+    for r in results:
+        if r["status"] == "skipped":
+            print(f"⏭️  {r['job']} [{r['run_key']}]: already done or running elsewhere")
+            continue
+        print(f"✅ {r['job']} [{r['run_key']}]: {r['status']}, {r['users']} users in "
+              f"{r['chunks']} chunks, {r['duration_seconds']}s")
+    print("🏁 Done.")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,25 +8,43 @@ Modules:
 - study_plan.py: Study plans, milestones, daily tasks
 - learner_progress.py: Progress tracking, achievements, sessions
 - adaptive_learning.py: AI recommendations, difficulty adjustment
+- batch_jobs.py: Nightly daily-task / streak / weekly maintenance jobs
+- context_snapshot.py: Composite learner context for the agent (one round trip)
+
+asgi.py serves the same API in async mode (Motor-backed hot reads).
 
 Database: flaskStudyPlanDB
 """
 
 import os
-import logging
 from flask import Flask, jsonify
 from flask_cors import CORS
 from flask_talisman import Talisman
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s %(levelname)s %(name)s %(threadName)s : %(message)s",
-)
+# Queue-backed structured logging: LOG_LEVEL, LOG_LEVELS, LOG_FORMAT=json, LOG_SAMPLE, LOG_RATE_LIMIT
+# Per-request loggers: logger -> (sample rate, records/second per template)
+HOT_LOGGERS = {
+    "hanabira_shared.query_tracker": (1.0, 20),
+}
+from hanabira_shared.logging_setup import configure_logging
+configure_logging(hot_loggers=HOT_LOGGERS)
 
 app = Flask(__name__)
 
+# orjson provider + gzip/brotli for large JSON bodies
+from hanabira_shared.serialization import init_serialization
+init_serialization(app)
+
+# Per-request DB call counts / N+1 warnings (before any MongoClient is created)
+from hanabira_shared.query_tracker import init_query_tracking
+init_query_tracking(app)
+
+# W3C traceparent server spans -> TRACE_DIR/<service>.jsonl (TRACING_ENABLED)
+from hanabira_shared.tracing import init_tracing
+init_tracing(app, "study-plan-service")
+
 # --- Security Configuration ---
 # Talisman for security headers
 csp = {
@@ -37,7 +55,8 @@ csp = {
 }
 Talisman(app, content_security_policy=csp, force_https=False)  # Set force_https=True in production
 
-# Limiter for rate limiting
+# Limiter for rate limiting (RATELIMIT_ENABLED=false for local load tests)
+app.config["RATELIMIT_ENABLED"] = os.getenv("RATELIMIT_ENABLED", "true").lower() == "true"
 limiter = Limiter(
     get_remote_address,
     app=app,
@@ -45,12 +64,18 @@ limiter = Limiter(
     storage_uri="memory://",
 )
 
+# Prometheus /metrics: route latency, Mongo pool stats (before any MongoClient is created)
+from hanabira_shared.metrics import init_metrics
+init_metrics(app, limiter)
+
 # CORS configuration
 allowed_origins = os.environ.get("ALLOWED_ORIGINS", "http://localhost:3000").split(",")
 CORS(app, resources={r"/*": {"origins": allowed_origins}}, supports_credentials=True)
 
 # Service configuration
 SERVICE_PORT = int(os.getenv("STUDY_PLAN_SERVICE_PORT", 5500))
+# One MongoDB URI for every module (and the Motor client in asgi.py)
+MONGODB_URI = os.getenv("MONGODB_URI", "mongodb://localhost:27017/")
 
 # --- Health check endpoint --- #
 @app.route("/health", methods=["GET"])
@@ -70,53 +95,68 @@ def handle_exception(e):
 # ---------------- Module imports ----------------- #
 
 from modules.content_mastery import ContentMasteryModule
-content_mastery_module = ContentMasteryModule()
+content_mastery_module = ContentMasteryModule(MONGODB_URI)
 content_mastery_module.register_routes(app)
 
 from modules.smart_goals import SmartGoalsModule
-smart_goals_module = SmartGoalsModule()
+smart_goals_module = SmartGoalsModule(MONGODB_URI)
 smart_goals_module.register_routes(app)
 
 from modules.okr import OKRModule
-okr_module = OKRModule(content_mastery_module)
+okr_module = OKRModule(content_mastery_module, MONGODB_URI)
 okr_module.register_routes(app)
 
 from modules.pact import PACTModule
-pact_module = PACTModule()
+pact_module = PACTModule(MONGODB_URI)
 pact_module.register_routes(app)
 
 from modules.context import ContextModule
-context_module = ContextModule()
+context_module = ContextModule(MONGODB_URI)
 context_module.register_routes(app)
 
 from modules.priority import PriorityMatrixModule
-priority_matrix_module = PriorityMatrixModule()
+priority_matrix_module = PriorityMatrixModule(MONGODB_URI)
 priority_matrix_module.register_routes(app)
 
 from modules.review_cycles import ReviewCyclesModule
-review_cycles_module = ReviewCyclesModule()
+review_cycles_module = ReviewCyclesModule(MONGODB_URI)
 review_cycles_module.register_routes(app)
 
 from modules.study_plan import StudyPlanModule
-study_plan_module = StudyPlanModule()
+study_plan_module = StudyPlanModule(MONGODB_URI)
 study_plan_module.register_routes(app)
 
 from modules.learner_progress import LearnerProgressModule
-learner_progress_module = LearnerProgressModule()
+learner_progress_module = LearnerProgressModule(MONGODB_URI)
 learner_progress_module.register_routes(app)
 
 from modules.adaptive_learning import AdaptiveLearningModule
-adaptive_learning_module = AdaptiveLearningModule()
+adaptive_learning_module = AdaptiveLearningModule(MONGODB_URI)
 adaptive_learning_module.register_routes(app)
 
 from modules.user_preferences import UserPreferencesModule
-user_preferences_module = UserPreferencesModule()
+user_preferences_module = UserPreferencesModule(MONGODB_URI)
 user_preferences_module.register_routes(app)
 
 from modules.performance import PerformanceModule
-performance_module = PerformanceModule()
+performance_module = PerformanceModule(MONGODB_URI)
 performance_module.register_routes(app)
 
+from modules.context_snapshot import ContextSnapshotModule
+context_snapshot_module = ContextSnapshotModule(
+    study_plan_module, learner_progress_module, performance_module, user_preferences_module
+)
+context_snapshot_module.register_routes(app)
+
+from modules.batch_jobs import BatchJobsModule
+batch_jobs_module = BatchJobsModule(
+    study_plan_module, learner_progress_module, pact_module, review_cycles_module, okr_module,
+    mongo_uri=MONGODB_URI
+)
+batch_jobs_module.register_routes(app)
+if os.getenv("BATCH_SCHEDULER_ENABLED", "true").lower() == "true":
+    batch_jobs_module.start_scheduler()
+
 # --------------- End of Module imports ---------------- #
 
 
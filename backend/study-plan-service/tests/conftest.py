@@ -0,0 +1,99 @@
+import threading
+import time
+from contextlib import contextmanager
+
+import pytest
+from mongomock import aggregate
+from mongomock.collection import Collection
+
+from hanabira_shared import query_tracker
+
+# mongomock emits no command events, so the tests feed hanabira_shared.query_tracker
+# from the collection methods instead: method -> (wire command, args -> command doc)
+_FILTER = lambda name, a, k: {"filter": a[0] if a else k.get("filter", {})}
+_MOCK_COMMANDS = {
+    "find": ("find", _FILTER),
+    "find_one": ("find", _FILTER),
+    "count_documents": ("aggregate", lambda n, a, k: {"pipeline": [{"$match": a[0] if a else k.get("filter", {})}]}),
+    "aggregate": ("aggregate", lambda n, a, k: {"pipeline": a[0] if a else k.get("pipeline", [])}),
+    "distinct": ("distinct", lambda n, a, k: {"query": a[1] if len(a) > 1 else k.get("filter") or {}}),
+    "insert_one": ("insert", lambda n, a, k: {}),
+    "insert_many": ("insert", lambda n, a, k: {}),
+    "update_one": ("update", lambda n, a, k: {"updates": [{"q": a[0] if a else k.get("filter", {})}]}),
+    "update_many": ("update", lambda n, a, k: {"updates": [{"q": a[0] if a else k.get("filter", {})}]}),
+    "replace_one": ("update", lambda n, a, k: {"updates": [{"q": a[0] if a else k.get("filter", {})}]}),
+    "delete_one": ("delete", lambda n, a, k: {"deletes": [{"q": a[0] if a else k.get("filter", {})}]}),
+    "delete_many": ("delete", lambda n, a, k: {"deletes": [{"q": a[0] if a else k.get("filter", {})}]}),
+    "find_one_and_update": ("findAndModify", lambda n, a, k: {"query": a[0] if a else k.get("filter", {})}),
+    "bulk_write": ("bulkWrite", lambda n, a, k: {}),
+}
+_depth = threading.local()
+
+
+def _instrument(method, command, build):
+    def tracked(self, *args, **kwargs):
+        # find_one -> find etc.: only the outermost call is a round trip
+        outer = getattr(_depth, "n", 0) == 0
+        _depth.n = getattr(_depth, "n", 0) + 1
+        start = time.perf_counter()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            _depth.n -= 1
+            if outer:
+                doc = {command: self.name, **build(self.name, args, kwargs)}
+                query_tracker.record(query_tracker.mongo_shape(command, doc), command,
+                                     (time.perf_counter() - start) * 1000)
+    return tracked
+
+
+for _name, (_command, _build) in _MOCK_COMMANDS.items():
+    setattr(Collection, _name, _instrument(getattr(Collection, _name), _command, _build))
+
+
+def _merge_stage(in_collection, database, options):
+    """
+    mongomock has no $merge: this covers the form the services use, `into` and
+    `on` with whenMatched "replace" or a single $replaceWith stage ($$ROOT/$$new).
+    """
+    target = database.get_collection(options["into"])
+    on = options.get("on", ["_id"])
+    on = [on] if isinstance(on, str) else on
+    when_matched = options.get("whenMatched", "merge")
+    for doc in in_collection:
+        existing = target.find_one({field: doc[field] for field in on})
+        if existing is None:
+            target.insert_one(dict(doc))
+            continue
+        if when_matched == "replace":
+            merged = doc
+        else:
+            (stage,) = when_matched
+            merged = aggregate._Parser(existing, user_vars={"new": doc}).parse(stage["$replaceWith"])
+        target.replace_one({"_id": existing["_id"]}, {k: v for k, v in merged.items() if k != "_id"})
+    return []
+
+
+aggregate._PIPELINE_HANDLERS["$merge"] = _merge_stage
+
+
+@pytest.fixture
+def query_budget():
+    """
+    Assert a DB call budget for a block:
+
+        with query_budget(4):
+            client.get("/v1/study-plan/daily-tasks", headers=...)
+
+    Fails if the block issues more than `max_queries` calls, or repeats one
+    query shape more than `max_repeats` times (an N+1).
+    """
+    @contextmanager
+    def budget(max_queries: int, max_repeats: int = query_tracker.QUERY_REPEAT_THRESHOLD):
+        with query_tracker.track_queries() as stats:
+            yield stats
+        assert stats.count <= max_queries, (
+            f"{stats.count} DB calls (budget {max_queries}): {stats.summary(top=10)['top_shapes']}")
+        repeated = stats.repeated(max_repeats)
+        assert not repeated, f"Query shapes repeated more than {max_repeats}x: {repeated}"
+    return budget
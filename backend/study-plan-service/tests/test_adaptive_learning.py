@@ -0,0 +1,115 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from modules.adaptive_learning import AdaptiveLearningModule
+from utils.recommendation_cache import RecommendationCache, invalidate_recommendations
+from utils.auth import JWT_SECRET, JWT_ALGORITHM
+import jwt
+import mongomock
+from flask import Flask
+
+@pytest.fixture
+def mock_adaptive():
+    app = Flask(__name__)
+    client = mongomock.MongoClient()
+
+    al = AdaptiveLearningModule()
+    al.mongo_client = client
+    al.db = client["flaskStudyPlanDB"]
+    al.progress_collection = al.db["learner_progress"]
+    al.activities_collection = al.db["learning_activities"]
+    al.recommendations_collection = al.db["learning_recommendations"]
+    al.difficulty_settings_collection = al.db["difficulty_settings"]
+    al.recommendation_cache = RecommendationCache(al.db["recommendation_cache"])
+
+    al.register_routes(app)
+    return app, al
+
+def seed_activities(al, user_id, score):
+    now = datetime.now(timezone.utc)
+    al.activities_collection.insert_many([
+        {"user_id": user_id, "category": "grammar", "score": score, "timestamp": now - timedelta(hours=i)}
+        for i in range(3)
+    ])
+    al.progress_collection.insert_one({"user_id": user_id, "current_streak": 2})
+
+def test_recommendations_served_from_cache(mock_adaptive):
+    app, al = mock_adaptive
+    seed_activities(al, "user123", 50)
+
+    first = al.get_recommendations("user123")
+    assert first["focus_area"] == "grammar"
+
+    # Data changes without an invalidation are not seen (cached)
+    al.activities_collection.delete_many({})
+    second = al.get_recommendations("user123")
+    assert second == first
+
+    stats = al.recommendation_cache.stats()
+    assert stats["misses"] == 1
+    assert stats["hits"] == 1
+
+def test_invalidation_recomputes(mock_adaptive):
+    app, al = mock_adaptive
+    seed_activities(al, "user123", 50)
+    al.get_recommendations("user123")
+
+    al.activities_collection.delete_many({})
+    invalidate_recommendations(al.db, "user123")
+
+    result = al.get_recommendations("user123")
+    assert result["recommendations"][0]["type"] == "welcome"
+    assert al.recommendation_cache.stats()["misses"] == 2
+
+def test_expired_entry_recomputes(mock_adaptive):
+    app, al = mock_adaptive
+    seed_activities(al, "user123", 50)
+    al.get_recommendations("user123")
+
+    # Same version, but cached over a day ago -> miss
+    al.activities_collection.delete_many({})
+    al.db["recommendation_cache"].update_one(
+        {"user_id": "user123"},
+        {"$set": {"cached_at": datetime.now(timezone.utc) - timedelta(days=1, minutes=1)}}
+    )
+
+    result = al.get_recommendations("user123")
+    assert result["recommendations"][0]["type"] == "welcome"
+    assert al.recommendation_cache.stats()["misses"] == 2
+
+def test_stale_computation_not_stored(mock_adaptive):
+    _, al = mock_adaptive
+    _, version = al.recommendation_cache.get("user123")
+
+    # Invalidated while computing -> result must not be cached
+    invalidate_recommendations(al.db, "user123")
+    assert al.recommendation_cache.put("user123", version, {"recommendations": []}) is False
+
+    payload, _ = al.recommendation_cache.get("user123")
+    assert payload is None
+
+def test_adjust_difficulty_invalidates(mock_adaptive):
+    app, al = mock_adaptive
+    seed_activities(al, "user123", 50)
+    al.get_difficulty_settings("user123")
+    al.get_recommendations("user123")
+    version_before = al.db["recommendation_cache"].find_one({"user_id": "user123"})["version"]
+
+    result = al.adjust_difficulty("user123", "grammar", 20)
+    assert result["adjusted"] is True
+
+    version_after = al.db["recommendation_cache"].find_one({"user_id": "user123"})["version"]
+    assert version_after == version_before + 1
+
+def test_cache_stats_endpoint(mock_adaptive):
+    app, al = mock_adaptive
+    client = app.test_client()
+
+    client.get("/v1/adaptive/recommendations/user123")
+    client.get("/v1/adaptive/recommendations/user123")
+
+    assert client.get("/v1/adaptive/recommendations/cache-stats").status_code == 401
+
+    token = jwt.encode({"userId": "user123"}, JWT_SECRET, algorithm=JWT_ALGORITHM)
+    res = client.get("/v1/adaptive/recommendations/cache-stats", headers={"Authorization": f"Bearer {token}"})
+    assert res.status_code == 200
+    assert res.get_json() == {"hits": 1, "misses": 1, "hit_rate": 0.5}
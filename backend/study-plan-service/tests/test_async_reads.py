@@ -0,0 +1,237 @@
+"""
+ASGI mode parity: the Motor-backed routes in modules/async_reads.py must
+return the same bodies as the Flask routes they shadow, on the same data.
+
+Motor is driven over mongomock through a thin async adapter, so both modes
+read the very same collections.
+"""
+import asyncio
+import jwt
+import pytest
+from datetime import datetime, timedelta, timezone
+import httpx
+import mongomock
+from fastapi import FastAPI
+from fastapi.middleware.wsgi import WSGIMiddleware
+from flask import Flask
+from modules.async_reads import AsyncReadModule
+from modules.context_snapshot import ContextSnapshotModule
+from modules.learner_progress import LearnerProgressModule
+from modules.performance import PerformanceModule
+from modules.priority import PriorityMatrixModule
+from modules.study_plan import StudyPlanModule
+from modules.user_preferences import UserPreferencesModule
+from utils.auth import JWT_SECRET, JWT_ALGORITHM
+from hanabira_shared.serialization import init_serialization
+
+
+class AsyncCursor:
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    def sort(self, *args, **kwargs):
+        self.cursor = self.cursor.sort(*args, **kwargs)
+        return self
+
+    def limit(self, n):
+        self.cursor = self.cursor.limit(n)
+        return self
+
+    async def to_list(self, length=None):
+        docs = list(self.cursor)
+        return docs if length is None else docs[:length]
+
+
+class AsyncCollection:
+    def __init__(self, collection):
+        self.collection = collection
+        self.name = collection.name
+
+    async def find_one(self, *args, **kwargs):
+        return self.collection.find_one(*args, **kwargs)
+
+    def find(self, *args, **kwargs):
+        return AsyncCursor(self.collection.find(*args, **kwargs))
+
+    def aggregate(self, pipeline):
+        return AsyncCursor(iter(list(self.collection.aggregate(pipeline))))
+
+
+class AsyncDatabase:
+    def __init__(self, db):
+        self.db = db
+
+    def __getitem__(self, name):
+        return AsyncCollection(self.db[name])
+
+
+def auth_header(user_id):
+    token = jwt.encode({"userId": user_id}, JWT_SECRET, algorithm=JWT_ALGORITHM)
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def serving():
+    app = Flask(__name__)
+    init_serialization(app)
+    client = mongomock.MongoClient()
+    db = client["flaskStudyPlanDB"]
+
+    sp = StudyPlanModule()
+    sp.mongo_client = client
+    sp.study_db = db
+    sp.plans_collection = db["study_plans"]
+    sp.milestones_collection = db["milestones"]
+    sp.tasks_collection = db["daily_tasks"]
+    sp.templates_collection = db["plan_templates"]
+
+    lp = LearnerProgressModule()
+    lp.mongo_client = client
+    lp.db = db
+    lp.progress_collection = db["learner_progress"]
+    lp.activities_collection = db["learning_activities"]
+    lp.achievements_collection = db["user_achievements"]
+    lp.sessions_collection = db["study_sessions"]
+
+    pm = PriorityMatrixModule()
+    pm.client = client
+    pm.db = db
+    pm.queue = db["priority_queue"]
+    pm.errors = db["error_analysis"]
+    pm.mastery = db["user_content_mastery"]
+    pm.interactions = db["content_interactions"]
+
+    perf = PerformanceModule()
+    perf.client = client
+    perf.db = db
+    perf.performance_trackings = db["performance_trackings"]
+    perf.performance_daily = db["performance_trackings_daily"]
+
+    prefs = UserPreferencesModule()
+    prefs.client = client
+    prefs.db = db
+    prefs.study_sessions = db["study_sessions"]
+
+    snap = ContextSnapshotModule(sp, lp, perf, prefs)
+    for module in (sp, lp, pm, snap):
+        module.register_routes(app)
+
+    reads = AsyncReadModule(app, sp, lp, pm, snap)
+    reads._bind(AsyncDatabase(db))
+    api = FastAPI()
+    reads.register_routes(api)
+    api.mount("/", WSGIMiddleware(app))
+    return app, api, db, perf
+
+
+def get_async(api, path, headers=None):
+    async def request():
+        transport = httpx.ASGITransport(app=api)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get(path, headers=headers)
+    return asyncio.run(request())
+
+
+def assert_same(app, api, path, headers=None):
+    sync = app.test_client().get(path, headers=headers)
+    async_ = get_async(api, path, headers)
+    assert sync.status_code == async_.status_code == 200
+    assert async_.json() == sync.get_json()
+    return sync.get_json()
+
+
+def seed(db, perf, user_id="user123"):
+    now = datetime.now(timezone.utc)
+    plan_id = db["study_plans"].insert_one({
+        "user_id": user_id, "status": "active", "target_level": "N4",
+        "exam_date": now + timedelta(days=60), "start_date": now - timedelta(days=30),
+        "created_at": now - timedelta(days=30)
+    }).inserted_id
+    db["milestones"].insert_one({
+        "plan_id": plan_id, "milestone_number": 1, "title": "Core Vocabulary", "status": "in_progress",
+        "target_start_date": now - timedelta(days=30), "target_end_date": now + timedelta(days=10),
+        "criteria": [{"type": "vocab_count", "target_value": 100, "current_value": 40}]
+    })
+    db["daily_tasks"].insert_many([
+        {"user_id": user_id, "plan_id": plan_id, "date": now, "title": "SRS Review", "task_type": "flashcard",
+         "description": "", "status": "completed", "estimated_minutes": 15},
+        {"user_id": user_id, "plan_id": plan_id, "date": now, "title": "Grammar", "task_type": "grammar",
+         "description": "", "status": "pending", "estimated_minutes": 20},
+    ])
+    db["learner_progress"].insert_one({"user_id": user_id, "current_streak": 3, "total_study_minutes": 120,
+                                       "created_at": now - timedelta(days=30)})
+    db["user_achievements"].insert_many([
+        {"user_id": user_id, "achievement_id": "first_review", "earned_at": now - timedelta(days=20)},
+        {"user_id": user_id, "achievement_id": "streak_3", "earned_at": now - timedelta(days=1)},
+    ])
+    db["learning_activities"].insert_many([
+        {"user_id": user_id, "activity_type": "flashcard_review", "timestamp": now - timedelta(hours=h),
+         "data": {"count": 10, "duration_minutes": 5}}
+        for h in range(0, 72, 12)
+    ])
+    db["study_sessions"].insert_one({"user_id": user_id, "created_at": now, "duration_minutes": 20})
+    db["priority_queue"].insert_one({"user_id": user_id, "items": [], "last_calculated": now,
+                                     "recommended_time_allocation": {"red": 33, "yellow": 34, "green": 33}})
+    perf.log_tracking(user_id, {"summary": "particle mixups", "note_audit_details": "", "note_quality_score": 7})
+
+
+def test_progress_matches_flask(serving):
+    app, api, db, perf = serving
+    seed(db, perf)
+    body = assert_same(app, api, "/v1/learner/progress/user123", auth_header("user123"))
+    assert body["achievements_count"] == 2
+    assert {a["achievement_id"] for a in body["achievements"]} == {"first_review", "streak_3"}
+
+
+def test_daily_tasks_matches_flask(serving):
+    app, api, db, perf = serving
+    seed(db, perf)
+    body = assert_same(app, api, "/v1/study-plan/daily-tasks", auth_header("user123"))
+    assert len(body["tasks"]) == 2
+
+
+def test_priority_matrix_matches_flask(serving):
+    app, api, db, perf = serving
+    seed(db, perf)
+    assert_same(app, api, "/v1/priority-matrix/?user_id=user123")
+
+
+def test_context_snapshot_matches_flask(serving):
+    app, api, db, perf = serving
+    seed(db, perf)
+    body = assert_same(app, api, "/v1/context/snapshot/user123", auth_header("user123"))
+    assert "errors" not in body
+
+
+def test_auth_errors_match_flask(serving):
+    app, api, _, _ = serving
+    for headers in (None, {"Authorization": "Bearer nope"}, auth_header("someone_else")):
+        sync = app.test_client().get("/v1/learner/progress/user123", headers=headers)
+        async_ = get_async(api, "/v1/learner/progress/user123", headers)
+        assert async_.status_code == sync.status_code
+        assert async_.json() == sync.get_json()
+
+
+def test_native_routes_run_flask_hooks(serving):
+    from flask_limiter import Limiter
+    from flask_limiter.util import get_remote_address
+    from flask_talisman import Talisman
+    from hanabira_shared.query_tracker import DEBUG_HEADER, init_query_tracking
+
+    app, api, db, perf = serving
+    seed(db, perf)
+    app.debug = True
+    init_query_tracking(app)
+    Talisman(app, force_https=False)
+    Limiter(get_remote_address, app=app, default_limits=["2 per minute"], storage_uri="memory://")
+    path, headers = "/v1/learner/progress/user123", auth_header("user123")
+
+    res = get_async(api, path, headers)
+    assert res.status_code == 200
+    assert res.headers["X-Frame-Options"] == "SAMEORIGIN"
+    assert "Content-Security-Policy" in res.headers
+    assert int(res.headers[DEBUG_HEADER].split(";")[0]) >= 4
+
+    # Flask and the native route count against the same rate limit bucket
+    assert app.test_client().get(path, headers=headers, environ_base={"REMOTE_ADDR": "127.0.0.1"}).status_code == 200
+    assert get_async(api, path, headers).status_code == 429
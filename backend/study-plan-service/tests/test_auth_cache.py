@@ -0,0 +1,99 @@
+import pytest
+import time
+import jwt
+from flask import Flask, jsonify, request
+import utils.auth as auth
+from utils.auth import TokenCache, decode_token, login_required, rotate_signing_key
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    # A new cache, so hit/miss counters left by other test modules do not leak in
+    secret, algorithm = auth.JWT_SECRET, auth.JWT_ALGORITHM
+    monkeypatch.setattr(auth, "token_cache", TokenCache())
+    auth.token_cache.bind(secret, algorithm)
+    yield auth.token_cache
+    rotate_signing_key(secret, algorithm)
+
+@pytest.fixture
+def decode_calls(monkeypatch):
+    calls = []
+    real = jwt.decode
+    def counting(*args, **kwargs):
+        calls.append(args[0])
+        return real(*args, **kwargs)
+    monkeypatch.setattr(auth.jwt, "decode", counting)
+    return calls
+
+def make_token(user_id="user123", ttl=3600, secret=None):
+    return jwt.encode({"userId": user_id, "exp": int(time.time()) + ttl},
+                      secret or auth.JWT_SECRET, algorithm=auth.JWT_ALGORITHM)
+
+def test_verified_claims_are_reused(decode_calls):
+    token = make_token()
+    first = decode_token(token)
+    first["userId"] = "tampered"
+
+    assert decode_token(token)["userId"] == "user123"
+    assert len(decode_calls) == 1
+    assert auth.token_cache.stats()["hits"] == 1
+
+def test_entries_expire_with_the_token():
+    cache = TokenCache()
+    cache.put("live", {"userId": "a", "exp": time.time() + 60})
+    cache.put("dead", {"userId": "b", "exp": time.time() - 1})
+
+    assert cache.get("live") == ({"userId": "a", "exp": pytest.approx(time.time() + 60, abs=5)}, None)
+    assert cache.get("dead") is None
+    assert cache.stats()["size"] == 1
+
+def test_invalid_and_expired_tokens_are_negative_cached(decode_calls):
+    forged = make_token(secret="not-the-service-key")
+    expired = make_token(ttl=-10)
+
+    for _ in range(3):
+        with pytest.raises(jwt.InvalidSignatureError):
+            decode_token(forged)
+        with pytest.raises(jwt.ExpiredSignatureError):
+            decode_token(expired)
+    assert len(decode_calls) == 2
+
+def test_key_rotation_clears_cache():
+    token = make_token()
+    decode_token(token)
+
+    rotate_signing_key("rotated-secret-key-for-tests-only")
+    with pytest.raises(jwt.InvalidSignatureError):
+        decode_token(token)
+    assert decode_token(make_token())["userId"] == "user123"
+
+def test_lru_is_bounded():
+    cache = TokenCache(max_size=3)
+    for i in range(5):
+        cache.put(f"t{i}", {"userId": str(i)})
+    assert cache.get("t0") is None
+    assert cache.get("t4") is not None
+    assert cache.stats()["size"] == 3
+
+def test_decorator_verifies_each_token_once(decode_calls):
+    app = Flask(__name__)
+
+    @login_required
+    def view():
+        return jsonify({"user": request.user["userId"]})
+
+    headers = {"Authorization": f"Bearer {make_token()}"}
+    n = 50
+
+    def verify_calls(clear):
+        decode_calls.clear()
+        auth.token_cache.clear()
+        with app.test_request_context(headers=headers):
+            for _ in range(n):
+                if clear:
+                    auth.token_cache.clear()
+                view()
+        return len(decode_calls)
+
+    # Cold: every request verifies the signature; warm: only the first one does
+    assert verify_calls(clear=True) == n
+    assert verify_calls(clear=False) == 1
@@ -0,0 +1,199 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from modules.batch_jobs import BatchJobsModule
+from modules.study_plan import StudyPlanModule
+from modules.learner_progress import LearnerProgressModule
+from modules.pact import PACTModule
+from modules.review_cycles import ReviewCyclesModule
+from utils.auth import JWT_SECRET, JWT_ALGORITHM
+import jwt
+import mongomock
+from flask import Flask
+
+# A Monday after the run hour, so daily and weekly jobs are all due
+NOW = datetime(2026, 3, 2, 3, 0, tzinfo=timezone.utc)
+
+@pytest.fixture
+def batch():
+    app = Flask(__name__)
+    client = mongomock.MongoClient()
+    db = client["flaskStudyPlanDB"]
+
+    sp = StudyPlanModule()
+    sp.mongo_client = client
+    sp.study_db = db
+    sp.plans_collection = db["study_plans"]
+    sp.milestones_collection = db["milestones"]
+    sp.tasks_collection = db["daily_tasks"]
+    sp.tasks_collection.create_index(
+        [("user_id", 1), ("date", 1), ("task_key", 1)],
+        unique=True,
+        partialFilterExpression={"task_key": {"$exists": True}}
+    )
+
+    lp = LearnerProgressModule()
+    lp.mongo_client = client
+    lp.db = db
+    lp.progress_collection = db["learner_progress"]
+    lp.activities_collection = db["learning_activities"]
+
+    pact = PACTModule()
+    pact.client = client
+    pact.db = db
+    pact.commitments = db["pact_commitments"]
+    pact.actions_log = db["pact_actions_log"]
+    pact.progress = db["learner_progress"]
+
+    rc = ReviewCyclesModule()
+    rc.client = client
+    rc.db = db
+    rc.reviews = db["review_cycles"]
+    rc.sessions = db["study_sessions"]
+    rc.mastery = db["user_content_mastery"]
+    rc.interactions = db["content_interactions"]
+    rc.commitments = db["pact_commitments"]
+    rc.queue = db["priority_queue"]
+    rc.interactions_daily = db["content_interactions_daily"]
+    rc.archive_state = db["event_archive_state"]
+
+    jobs = BatchJobsModule(sp, lp, pact, rc, chunk_size=2, max_workers=2)
+    jobs.client = client
+    jobs.db = db
+    jobs.runs = db["batch_job_runs"]
+    jobs.runs.create_index([("job", 1), ("run_key", 1)], unique=True)
+
+    jobs.register_routes(app)
+    return app, jobs
+
+def seed_plans(jobs, n):
+    jobs.study_plan.plans_collection.insert_many([
+        {"user_id": f"user{i}", "status": "active", "daily_study_minutes": 30,
+         "created_at": datetime(2026, 1, 1)}
+        for i in range(n)
+    ])
+
+def test_daily_tasks_chunked_and_idempotent(batch):
+    _, jobs = batch
+    seed_plans(jobs, 5)
+
+    result = jobs.run_job("daily_tasks", NOW)
+    assert result["status"] == "completed"
+    assert result["users"] == 5
+    assert result["chunks"] == 3
+    created = jobs.study_plan.tasks_collection.count_documents({})
+    assert created > 0
+
+    # Completed run is skipped; storing the same tasks again adds nothing
+    assert jobs.run_job("daily_tasks", NOW)["status"] == "skipped"
+    plan = jobs.study_plan.plans_collection.find_one({"user_id": "user0"})
+    tasks = jobs.study_plan.build_daily_tasks(plan, None, NOW.replace(hour=0))
+    assert jobs.study_plan.store_daily_tasks(tasks) == 0
+    assert jobs.study_plan.tasks_collection.count_documents({}) == created
+
+def test_run_resumes_after_failed_chunk(batch):
+    _, jobs = batch
+    seed_plans(jobs, 4)
+
+    original = jobs.jobs["daily_tasks"]["chunk"]
+    def flaky(user_ids, now):
+        if "user3" in user_ids:
+            raise RuntimeError("mongo went away")
+        return original(user_ids, now)
+    jobs.jobs["daily_tasks"]["chunk"] = flaky
+
+    first = jobs.run_job("daily_tasks", NOW)
+    assert first["status"] == "failed"
+    assert first["failed_chunks"] == 1
+
+    # The retry only processes the chunk that failed
+    jobs.jobs["daily_tasks"]["chunk"] = original
+    second = jobs.run_job("daily_tasks", NOW)
+    assert second["status"] == "completed"
+    assert second["users"] == 2
+    assert sorted(jobs.study_plan.tasks_collection.distinct("user_id")) == ["user0", "user1", "user2", "user3"]
+
+    run = jobs.runs.find_one({"job": "daily_tasks"})
+    assert run["attempts"] == 2
+    assert run["metrics"]["users"] == 4
+
+def test_live_lease_blocks_second_worker(batch):
+    _, jobs = batch
+    jobs.runs.insert_one({
+        "job": "pact_streaks", "run_key": NOW.date().isoformat(), "status": "running",
+        "lease_until": NOW + timedelta(minutes=5), "started_at": NOW
+    })
+    assert jobs.run_job("pact_streaks", NOW)["status"] == "skipped"
+
+def test_weekly_jobs(batch):
+    _, jobs = batch
+    last_week = NOW - timedelta(days=3)
+    jobs.learner_progress.progress_collection.insert_many([
+        {"user_id": "user1", "last_activity_date": last_week,
+         "weekly_goals": {"flashcard_reviews": {"current": 40, "target": 100}}},
+        {"user_id": "user2", "last_activity_date": NOW - timedelta(days=60),
+         "weekly_goals": {"flashcard_reviews": {"current": 5, "target": 100}}},
+    ])
+
+    results = {r["job"]: r for r in jobs.run_due_jobs(NOW)}
+    assert set(results) == {"daily_tasks", "pact_streaks", "weekly_goals_reset", "weekly_reviews"}
+    assert results["weekly_goals_reset"]["run_key"] == "2026-W10"
+
+    for doc in jobs.learner_progress.progress_collection.find():
+        assert doc["weekly_goals"]["flashcard_reviews"]["current"] == 0
+
+    # Only the recently active user gets a review, covering last week
+    reviews = list(jobs.review_cycles.reviews.find())
+    assert [r["user_id"] for r in reviews] == ["user1"]
+    assert reviews[0]["period_start"] == datetime(2026, 2, 23)
+
+def test_weekly_jobs_due_until_completed_this_week(batch):
+    _, jobs = batch
+    tuesday = NOW + timedelta(days=1)
+    assert jobs.is_due("weekly_reviews", NOW.replace(hour=0)) is False
+    assert jobs.is_due("daily_tasks", tuesday.replace(hour=0)) is False
+
+    # Scheduler down all Monday: the weekly jobs are still due on Tuesday, at any hour
+    assert jobs.is_due("weekly_reviews", tuesday.replace(hour=0)) is True
+    assert jobs.run_job("weekly_reviews", tuesday)["status"] == "completed"
+    assert jobs.is_due("weekly_reviews", tuesday + timedelta(days=3)) is False
+    assert jobs.is_due("weekly_reviews", NOW + timedelta(days=7)) is True
+
+    jobs.run_job("daily_tasks", tuesday)
+    assert jobs.is_due("daily_tasks", tuesday) is False
+    assert jobs.is_due("daily_tasks", tuesday + timedelta(days=1)) is True
+
+def test_late_weekly_reset_keeps_this_weeks_progress(batch):
+    _, jobs = batch
+    wednesday = NOW + timedelta(days=2)
+    jobs.learner_progress.progress_collection.insert_many([
+        {"user_id": "user1", "last_activity_date": NOW - timedelta(days=3),
+         "weekly_goals": {"flashcard_reviews": {"current": 40, "target": 100}}},
+        {"user_id": "user2", "last_activity_date": wednesday - timedelta(hours=1),
+         "weekly_goals": {"flashcard_reviews": {"current": 12, "target": 100}}},
+    ])
+
+    # Missed on Monday, caught up on Wednesday
+    assert jobs.is_due("weekly_goals_reset", wednesday) is True
+    assert jobs.run_job("weekly_goals_reset", wednesday)["status"] == "completed"
+
+    current = {d["user_id"]: d["weekly_goals"]["flashcard_reviews"]["current"]
+               for d in jobs.learner_progress.progress_collection.find()}
+    assert current == {"user1": 0, "user2": 12}
+
+def test_metrics_endpoint(batch):
+    app, jobs = batch
+    seed_plans(jobs, 3)
+    jobs.run_job("daily_tasks", NOW)
+
+    client = app.test_client()
+    assert client.get("/v1/batch/metrics").status_code == 401
+
+    token = jwt.encode({"userId": "user123"}, JWT_SECRET, algorithm=JWT_ALGORITHM)
+    res = client.get("/v1/batch/metrics", headers={"Authorization": f"Bearer {token}"})
+    assert res.status_code == 200
+    daily = res.get_json()["jobs"]["daily_tasks"]
+    assert daily["status"] == "completed"
+    assert daily["users"] == 3
+    assert daily["chunks"] == 2
+    assert daily["tasks_created"] > 0
+    assert "last_attempt_seconds" in daily
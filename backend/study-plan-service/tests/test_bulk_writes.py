@@ -0,0 +1,113 @@
+"""
+Regression benchmark for the bulk write paths: a few hundred items per call
+must go out as a fixed number of write commands, never one per item.
+"""
+import pytest
+from datetime import datetime, timedelta, timezone
+from modules.study_plan import StudyPlanModule
+from modules.smart_goals import SmartGoalsModule
+import mongomock
+from flask import Flask
+from bson import ObjectId
+
+N_ITEMS = 300
+
+class WriteCounter:
+    """Wrap a collection and count write calls by method name."""
+    WRITES = ("insert_one", "insert_many", "update_one", "update_many", "bulk_write")
+
+    def __init__(self, collection):
+        self._collection = collection
+        self.calls = {}
+
+    def __getattr__(self, name):
+        attr = getattr(self._collection, name)
+        if name in self.WRITES:
+            def counted(*args, **kwargs):
+                self.calls[name] = self.calls.get(name, 0) + 1
+                return attr(*args, **kwargs)
+            return counted
+        return attr
+
+@pytest.fixture
+def study_plan():
+    client = mongomock.MongoClient()
+    sp = StudyPlanModule()
+    sp.mongo_client = client
+    sp.study_db = client["flaskStudyPlanDB"]
+    sp.plans_collection = sp.study_db["study_plans"]
+    sp.milestones_collection = WriteCounter(sp.study_db["milestones"])
+    sp.tasks_collection = WriteCounter(sp.study_db["daily_tasks"])
+    return sp
+
+@pytest.fixture
+def smart():
+    app = Flask(__name__)
+    client = mongomock.MongoClient()
+    sg = SmartGoalsModule()
+    sg.client = client
+    sg.db = client["flaskStudyPlanDB"]
+    sg.goals = WriteCounter(sg.db["smart_goals"])
+    sg.register_routes(app)
+    return app, sg
+
+def test_log_activity_single_update(study_plan):
+    today = datetime.now(timezone.utc).replace(hour=12)
+    study_plan.tasks_collection.insert_many([
+        {"user_id": "user123", "date": today, "status": "pending", "task_type": "flashcard"}
+        for _ in range(N_ITEMS)
+    ])
+    study_plan.tasks_collection.calls.clear()
+
+    result = study_plan.log_activity("user123", {"type": "flashcard_review", "duration_seconds": 600})
+
+    assert result["tasks_updated"] == N_ITEMS
+    assert study_plan.tasks_collection.calls == {"update_many": 1}
+    assert study_plan.tasks_collection.count_documents({"status": "completed", "actual_duration": 10}) == N_ITEMS
+
+def test_recalculate_milestones_single_bulk_write(study_plan):
+    now = datetime.now(timezone.utc)
+    plan_id = study_plan.plans_collection.insert_one({
+        "user_id": "user123", "status": "active",
+        "start_date": now, "exam_date": now + timedelta(days=7 * N_ITEMS * 2)
+    }).inserted_id
+    study_plan.milestones_collection.insert_many([
+        {"plan_id": plan_id, "milestone_number": i + 1, "title": f"M{i + 1}",
+         "status": "pending", "target_end_date": now}
+        for i in range(N_ITEMS)
+    ])
+    study_plan.milestones_collection.calls.clear()
+
+    result = study_plan.recalculate_milestones(plan_id)
+
+    assert len(result["adjustments"]) == N_ITEMS
+    assert study_plan.milestones_collection.calls == {"bulk_write": 1}
+    last = study_plan.milestones_collection.find_one({"milestone_number": N_ITEMS})
+    assert last["target_end_date"].date() == (now + timedelta(days=7 * N_ITEMS * 2 - 7)).date()
+
+def test_batch_update_goals_per_item_results(smart):
+    app, sg = smart
+    own_ids = [str(oid) for oid in sg.goals.insert_many([
+        {"user_id": "user123", "title": f"Goal {i}", "status": "active"} for i in range(N_ITEMS)
+    ]).inserted_ids]
+    other_id = str(sg.goals.insert_one({"user_id": "someone_else", "title": "Not mine"}).inserted_id)
+    sg.goals.calls.clear()
+
+    updates = [{"id": gid, "fields": {"status": "completed"}} for gid in own_ids]
+    updates += [
+        {"id": other_id, "fields": {"status": "completed"}},
+        {"id": str(ObjectId()), "fields": {}},
+        {"id": "not-an-id", "fields": {}},
+        {"fields": {"title": "new"}},
+    ]
+
+    res = app.test_client().post("/v1/smart-goals/batch", json={"user_id": "user123", "updates": updates})
+
+    assert res.status_code == 200
+    body = res.get_json()
+    assert body["updated_count"] == N_ITEMS
+    assert body["ids"] == own_ids
+    assert [r["status"] for r in body["results"][-4:]] == ["not_found", "not_found", "invalid_id", "skipped"]
+    assert sg.goals.calls == {"bulk_write": 1}
+    assert sg.goals.count_documents({"status": "completed"}) == N_ITEMS
+    assert sg.goals.find_one({"_id": ObjectId(other_id)}).get("status") is None
@@ -120,3 +120,69 @@ def test_get_stats(mock_mastery):
     assert learning_group["count"] == 1
     assert reviewing_group["count"] == 2
     assert reviewing_group["avg_accuracy"] == 85.0
+
+def test_batch_review_matches_sequential(mock_mastery):
+    app = Flask(__name__)
+    mock_mastery.register_routes(app)
+    client = app.test_client()
+
+    words = ["inu", "neko", "tori"]
+    for user_id in ("seq", "batch"):
+        for w in words:
+            client.post(f"/v1/mastery/vocabulary/{w}/start", json={"user_id": user_id})
+
+    # Same card several times: later reviews must see earlier results
+    reviews = [
+        {"content_type": "vocabulary", "content_id": "inu", "is_correct": True, "difficulty": "easy"},
+        {"content_type": "vocabulary", "content_id": "neko", "is_correct": False, "error_type": "reading"},
+        {"content_type": "vocabulary", "content_id": "inu", "is_correct": True, "difficulty": "perfect"},
+        {"content_type": "vocabulary", "content_id": "tori", "is_correct": True},
+        {"content_type": "vocabulary", "content_id": "inu", "is_correct": False},
+    ]
+    for r in reviews:
+        client.post("/v1/mastery/review", json={"user_id": "seq", **r})
+
+    inu_id = str(mock_mastery.mastery.find_one({"user_id": "batch", "content_id": "inu"})["_id"])
+    batch = reviews[:4] + [{"mastery_id": inu_id, "is_correct": False}] + [
+        {"content_type": "vocabulary", "content_id": "missing", "is_correct": True},
+        {"mastery_id": "not-an-id", "is_correct": True},
+    ]
+    res = client.post("/v1/mastery/review/batch", json={"user_id": "batch", "reviews": batch})
+    assert res.status_code == 200
+    body = res.get_json()
+    assert body["processed"] == 5
+    assert body["failed"] == 2
+    assert [r["index"] for r in body["results"]] == list(range(7))
+    assert body["results"][5]["error"] == "Mastery record not found"
+
+    def state(user_id, word):
+        doc = mock_mastery.mastery.find_one({"user_id": user_id, "content_id": word})
+        return (doc["status"], doc["mastery_stage"], doc["srs"]["interval_days"], doc["srs"]["ease_factor"],
+                doc["srs"]["correct_streak"], doc["stats"], doc.get("last_error_type"))
+
+    for w in words:
+        assert state("batch", w) == state("seq", w)
+
+    logged = [i["content_id"] for i in mock_mastery.interactions.find({"user_id": "batch"})]
+    assert logged == ["inu", "neko", "inu", "tori", "inu"]
+
+def test_batch_review_single_round_trips(mock_mastery):
+    app = Flask(__name__)
+    mock_mastery.register_routes(app)
+    client = app.test_client()
+    for i in range(100):
+        client.post(f"/v1/mastery/vocabulary/w{i}/start", json={"user_id": "user123"})
+
+    calls = []
+    for name in ("find", "find_one", "update_one", "bulk_write"):
+        original = getattr(mock_mastery.mastery, name)
+        def wrapped(*args, _name=name, _original=original, **kwargs):
+            calls.append(_name)
+            return _original(*args, **kwargs)
+        setattr(mock_mastery.mastery, name, wrapped)
+
+    reviews = [{"content_type": "vocabulary", "content_id": f"w{i}", "is_correct": i % 4 != 0} for i in range(100)]
+    res = client.post("/v1/mastery/review/batch", json={"user_id": "user123", "reviews": reviews})
+    assert res.get_json()["processed"] == 100
+    assert calls == ["find", "bulk_write"]
+    assert mock_mastery.interactions.count_documents({"user_id": "user123"}) == 100
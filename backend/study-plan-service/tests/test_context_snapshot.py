@@ -0,0 +1,152 @@
+import jwt
+import pytest
+from concurrent.futures import TimeoutError as FutureTimeout
+from datetime import datetime, timedelta, timezone
+import modules.context_snapshot as context_snapshot
+from modules.context_snapshot import ContextSnapshotModule
+from modules.study_plan import StudyPlanModule
+from modules.learner_progress import LearnerProgressModule
+from modules.performance import PerformanceModule
+from modules.user_preferences import UserPreferencesModule
+from utils.auth import JWT_SECRET, JWT_ALGORITHM
+import mongomock
+from flask import Flask
+
+def auth_header(user_id):
+    token = jwt.encode({"userId": user_id}, JWT_SECRET, algorithm=JWT_ALGORITHM)
+    return {"Authorization": f"Bearer {token}"}
+
+@pytest.fixture
+def snapshot_env():
+    app = Flask(__name__)
+    client = mongomock.MongoClient()
+    db = client["flaskStudyPlanDB"]
+
+    sp = StudyPlanModule()
+    sp.mongo_client = client
+    sp.study_db = db
+    sp.plans_collection = db["study_plans"]
+    sp.milestones_collection = db["milestones"]
+    sp.tasks_collection = db["daily_tasks"]
+
+    lp = LearnerProgressModule()
+    lp.mongo_client = client
+    lp.db = db
+    lp.activities_collection = db["learning_activities"]
+
+    perf = PerformanceModule()
+    perf.client = client
+    perf.db = db
+    perf.performance_trackings = db["performance_trackings"]
+    perf.performance_daily = db["performance_trackings_daily"]
+
+    prefs = UserPreferencesModule()
+    prefs.client = client
+    prefs.db = db
+    prefs.study_sessions = db["study_sessions"]
+
+    snap = ContextSnapshotModule(sp, lp, perf, prefs)
+    snap.register_routes(app)
+    return app, snap, db
+
+def seed(db, perf, user_id="user123"):
+    now = datetime.now(timezone.utc)
+    plan_id = db["study_plans"].insert_one({
+        "user_id": user_id, "status": "active", "target_level": "N4",
+        "exam_date": now + timedelta(days=60), "start_date": now - timedelta(days=30),
+        "created_at": now - timedelta(days=30)
+    }).inserted_id
+    milestone_id = db["milestones"].insert_one({
+        "plan_id": plan_id, "milestone_number": 1, "title": "Core Vocabulary", "status": "in_progress",
+        "target_start_date": now - timedelta(days=30), "target_end_date": now + timedelta(days=10),
+        "criteria": [{"type": "vocab_count", "target_value": 100, "current_value": 40}]
+    }).inserted_id
+    db["study_plans"].update_one({"_id": plan_id}, {"$set": {"current_milestone_id": milestone_id}})
+    db["daily_tasks"].insert_many([
+        {"user_id": user_id, "date": now, "title": "SRS Review", "task_type": "flashcard", "status": "completed"},
+        {"user_id": user_id, "date": now, "title": "Grammar", "task_type": "grammar", "status": "pending"},
+    ])
+    db["study_sessions"].insert_one({"user_id": user_id, "created_at": now, "duration_minutes": 20})
+    db["learning_activities"].insert_one({"user_id": user_id, "activity_type": "flashcard_review",
+                                          "timestamp": now, "data": {"count": 10}})
+    perf.log_tracking(user_id, {"summary": "particle mixups", "note_audit_details": "", "note_quality_score": 7})
+
+def test_snapshot_gathers_all_sections(snapshot_env):
+    app, snap, db = snapshot_env
+    seed(db, snap.performance)
+
+    res = app.test_client().get("/v1/context/snapshot/user123", headers=auth_header("user123"))
+    assert res.status_code == 200
+    body = res.get_json()
+    assert "errors" not in body
+    assert body["plan"]["current_milestone"] == "Core Vocabulary"
+    assert body["plan"]["progress_percent"] == 40.0
+    assert [t["completed"] for t in body["daily_tasks"]] == [True, False]
+    assert body["streak"]["current"] == 1
+    assert len(body["recent_sessions"]) == 1
+    assert body["activities"][0]["type"] == "10 Flashcards Reviewed"
+    assert body["performance_trends"]["identified_struggles"] == ["particles"]
+
+def test_snapshot_etag_revalidation(snapshot_env):
+    app, snap, db = snapshot_env
+    seed(db, snap.performance)
+    client = app.test_client()
+    headers = auth_header("user123")
+
+    first = client.get("/v1/context/snapshot/user123", headers=headers)
+    etag = first.headers["ETag"]
+    assert etag
+
+    again = client.get("/v1/context/snapshot/user123", headers={**headers, "If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.data == b""
+
+    db["daily_tasks"].update_many({}, {"$set": {"status": "completed"}})
+    changed = client.get("/v1/context/snapshot/user123", headers={**headers, "If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+def test_snapshot_section_failure_is_isolated(snapshot_env):
+    app, snap, db = snapshot_env
+    seed(db, snap.performance)
+    def broken(user_id, days=30):
+        raise RuntimeError("boom")
+    snap.performance.get_trends = broken
+
+    res = app.test_client().get("/v1/context/snapshot/user123", headers=auth_header("user123"))
+    body = res.get_json()
+    assert res.status_code == 200
+    assert body["performance_trends"] is None
+    assert body["errors"] == {"performance_trends": "boom"}
+    assert body["plan"] is not None
+
+def test_snapshot_sections_share_one_deadline(snapshot_env, monkeypatch):
+    _, snap, _ = snapshot_env
+    clock = [100.0]
+    monkeypatch.setattr(context_snapshot.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(context_snapshot, "SNAPSHOT_TIMEOUT_SECONDS", 5.0)
+
+    waits = []
+    class SlowFuture:
+        # Every section takes 2s of the fake clock and then misses its wait
+        def result(self, timeout=None):
+            waits.append(timeout)
+            clock[0] += 2
+            raise FutureTimeout()
+        def cancel(self):
+            return False
+    class SlowPool:
+        def submit(self, fn, *args):
+            return SlowFuture()
+    snap.pool = SlowPool()
+
+    snapshot = snap.build_snapshot("user123")
+
+    assert waits == [5.0, 3.0, 1.0, 0.0, 0.0, 0.0, 0.0]
+    assert set(snapshot["errors"]) == set(snap._sections())
+
+def test_snapshot_requires_own_user(snapshot_env):
+    app, _, _ = snapshot_env
+    client = app.test_client()
+    assert client.get("/v1/context/snapshot/user123").status_code == 401
+    assert client.get("/v1/context/snapshot/user123", headers=auth_header("other")).status_code == 403
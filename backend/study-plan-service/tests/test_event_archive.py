@@ -0,0 +1,150 @@
+import gzip
+import pytest
+from datetime import datetime, timedelta, timezone
+from modules.event_archive import EventArchiveModule
+from utils.timeseries import ensure_timeseries_collection
+import mongomock
+from bson import json_util
+
+@pytest.fixture
+def archiver(tmp_path):
+    client = mongomock.MongoClient()
+
+    arc = EventArchiveModule(archive_dir=str(tmp_path), archive_after_days=30)
+    arc.client = client
+    arc.db = client["flaskStudyPlanDB"]
+    arc.interactions = arc.db["content_interactions"]
+    arc.activities = arc.db["learning_activities"]
+    arc.interactions_daily = arc.db["content_interactions_daily"]
+    arc.activities_daily = arc.db["learning_activities_daily"]
+    arc.archive_state = arc.db["event_archive_state"]
+    return arc
+
+def test_timeseries_fallback_to_regular_collection():
+    db = mongomock.MongoClient()["flaskStudyPlanDB"]
+    coll = ensure_timeseries_collection(db, "content_interactions")
+    coll.insert_one({"user_id": "user123", "timestamp": datetime.now(timezone.utc)})
+    assert coll.count_documents({}) == 1
+
+def test_archive_old_interactions(archiver, tmp_path):
+    user_id = "user123"
+    now = datetime.now(timezone.utc)
+    old_day = (now - timedelta(days=60)).replace(hour=10, minute=0, second=0, microsecond=0)
+
+    # 3 old reviews of one item (2 correct), 1 old review of another, 2 recent reviews
+    archiver.interactions.insert_many([
+        {"user_id": user_id, "content_type": "vocabulary", "content_id": "inu", "is_correct": True, "timestamp": old_day},
+        {"user_id": user_id, "content_type": "vocabulary", "content_id": "inu", "is_correct": True, "timestamp": old_day + timedelta(hours=1)},
+        {"user_id": user_id, "content_type": "vocabulary", "content_id": "inu", "is_correct": False, "timestamp": old_day + timedelta(hours=2)},
+        {"user_id": user_id, "content_type": "kanji", "content_id": "犬", "is_correct": True, "timestamp": old_day + timedelta(days=3)},
+        {"user_id": user_id, "content_type": "vocabulary", "content_id": "inu", "is_correct": True, "timestamp": now - timedelta(days=1)},
+        {"user_id": user_id, "content_type": "vocabulary", "content_id": "neko", "is_correct": False, "timestamp": now},
+    ])
+
+    result = archiver.run()
+    stats = next(s for s in result["collections"] if s["collection"] == "content_interactions")
+    assert stats["events"] == 4
+    assert stats["days"] == 2
+
+    # Hot collection keeps only recent events
+    assert archiver.interactions.count_documents({}) == 2
+
+    # Per-item/per-day summary
+    summary = archiver.interactions_daily.find_one({"user_id": user_id, "content_id": "inu"})
+    assert summary["total"] == 3
+    assert summary["correct"] == 2
+    assert summary["incorrect"] == 1
+    assert archiver.interactions_daily.count_documents({}) == 2
+
+    # Originals exported as gzip NDJSON
+    day_str = old_day.strftime("%Y-%m-%d")
+    path = tmp_path / "content_interactions" / old_day.strftime("%Y") / f"{day_str}.ndjson.gz"
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        lines = [json_util.loads(line) for line in f]
+    assert len(lines) == 3
+    assert lines[0]["content_id"] == "inu"
+
+def test_archive_rerun_is_idempotent(archiver):
+    old = datetime.now(timezone.utc) - timedelta(days=45)
+    archiver.activities.insert_many([
+        {"user_id": "user123", "activity_type": "flashcard_review", "timestamp": old,
+         "data": {"count": 10, "duration_minutes": 5}},
+        {"user_id": "user123", "activity_type": "flashcard_review", "timestamp": old + timedelta(minutes=5),
+         "data": {"count": 20, "duration_minutes": 8}},
+    ])
+
+    archiver.run()
+    archiver.run()
+
+    assert archiver.activities.count_documents({}) == 0
+    summary = archiver.activities_daily.find_one({"user_id": "user123"})
+    assert summary["total"] == 2
+    assert summary["items"] == 30
+    assert summary["duration_minutes"] == 13
+
+def test_late_events_add_to_an_archived_day(archiver):
+    user_id = "user123"
+    old_day = (datetime.now(timezone.utc) - timedelta(days=60)).replace(hour=10, minute=0, second=0, microsecond=0)
+    archiver.interactions.insert_many([
+        {"user_id": user_id, "content_type": "vocabulary", "content_id": "inu", "is_correct": True, "timestamp": old_day},
+        {"user_id": user_id, "content_type": "vocabulary", "content_id": "inu", "is_correct": False, "timestamp": old_day},
+        {"user_id": user_id, "content_type": "vocabulary", "content_id": "inu", "is_correct": True,
+         "timestamp": old_day + timedelta(days=20)},
+    ])
+    archiver.run()
+    boundary = archiver.archive_state.find_one({"collection": "content_interactions"})["archived_through"]
+
+    # A late event for the first day, whose raw events are already gone
+    archiver.interactions.insert_one({"user_id": user_id, "content_type": "vocabulary", "content_id": "inu",
+                                      "is_correct": True, "timestamp": old_day + timedelta(hours=3)})
+    archiver.run()
+
+    day = old_day.replace(hour=0)
+    summary = archiver.interactions_daily.find_one({"user_id": user_id, "content_id": "inu", "day": day})
+    assert summary["total"] == 3
+    assert summary["correct"] == 2
+    assert summary["incorrect"] == 1
+    assert archiver.archive_state.find_one({"collection": "content_interactions"})["archived_through"] == boundary
+
+def test_rollup_rerun_before_delete_counts_once(archiver):
+    day = (datetime.now(timezone.utc) - timedelta(days=45)).replace(hour=0, minute=0, second=0, microsecond=0)
+    archiver.interactions.insert_many([
+        {"user_id": "user123", "content_type": "kanji", "content_id": "犬", "is_correct": True,
+         "timestamp": day + timedelta(hours=h)}
+        for h in range(3)
+    ])
+
+    # Interrupted after the rollup, before export/delete: the rerun folds the same events again
+    archiver.rollup_day("content_interactions", day)
+    archiver.rollup_day("content_interactions", day)
+
+    assert archiver.interactions_daily.find_one({"content_id": "犬"})["total"] == 3
+
+def test_archive_dry_run_changes_nothing(archiver, tmp_path):
+    old = datetime.now(timezone.utc) - timedelta(days=45)
+    archiver.interactions.insert_one({"user_id": "user123", "content_id": "inu", "is_correct": True, "timestamp": old})
+
+    result = archiver.run(dry_run=True)
+    stats = next(s for s in result["collections"] if s["collection"] == "content_interactions")
+    assert stats["events"] == 1
+    assert archiver.interactions.count_documents({}) == 1
+    assert archiver.interactions_daily.count_documents({}) == 0
+    assert not (tmp_path / "content_interactions").exists()
+
+def test_archive_refuses_timeseries_deletes_before_mongo_7(archiver, tmp_path, monkeypatch):
+    old = datetime.now(timezone.utc) - timedelta(days=45)
+    archiver.interactions.insert_one({"user_id": "user123", "content_id": "inu", "is_correct": True, "timestamp": old})
+    monkeypatch.setattr("modules.event_archive.is_timeseries", lambda db, name: True)
+    monkeypatch.setattr(archiver.client, "server_info", lambda: {"versionArray": [6, 0, 14, 0]}, raising=False)
+
+    with pytest.raises(RuntimeError, match="7.0"):
+        archiver.run()
+    assert archiver.interactions.count_documents({}) == 1
+    assert not (tmp_path / "content_interactions").exists()
+
+    # Dry runs only read, so they still work
+    assert archiver.run(dry_run=True)["collections"][0]["events"] == 1
+
+    monkeypatch.setattr(archiver.client, "server_info", lambda: {"versionArray": [7, 0, 2, 0]}, raising=False)
+    archiver.run()
+    assert archiver.interactions.count_documents({}) == 0
@@ -73,6 +73,8 @@ def app_with_all_modules():
     review_cycles.interactions = mastery.interactions
     review_cycles.commitments = pact.commitments
     review_cycles.queue = priority.queue
+    review_cycles.interactions_daily = db["content_interactions_daily"]
+    review_cycles.archive_state = db["event_archive_state"]
     review_cycles.register_routes(app)
     
     return app
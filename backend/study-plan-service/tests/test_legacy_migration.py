@@ -0,0 +1,142 @@
+import pytest
+from modules.legacy_migration import LegacyMigration
+from pymongo.errors import BulkWriteError
+import mongomock
+
+@pytest.fixture
+def migration():
+    client = mongomock.MongoClient()
+
+    mig = LegacyMigration(chunk_size=25, max_workers=4)
+    mig.client = client
+    mig.db = client["flaskStudyPlanDB"]
+    mig.state = mig.db["migration_state"]
+    mig.progress = mig.db["learner_progress"]
+    return mig
+
+def seed_words(mig, n, start=0):
+    mig.client["flaskFlashcardDB"]["words"].insert_many([{
+        "userId": f"user{i % 3}",
+        "vocabulary_original": f"word{i}",
+        "difficulty": ["easy", "medium", "hard", "new"][i % 4],
+        "p_tag": "JLPT_N5",
+    } for i in range(start, start + n)])
+
+def mastery(mig):
+    return mig.db["user_content_mastery"]
+
+def test_migrates_all_chunks(migration):
+    seed_words(migration, 110)
+    migration.client["flaskFlashcardDB"]["words"].insert_one({"vocabulary_original": "orphan"})
+
+    report = migration.run()
+
+    assert report["status"] == "completed"
+    assert report["chunks_total"] == 5
+    assert report["read"] == 111
+    assert report["upserted"] == 110
+    assert report["skipped"] == 1
+    assert mastery(migration).count_documents({}) == 110
+    doc = mastery(migration).find_one({"content_id": "word0"})
+    assert doc["status"] == "reviewing"
+    assert doc["srs"]["ease_factor"] == 3.0
+
+def test_rerun_is_idempotent(migration):
+    seed_words(migration, 60)
+    migration.run()
+    mastery(migration).update_one({"content_id": "word1"}, {"$set": {"status": "mastered"}})
+
+    report = migration.run()
+
+    assert report["upserted"] == 0
+    assert report["existing"] == 60
+    assert mastery(migration).count_documents({}) == 60
+    # Existing (possibly progressed) records are never overwritten
+    assert mastery(migration).find_one({"content_id": "word1"})["status"] == "mastered"
+
+def test_resumes_after_interruption(migration):
+    seed_words(migration, 100)
+    original = migration.migrate_chunk
+
+    def flaky(name, source, target, transform, chunk, dry_run=False):
+        if chunk["index"] == 2:
+            raise ConnectionError("lost connection")
+        return original(name, source, target, transform, chunk, dry_run)
+
+    migration.migrate_chunk = flaky
+    first = migration.run()
+    assert first["status"] == "incomplete"
+    assert mastery(migration).count_documents({}) == 75
+
+    migration.migrate_chunk = original
+    second = migration.run()
+    assert second["status"] == "completed"
+    assert second["chunks_resumed"] == 3
+    assert second["chunks_processed"] == 1
+    assert second["upserted"] == 25
+    assert mastery(migration).count_documents({}) == 100
+
+    state = migration.state.find_one({"_id": "legacy_words_to_mastery"})
+    assert sorted(state["completed_chunks"]) == [0, 1, 2, 3]
+    assert state["totals"]["upserted"] == 100
+
+def test_chunk_with_write_errors_is_retried(migration, monkeypatch):
+    seed_words(migration, 100)
+    real_bulk_write = mongomock.collection.Collection.bulk_write
+    failed = []
+
+    def bulk_write(self, ops, ordered=True):
+        # Chunk 2 (word50..word74): the first upsert fails, the rest are written
+        if self.name == "user_content_mastery" and not failed and ops[0]._filter["content_id"] == "word50":
+            failed.append(True)
+            result = real_bulk_write(self, ops[1:], ordered=ordered)
+            raise BulkWriteError({
+                "writeErrors": [{"index": 0, "code": 11000, "errmsg": "E11000 duplicate key error"}],
+                "upserted": [{"index": i + 1, "_id": _id} for i, _id in result.upserted_ids.items()],
+            })
+        return real_bulk_write(self, ops, ordered=ordered)
+
+    monkeypatch.setattr(mongomock.collection.Collection, "bulk_write", bulk_write)
+
+    first = migration.run()
+    assert first["status"] == "incomplete"
+    assert first["errors"] == 1
+    assert first["upserted"] == 99
+    state = migration.state.find_one({"_id": "legacy_words_to_mastery"})
+    assert sorted(state["completed_chunks"]) == [0, 1, 3]
+
+    second = migration.run()
+    assert second["status"] == "completed"
+    assert second["chunks_processed"] == 1
+    assert second["upserted"] == 1
+    assert second["existing"] == 24
+    assert mastery(migration).count_documents({}) == 100
+
+def test_open_ended_last_chunk_picks_up_new_rows(migration):
+    seed_words(migration, 30)
+    original = migration.migrate_chunk
+    migration.migrate_chunk = lambda *a, **k: (_ for _ in ()).throw(RuntimeError("down"))
+    migration.run()
+
+    # Rows inserted after planning land in the open-ended final chunk
+    seed_words(migration, 10, start=30)
+    migration.migrate_chunk = original
+    report = migration.run()
+
+    assert report["status"] == "completed"
+    assert mastery(migration).count_documents({}) == 40
+
+def test_dry_run_reports_without_writing(migration):
+    seed_words(migration, 80)
+    migration.run()
+    seed_words(migration, 20, start=80)
+
+    report = migration.run(dry_run=True)
+
+    assert report["dry_run"] is True
+    assert report["read"] == 100
+    assert report["upserted"] == 20
+    assert report["existing"] == 80
+    assert report["docs_per_second"] is not None
+    assert mastery(migration).count_documents({}) == 80
+    assert migration.state.find_one({"_id": "legacy_words_to_mastery"})["last_run"]["dry_run"] is False
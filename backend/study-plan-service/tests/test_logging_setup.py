@@ -0,0 +1,97 @@
+import io
+import json
+import logging
+
+import pytest
+
+from hanabira_shared import logging_setup, tracing
+
+
+class Exploding:
+    """Fails the test if a filtered record still gets its message formatted."""
+
+    def __str__(self):
+        raise AssertionError("message formatted for a dropped record")
+
+
+@pytest.fixture
+def configured(monkeypatch):
+    stream = io.StringIO()
+    root = logging.getLogger()
+    saved_handlers, saved_level = list(root.handlers), root.level
+
+    def configure(fmt="text", **env):
+        for key, value in env.items():
+            monkeypatch.setenv(key, value)
+        logging_setup.configure_logging(level="INFO", fmt=fmt, stream=stream)
+
+        def lines():
+            logging_setup.flush_logging()
+            return stream.getvalue().splitlines()
+        return lines
+
+    yield configure
+    logging_setup.flush_logging()
+    for handler in list(root.handlers):
+        if handler not in saved_handlers:
+            root.removeHandler(handler)
+    root.setLevel(saved_level)
+    for name in ("test.hot", "test.levels"):
+        logger = logging.getLogger(name)
+        logger.filters.clear()
+        logger.setLevel(logging.NOTSET)
+
+
+def test_rate_limit_counts_suppressed(configured):
+    lines = configured(fmt="json", LOG_RATE_LIMIT="test.hot=2")
+    logger = logging.getLogger("test.hot")
+    for i in range(10):
+        logger.info("answer card=%s", i)
+    logger.info("other template")
+    logger.warning("always %s", "kept")
+
+    records = [json.loads(line) for line in lines()]
+    answers = [r for r in records if r["msg"].startswith("answer")]
+    assert [r["msg"] for r in answers] == ["answer card=0", "answer card=1"]
+    assert any(r["msg"] == "other template" for r in records)
+    assert any(r["msg"] == "always kept" and r["level"] == "WARNING" for r in records)
+
+    # The next record that passes reports how many were dropped
+    limiter = next(f for f in logger.filters if isinstance(f, logging_setup.RateLimitFilter))
+    limiter._buckets[("test.hot", "answer card=%s")][0] = 1
+    logger.info("answer card=%s", "late")
+    last = json.loads(lines()[-1])
+    assert last["msg"] == "answer card=late" and last["suppressed"] == 8
+
+
+def test_sampling_drops_below_warning(configured):
+    lines = configured(LOG_SAMPLE="test.hot=0", LOG_RATE_LIMIT="test.hot=0")
+    logger = logging.getLogger("test.hot")
+    for _ in range(50):
+        logger.info("sampled %s", Exploding())
+    logger.error("kept")
+    output = lines()
+    assert len(output) == 1 and output[0].endswith("kept")
+
+
+def test_per_logger_levels_are_lazy(configured):
+    lines = configured(LOG_LEVELS="test.levels=WARNING")
+    logger = logging.getLogger("test.levels")
+    logger.info("filtered %s", Exploding())
+    logger.warning("passed %s", "through")
+    output = lines()
+    assert len(output) == 1 and output[0].endswith("passed through")
+
+
+def test_json_carries_trace_id_and_extras(configured, monkeypatch, tmp_path):
+    monkeypatch.setattr(tracing, "TRACING_ENABLED", True)
+    monkeypatch.setattr(tracing, "exporter", tracing.JsonlExporter(str(tmp_path), "study-plan-service"))
+    lines = configured(fmt="json")
+    with tracing.span("work") as current:
+        logging.getLogger("test.levels").warning("db_queries queries=%d", 3, extra={"db": {"queries": 3}})
+
+    record = json.loads(lines()[-1])
+    assert record["msg"] == "db_queries queries=3"
+    assert record["logger"] == "test.levels"
+    assert record["trace_id"] == current.trace_id
+    assert record["db"] == {"queries": 3}
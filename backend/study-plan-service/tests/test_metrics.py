@@ -0,0 +1,88 @@
+import os
+import subprocess
+import sys
+from types import SimpleNamespace
+
+import pytest
+from flask import Flask, jsonify
+from prometheus_client.parser import text_string_to_metric_families
+
+from hanabira_shared import metrics
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def scrape(client):
+    res = client.get("/metrics")
+    assert res.status_code == 200
+    assert res.headers["Content-Type"].startswith("text/plain")
+    return {s.name + str(sorted(s.labels.items())): s.value
+            for family in text_string_to_metric_families(res.get_data(as_text=True)) for s in family.samples}
+
+
+@pytest.fixture
+def metrics_app():
+    app = Flask(__name__)
+    metrics.init_metrics(app)
+
+    @app.route("/v1/plans/<plan_id>")
+    def get_plan(plan_id):
+        return jsonify({"id": plan_id})
+
+    return app
+
+
+def sample(samples, name, **labels):
+    return samples.get(name + str(sorted(labels.items())), 0)
+
+
+def test_route_latency_by_template(metrics_app):
+    client = metrics_app.test_client()
+    before = scrape(client)
+    for plan_id in ("a", "b", "c"):
+        client.get(f"/v1/plans/{plan_id}")
+    client.get("/nope")
+    after = scrape(client)
+
+    route = dict(method="GET", route="/v1/plans/<plan_id>")
+    assert sample(after, "http_requests_total", status="200", **route) - \
+        sample(before, "http_requests_total", status="200", **route) == 3
+    assert sample(after, "http_request_duration_seconds_count", **route) - \
+        sample(before, "http_request_duration_seconds_count", **route) == 3
+    assert sample(after, "http_requests_total", method="GET", route="<unmatched>", status="404") >= 1
+    # /metrics itself is not measured, and nothing is left in flight
+    assert not any("route', '/metrics'" in k for k in after)
+    assert sample(after, "http_requests_in_progress") == 0
+
+
+def test_pool_listener_tracks_checkouts():
+    listener = metrics.PoolMetricsListener()
+    event = SimpleNamespace(address=("pool-test", 27017), reason="timeout")
+    gauge = metrics.MONGO_POOL_CHECKED_OUT.labels("pool-test:27017")
+    waits = metrics.MONGO_POOL_WAIT.labels("pool-test:27017")
+
+    listener.connection_created(event)
+    listener.connection_check_out_started(event)
+    listener.connection_checked_out(event)
+    assert gauge._value.get() == 1
+    assert waits._sum.get() > 0
+    listener.connection_checked_in(event)
+    assert gauge._value.get() == 0
+
+    listener.connection_check_out_started(event)
+    listener.connection_check_out_failed(event)
+    assert metrics.MONGO_POOL_CHECKOUT_FAILURES.labels("pool-test:27017", "timeout")._value.get() == 1
+
+
+def test_multiprocess_aggregation(tmp_path):
+    """Two 'workers' write to the multiprocess dir; a third process serves the sum."""
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path), "PYTHONPATH": SERVICE_DIR}
+    worker = ("from hanabira_shared import metrics\n"
+              "for _ in range({n}): metrics.HTTP_REQUESTS.labels('GET', '/v1/x', '200').inc()")
+    for n in (2, 3):
+        subprocess.run([sys.executable, "-c", worker.format(n=n)], env=env, check=True, cwd=SERVICE_DIR)
+
+    scrape_cmd = "from hanabira_shared import metrics; print(metrics.render_metrics()[0].decode())"
+    out = subprocess.run([sys.executable, "-c", scrape_cmd],
+                         env=env, check=True, cwd=SERVICE_DIR, capture_output=True, text=True).stdout
+    assert 'http_requests_total{method="GET",route="/v1/x",status="200"} 5.0' in out
@@ -133,3 +133,90 @@ def test_okr_risk_assessment(mock_env):
         "deadline": deadline,
         "progress_percent": 20
     }) == "high"
+
+def seed_okr(okr, user_id="user123", sources=("vocabulary", "grammar"), n_okrs=2, stale=False):
+    now = datetime.now()
+    for i in range(n_okrs):
+        doc = {
+            "user_id": user_id,
+            "objective": f"Objective {i}",
+            "key_results": [
+                {"id": ObjectId(), "title": s, "data_source": s, "target": 100, "current": 0,
+                 "progress_percent": 0, "history": []}
+                for s in sources
+            ],
+            "created_at": now - timedelta(days=10),
+            "deadline": now + timedelta(days=30)
+        }
+        if stale: doc["kr_stale"] = True
+        okr.objectives.insert_one(doc)
+
+def test_list_okrs_hydrates_with_one_query_per_source(mock_env):
+    app, okr, mastery = mock_env
+    client = app.test_client()
+
+    grammar_ids = [okr.grammar_db.grammars.insert_one({"title": f"grammar {i}", "p_tag": "JLPT_N4"}).inserted_id for i in range(5)]
+    okr.jmdict_db.entries.insert_many([{"expression": f"word_{i}", "reading": f"reading_{i}"} for i in range(5)])
+    mastery.mastery.insert_many(
+        [{"user_id": "user123", "content_type": "vocabulary", "content_id": f"word_{i}"} for i in range(5)] +
+        [{"user_id": "user123", "content_type": "grammar", "content_id": str(gid)} for gid in grammar_ids]
+    )
+    seed_okr(okr)
+
+    finds = {"entries": 0, "grammars": 0}
+    def counting(collection, name):
+        original = collection.find
+        def find(*args, **kwargs):
+            finds[name] += 1
+            return original(*args, **kwargs)
+        return find
+    okr.jmdict_db.entries.find = counting(okr.jmdict_db.entries, "entries")
+    okr.grammar_db.grammars.find = counting(okr.grammar_db.grammars, "grammars")
+    okr.jmdict_db.entries.find_one = okr.grammar_db.grammars.find_one = None  # per-item lookups are gone
+
+    res = client.get("/v1/okr/objectives?user_id=user123")
+    assert res.status_code == 200
+    body = res.get_json()
+    grammar_items = body[0]["key_results"][1]["items"]
+    assert sorted(i["title"] for i in grammar_items) == [f"grammar {i}" for i in range(5)]
+    assert grammar_items[0]["level"] == "N4"
+    assert body[1]["key_results"][0]["items"][0]["title"] == "word_0"
+    assert finds == {"entries": 1, "grammars": 1}
+
+    # Second request is served from the title cache
+    client.get("/v1/okr/objectives?user_id=user123")
+    assert finds == {"entries": 1, "grammars": 1}
+    assert okr.title_cache.stats()["hits"] == 10
+
+def test_list_okrs_does_not_refresh_on_get(mock_env):
+    app, okr, mastery = mock_env
+    mastery.mastery.insert_many([
+        {"user_id": "user123", "content_type": "vocabulary", "content_id": f"word_{i}"} for i in range(10)
+    ])
+    seed_okr(okr, sources=("vocabulary",), n_okrs=1)
+    scheduled = []
+    okr.schedule_refresh = scheduled.append
+
+    res = app.test_client().get("/v1/okr/objectives?user_id=user123")
+    assert res.get_json()[0]["key_results"][0]["current"] == 0
+    assert scheduled == []
+
+def test_write_marks_stale_and_refresh_clears(mock_env):
+    app, okr, mastery = mock_env
+    client = app.test_client()
+    seed_okr(okr, sources=("vocabulary",), n_okrs=2)
+
+    client.post("/v1/mastery/vocabulary/word_1/start", json={"user_id": "user123"})
+    assert okr.objectives.count_documents({"kr_stale": True}) == 2
+
+    # A GET that sees stale objectives schedules a background refresh
+    scheduled = []
+    okr.schedule_refresh = scheduled.append
+    client.get("/v1/okr/objectives?user_id=user123")
+    assert scheduled == ["user123"]
+
+    assert okr.refresh_user_okrs("user123") == 2
+    assert okr.objectives.count_documents({"kr_stale": True}) == 0
+    doc = okr.objectives.find_one({"user_id": "user123"})
+    assert doc["key_results"][0]["current"] == 1
+    assert doc["risk_level"] in ("low", "medium", "high")
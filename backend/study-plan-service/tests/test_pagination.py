@@ -0,0 +1,164 @@
+import jwt
+import pytest
+from datetime import datetime, timedelta, timezone
+from modules.content_mastery import ContentMasteryModule
+from modules.learner_progress import LearnerProgressModule
+from modules.performance import PerformanceModule
+from utils.auth import JWT_SECRET, JWT_ALGORITHM
+from utils.pagination import keyset_page, encode_cursor, DEFAULT_PAGE_SIZE
+import mongomock
+from flask import Flask
+
+BASE = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+def auth_header(user_id):
+    token = jwt.encode({"userId": user_id}, JWT_SECRET, algorithm=JWT_ALGORITHM)
+    return {"Authorization": f"Bearer {token}"}
+
+@pytest.fixture
+def paged_env():
+    app = Flask(__name__)
+    client = mongomock.MongoClient()
+    db = client["flaskStudyPlanDB"]
+
+    cm = ContentMasteryModule()
+    cm.client = client
+    cm.db = db
+    cm.mastery = db["user_content_mastery"]
+    cm.interactions = db["content_interactions"]
+    cm.register_routes(app)
+
+    lp = LearnerProgressModule()
+    lp.mongo_client = client
+    lp.db = db
+    lp.activities_collection = db["learning_activities"]
+    lp.register_routes(app)
+
+    perf = PerformanceModule()
+    perf.client = client
+    perf.db = db
+    perf.performance_trackings = db["performance_trackings"]
+    perf.performance_daily = db["performance_trackings_daily"]
+    perf.register_routes(app)
+
+    return app, cm, lp, perf, db
+
+def seed_mastery(db, user_id, n):
+    # Ten rows share each updated_at so pages must break ties on _id
+    db["user_content_mastery"].insert_many([{
+        "user_id": user_id, "content_type": "vocabulary", "content_id": f"w{i}", "status": "learning",
+        "updated_at": BASE + timedelta(minutes=i // 10),
+        "srs": {"next_review_date": BASE + timedelta(hours=i % 7)},
+    } for i in range(n)])
+
+class FindSpy:
+    """Records how many documents each find() actually pulled from the server."""
+    def __init__(self, collection):
+        self.collection = collection
+        self.fetched = []
+
+    def find(self, *args, **kwargs):
+        spy = self
+        class Cursor:
+            def __init__(self, cursor):
+                self.cursor = cursor
+            def sort(self, *a, **k):
+                self.cursor = self.cursor.sort(*a, **k)
+                return self
+            def limit(self, n):
+                self.cursor = self.cursor.limit(n)
+                return self
+            def skip(self, n):
+                raise AssertionError("keyset pagination must not skip")
+            def __iter__(self):
+                docs = list(self.cursor)
+                spy.fetched.append(len(docs))
+                return iter(docs)
+        return Cursor(self.collection.find(*args, **kwargs))
+
+def walk(client, url, headers=None):
+    pages, cursor = [], None
+    while True:
+        res = client.get(url + (f"&cursor={cursor}" if cursor else ""), headers=headers)
+        assert res.status_code == 200
+        pages.append(res.get_json())
+        cursor = res.headers.get("X-Next-Cursor")
+        if not cursor:
+            return pages
+
+def test_mastery_pages_cover_every_row_once(paged_env):
+    app, _, _, _, db = paged_env
+    seed_mastery(db, "user123", 237)
+    seed_mastery(db, "someone_else", 30)
+
+    pages = walk(app.test_client(), "/v1/mastery/?user_id=user123&limit=25")
+
+    assert [len(p) for p in pages] == [25] * 9 + [12]
+    ids = [r["content_id"] for p in pages for r in p]
+    assert len(ids) == len(set(ids)) == 237
+    stamps = [r["updated_at"] for p in pages for r in p]
+    parsed = [datetime.strptime(s, "%a, %d %b %Y %H:%M:%S %Z") for s in stamps]
+    assert parsed == sorted(parsed, reverse=True)
+
+def test_due_pages_ascending_with_default_size(paged_env):
+    app, _, _, _, db = paged_env
+    seed_mastery(db, "user123", DEFAULT_PAGE_SIZE + 5)
+
+    pages = walk(app.test_client(), "/v1/mastery/due?user_id=user123")
+    assert [len(p) for p in pages] == [DEFAULT_PAGE_SIZE, 5]
+    assert len({r["content_id"] for p in pages for r in p}) == DEFAULT_PAGE_SIZE + 5
+
+def test_deep_pages_fetch_constant_rows(paged_env):
+    _, cm, _, _, db = paged_env
+    seed_mastery(db, "user123", 2000)
+    spy = FindSpy(cm.mastery)
+
+    cursor, pages = None, 0
+    while True:
+        docs, cursor = keyset_page(spy, {"user_id": "user123"}, "updated_at", -1, cursor=cursor, limit=20)
+        pages += 1
+        if not cursor:
+            break
+
+    # Page 100 pulls the same 21 rows as page 1 (limit + 1 look-ahead), never the rows before it
+    assert pages == 100
+    assert set(spy.fetched[:-1]) == {21}
+    assert spy.fetched[-1] == 20
+
+def test_activities_and_trackings_return_next_cursor(paged_env):
+    app, _, _, _, db = paged_env
+    db["learning_activities"].insert_many([{
+        "user_id": "user123", "activity_type": "flashcard_review", "data": {"count": i},
+        "timestamp": BASE + timedelta(hours=i),
+    } for i in range(45)])
+    db["performance_trackings"].insert_many([{
+        "user_id": "user123", "summary": f"audit {i}", "timestamp": BASE + timedelta(days=i),
+    } for i in range(12)])
+    client = app.test_client()
+    headers = auth_header("user123")
+
+    first = client.get("/v1/learner/activities/user123?limit=20", headers=headers).get_json()
+    assert first["activities"][0]["type"] == "44 Flashcards Reviewed"
+    second = client.get(f"/v1/learner/activities/user123?limit=20&cursor={first['next_cursor']}",
+                        headers=headers).get_json()
+    assert second["activities"][0]["type"] == "24 Flashcards Reviewed"
+
+    trackings = client.get("/v1/performance/trackings?limit=10", headers=headers).get_json()
+    rest = client.get(f"/v1/performance/trackings?limit=10&cursor={trackings['next_cursor']}",
+                      headers=headers).get_json()
+    assert [t["summary"] for t in rest["trackings"]] == ["audit 1", "audit 0"]
+    assert rest["next_cursor"] is None
+
+def test_bad_cursor_rejected(paged_env):
+    app, _, _, _, db = paged_env
+    seed_mastery(db, "user123", 5)
+    client = app.test_client()
+
+    assert client.get("/v1/mastery/?user_id=user123&cursor=not-a-cursor").status_code == 400
+
+    # A cursor issued for one ordering cannot be replayed against another
+    foreign = encode_cursor("timestamp", BASE, "x")
+    assert client.get(f"/v1/mastery/due?user_id=user123&cursor={foreign}").status_code == 400
+    mastery_cursor = encode_cursor("updated_at", BASE, "x")
+    res = client.get(f"/v1/learner/activities/user123?cursor={mastery_cursor}", headers=auth_header("user123"))
+    assert res.status_code == 400
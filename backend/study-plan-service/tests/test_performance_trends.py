@@ -0,0 +1,171 @@
+import pytest
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from modules.performance import PerformanceModule, extract_tags, day_start
+import mongomock
+
+SUMMARIES = [
+    ("Confused particles again", ""),
+    ("Good session", "kanji recall slow"),
+    ("Passive voice errors", "particle slips too"),
+    ("Clean notes", ""),
+]
+
+@pytest.fixture
+def perf():
+    client = mongomock.MongoClient()
+
+    pm = PerformanceModule()
+    pm.client = client
+    pm.db = client["flaskStudyPlanDB"]
+    pm.performance_trackings = pm.db["performance_trackings"]
+    pm.performance_daily = pm.db["performance_trackings_daily"]
+    pm._create_indexes()
+    return pm
+
+def legacy_trends(pm, user_id, days):
+    """The pre-rollup implementation: keyword scan over every audit in the window."""
+    since = datetime.now(timezone.utc) - timedelta(days=days)
+    audits = list(pm.performance_trackings.find({"user_id": user_id, "timestamp": {"$gte": since}}).sort("timestamp", -1))
+    scores = [a["note_quality_score"] for a in audits if a.get("note_quality_score") is not None]
+    points = [t for a in audits for t in extract_tags(a.get("summary"), a.get("note_audit_details"))]
+    return {
+        "audit_count": len(audits),
+        "avg_note_quality": round(sum(scores) / len(scores), 2) if scores else 0,
+        "identified_struggles": {item for item, _ in Counter(points).most_common(3)},
+        "latest_audit_summary": audits[0]["summary"] if audits else None,
+    }
+
+def seed_raw(pm, user_id, n, start=None):
+    # Bypasses log_tracking: raw historical rows without tags or rollups
+    start = start or datetime.now(timezone.utc) - timedelta(hours=n)
+    pm.performance_trackings.insert_many([{
+        "user_id": user_id,
+        "timestamp": start + timedelta(hours=i),
+        "summary": SUMMARIES[i % 4][0],
+        "note_audit_details": SUMMARIES[i % 4][1],
+        "note_quality_score": 4 + i % 5 if i % 7 else None,
+    } for i in range(n)])
+
+def test_tags_extracted_at_write_time(perf):
+    perf.log_tracking("user123", {"summary": "Passive voice errors", "note_audit_details": "particle slips",
+                                  "note_quality_score": 6})
+    doc = perf.performance_trackings.find_one({"user_id": "user123"})
+    assert doc["tags"] == ["passive_form", "particles"]
+
+    row = perf.performance_daily.find_one({"user_id": "user123"})
+    assert row["audits"] == 1
+    assert row["tags"] == {"passive_form": 1, "particles": 1}
+    assert row["latest_summary"] == "Passive voice errors"
+
+def test_trends_match_keyword_scan(perf):
+    for summary, details in SUMMARIES * 3:
+        perf.log_tracking("user123", {"summary": summary, "note_audit_details": details, "note_quality_score": 7})
+    perf.log_tracking("other", {"summary": "kanji", "note_quality_score": 1})
+
+    trends = perf.get_trends("user123", 30)
+    legacy = legacy_trends(perf, "user123", 30)
+
+    assert trends["status"] == "success"
+    assert trends["audit_count"] == legacy["audit_count"] == 12
+    assert trends["avg_note_quality"] == legacy["avg_note_quality"] == 7
+    assert set(trends["identified_struggles"]) == legacy["identified_struggles"]
+    assert trends["identified_struggles"][0] == "particles"
+    # Same-millisecond writes: the rollup keeps the last one written
+    assert trends["latest_audit_summary"] == "Clean notes"
+
+def test_no_data(perf):
+    assert perf.get_trends("nobody", 30) == {"status": "no_data", "trends": []}
+
+def test_rebuild_rollups_backfills_history(perf):
+    seed_raw(perf, "user123", 200)
+
+    assert perf.rebuild_rollups() == 200
+    assert perf.performance_trackings.count_documents({"tags": {"$exists": False}}) == 0
+
+    trends = perf.get_trends("user123", 30)
+    legacy = legacy_trends(perf, "user123", 30)
+    assert trends["audit_count"] == legacy["audit_count"] == 200
+    assert trends["avg_note_quality"] == legacy["avg_note_quality"]
+    assert set(trends["identified_struggles"]) == legacy["identified_struggles"]
+
+    # Idempotent
+    perf.rebuild_rollups("user123")
+    assert perf.get_trends("user123", 30) == trends
+
+def test_rebuild_keeps_rows_written_after_the_scan(perf):
+    seed_raw(perf, "user123", 30)
+    today = day_start(datetime.now(timezone.utc))
+    # A write that landed after the scan left a newer row than the grouped trackings
+    live = datetime.now(timezone.utc) + timedelta(seconds=1)
+    perf.performance_daily.insert_one({"user_id": "user123", "day": today, "audits": 99, "tags": {},
+                                       "latest_summary": "live", "latest_at": live})
+
+    perf.rebuild_rollups()
+
+    row = perf.performance_daily.find_one({"user_id": "user123", "day": today})
+    assert row["audits"] == 99
+    assert row["latest_summary"] == "live"
+
+def test_rollup_bump_after_rebuild_counts_once(perf):
+    perf.log_tracking("user123", {"summary": "kanji again", "note_quality_score": 5})
+    entry = perf.performance_trackings.find_one({"user_id": "user123"})
+    entry["timestamp"] = entry["timestamp"].replace(tzinfo=timezone.utc)
+    perf.performance_daily.delete_many({})
+
+    # Inserted before the scan, rollup bump landing after the merge: already folded
+    perf.rebuild_rollups()
+    perf._bump_rollup(entry)
+    assert perf.get_trends("user123", 30)["audit_count"] == 1
+
+    perf.log_tracking("user123", {"summary": "particle slips", "note_quality_score": 5})
+    assert perf.get_trends("user123", 30)["audit_count"] == 2
+
+def test_rebuild_replaces_stale_rows(perf):
+    perf.log_tracking("user123", {"summary": "particle slips", "note_quality_score": 3})
+    perf.log_tracking("gone", {"summary": "kanji", "note_quality_score": 3})
+    # Trackings replaced behind the rollup's back with older history
+    perf.performance_trackings.delete_many({})
+    seed_raw(perf, "user123", 3, start=datetime.now(timezone.utc) - timedelta(minutes=10))
+
+    assert perf.rebuild_rollups() == 3
+    assert perf.performance_daily.count_documents({"user_id": "gone"}) == 0
+    rows = list(perf.performance_daily.find({"user_id": "user123"}))
+    assert sum(r["audits"] for r in rows) == 3
+
+def test_trend_cost_follows_tags_not_events(perf):
+    # Same 20-day window and tag set; 25x more events in the heavy user's history
+    start = day_start(datetime.now(timezone.utc)) - timedelta(days=20)
+    for user_id, n in (("light", 200), ("heavy", 5000)):
+        perf.performance_trackings.insert_many([{
+            "user_id": user_id, "timestamp": start + timedelta(minutes=i * 20 * 24 * 60 // n),
+            "summary": SUMMARIES[i % 4][0], "note_audit_details": SUMMARIES[i % 4][1], "note_quality_score": 5,
+        } for i in range(n)])
+    perf.rebuild_rollups()
+
+    assert perf.performance_daily.count_documents({"user_id": "light"}) == 20
+    assert perf.performance_daily.count_documents({"user_id": "heavy"}) == 20
+
+    # Trends never read the raw trackings
+    raw = perf.performance_trackings
+    class NoRawReads:
+        def __getattr__(self, name):
+            raise AssertionError(f"get_trends touched performance_trackings.{name}")
+    perf.performance_trackings = NoRawReads()
+
+    calls = {"aggregate": 0}
+    aggregate = perf.performance_daily.aggregate
+    def counted(pipeline, *args, **kwargs):
+        calls["aggregate"] += 1
+        return aggregate(pipeline, *args, **kwargs)
+    perf.performance_daily.aggregate = counted
+
+    # One grouped aggregation over the same 20 rollup rows, whatever the event count
+    for user_id in ("light", "heavy"):
+        calls["aggregate"] = 0
+        trends = perf.get_trends(user_id, 30)
+        assert calls["aggregate"] == 1
+        assert perf.performance_daily.count_documents(PerformanceModule.trends_pipeline(user_id, 30)[0]["$match"]) == 20
+        assert set(trends["identified_struggles"]) == {"particles", "kanji_recall", "passive_form"}
+
+    perf.performance_trackings = raw
@@ -1,6 +1,7 @@
 import pytest
 from datetime import datetime, timedelta
 from modules.priority import PriorityMatrixModule
+from hanabira_shared.serialization import init_serialization
 import mongomock
 from flask import Flask
 from bson import ObjectId
@@ -8,6 +9,7 @@ from bson import ObjectId
 @pytest.fixture
 def mock_priority():
     app = Flask(__name__)
+    init_serialization(app)
     client = mongomock.MongoClient()
     
     pm = PriorityMatrixModule()
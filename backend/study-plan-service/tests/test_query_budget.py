@@ -0,0 +1,82 @@
+import logging
+
+import mongomock
+import pytest
+from flask import Flask
+
+from modules.priority import PriorityMatrixModule
+from hanabira_shared.query_tracker import DEBUG_HEADER, init_query_tracking, mongo_shape
+from hanabira_shared.serialization import init_serialization
+
+
+@pytest.fixture
+def tracked_priority():
+    app = Flask(__name__)
+    app.debug = True
+    init_serialization(app)
+    init_query_tracking(app)
+    client = mongomock.MongoClient()
+
+    pm = PriorityMatrixModule()
+    pm.client = client
+    pm.db = client["flaskStudyPlanDB"]
+    pm.queue = pm.db["priority_queue"]
+    pm.errors = pm.db["error_analysis"]
+    pm.mastery = pm.db["user_content_mastery"]
+    pm.interactions = pm.db["content_interactions"]
+
+    pm.register_routes(app)
+    return app, pm
+
+
+def seed_mastery(pm, user_id, n):
+    pm.mastery.insert_many([
+        {"user_id": user_id, "content_id": f"word{i}", "content_type": "vocabulary", "status": "learning"}
+        for i in range(n)
+    ])
+
+
+def test_mongo_shape_strips_values():
+    a = mongo_shape("find", {"find": "daily_tasks", "filter": {"user_id": "u1", "date": {"$gte": 1}}})
+    b = mongo_shape("find", {"find": "daily_tasks", "filter": {"date": {"$gte": 2}, "user_id": "u2"}})
+    assert a == b == "find daily_tasks {date:{$gte:?},user_id:?}"
+
+    agg = mongo_shape("aggregate", {"aggregate": "content_interactions", "pipeline": [
+        {"$match": {"user_id": "u1"}}, {"$group": {"_id": "$content_id", "n": {"$sum": 1}}}]})
+    assert agg == "aggregate content_interactions [{$match:{user_id:?}},{$group:{}}]"
+
+
+def test_query_budget_get_matrix(tracked_priority, query_budget):
+    app, pm = tracked_priority
+    pm.queue.insert_one({"user_id": "user123", "items": []})
+
+    with query_budget(1) as stats:
+        res = app.test_client().get("/v1/priority-matrix/?user_id=user123")
+    assert res.status_code == 200
+    assert stats.commands == {"find": 1}
+
+
+def test_recalculate_matrix_n_plus_one_detected(tracked_priority, caplog):
+    app, pm = tracked_priority
+    seed_mastery(pm, "user123", 12)
+
+    with caplog.at_level(logging.INFO, logger="hanabira_shared.query_tracker"):
+        res = app.test_client().post("/v1/priority-matrix/recalculate", json={"user_id": "user123"})
+    assert res.status_code == 200
+
+    # 1 mastery find + 12 x (interactions find + mastery update) + queue upsert + find back
+    count, _, repeated = res.headers[DEBUG_HEADER].split("; ")
+    assert int(count) == 27
+    assert repeated == "repeated=2"
+    warning = next(r for r in caplog.records if r.levelno == logging.WARNING)
+    assert "find content_interactions {content_id:?,timestamp:{$gte:?},user_id:?} x12" in warning.getMessage()
+    assert warning.db["queries"] == 27
+
+
+def test_query_budget_flags_repeats(tracked_priority, query_budget):
+    app, pm = tracked_priority
+    seed_mastery(pm, "user123", 3)
+
+    with pytest.raises(AssertionError, match="repeated more than 2x"):
+        with query_budget(100, max_repeats=2):
+            app.test_client().post("/v1/priority-matrix/recalculate", json={"user_id": "user123"})
@@ -1,6 +1,8 @@
+import random
 import pytest
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from modules.review_cycles import ReviewCyclesModule
+from modules.event_archive import EventArchiveModule
 import mongomock
 from flask import Flask
 from bson import ObjectId
@@ -19,6 +21,8 @@ def mock_review():
     rc.interactions = rc.db["content_interactions"]
     rc.commitments = rc.db["pact_commitments"]
     rc.queue = rc.db["priority_queue"]
+    rc.interactions_daily = rc.db["content_interactions_daily"]
+    rc.archive_state = rc.db["event_archive_state"]
     
     rc.register_routes(app)
     return app, rc
@@ -78,3 +82,105 @@ def test_get_latest_review(mock_review):
     assert data["cycle_type"] == "daily"
     # period_end should be present
     assert "period_end" in data
+
+def python_period_metrics(sessions, interactions, start, end):
+    """Reference implementation: load everything and count in Python."""
+    sessions = [s for s in sessions if start <= s["started_at"] < end]
+    interactions = [i for i in interactions if start <= i["timestamp"] < end]
+    by_type = {}
+    for i in interactions:
+        entry = by_type.setdefault(i["content_type"], {"total": 0, "correct": 0})
+        entry["total"] += 1
+        entry["correct"] += 1 if i["is_correct"] else 0
+    correct = sum(1 for i in interactions if i["is_correct"])
+    return {
+        "total_study_minutes": sum(s["duration_minutes"] for s in sessions),
+        "session_count": len(sessions),
+        "interaction_count": len(interactions),
+        "avg_accuracy": round(correct / len(interactions) * 100, 2) if interactions else 0,
+        "by_type": by_type,
+    }
+
+def seed_synthetic(rc, user_id, days, now):
+    rng = random.Random(42)
+    sessions, interactions = [], []
+    for d in range(days):
+        day = now - timedelta(days=d)
+        for _ in range(rng.randint(0, 3)):
+            sessions.append({"user_id": user_id, "duration_minutes": rng.randint(5, 60),
+                             "started_at": day - timedelta(minutes=rng.randint(0, 600))})
+        for _ in range(rng.randint(0, 40)):
+            interactions.append({"user_id": user_id,
+                                 "content_type": rng.choice(["vocabulary", "kanji", "grammar"]),
+                                 "content_id": f"item_{rng.randint(0, 50)}",
+                                 "is_correct": rng.random() < 0.75,
+                                 "timestamp": day - timedelta(minutes=rng.randint(0, 600))})
+    # Another user's events must not leak in
+    interactions.append({"user_id": "other", "content_type": "kanji", "content_id": "x",
+                         "is_correct": True, "timestamp": now - timedelta(days=1)})
+    rc.sessions.insert_many([dict(s) for s in sessions])
+    rc.interactions.insert_many([dict(i) for i in interactions])
+    return sessions, [i for i in interactions if i["user_id"] == user_id]
+
+def assert_matches(metrics, expected):
+    assert metrics["total_study_minutes"] == expected["total_study_minutes"]
+    assert metrics["session_count"] == expected["session_count"]
+    assert metrics["interaction_count"] == expected["interaction_count"]
+    assert metrics["avg_accuracy"] == expected["avg_accuracy"]
+    assert {t: {"total": b["total"], "correct": b["correct"]} for t, b in metrics["by_content_type"].items()} == expected["by_type"]
+
+@pytest.mark.parametrize("days", [1, 7, 30, 90])
+def test_period_metrics_match_python(mock_review, days):
+    _, rc = mock_review
+    now = datetime(2026, 3, 15, 12, 0, tzinfo=timezone.utc)
+    sessions, interactions = seed_synthetic(rc, "user123", 100, now)
+
+    start = (now - timedelta(days=days)).replace(hour=0, minute=0)
+    metrics = rc.calculate_period_metrics("user123", start, now)
+    assert_matches(metrics, python_period_metrics(sessions, interactions, start, now))
+
+def test_period_metrics_read_archived_rollups(mock_review, tmp_path):
+    _, rc = mock_review
+    now = datetime.now(timezone.utc)
+    sessions, interactions = seed_synthetic(rc, "user123", 90, now)
+
+    archiver = EventArchiveModule(archive_dir=str(tmp_path), archive_after_days=30)
+    archiver.client = rc.client
+    archiver.db = rc.db
+    archiver.interactions = rc.interactions
+    archiver.activities = rc.db["learning_activities"]
+    archiver.interactions_daily = rc.interactions_daily
+    archiver.activities_daily = rc.db["learning_activities_daily"]
+    archiver.archive_state = rc.archive_state
+    archiver.run()
+    assert rc.interactions.count_documents({"timestamp": {"$lt": now - timedelta(days=31)}}) == 0
+
+    # Quarterly window spanning archived days and raw days
+    start = (now - timedelta(days=80)).replace(hour=0, minute=0, second=0, microsecond=0)
+    metrics = rc.calculate_period_metrics("user123", start, now)
+    assert_matches(metrics, python_period_metrics(sessions, interactions, start, now))
+
+def test_period_metrics_archived_first_day_from_mid_day(mock_review, tmp_path):
+    _, rc = mock_review
+    now = datetime.now(timezone.utc)
+    sessions, interactions = seed_synthetic(rc, "user123", 90, now)
+
+    archiver = EventArchiveModule(archive_dir=str(tmp_path), archive_after_days=30)
+    archiver.client = rc.client
+    archiver.db = rc.db
+    archiver.interactions = rc.interactions
+    archiver.activities = rc.db["learning_activities"]
+    archiver.interactions_daily = rc.interactions_daily
+    archiver.activities_daily = rc.db["learning_activities_daily"]
+    archiver.archive_state = rc.archive_state
+    archiver.run()
+
+    # The first day is archived: its rollup row counts the whole day, not nothing
+    first_day = (now - timedelta(days=80)).replace(hour=0, minute=0, second=0, microsecond=0)
+    start = first_day + timedelta(hours=12)
+    metrics = rc.calculate_period_metrics("user123", start, now)
+    expected = python_period_metrics(sessions, interactions, first_day, now)
+    assert metrics["interaction_count"] == expected["interaction_count"]
+    assert metrics["avg_accuracy"] == expected["avg_accuracy"]
+    assert {t: {"total": b["total"], "correct": b["correct"]} for t, b in metrics["by_content_type"].items()} == expected["by_type"]
+    assert metrics["session_count"] == python_period_metrics(sessions, interactions, start, now)["session_count"]
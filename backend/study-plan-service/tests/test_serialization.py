@@ -0,0 +1,61 @@
+import pytest
+import gzip
+import json
+from datetime import datetime, timezone
+from bson import ObjectId
+from flask import Flask, Response, jsonify, request
+from hanabira_shared.serialization import init_serialization, COMPRESS_MIN_BYTES
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    init_serialization(app)
+
+    @app.route("/doc")
+    def doc():
+        return jsonify({"_id": ObjectId("65a1b2c3d4e5f60718293a4b"), "ids": {ObjectId("65a1b2c3d4e5f60718293a4b")},
+                        "naive": datetime(2025, 1, 2, 3, 4, 5), "aware": datetime(2025, 1, 2, 3, 4, 5, tzinfo=timezone.utc)})
+
+    @app.route("/big")
+    def big():
+        response = jsonify([{"word": f"word_{i}", "interval": i} for i in range(500)])
+        response.add_etag()
+        return response.make_conditional(request)
+
+    @app.route("/stream")
+    def stream():
+        return Response((b"data: x\n\n" * 500 for _ in range(1)), mimetype="text/event-stream")
+
+    return app.test_client()
+
+def test_mongo_types_are_encoded(client):
+    body = client.get("/doc").get_json()
+    assert body["_id"] == "65a1b2c3d4e5f60718293a4b"
+    assert body["ids"] == ["65a1b2c3d4e5f60718293a4b"]
+    # Naive datetimes from PyMongo are UTC
+    assert body["naive"] == body["aware"] == "2025-01-02T03:04:05+00:00"
+
+def test_large_bodies_are_gzipped_when_accepted(client):
+    plain = client.get("/big")
+    assert "Content-Encoding" not in plain.headers
+    assert len(plain.get_data()) >= COMPRESS_MIN_BYTES
+
+    res = client.get("/big", headers={"Accept-Encoding": "gzip, deflate"})
+    assert res.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in res.headers["Vary"]
+    assert int(res.headers["Content-Length"]) < len(plain.get_data()) / 4
+    assert json.loads(gzip.decompress(res.get_data())) == plain.get_json()
+
+def test_small_and_streamed_bodies_are_left_alone(client):
+    assert "Content-Encoding" not in client.get("/doc", headers={"Accept-Encoding": "gzip"}).headers
+    res = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in res.headers
+    assert res.get_data().startswith(b"data: x")
+
+def test_compressed_etag_is_weak_and_revalidates(client):
+    res = client.get("/big", headers={"Accept-Encoding": "gzip"})
+    etag = res.headers["ETag"]
+    assert etag.startswith('W/"')
+
+    again = client.get("/big", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert again.status_code == 304
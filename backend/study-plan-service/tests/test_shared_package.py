@@ -0,0 +1,16 @@
+import importlib
+import os
+
+import pytest
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules this service imports from hanabira_shared (backend/shared, installed by requirements.txt)
+SHARED_MODULES = ("logging_setup", "metrics", "query_tracker", "serialization", "token_cache", "tracing")
+
+
+@pytest.mark.parametrize("name", SHARED_MODULES)
+def test_shared_module_is_installed_not_copied(name):
+    # ImportError here means the image or venv was built without `-e ../shared`
+    importlib.import_module(f"hanabira_shared.{name}")
+    assert not os.path.exists(os.path.join(SERVICE_DIR, "utils", f"{name}.py"))
@@ -0,0 +1,113 @@
+"""
+SMART goal metrics: the per-user $facet aggregation must match the
+per-goal handlers, and listing 50 goals must cost a fixed number of queries.
+"""
+import pytest
+from datetime import datetime, timedelta
+from modules.smart_goals import SmartGoalsModule, METRIC_SOURCES
+import mongomock
+from flask import Flask
+
+N_GOALS = 50
+
+@pytest.fixture
+def smart():
+    app = Flask(__name__)
+    client = mongomock.MongoClient()
+    sg = SmartGoalsModule()
+    sg.client = client
+    sg.db = client["flaskStudyPlanDB"]
+    sg.goals = sg.db["smart_goals"]
+    sg.mastery = sg.db["user_content_mastery"]
+    sg.quiz_attempts = sg.db["quiz_attempts"]
+    sg.sessions = sg.db["study_sessions"]
+    sg.register_routes(app)
+    return app, sg
+
+def seed(sg, user_id="user123"):
+    now = datetime.now()
+    statuses = ["mastered", "reviewing", "learning"]
+    types = ["vocabulary", "kanji", "grammar"]
+    sg.mastery.insert_many([
+        {"user_id": user_id, "content_type": types[i % 3], "content_id": f"c{i}",
+         "status": statuses[i % 3], "last_reviewed_at": now - timedelta(hours=i)}
+        for i in range(300)
+    ])
+    sg.quiz_attempts.insert_many([
+        {"user_id": user_id, "score_percent": 50 + i % 50, "timestamp": now - timedelta(hours=3 * i)}
+        for i in range(100)
+    ])
+    sg.sessions.insert_many([
+        {"user_id": user_id, "duration_minutes": 10 + i % 20, "started_at": now - timedelta(hours=5 * i)}
+        for i in range(100)
+    ])
+    metrics = list(METRIC_SOURCES)
+    # 50 goals over 5 metrics and 10 distinct creation windows
+    sg.goals.insert_many([
+        {"user_id": user_id, "title": f"Goal {i}", "status": "active",
+         "measurable_metric": metrics[i % 5], "measurable_target": 100, "measurable_baseline": 0,
+         "created_at": now - timedelta(days=i // 5)}
+        for i in range(N_GOALS)
+    ])
+
+def legacy_value(sg, goal):
+    handlers = {
+        "vocabulary_count": sg.get_vocab_count,
+        "kanji_count": sg.get_kanji_count,
+        "grammar_points": sg.get_grammar_count,
+        "quiz_average": sg.get_quiz_average,
+        "study_minutes": sg.get_total_study_time
+    }
+    return handlers[goal["measurable_metric"]](goal["user_id"], goal["created_at"])
+
+def test_facet_metrics_match_per_goal_handlers(smart):
+    _, sg = smart
+    seed(sg)
+    goals = list(sg.goals.find({"user_id": "user123"}))
+
+    metrics = sg.compute_metrics("user123", goals)
+    for goal in goals:
+        assert metrics[(goal["measurable_metric"], goal["created_at"])] == legacy_value(sg, goal)
+
+def count_source_queries(sg):
+    """Count top-level reads on the metric source collections."""
+    calls = {"queries": 0, "depth": 0}
+    for name in ("mastery", "quiz_attempts", "sessions"):
+        coll = getattr(sg, name)
+        for method in ("find", "find_one", "count_documents", "aggregate"):
+            original = getattr(coll, method)
+            def counted(*args, _original=original, **kwargs):
+                # mongomock implements some reads on top of others; count the outer call only
+                if calls["depth"] == 0:
+                    calls["queries"] += 1
+                calls["depth"] += 1
+                try:
+                    return _original(*args, **kwargs)
+                finally:
+                    calls["depth"] -= 1
+            setattr(coll, method, counted)
+    return calls
+
+def test_list_50_goals_query_count(smart):
+    app, sg = smart
+    seed(sg)
+    goals = list(sg.goals.find({"user_id": "user123"}))
+    calls = count_source_queries(sg)
+
+    # Before: one query per goal through the per-goal handlers
+    for goal in goals:
+        legacy_value(sg, goal)
+    assert calls["queries"] == N_GOALS
+
+    # After: one $facet per source collection, independent of the number of goals
+    calls["queries"] = 0
+    res = app.test_client().get("/v1/smart-goals/?user_id=user123")
+    assert res.status_code == 200
+    assert len(res.get_json()) == N_GOALS
+    assert calls["queries"] == 3
+
+    sg.goals.delete_many({"title": {"$nin": [f"Goal {i}" for i in range(5)]}})
+    calls["queries"] = 0
+    res = app.test_client().get("/v1/smart-goals/?user_id=user123")
+    assert len(res.get_json()) == 5
+    assert calls["queries"] == 3
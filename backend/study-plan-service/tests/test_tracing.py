@@ -0,0 +1,76 @@
+import json
+
+import pytest
+from flask import Flask, jsonify
+
+from hanabira_shared import tracing
+
+
+@pytest.fixture
+def traced_app(tmp_path, monkeypatch):
+    monkeypatch.setattr(tracing, "TRACING_ENABLED", True)
+    monkeypatch.setattr(tracing, "TRACE_SERVICE_NAME", None)
+    monkeypatch.setattr(tracing, "exporter", tracing.JsonlExporter(str(tmp_path)))
+    app = Flask(__name__)
+    tracing.init_tracing(app, "study-plan-service")
+
+    @app.route("/v1/things/<thing_id>")
+    def get_thing(thing_id):
+        with tracing.span("load_thing", thing_id=thing_id):
+            headers = tracing.inject({"Authorization": "Bearer x"})
+        return jsonify({"forwarded": headers})
+
+    def spans():
+        with open(tmp_path / "study-plan-service.jsonl") as f:
+            return [json.loads(line) for line in f]
+    return app, spans
+
+
+def test_parse_traceparent():
+    tid, sid = "4bf92f3577b34da6a3ce929d0e0e4736", "00f067aa0ba902b7"
+    assert tracing.parse_traceparent(f"00-{tid}-{sid}-01") == (tid, sid)
+    assert tracing.parse_traceparent(f"00-{'0' * 32}-{sid}-01") is None
+    assert tracing.parse_traceparent(f"ff-{tid}-{sid}-01") is None
+    assert tracing.parse_traceparent("garbage") is None
+    assert tracing.parse_traceparent(None) is None
+
+
+def test_server_span_joins_incoming_trace(traced_app):
+    app, spans = traced_app
+    tid, parent = "4bf92f3577b34da6a3ce929d0e0e4736", "00f067aa0ba902b7"
+
+    res = app.test_client().get("/v1/things/42", headers={"traceparent": f"00-{tid}-{parent}-01"})
+    assert res.status_code == 200
+
+    server = next(s for s in spans() if s["kind"] == "server")
+    child = next(s for s in spans() if s["name"] == "load_thing")
+    assert server["traceId"] == child["traceId"] == tid
+    assert server["parentSpanId"] == parent
+    assert server["name"] == "GET /v1/things/<thing_id>"
+    assert server["attributes"]["http.status_code"] == 200
+    assert server["service"] == child["service"] == "study-plan-service"
+    assert child["parentSpanId"] == server["spanId"]
+    assert child["attributes"]["thing_id"] == "42"
+    assert res.headers["traceresponse"] == f"00-{tid}-{server['spanId']}-01"
+
+    # Outbound headers carry the innermost span
+    forwarded = res.get_json()["forwarded"]
+    assert forwarded["Authorization"] == "Bearer x"
+    assert forwarded["traceparent"] == f"00-{tid}-{child['spanId']}-01"
+
+
+def test_new_trace_without_header(traced_app):
+    app, spans = traced_app
+    app.test_client().get("/v1/things/1")
+    app.test_client().get("/v1/things/2")
+    roots = [s for s in spans() if s["kind"] == "server"]
+    assert len(roots) == 2
+    assert roots[0]["traceId"] != roots[1]["traceId"]
+    assert all(s["parentSpanId"] is None for s in roots)
+
+
+def test_disabled_is_noop(monkeypatch):
+    monkeypatch.setattr(tracing, "TRACING_ENABLED", False)
+    with tracing.span("anything") as s:
+        assert s is None
+        assert tracing.inject({"a": "b"}) == {"a": "b"}
@@ -0,0 +1,69 @@
+"""
+Flask request hooks for the native ASGI routes.
+
+asgi.py serves a few hot reads natively (modules/async_reads.py) in front
+of the mounted Flask app. Routes built with `flask_hooks_route(flask_app)`
+run their async handler inside a Flask request context for the same
+request, the way Flask's own full_dispatch_request does:
+
+    preprocess_request()   before_request hooks: flask-limiter, tracing
+                           (traceparent), query tracking, metrics timer,
+                           Talisman
+    <async handler>
+    finalize_request()     after_request hooks: compression, security
+                           headers, traceresponse, X-DB-Queries / N+1 log,
+                           request histograms, CORS
+    teardown               teardown_request hooks
+
+So both serving modes apply exactly the hooks registered on the Flask app,
+including ones added later. The request resolves to the same Flask url_rule
+and endpoint, so metrics land in the same series and rate limits count
+against the same buckets.
+
+The sync hooks run on the event loop; they are cheap with the in-memory
+limiter storage this service uses.
+"""
+
+from fastapi import Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.routing import APIRoute
+from starlette.exceptions import HTTPException
+from starlette.middleware.wsgi import build_environ
+from starlette.responses import Response
+
+
+def to_flask_response(flask_app, response: Response):
+    headers = [(k.decode("latin-1"), v.decode("latin-1")) for k, v in response.raw_headers]
+    return flask_app.response_class(response.body, status=response.status_code, headers=headers)
+
+
+def to_asgi_response(response) -> Response:
+    result = Response(response.get_data(), status_code=response.status_code)
+    result.raw_headers = [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in response.headers.items()]
+    return result
+
+
+def flask_hooks_route(flask_app):
+    """APIRoute class whose handlers run between the Flask app's before/after/teardown hooks."""
+
+    class FlaskHooksRoute(APIRoute):
+        def get_route_handler(self):
+            handler = super().get_route_handler()
+
+            async def run_with_flask_hooks(request: Request) -> Response:
+                environ = build_environ(request.scope, await request.body())
+                with flask_app.request_context(environ):
+                    try:
+                        rv = flask_app.preprocess_request()
+                        if rv is None:
+                            rv = to_flask_response(flask_app, await handler(request))
+                    except (HTTPException, RequestValidationError):
+                        # FastAPI's own errors keep FastAPI's handlers
+                        raise
+                    except Exception as e:
+                        rv = flask_app.handle_user_exception(e)
+                    return to_asgi_response(flask_app.finalize_request(rv))
+
+            return run_with_flask_hooks
+
+    return FlaskHooksRoute
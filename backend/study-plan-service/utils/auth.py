@@ -1,22 +1,59 @@
 import jwt
 import os
 import functools
+from typing import Any, Dict, Optional
 from flask import request, jsonify
 
+from hanabira_shared.token_cache import TokenCache
+
 # JWT Configuration
 JWT_SECRET = os.environ.get("JWT_SECRET", "your-development-secret-key")
 JWT_ALGORITHM = os.environ.get("JWT_ALGORITHM", "HS256")
 
+token_cache = TokenCache()
+
+
+def rotate_signing_key(secret: str, algorithm: Optional[str] = None):
+    """Switch to a new signing key; previously verified tokens are dropped."""
+    global JWT_SECRET, JWT_ALGORITHM
+    JWT_SECRET = secret
+    JWT_ALGORITHM = algorithm or JWT_ALGORITHM
+    token_cache.bind(JWT_SECRET, JWT_ALGORITHM)
+
+
+def decode_token(token: str) -> Dict[str, Any]:
+    """
+    jwt.decode with the service key, served from the verified-token cache
+    when possible. Raises the same jwt exceptions as jwt.decode.
+    """
+    token_cache.bind(JWT_SECRET, JWT_ALGORITHM)
+    cached = token_cache.get(token)
+    if cached is not None:
+        claims, error = cached
+        if error is not None:
+            raise error.with_traceback(None)
+        return dict(claims)
+
+    try:
+        claims = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+    except jwt.InvalidTokenError as e:
+        # ExpiredSignatureError is an InvalidTokenError too
+        token_cache.put_invalid(token, e)
+        raise
+    token_cache.put(token, claims)
+    return dict(claims)
+
+
 def login_required(f):
     @functools.wraps(f)
     def decorated_function(*args, **kwargs):
         auth_header = request.headers.get("Authorization")
         if not auth_header or not auth_header.startswith("Bearer "):
             return jsonify({"error": "Authentication required"}), 401
-        
+
         token = auth_header.split(" ")[1]
         try:
-            payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
+            payload = decode_token(token)
             request.user = payload
         except jwt.ExpiredSignatureError:
             return jsonify({"error": "Token has expired"}), 401
@@ -24,6 +61,6 @@ def login_required(f):
             return jsonify({"error": "Invalid token"}), 401
         except Exception:
             return jsonify({"error": "Authentication failed"}), 401
-            
+
         return f(*args, **kwargs)
     return decorated_function
@@ -0,0 +1,28 @@
+"""
+Write-side trigger for OKR key-result refresh.
+
+Key results are computed from mastery, interaction and session data and
+are no longer recomputed on GET. Writers that change that data call
+`mark_okrs_stale`; the OKR module refreshes stale objectives in the
+background and the nightly batch job refreshes everything once a day.
+"""
+
+import logging
+from datetime import datetime, timezone
+
+OKR_COLLECTION = "okr_objectives"
+
+logger = logging.getLogger(__name__)
+
+
+def mark_okrs_stale(db, user_id: str) -> None:
+    """Flag the user's objectives for a key-result refresh (one cheap write)."""
+    if not user_id:
+        return
+    try:
+        db[OKR_COLLECTION].update_many(
+            {"user_id": user_id, "kr_stale": {"$ne": True}},
+            {"$set": {"kr_stale": True, "kr_stale_since": datetime.now(timezone.utc)}}
+        )
+    except Exception as e:
+        logger.error(f"Error marking OKRs stale for {user_id}: {e}")
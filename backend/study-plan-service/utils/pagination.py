@@ -0,0 +1,90 @@
+"""
+Keyset (cursor) pagination for per-user listings.
+
+Pages are ordered by (sort_key, _id) within a user and continue from the
+last row seen rather than skipping over earlier rows, so page N costs the
+same as page 1 when the collection has a matching (user_id, sort_key, _id)
+index. The position is handed to clients as an opaque, URL-safe cursor
+token; it is bound to the sort key it was issued for.
+
+Listings that already return a JSON object carry the token as
+"next_cursor"; bare-list listings send it in the X-Next-Cursor header so
+existing clients keep working. No token means there are no more rows.
+"""
+
+import base64
+import binascii
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from bson import json_util
+
+DEFAULT_PAGE_SIZE = int(os.getenv("DEFAULT_PAGE_SIZE", 50))
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", 200))
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def page_size(requested: Optional[int]) -> int:
+    if not requested or requested < 1:
+        return DEFAULT_PAGE_SIZE
+    return min(requested, MAX_PAGE_SIZE)
+
+
+def encode_cursor(sort_key: str, value: Any, _id: Any) -> str:
+    raw = json_util.dumps({"k": sort_key, "v": value, "id": _id})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str, sort_key: str) -> Tuple[Any, Any]:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        data = json_util.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        if data["k"] != sort_key:
+            raise InvalidCursor("Cursor was issued for a different ordering")
+        return data["v"], data["id"]
+    except InvalidCursor:
+        raise
+    except (binascii.Error, ValueError, KeyError, TypeError, UnicodeDecodeError):
+        raise InvalidCursor("Malformed cursor")
+
+
+def _get_path(doc: Dict[str, Any], path: str) -> Any:
+    for part in path.split("."):
+        doc = doc.get(part) if isinstance(doc, dict) else None
+    return doc
+
+
+def keyset_page(collection, query: Dict[str, Any], sort_key: str, direction: int = -1,
+                cursor: Optional[str] = None, limit: Optional[int] = None,
+                projection: Optional[Dict[str, Any]] = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    One page of `query` ordered by (sort_key, _id) in `direction`.
+
+    Returns (docs, next_cursor). `sort_key` must be present on every row the
+    query matches; rows without it cannot be positioned after.
+    """
+    limit = page_size(limit)
+    if cursor:
+        value, last_id = decode_cursor(cursor, sort_key)
+        op = "$lt" if direction < 0 else "$gt"
+        query = {"$and": [query, {"$or": [
+            {sort_key: {op: value}},
+            {sort_key: value, "_id": {op: last_id}},
+        ]}]}
+
+    docs = list(
+        collection.find(query, projection)
+        .sort([(sort_key, direction), ("_id", direction)])
+        .limit(limit + 1)
+    )
+    if len(docs) <= limit:
+        return docs, None
+
+    docs = docs[:limit]
+    last = docs[-1]
+    return docs, encode_cursor(sort_key, _get_path(last, sort_key), last["_id"])
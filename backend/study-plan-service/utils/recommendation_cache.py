@@ -0,0 +1,107 @@
+"""
+Versioned per-user recommendation cache.
+
+One document per user in `recommendation_cache`:
+    {user_id, version, cached_version, payload, cached_at}
+
+Writers that change anything recommendations depend on (activity logs,
+difficulty changes, plan changes) bump `version`. A cached payload is
+served only while `cached_version == version` and it is younger than the
+TTL, so recommendations that depend on the date (deadlines, streaks) are
+recomputed at least once a day. A payload computed from a stale version is
+never stored because the write is conditional on the version that was read
+before computing.
+"""
+
+import logging
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple
+
+RECOMMENDATION_CACHE_COLLECTION = "recommendation_cache"
+RECOMMENDATION_CACHE_TTL_SECONDS = int(os.getenv("RECOMMENDATION_CACHE_TTL_SECONDS", 24 * 3600))
+
+logger = logging.getLogger(__name__)
+
+
+def invalidate_recommendations(db, user_id: str) -> None:
+    """Bump the user's version stamp so the next read recomputes."""
+    if not user_id:
+        return
+    try:
+        db[RECOMMENDATION_CACHE_COLLECTION].update_one(
+            {"user_id": user_id},
+            {"$inc": {"version": 1}, "$set": {"invalidated_at": datetime.now(timezone.utc)}},
+            upsert=True
+        )
+    except Exception as e:
+        logger.error(f"Error invalidating recommendations for {user_id}: {e}")
+
+
+class RecommendationCache:
+    def __init__(self, collection, ttl_seconds: int = RECOMMENDATION_CACHE_TTL_SECONDS):
+        self.collection = collection
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def create_indexes(self):
+        self.collection.create_index([("user_id", 1)], unique=True)
+
+    def get(self, user_id: str) -> Tuple[Optional[Dict[str, Any]], int]:
+        """Return (payload or None, current version)."""
+        doc = self.collection.find_one({"user_id": user_id})
+        if doc is None:
+            self.collection.update_one(
+                {"user_id": user_id},
+                {"$setOnInsert": {"user_id": user_id, "version": 0}},
+                upsert=True
+            )
+            doc = {"version": 0}
+
+        version = doc.get("version", 0)
+        if (doc.get("payload") is not None and doc.get("cached_version") == version
+                and self._fresh(doc.get("cached_at"))):
+            self._count(hit=True)
+            return doc["payload"], version
+
+        self._count(hit=False)
+        return None, version
+
+    def _fresh(self, cached_at: Optional[datetime]) -> bool:
+        if cached_at is None:
+            return False
+        if cached_at.tzinfo is None:
+            # PyMongo returns naive UTC datetimes unless the client is tz_aware
+            cached_at = cached_at.replace(tzinfo=timezone.utc)
+        return datetime.now(timezone.utc) - cached_at < self.ttl
+
+    def put(self, user_id: str, version: int, payload: Dict[str, Any]) -> bool:
+        """Store payload computed at `version`; skipped if the user was invalidated meanwhile."""
+        res = self.collection.update_one(
+            {"user_id": user_id, "version": version},
+            {"$set": {
+                "payload": payload,
+                "cached_version": version,
+                "cached_at": datetime.now(timezone.utc)
+            }}
+        )
+        return res.matched_count > 0
+
+    def _count(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0
+            }
@@ -0,0 +1,64 @@
+"""
+Time-series collection helpers.
+
+Append-only event streams (content interactions, learning activities) are
+stored as MongoDB time-series collections keyed by user, so storage is
+bucketed per user and time range instead of one document per event.
+Servers without time-series support (MongoDB < 5.0, mongomock) fall back
+to a regular collection.
+"""
+
+import logging
+from pymongo.errors import CollectionInvalid, OperationFailure
+
+logger = logging.getLogger(__name__)
+
+# Default layout for event streams in this service
+EVENT_TIME_FIELD = "timestamp"
+EVENT_META_FIELD = "user_id"
+EVENT_GRANULARITY = "hours"
+
+
+def is_timeseries(db, name: str) -> bool:
+    """Return True if `name` already exists as a time-series collection."""
+    try:
+        for info in db.list_collections(filter={"name": name}):
+            return info.get("type") == "timeseries"
+    except Exception:
+        pass
+    return False
+
+
+def ensure_timeseries_collection(
+    db,
+    name: str,
+    time_field: str = EVENT_TIME_FIELD,
+    meta_field: str = EVENT_META_FIELD,
+    granularity: str = EVENT_GRANULARITY,
+):
+    """
+    Create `name` as a time-series collection if it does not exist yet.
+
+    Existing regular collections are left untouched (convert them with
+    scripts/archive_events.py --convert-timeseries). Always returns the
+    collection handle.
+    """
+    if name in db.list_collection_names():
+        if not is_timeseries(db, name):
+            logger.info(f"Collection {name} is a regular collection; time-series conversion pending")
+        return db[name]
+
+    try:
+        db.create_collection(name, timeseries={
+            "timeField": time_field,
+            "metaField": meta_field,
+            "granularity": granularity,
+        })
+        logger.info(f"Created time-series collection {name} (meta={meta_field})")
+    except CollectionInvalid:
+        # Created concurrently by another worker
+        pass
+    except (OperationFailure, NotImplementedError) as e:
+        logger.warning(f"Time-series collections unavailable, using regular collection for {name}: {e}")
+
+    return db[name]
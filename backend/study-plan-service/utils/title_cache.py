@@ -0,0 +1,68 @@
+"""
+In-process cache for dictionary/grammar titles used when hydrating items.
+
+JMdict entries and grammar points are effectively read-only reference
+data, so a bounded LRU with a long TTL removes almost all of the lookups
+on hot read paths. Lookups that found nothing are cached too (as None),
+so unknown ids do not hit Mongo on every request.
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, List, Tuple
+
+TITLE_CACHE_MAX_SIZE = int(os.getenv("TITLE_CACHE_MAX_SIZE", 20000))
+TITLE_CACHE_TTL_SECONDS = int(os.getenv("TITLE_CACHE_TTL_SECONDS", 6 * 3600))
+
+_MISSING = object()
+
+
+class TitleCache:
+    def __init__(self, max_size: int = TITLE_CACHE_MAX_SIZE, ttl_seconds: int = TITLE_CACHE_TTL_SECONDS):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get_many(self, keys: Iterable[Hashable]) -> Tuple[Dict[Hashable, Any], List[Hashable]]:
+        """Return ({key: value} for cached keys, [keys that must be loaded])."""
+        found, missing = {}, []
+        now = time.monotonic()
+        with self._lock:
+            for key in keys:
+                entry = self._data.get(key, _MISSING)
+                if entry is not _MISSING and entry[0] > now:
+                    self._data.move_to_end(key)
+                    found[key] = entry[1]
+                    self.hits += 1
+                else:
+                    missing.append(key)
+                    self.misses += 1
+        return found, missing
+
+    def put_many(self, values: Dict[Hashable, Any]):
+        expires = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            for key, value in values.items():
+                self._data[key] = (expires, value)
+                self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0
+            }
@@ -0,0 +1,16 @@
+"""
+HTTP benchmark harness for the Flask (5100) and study-plan (5500) services.
+
+Drives each service in-process through the Flask test client against seeded
+data and records latency percentiles and Mongo command counts per endpoint.
+
+    harness.py    service loading, Mongo command counters, timing, reports
+    workloads.py  seed data and the scripted request mix per service
+    run.py        CLI: run a tier, write JSON, compare against a baseline
+    serialization.py  JSON encode time and bytes on the wire per endpoint
+    logging_overhead.py  flashcard write throughput, legacy prints vs queue-backed logging
+
+Tiers:
+    mongomock   in-memory, no mongod needed (CI)
+    local       a mongod on localhost:27017 (services hardcode this host)
+"""
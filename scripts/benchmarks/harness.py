@@ -0,0 +1,217 @@
+"""
+Benchmark harness: loads a service's Flask app in-process, counts the Mongo
+commands each request issues, and summarizes latencies.
+
+Both services are laid out as server.py + modules/ + utils/ / config/, so
+they are loaded one at a time and those top-level packages are dropped from
+sys.modules in between.
+"""
+
+import importlib
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional
+
+from pymongo import monitoring
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+SERVICE_DIRS = {
+    "flask": os.path.join(REPO_ROOT, "backend", "flask"),
+    "study-plan": os.path.join(REPO_ROOT, "backend", "study-plan-service"),
+}
+# hanabira_shared too: it holds per-service state (tracing's service name, HOT_LOGGERS, the metrics registry)
+SERVICE_PACKAGES = ("server", "modules", "utils", "config", "hanabira_shared")
+
+# Driver chatter that is not part of serving a request
+IGNORED_COMMANDS = {"hello", "ismaster", "isMaster", "ping", "endSessions", "saslStart", "saslContinue",
+                    "buildInfo", "getMore"}
+
+
+# ============================================
+# Mongo command counting
+# ============================================
+
+class CommandCounter(monitoring.CommandListener):
+    """
+    Counts Mongo commands by name. Registered globally with PyMongo for the
+    local tier; the mongomock tier feeds it from instrumented collection
+    methods instead (mongomock never emits command events).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = Counter()
+
+    def record(self, name: str):
+        with self._lock:
+            self.counts[name] += 1
+
+    def snapshot(self) -> Counter:
+        with self._lock:
+            return Counter(self.counts)
+
+    def started(self, event):
+        if event.command_name not in IGNORED_COMMANDS:
+            self.record(event.command_name)
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+
+# mongomock method -> the wire command PyMongo would send for it
+MOCK_COMMANDS = {
+    "find": "find", "find_one": "find", "aggregate": "aggregate", "count_documents": "aggregate",
+    "estimated_document_count": "count", "distinct": "distinct",
+    "insert_one": "insert", "insert_many": "insert", "update_one": "update", "update_many": "update",
+    "replace_one": "update", "delete_one": "delete", "delete_many": "delete", "bulk_write": "bulkWrite",
+    "find_one_and_update": "findAndModify", "find_one_and_replace": "findAndModify",
+    "find_one_and_delete": "findAndModify", "create_index": "createIndexes", "create_indexes": "createIndexes",
+}
+
+
+def instrument_mongomock(counter: CommandCounter):
+    """Wrap mongomock.Collection methods so each top-level call counts once."""
+    from mongomock.collection import Collection
+
+    depth = threading.local()
+
+    def wrap(method: Callable, command: str):
+        def counted(self, *args, **kwargs):
+            # find_one -> find, update_one -> _update, ...: only the outermost call is a command
+            if getattr(depth, "n", 0) == 0:
+                counter.record(command)
+            depth.n = getattr(depth, "n", 0) + 1
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                depth.n -= 1
+        counted.__wrapped__ = method
+        return counted
+
+    for name, command in MOCK_COMMANDS.items():
+        method = getattr(Collection, name, None)
+        if method is not None and not hasattr(method, "__wrapped__"):
+            setattr(Collection, name, wrap(method, command))
+
+
+def start_tier(tier: str, counter: CommandCounter):
+    """Point every MongoClient the services create at the chosen backend."""
+    if tier == "local":
+        monitoring.register(counter)
+        return None
+
+    import mongomock
+    import pymongo
+
+    patcher = mongomock.patch(servers=(("localhost", 27017),), on_new="create")
+    patcher.start()
+    instrument_mongomock(counter)
+
+    # flask_pymongo subclasses the real MongoClient, so route it through the patched one too
+    import flask_pymongo
+    flask_pymongo.MongoClient = pymongo.MongoClient
+    return patcher
+
+
+# ============================================
+# Service loading
+# ============================================
+
+def load_service(service: str, env: Optional[Dict[str, str]] = None, log_level: str = "WARNING"):
+    """Import a service's server module fresh and return its module object."""
+    for name in list(sys.modules):
+        if name.split(".")[0] in SERVICE_PACKAGES:
+            del sys.modules[name]
+    for path in SERVICE_DIRS.values():
+        while path in sys.path:
+            sys.path.remove(path)
+    sys.path.insert(0, SERVICE_DIRS[service])
+    os.environ.update(env or {})
+
+    server = importlib.import_module("server")
+    # Services call logging.basicConfig(INFO) on import; per-request logs would skew timings
+    logging.getLogger().setLevel(log_level)
+    server.app.config["TESTING"] = True
+    limiter = getattr(server, "limiter", None)
+    if limiter is not None:
+        limiter.enabled = False
+    return server
+
+
+# ============================================
+# Measurement
+# ============================================
+
+def percentile(samples: List[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    k = (len(ordered) - 1) * pct / 100
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def run_endpoint(client, counter: CommandCounter, requests: List[Dict[str, Any]],
+                 warmup: int = 5) -> Dict[str, Any]:
+    """
+    Issue `requests` (dicts of method/path/headers/json) in order and return
+    latency percentiles and per-request Mongo command counts.
+    """
+    for req in requests[:warmup]:
+        client.open(req["path"], method=req["method"], headers=req.get("headers"), json=req.get("json"))
+
+    latencies, statuses = [], Counter()
+    before = counter.snapshot()
+    for req in requests:
+        start = time.perf_counter()
+        resp = client.open(req["path"], method=req["method"], headers=req.get("headers"), json=req.get("json"))
+        latencies.append((time.perf_counter() - start) * 1000)
+        statuses[resp.status_code] += 1
+    commands = counter.snapshot() - before
+
+    n = len(requests)
+    return {
+        "requests": n,
+        "errors": sum(c for s, c in statuses.items() if s >= 400),
+        "status_codes": {str(s): c for s, c in sorted(statuses.items())},
+        "mean_ms": round(sum(latencies) / n, 3) if n else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "mongo_commands_per_request": round(sum(commands.values()) / n, 2) if n else 0.0,
+        "mongo_commands": dict(sorted(commands.items())),
+    }
+
+
+# ============================================
+# Comparison
+# ============================================
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], threshold: float) -> List[Dict[str, Any]]:
+    """
+    Per-endpoint deltas between two result files. An endpoint regresses when
+    p95 grows by more than `threshold` (fraction) or it issues more Mongo
+    commands per request than before.
+    """
+    rows = []
+    for key, cur in current["endpoints"].items():
+        base = baseline.get("endpoints", {}).get(key)
+        if not base:
+            continue
+        p95_delta = (cur["p95_ms"] - base["p95_ms"]) / base["p95_ms"] if base["p95_ms"] else 0.0
+        cmd_delta = cur["mongo_commands_per_request"] - base["mongo_commands_per_request"]
+        rows.append({
+            "endpoint": key,
+            "p95_ms": (base["p95_ms"], cur["p95_ms"]),
+            "p95_change": round(p95_delta, 3),
+            "commands_per_request": (base["mongo_commands_per_request"], cur["mongo_commands_per_request"]),
+            "regressed": p95_delta > threshold or cmd_delta > 0,
+        })
+    return rows
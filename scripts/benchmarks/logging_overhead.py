@@ -0,0 +1,247 @@
+"""
+Logging Benchmark: print + synchronous handler vs the queue-backed layer
+
+Drives the Flask flashcard write paths (POST /v1/study/answer and
+POST /v1/flashcard) from several threads and reports throughput under two
+logging setups:
+
+- legacy: the old behaviour. logging.basicConfig(INFO) with a StreamHandler
+  that formats and writes on the request thread under the handler lock,
+  every per-request INFO line emitted, and the payload print() calls that
+  store_flashcard_state used to make.
+- structured: hanabira_shared.logging_setup.configure_logging(). Request threads
+  only enqueue; hot loggers are rate limited; debug lines are never built.
+
+Both write to the same sink: a file, with --write-latency-ms added to every
+write to model stderr piped to a container log driver (a blocking write
+under back-pressure). The modes alternate for --rounds rounds and the
+median is reported. The activity POST that answer_flashcard makes to the
+study-plan service is replaced with a no-op so only logging differs.
+
+SRS state is reset before every run so the interval never overflows.
+
+Usage:
+    python scripts/benchmarks/logging_overhead.py
+    python scripts/benchmarks/logging_overhead.py --threads 16 --requests 4000 --out bench/logging.json
+    python scripts/benchmarks/logging_overhead.py --write-latency-ms 0   # plain file
+"""
+
+import argparse
+import contextlib
+import json
+import logging
+import logging.handlers
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+# Add scripts/ to path to import the generator and this package
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+from flask import request
+
+from benchmarks.harness import CommandCounter, load_service, percentile, start_tier
+from benchmarks import workloads
+from benchmarks.run import SERVICE_ENV
+
+LEGACY_FORMAT = "%(asctime)s %(levelname)s %(name)s %(threadName)s : %(message)s"
+
+
+# ============================================
+# Logging setups
+# ============================================
+
+class SlowSink:
+    """File wrapper whose writes block for `latency` seconds, like a full pipe."""
+
+    def __init__(self, stream, latency: float):
+        self.stream = stream
+        self.latency = latency
+
+    def write(self, text):
+        if self.latency:
+            time.sleep(self.latency)
+        return self.stream.write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+
+def install_legacy_prints(app):
+    """Re-create the removed store_flashcard_state payload dump (stdout, on the request thread)."""
+    state = {"enabled": False}
+
+    @app.before_request
+    def _legacy_payload_print():
+        if state["enabled"] and request.path == "/v1/flashcard" and request.method == "POST":
+            print("received flashcard update POST payload:")
+            print(request.get_json(silent=True))
+
+    return state
+
+
+def use_legacy(sink, logging_setup):
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if type(handler) is logging.StreamHandler or isinstance(handler, logging.handlers.QueueHandler):
+            root.removeHandler(handler)
+    handler = logging.StreamHandler(sink)
+    handler.setFormatter(logging.Formatter(LEGACY_FORMAT))
+    root.addHandler(handler)
+    root.setLevel(logging.INFO)
+    for name in logging_setup.HOT_LOGGERS:
+        logging.getLogger(name).filters.clear()
+
+
+def use_structured(sink, logging_setup):
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        if type(handler) is logging.StreamHandler:
+            root.removeHandler(handler)
+    logging_setup.configure_logging(level="INFO", stream=sink)
+
+
+# ============================================
+# Load
+# ============================================
+
+def build_requests(flask_db, plans, secret, algorithm, count):
+    users = sorted(plans)
+    tokens = {uid: workloads.token(uid, secret, algorithm) for uid in users}
+    cards = {uid: [str(d["_id"]) for d in flask_db.user_flashcard_progress.find({"userId": uid}, {"_id": 1})]
+             for uid in users}
+    reqs = []
+    for n in range(count):
+        uid = users[n % len(users)]
+        headers = {"Authorization": f"Bearer {tokens[uid]}"}
+        if n % 4 == 3:
+            reqs.append(("/v1/flashcard", headers, {
+                "collectionName": "words", "userId": uid, "p_tag": "essential_600_verbs", "s_tag": "verbs-1",
+                "vocabulary_original": f"verbs-1-{n % 75}", "difficulty": "medium",
+            }))
+        else:
+            card_ids = cards[uid]
+            reqs.append(("/v1/study/answer", headers, {"cardId": card_ids[n % len(card_ids)], "quality": n % 6}))
+    return reqs
+
+
+def drive(app, reqs, threads):
+    """Split `reqs` over `threads` workers (one test client each); returns (seconds, latencies_ms, errors)."""
+    latencies, errors = [], []
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(chunk):
+        client, local_lat, local_err = app.test_client(), [], 0
+        barrier.wait()
+        for path, headers, body in chunk:
+            start = time.perf_counter()
+            resp = client.post(path, headers=headers, json=body)
+            local_lat.append((time.perf_counter() - start) * 1000)
+            local_err += resp.status_code >= 400
+        latencies.extend(local_lat)
+        errors.append(local_err)
+
+    pool = [threading.Thread(target=worker, args=(reqs[i::threads],), name=f"bench-{i}") for i in range(threads)]
+    for t in pool:
+        t.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for t in pool:
+        t.join()
+    return time.perf_counter() - start, latencies, sum(errors)
+
+
+def run_mode(mode, app, reqs, threads, sink, logging_setup, legacy_prints):
+    if mode == "legacy":
+        use_legacy(sink, logging_setup)
+    else:
+        use_structured(sink, logging_setup)
+    legacy_prints["enabled"] = mode == "legacy"
+    with contextlib.redirect_stdout(sink):
+        drive(app, reqs[:threads * 5], threads)  # warm up
+        seconds, latencies, errors = drive(app, reqs, threads)
+    logging_setup.flush_logging()
+    return len(reqs) / seconds, latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare request throughput under legacy and structured logging")
+    parser.add_argument("--users", type=int, default=4)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per mode and round")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--write-latency-ms", type=float, default=0.2, help="Added to every write to the sink")
+    parser.add_argument("--sink", help="Log file (default: a temp file)")
+    parser.add_argument("--out", help="Write results JSON here")
+    args = parser.parse_args()
+
+    start_tier("mongomock", CommandCounter())
+    from pymongo import MongoClient
+    mongo = MongoClient("mongodb://localhost:27017/")
+    plans = workloads.seed(mongo, args.users, args.days, args.seed)
+
+    server = load_service("flask", SERVICE_ENV.get("flask"))
+    logging_setup = sys.modules["hanabira_shared.logging_setup"]
+    auth = sys.modules["modules.auth"]
+    legacy_prints = install_legacy_prints(server.app)
+    flask_db = mongo["flaskFlashcardDB"]
+    reqs = build_requests(flask_db, plans, auth.JWT_SECRET, auth.JWT_ALGORITHM, args.requests)
+
+    sink_path = args.sink or tempfile.mkstemp(prefix="hanabira-logbench-", suffix=".log")[1]
+    log_file = open(sink_path, "a", buffering=1, encoding="utf-8")
+    sink = SlowSink(log_file, args.write_latency_ms / 1000)
+
+    runs = {"legacy": [], "structured": []}
+    real_post = requests.post
+    requests.post = lambda *a, **kw: None
+    try:
+        for _ in range(args.rounds):
+            for mode in runs:
+                # Fresh SRS state: repeated "good" answers would grow the interval past datetime's range
+                flask_db.user_flashcard_progress.update_many({}, {"$unset": {"srs_state": ""}})
+                size_before = os.path.getsize(sink_path)
+                rate, latencies, errors = run_mode(mode, server.app, reqs, args.threads, sink, logging_setup,
+                                                   legacy_prints)
+                log_file.flush()
+                runs[mode].append((rate, latencies, errors, os.path.getsize(sink_path) - size_before))
+    finally:
+        requests.post = real_post
+        logging_setup.configure_logging(stream=sys.stderr)
+        log_file.close()
+
+    results = {}
+    for mode, samples in runs.items():
+        latencies = [ms for _, lat, _, _ in samples for ms in lat]
+        results[mode] = row = {
+            "requests": len(reqs) * args.rounds,
+            "errors": sum(s[2] for s in samples),
+            "req_per_s": round(statistics.median(s[0] for s in samples), 1),
+            "p50_ms": round(percentile(latencies, 50), 3),
+            "p95_ms": round(percentile(latencies, 95), 3),
+            "p99_ms": round(percentile(latencies, 99), 3),
+            "log_bytes_per_request": round(sum(s[3] for s in samples) / (len(reqs) * args.rounds), 1),
+        }
+        print(f"✅ {mode:<10} {row['req_per_s']:>8.1f} req/s  p50 {row['p50_ms']:>7.2f}ms  "
+              f"p95 {row['p95_ms']:>7.2f}ms  p99 {row['p99_ms']:>7.2f}ms  "
+              f"{row['log_bytes_per_request']:>6.1f} log B/req  errors {row['errors']}")
+
+    speedup = results["structured"]["req_per_s"] / results["legacy"]["req_per_s"]
+    print(f"🏁 structured/legacy throughput: {speedup:.2f}x "
+          f"({args.threads} threads, {args.write_latency_ms}ms/write, log: {sink_path})")
+
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w") as f:
+            json.dump({"threads": args.threads, "write_latency_ms": args.write_latency_ms, "modes": results,
+                       "speedup": round(speedup, 2)}, f, indent=2)
+        print(f"🏁 Results written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+HTTP Benchmark: Flask + study-plan endpoints through the Flask test client
+
+Seeds a deterministic dataset, runs the scripted workload against each
+endpoint in-process, and reports p50/p95/p99 latency plus Mongo commands
+per request. Results are written as JSON so runs can be diffed across
+commits; --compare flags endpoints whose p95 or command count regressed.
+
+Usage:
+    python scripts/benchmarks/run.py                                # mongomock tier
+    python scripts/benchmarks/run.py --tier local --users 20 --iterations 500
+    python scripts/benchmarks/run.py --out bench/head.json --compare bench/main.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+# Add scripts/ to path to import the generator and this package
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.harness import REPO_ROOT, CommandCounter, compare, load_service, run_endpoint, start_tier
+from benchmarks import workloads
+
+SERVICE_ENV = {
+    "study-plan": {"BATCH_SCHEDULER_ENABLED": "false", "RATELIMIT_ENABLED": "false"},
+}
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Flask and study-plan endpoints")
+    parser.add_argument("--tier", choices=("mongomock", "local"), default="mongomock")
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--days", type=int, default=90, help="History depth per seeded user")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--iterations", type=int, default=200, help="Requests per endpoint")
+    parser.add_argument("--endpoint", action="append", help="Only run endpoints containing this text")
+    parser.add_argument("--out", help="Write results JSON here")
+    parser.add_argument("--compare", help="Baseline results JSON to diff against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="p95 growth that counts as a regression")
+    parser.add_argument("--log-level", default="WARNING", help="Service log level during the run")
+    parser.add_argument("--keep-data", action="store_true", help="Leave seeded data in place (local tier)")
+    args = parser.parse_args()
+
+    counter = CommandCounter()
+    patcher = start_tier(args.tier, counter)
+
+    from pymongo import MongoClient
+    client = MongoClient("mongodb://localhost:27017/")
+
+    print(f"🚀 Seeding {args.users} users x {args.days} days ({args.tier})...")
+    plans = workloads.seed(client, args.users, args.days, args.seed)
+
+    selected = [k for k in workloads.ENDPOINTS if not args.endpoint or any(e in k for e in args.endpoint)]
+    results = {}
+    for service in ("flask", "study-plan"):
+        keys = [k for k in selected if workloads.ENDPOINTS[k][0] == service]
+        if not keys:
+            continue
+        server = load_service(service, SERVICE_ENV.get(service), args.log_level)
+        auth = sys.modules["modules.auth" if service == "flask" else "utils.auth"]
+        test_client = server.app.test_client()
+        for key in keys:
+            requests = workloads.script(key, plans, args.iterations, auth.JWT_SECRET, auth.JWT_ALGORITHM)
+            results[key] = stats = run_endpoint(test_client, counter, requests)
+            print(f"✅ {key:<46} p50 {stats['p50_ms']:>8.2f}ms  p95 {stats['p95_ms']:>8.2f}ms  "
+                  f"p99 {stats['p99_ms']:>8.2f}ms  {stats['mongo_commands_per_request']:>6} cmds/req"
+                  + (f"  ⚠️ {stats['errors']} errors" if stats["errors"] else ""))
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "tier": args.tier,
+            "users": args.users,
+            "days": args.days,
+            "seed": args.seed,
+            "iterations": args.iterations,
+            "python": platform.python_version(),
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        },
+        "endpoints": results,
+    }
+
+    if args.tier == "local" and not args.keep_data:
+        workloads.cleanup(client, args.users)
+    if patcher is not None:
+        patcher.stop()
+
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"🏁 Results written to {args.out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        rows = compare(baseline, report, args.threshold)
+        print(f"\nvs {baseline['meta'].get('commit')} ({baseline['meta'].get('tier')}):")
+        for row in rows:
+            flag = "⚠️ " if row["regressed"] else "  "
+            print(f"{flag}{row['endpoint']:<46} p95 {row['p95_ms'][0]:.2f} -> {row['p95_ms'][1]:.2f}ms "
+                  f"({row['p95_change']:+.0%})  cmds/req {row['commands_per_request'][0]} -> "
+                  f"{row['commands_per_request'][1]}")
+        if any(row["regressed"] for row in rows):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Serialization Benchmark: stdlib vs orjson JSON provider, bytes on the wire
+
+For the largest read endpoints, captures the object each handler passes to
+jsonify() on the seeded dataset, then measures:
+- encode time with Flask's DefaultJSONProvider vs the service's OrjsonProvider
+- response size: stdlib (ASCII-escaped) vs orjson (UTF-8) raw, then gzip
+  and brotli (when installed)
+
+Usage:
+    python scripts/benchmarks/serialization.py
+    python scripts/benchmarks/serialization.py --users 5 --days 365 --repeat 50 --out bench/serialization.json
+"""
+
+import argparse
+import gzip
+import json
+import os
+import sys
+import time
+
+# Add scripts/ to path to import the generator and this package
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bson import ObjectId
+from flask.json.provider import DefaultJSONProvider
+
+from benchmarks.harness import CommandCounter, load_service, start_tier
+from benchmarks import workloads
+from benchmarks.run import SERVICE_ENV
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+LARGE_ENDPOINTS = [
+    "flask GET /v1/study/due",
+    "flask GET /v1/japanese-texts",
+    "study-plan GET /v1/learner/activities",
+    "study-plan GET /v1/priority-matrix",
+    "study-plan GET /v1/context/snapshot",
+]
+
+
+class StdlibProvider(DefaultJSONProvider):
+    """Flask's default provider; ObjectIds stringified as the old per-route loops did."""
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, ObjectId):
+            return str(o)
+        return DefaultJSONProvider.default(o)
+
+
+def capture_payload(app, client, req):
+    """Run one request and return the object its handler serialized."""
+    captured = {}
+    real = app.json.response
+
+    def spy(*args, **kwargs):
+        captured["obj"] = app.json._prepare_response_obj(args, kwargs)
+        return real(*args, **kwargs)
+
+    app.json.response = spy
+    try:
+        client.open(req["path"], method=req["method"], headers=req["headers"])
+    finally:
+        del app.json.response
+    return captured.get("obj")
+
+
+def time_encode(provider, obj, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        provider.response(obj).get_data()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JSON encoding and compression on large endpoints")
+    parser.add_argument("--users", type=int, default=3)
+    parser.add_argument("--days", type=int, default=180)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--out", help="Write results JSON here")
+    args = parser.parse_args()
+
+    start_tier("mongomock", CommandCounter())
+    from pymongo import MongoClient
+    plans = workloads.seed(MongoClient("mongodb://localhost:27017/"), args.users, args.days, args.seed)
+
+    results = {}
+    for service in ("flask", "study-plan"):
+        server = load_service(service, SERVICE_ENV.get(service))
+        app, client = server.app, server.app.test_client()
+        auth = sys.modules["modules.auth" if service == "flask" else "utils.auth"]
+        stdlib = StdlibProvider(app)
+
+        for key in (k for k in LARGE_ENDPOINTS if workloads.ENDPOINTS[k][0] == service):
+            req = workloads.script(key, plans, 1, auth.JWT_SECRET, auth.JWT_ALGORITHM)[0]
+            with app.app_context():
+                obj = capture_payload(app, client, req)
+                if obj is None:
+                    print(f"⚠️  {key}: handler did not return JSON")
+                    continue
+                body = app.json.response(obj).get_data()
+                row = {
+                    "stdlib_ms": round(time_encode(stdlib, obj, args.repeat), 3),
+                    "orjson_ms": round(time_encode(app.json, obj, args.repeat), 3),
+                    "stdlib_bytes": len(stdlib.response(obj).get_data()),
+                    "raw_bytes": len(body),
+                    "gzip_bytes": len(gzip.compress(body, compresslevel=6)),
+                    "br_bytes": len(brotli.compress(body, quality=4)) if brotli else None,
+                }
+            row["speedup"] = round(row["stdlib_ms"] / row["orjson_ms"], 1) if row["orjson_ms"] else None
+            results[key] = row
+            print(f"✅ {key:<40} encode {row['stdlib_ms']:>8.2f} -> {row['orjson_ms']:>7.2f}ms "
+                  f"({row['speedup']}x)  {row['stdlib_bytes']:>9,} -> {row['raw_bytes']:>9,}B raw  {row['gzip_bytes']:>8,}B gzip"
+                  + (f"  {row['br_bytes']:>8,}B br" if row["br_bytes"] else ""))
+
+    if args.out:
+        os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+        with open(args.out, "w") as f:
+            json.dump({"users": args.users, "days": args.days, "endpoints": results}, f, indent=2)
+        print(f"🏁 Results written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+Seed data and scripted request mix for the benchmark.
+
+Learner history comes from generate_synthetic_data.simulate_user (the same
+generator used for load testing), so the benchmark reads realistically
+sized, deterministic per-user data. Study plans, daily tasks, library
+texts and the static deck catalogue are added here because the generator
+does not produce them.
+"""
+
+import argparse
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+import jwt
+
+import generate_synthetic_data as synth
+
+STATIC_DB = "zenRelationshipsAutomated"
+DECK_PARTS = ["verbs-1", "verbs-2", "verbs-3", "verbs-4", "verbs-5", "verbs-6", "verbs-7", "verbs-8"]
+
+
+# ============================================
+# Seeding
+# ============================================
+
+def user_ids(users: int) -> List[str]:
+    return [f"{synth.USER_PREFIX}{i:06d}" for i in range(users)]
+
+
+def seed(client, users: int, days: int, seed_value: int) -> Dict[str, Any]:
+    """Write the benchmark dataset; returns {user_id: plan_id}."""
+    now = datetime.now(timezone.utc)
+    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    flask_db, sp_db = client["flaskFlashcardDB"], client["flaskStudyPlanDB"]
+
+    cleanup(client, users)
+
+    args = argparse.Namespace(seed=seed_value, days=days, max_cards=3000)
+    writer = synth.BulkWriter(5000)
+    for i in range(users):
+        synth.simulate_user(i, args, today, {"flask": flask_db, "study-plan": sp_db}, writer, None)
+    writer.flush()
+
+    plans = {}
+    for uid in user_ids(users):
+        plan_id = sp_db.study_plans.insert_one({
+            "user_id": uid, "status": "active", "target_level": "N4", "total_days": 120,
+            "start_date": now - timedelta(days=30), "exam_date": now + timedelta(days=90), "created_at": now,
+        }).inserted_id
+        sp_db.milestones.insert_many([{
+            "plan_id": plan_id, "milestone_number": n, "title": f"Milestone {n}", "status": "in_progress",
+            "target_start_date": now - timedelta(days=30), "target_end_date": now + timedelta(days=30 * n),
+            "criteria": [{"type": "vocab_count", "target_value": 100, "current_value": 10 * n}],
+        } for n in range(1, 4)])
+        sp_db.daily_tasks.insert_many([{
+            "user_id": uid, "plan_id": plan_id, "date": today, "task_type": t, "title": t.title(),
+            "description": "", "estimated_minutes": 15, "status": "pending", "task_key": t,
+        } for t in ("flashcard", "grammar", "reading")])
+        plans[uid] = str(plan_id)
+
+    client["library"]["texts"].insert_many([{
+        "userId": uid, "topic": f"Reading {n}", "sourceLink": "", "p_tag": "synthetic", "s_tag": f"part_{n}",
+        "lang": "jp", "actualText": "吾輩は猫である。名前はまだ無い。" * (40 + 20 * n),
+    } for uid in user_ids(users) for n in range(12)])
+
+    if client[STATIC_DB]["words"].count_documents({"p_tag": "essential_600_verbs"}) == 0:
+        client[STATIC_DB]["words"].insert_many([
+            {"p_tag": "essential_600_verbs", "s_tag": part, "vocabulary_original": f"{part}-{n}"}
+            for part in DECK_PARTS for n in range(75)
+        ])
+    return plans
+
+
+def cleanup(client, users: int):
+    ids = {"$in": user_ids(users)}
+    flask_db, sp_db = client["flaskFlashcardDB"], client["flaskStudyPlanDB"]
+    for name in ("personal_cards", "user_flashcard_progress"):
+        flask_db[name].delete_many({"userId": ids})
+    client["library"]["texts"].delete_many({"userId": ids})
+    plan_ids = [p["_id"] for p in sp_db.study_plans.find({"user_id": ids}, {"_id": 1})]
+    sp_db.milestones.delete_many({"plan_id": {"$in": plan_ids}})
+    for name in ("user_content_mastery", "content_interactions", "learning_activities", "study_sessions",
+                 "smart_goals", "study_plans", "daily_tasks", "priority_queue", "learner_progress"):
+        sp_db[name].delete_many({"user_id": ids})
+
+
+# ============================================
+# Workload
+# ============================================
+
+def token(user_id: str, secret: str, algorithm: str) -> str:
+    return jwt.encode({"userId": user_id, "role": "student",
+                       "exp": datetime.now(timezone.utc) + timedelta(hours=2)}, secret, algorithm=algorithm)
+
+
+# endpoint key -> (service, method, path template); {user_id} / {plan_id} are filled per request
+ENDPOINTS = {
+    "flask GET /v1/study/due": ("flask", "GET", "/v1/study/due"),
+    "flask GET /v1/decks": ("flask", "GET", "/v1/decks"),
+    "flask GET /v1/japanese-texts": ("flask", "GET", "/v1/japanese-texts/{user_id}"),
+    "study-plan GET /v1/learner/progress": ("study-plan", "GET", "/v1/learner/progress/{user_id}"),
+    "study-plan GET /v1/learner/stats": ("study-plan", "GET", "/v1/learner/stats/{user_id}"),
+    "study-plan GET /v1/learner/activities": ("study-plan", "GET", "/v1/learner/activities/{user_id}?limit=200"),
+    "study-plan GET /v1/priority-matrix": ("study-plan", "GET", "/v1/priority-matrix/?user_id={user_id}"),
+    "study-plan GET /v1/study-plan/daily-tasks": ("study-plan", "GET", "/v1/study-plan/daily-tasks"),
+    "study-plan GET /v1/study-plan/progress": ("study-plan", "GET", "/v1/study-plan/progress/{plan_id}"),
+    "study-plan GET /v1/context/snapshot": ("study-plan", "GET", "/v1/context/snapshot/{user_id}"),
+}
+
+
+def script(endpoint: str, plans: Dict[str, str], iterations: int, secret: str,
+           algorithm: str) -> List[Dict[str, Any]]:
+    """Round-robin the endpoint over the seeded users, `iterations` requests in total."""
+    _, method, template = ENDPOINTS[endpoint]
+    users = sorted(plans)
+    tokens = {uid: token(uid, secret, algorithm) for uid in users}
+    requests = []
+    for n in range(iterations):
+        uid = users[n % len(users)]
+        requests.append({
+            "method": method,
+            "path": template.format(user_id=uid, plan_id=plans[uid]),
+            "headers": {"Authorization": f"Bearer {tokens[uid]}"},
+        })
+    return requests
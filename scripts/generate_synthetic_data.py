@@ -0,0 +1,430 @@
+"""
+Synthetic dataset generator for load and performance testing.
+
+Unlike seed_strategy_data.py (a handful of demo records for one user), this
+reproduces production-scale history for many users. Every user's study
+history is simulated day by day:
+
+- Streaks and gaps: a two-state (studying / lapsed) Markov chain per user,
+  with a per-user engagement level.
+- Daily bursts: 1-3 sessions on study days, session size log-normal.
+- Zipfian content: studied words are drawn by Zipf frequency rank, and card
+  difficulty is Zipfian too (most cards easy, a long tail of leeches).
+- Cards are scheduled with SM-2, so SRS state, due dates and accuracy come
+  out of the simulated reviews rather than being drawn independently.
+
+Output goes with insert_many to the stores each service reads:
+    flask       flaskFlashcardDB.personal_cards, user_flashcard_progress
+    study-plan  flaskStudyPlanDB.user_content_mastery, content_interactions,
+                learning_activities, study_sessions, smart_goals
+    hanachan    conversations / chat_messages (SQL, DATABASE_URL)
+
+Output is deterministic for a given --seed and --anchor. That includes
+ObjectIds, so two runs produce identical datasets. Synthetic users are
+"synth-000000", "synth-000001", ...; --reset removes them first, and a run
+without --reset refuses to start while any are left.
+
+Usage:
+    python scripts/generate_synthetic_data.py --users 200 --days 180
+    python scripts/generate_synthetic_data.py --users 1000 --days 365 --seed 7 --reset
+    python scripts/generate_synthetic_data.py --stores study-plan --anchor 2025-01-01
+"""
+
+import argparse
+import bisect
+import math
+import os
+import random
+import struct
+import time
+from datetime import datetime, timedelta, timezone
+
+from bson import ObjectId
+from pymongo import MongoClient
+
+USER_PREFIX = "synth-"
+STORES = ("flask", "study-plan", "hanachan")
+
+VOCAB_POOL = 8000        # distinct words, ranked by frequency
+DIFFICULTY_LEVELS = 12   # Zipf-ranked difficulty buckets
+NEW_CARDS_PER_SESSION = 10
+
+CHAT_OPENERS = [
+    "Can you explain the difference between は and が?",
+    "Quiz me on today's vocabulary.",
+    "Why do I keep forgetting {word}?",
+    "What should I focus on this week?",
+    "Give me example sentences for {word}.",
+]
+
+
+# ============================================
+# Distributions
+# ============================================
+
+class Zipf:
+    """Finite Zipf(s) over ranks 1..n, sampled by inverse CDF."""
+
+    def __init__(self, n: int, s: float):
+        weights = [1 / (k ** s) for k in range(1, n + 1)]
+        total = sum(weights)
+        acc, self.cdf = 0.0, []
+        for w in weights:
+            acc += w / total
+            self.cdf.append(acc)
+
+    def sample(self, rng: random.Random) -> int:
+        return min(bisect.bisect_left(self.cdf, rng.random()), len(self.cdf) - 1) + 1
+
+
+WORD_RANKS = Zipf(VOCAB_POOL, 1.07)
+DIFFICULTY = Zipf(DIFFICULTY_LEVELS, 1.3)
+
+
+def oid(rng: random.Random, ts: datetime) -> ObjectId:
+    """Deterministic ObjectId: real timestamp prefix, seeded tail."""
+    return ObjectId(struct.pack(">I", int(ts.timestamp())) + rng.getrandbits(64).to_bytes(8, "big"))
+
+
+def study_days(rng: random.Random, days: int, engagement: float):
+    """Yield the day indexes a user studies on (two-state Markov chain)."""
+    p_break = 0.04 + 0.18 * (1 - engagement)
+    p_resume = 0.15 + 0.5 * engagement
+    active = True
+    for d in range(days):
+        if active:
+            yield d
+            active = rng.random() > p_break
+        else:
+            active = rng.random() < p_resume
+
+
+def sm2(card: dict, quality: int):
+    """Flask answer_flashcard's SM-2 step, applied in place."""
+    if quality >= 3:
+        card["interval"] = 1 if card["reps"] == 0 else 6 if card["reps"] == 1 else int(card["interval"] * card["ease"])
+        card["reps"] += 1
+        card["ease"] = max(1.3, card["ease"] + (0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02)))
+    else:
+        card["reps"] = 0
+        card["interval"] = 1
+
+
+def mastery_status(interval: int, accuracy: float, streak: int) -> str:
+    # Mirrors ContentMasteryModule.determine_status
+    if interval >= 120: return "burned"
+    if interval >= 21 and accuracy >= 90: return "mastered"
+    if streak >= 3 or accuracy >= 80: return "reviewing"
+    return "learning"
+
+
+# ============================================
+# Writers
+# ============================================
+
+class BulkWriter:
+    """Buffers documents per collection and flushes them with insert_many."""
+
+    def __init__(self, batch_size: int):
+        self.batch_size = batch_size
+        self.buffers = {}
+        self.counts = {}
+
+    def add(self, collection, doc: dict):
+        key = collection.full_name
+        buf = self.buffers.setdefault(key, (collection, []))[1]
+        buf.append(doc)
+        if len(buf) >= self.batch_size:
+            self._flush(key)
+
+    def _flush(self, key: str):
+        collection, buf = self.buffers[key]
+        if buf:
+            collection.insert_many(buf, ordered=False)
+            self.counts[key] = self.counts.get(key, 0) + len(buf)
+            buf.clear()
+
+    def flush(self):
+        for key in list(self.buffers):
+            self._flush(key)
+
+
+class SqlWriter:
+    """Bulk inserts into hanachan's conversation tables via SQLAlchemy Core."""
+
+    def __init__(self, database_url: str, batch_size: int):
+        from sqlalchemy import MetaData, create_engine
+
+        self.engine = create_engine(database_url)
+        self.meta = MetaData()
+        self.meta.reflect(self.engine, only=["conversations", "chat_messages"])
+        self.conversations = self.meta.tables["conversations"]
+        self.messages = self.meta.tables["chat_messages"]
+        self.batch_size = batch_size
+        self.counts = {"conversations": 0, "chat_messages": 0}
+
+    def write_user(self, conversations: list):
+        """conversations: [(conversation_row, [message_row, ...]), ...]"""
+        with self.engine.begin() as conn:
+            for conv, msgs in conversations:
+                conv_id = conn.execute(self.conversations.insert().values(**conv)).inserted_primary_key[0]
+                rows = [{**m, "conversation_id": conv_id} for m in msgs]
+                for i in range(0, len(rows), self.batch_size):
+                    conn.execute(self.messages.insert(), rows[i:i + self.batch_size])
+                self.counts["conversations"] += 1
+                self.counts["chat_messages"] += len(rows)
+
+    def has_synthetic(self) -> bool:
+        from sqlalchemy import select
+
+        with self.engine.connect() as conn:
+            query = select(self.conversations.c.id).where(self.conversations.c.user_id.like(f"{USER_PREFIX}%"))
+            return conn.execute(query.limit(1)).first() is not None
+
+    def reset(self):
+        from sqlalchemy import select
+
+        with self.engine.begin() as conn:
+            ids = select(self.conversations.c.id).where(self.conversations.c.user_id.like(f"{USER_PREFIX}%"))
+            conn.execute(self.messages.delete().where(self.messages.c.conversation_id.in_(ids)))
+            conn.execute(self.conversations.delete().where(self.conversations.c.user_id.like(f"{USER_PREFIX}%")))
+
+
+# ============================================
+# Simulation
+# ============================================
+
+def simulate_user(index: int, args, anchor: datetime, dbs: dict, writer: BulkWriter, sql: "SqlWriter"):
+    rng = random.Random(f"{args.seed}:{index}")
+    user_id = f"{USER_PREFIX}{index:06d}"
+    start = anchor - timedelta(days=args.days)
+    engagement = rng.betavariate(2, 2)
+
+    cards = {}            # word rank -> card state
+    due = {}              # day index -> [word rank]
+    flask_db, sp_db = dbs.get("flask"), dbs.get("study-plan")
+    chat_days = []
+
+    for d in study_days(rng, args.days, engagement):
+        day = start + timedelta(days=d)
+        for s in range(rng.choices([1, 2, 3], weights=[6, 3, 1])[0]):
+            session_start = day + timedelta(hours=rng.choice([7, 12, 19, 21]) + 3 * s, minutes=rng.randrange(60))
+            burst = max(3, min(200, int(rng.lognormvariate(3.0, 0.6) * (0.5 + engagement))))
+
+            queue = []
+            for due_day in sorted(k for k in due if k <= d):
+                queue.extend(due.pop(due_day))
+            # Overflow stays due tomorrow, like a real backlog
+            if len(queue) > burst:
+                due.setdefault(d + 1, []).extend(queue[burst:])
+                queue = queue[:burst]
+            for _ in range(min(NEW_CARDS_PER_SESSION, burst - len(queue))):
+                rank = WORD_RANKS.sample(rng)
+                if rank not in cards and len(cards) < args.max_cards:
+                    cards[rank] = {
+                        "rank": rank, "p_fail": min(0.75, 0.04 + 0.07 * (DIFFICULTY.sample(rng) - 1)),
+                        "reps": 0, "interval": 0, "ease": 2.5, "reviews": 0, "correct": 0, "streak": 0,
+                        "first_seen": session_start, "last_review": None,
+                    }
+                    queue.append(rank)
+
+            ts = session_start
+            correct_in_session = 0
+            for rank in queue:
+                card = cards[rank]
+                ts += timedelta(seconds=rng.randint(4, 25))
+                is_correct = rng.random() > card["p_fail"]
+                quality = rng.choices([3, 4, 5], weights=[3, 5, 2])[0] if is_correct else rng.choice([0, 1, 2])
+                old_interval = card["interval"]
+                sm2(card, quality)
+                card["reviews"] += 1
+                card["correct"] += is_correct
+                card["streak"] = card["streak"] + 1 if is_correct else 0
+                card["last_review"] = ts
+                correct_in_session += is_correct
+                due.setdefault(d + max(1, card["interval"]), []).append(rank)
+
+                if sp_db is not None:
+                    writer.add(sp_db.content_interactions, {
+                        "_id": oid(rng, ts), "user_id": user_id, "interaction_type": "flashcard_review",
+                        "content_type": "vocabulary", "content_id": f"word_{rank}", "is_correct": is_correct,
+                        "timestamp": ts,
+                        "srs_change": {"old_interval": old_interval, "new_interval": card["interval"]},
+                    })
+
+            minutes = max(1, round((ts - session_start).total_seconds() / 60))
+            if sp_db is not None and queue:
+                writer.add(sp_db.learning_activities, {
+                    "_id": oid(rng, ts), "user_id": user_id, "activity_type": "flashcard_review", "timestamp": ts,
+                    "data": {"count": len(queue), "category": "vocabulary", "duration_minutes": minutes,
+                             "score": round(100 * correct_in_session / len(queue))},
+                })
+                writer.add(sp_db.study_sessions, {
+                    "_id": oid(rng, session_start), "user_id": user_id, "skill": "vocabulary",
+                    "created_at": session_start, "started_at": session_start, "ended_at": ts,
+                    "duration_minutes": minutes, "items_reviewed": len(queue),
+                })
+        if rng.random() < 0.15 * (0.5 + engagement):
+            chat_days.append(day)
+
+    # Final card states
+    for card in cards.values():
+        next_review = card["last_review"] + timedelta(days=max(1, card["interval"]))
+        created = card["first_seen"]
+        if flask_db is not None:
+            # Personal cards, so /v1/study/due hydrates without the static Express DB
+            card_oid = oid(rng, created)
+            writer.add(flask_db.personal_cards, {
+                "_id": card_oid, "userId": user_id, "front": f"word_{card['rank']}",
+                "back": f"meaning of word_{card['rank']}", "type": "vocabulary", "default_deck": "Synthetic",
+                "original_creator": "user", "created_at": created,
+            })
+            writer.add(flask_db.user_flashcard_progress, {
+                "_id": oid(rng, created), "userId": user_id, "card_type": "PERSONAL",
+                "content_type": "vocabulary", "source_id": str(card_oid), "deck_name": "Synthetic",
+                "srs_state": {"repetitions": card["reps"], "interval": card["interval"],
+                              "ease_factor": round(card["ease"], 2), "next_review_at": next_review,
+                              "last_review_at": card["last_review"]},
+                "tags": ["synthetic"], "created_at": created,
+            })
+        if sp_db is not None:
+            accuracy = 100 * card["correct"] / card["reviews"]
+            writer.add(sp_db.user_content_mastery, {
+                "_id": oid(rng, created), "user_id": user_id, "content_type": "vocabulary",
+                "content_id": f"word_{card['rank']}", "status": mastery_status(card["interval"], accuracy, card["streak"]),
+                "mastery_stage": min(card["reps"] + 1, 8),
+                "srs": {"ease_factor": round(card["ease"], 2), "interval_days": card["interval"],
+                        "next_review_date": next_review, "review_count": card["reviews"],
+                        "correct_streak": card["streak"], "lapse_count": card["reviews"] - card["correct"]},
+                "stats": {"total_reviews": card["reviews"], "correct_count": card["correct"],
+                          "incorrect_count": card["reviews"] - card["correct"],
+                          "accuracy_percent": round(accuracy, 2)},
+                "first_seen_at": created, "last_reviewed_at": card["last_review"],
+                "created_at": created, "updated_at": card["last_review"],
+            })
+
+    if sp_db is not None:
+        for metric, target in (("vocabulary_count", 500), ("study_minutes", 1200)):
+            created = start + timedelta(days=rng.randrange(max(1, args.days // 2)))
+            writer.add(sp_db.smart_goals, {
+                "_id": oid(rng, created), "user_id": user_id, "plan_id": None,
+                "title": f"Synthetic {metric.replace('_', ' ')} goal", "measurable_metric": metric,
+                "measurable_target": target, "measurable_baseline": 0, "status": "active", "priority": 1,
+                "time_bound_deadline": anchor + timedelta(days=rng.randint(14, 120)), "success_criteria": [],
+                "progress_percent": 0, "created_at": created, "updated_at": created,
+            })
+
+    if sql is not None and chat_days:
+        conversations = []
+        for n, day in enumerate(chat_days):
+            opened = day + timedelta(hours=rng.randint(8, 22), minutes=rng.randrange(60))
+            msgs, ts = [], opened
+            for turn in range(rng.randint(1, 6)):
+                word = f"word_{WORD_RANKS.sample(rng)}"
+                for role in ("user", "assistant"):
+                    ts += timedelta(seconds=rng.randint(5, 90))
+                    text = rng.choice(CHAT_OPENERS).format(word=word) if role == "user" else \
+                        f"Synthetic reply about {word}. " * rng.randint(1, 8)
+                    msgs.append({"role": role, "content": text, "created_at": ts})
+            conversations.append(({
+                "session_id": f"{user_id}-{n:05d}", "user_id": user_id, "title": f"Chat {n + 1}",
+                "created_at": opened, "updated_at": ts,
+            }, msgs))
+        sql.write_user(conversations)
+
+
+# store -> (user field, collections written)
+MONGO_COLLECTIONS = {
+    "flask": ("userId", ("personal_cards", "user_flashcard_progress")),
+    "study-plan": ("user_id", ("user_content_mastery", "content_interactions", "learning_activities",
+                               "study_sessions", "smart_goals")),
+}
+
+
+def existing_stores(dbs: dict, sql: "SqlWriter") -> list:
+    """Stores that already hold synthetic users (reruns would collide on their fixed _ids)."""
+    query = {"$regex": f"^{USER_PREFIX}"}
+    found = [store for store, db in dbs.items()
+             if any(db[name].find_one({MONGO_COLLECTIONS[store][0]: query}, {"_id": 1})
+                    for name in MONGO_COLLECTIONS[store][1])]
+    if sql is not None and sql.has_synthetic():
+        found.append("hanachan")
+    return found
+
+
+def reset(dbs: dict, sql: "SqlWriter"):
+    query = {"$regex": f"^{USER_PREFIX}"}
+    for store, db in dbs.items():
+        field, names = MONGO_COLLECTIONS[store]
+        for name in names:
+            db[name].delete_many({field: query})
+    if sql is not None:
+        sql.reset()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a deterministic synthetic dataset")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--days", type=int, default=180, help="History depth per user")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--anchor", help="End of history (YYYY-MM-DD, UTC); default today")
+    parser.add_argument("--max-cards", type=int, default=3000, help="Cap on distinct cards per user")
+    parser.add_argument("--stores", default=",".join(STORES), help=f"Comma-separated subset of {STORES}")
+    parser.add_argument("--mongo-uri", default=os.getenv("MONGODB_URI", "mongodb://localhost:27017/"))
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"), help="hanachan SQL database")
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--reset", action="store_true", help="Delete earlier synthetic users first")
+    args = parser.parse_args()
+
+    stores = {s.strip() for s in args.stores.split(",") if s.strip()}
+    unknown = stores - set(STORES)
+    if unknown:
+        parser.error(f"Unknown store(s): {', '.join(sorted(unknown))}")
+
+    if args.anchor:
+        anchor = datetime.strptime(args.anchor, "%Y-%m-%d").replace(tzinfo=timezone.utc)
+    else:
+        anchor = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+
+    client = MongoClient(args.mongo_uri)
+    dbs = {}
+    if "flask" in stores:
+        dbs["flask"] = client["flaskFlashcardDB"]
+    if "study-plan" in stores:
+        dbs["study-plan"] = client["flaskStudyPlanDB"]
+    sql = None
+    if "hanachan" in stores:
+        if args.database_url:
+            sql = SqlWriter(args.database_url, args.batch_size)
+        else:
+            print("⚠️  No --database-url / DATABASE_URL; skipping hanachan conversations.")
+
+    if args.reset:
+        print("🧹 Removing earlier synthetic users...")
+        reset(dbs, sql)
+    else:
+        existing = existing_stores(dbs, sql)
+        if existing:
+            parser.error(f"Synthetic users already exist in {', '.join(existing)}; rerun with --reset to replace them")
+
+    print(f"🚀 Generating {args.users} users x {args.days} days (seed={args.seed}, anchor={anchor.date()})...")
+    writer = BulkWriter(args.batch_size)
+    started = time.monotonic()
+    for i in range(args.users):
+        simulate_user(i, args, anchor, dbs, writer, sql)
+        if (i + 1) % max(1, args.users // 10) == 0:
+            print(f"✅ {i + 1}/{args.users} users")
+    writer.flush()
+    elapsed = time.monotonic() - started
+
+    counts = dict(writer.counts)
+    if sql is not None:
+        counts.update({f"hanachan.{k}": v for k, v in sql.counts.items()})
+    total = sum(counts.values())
+    for name, n in sorted(counts.items()):
+        print(f"   {name:<45} {n:>10,}")
+    print(f"🏁 {total:,} records in {elapsed:.1f}s ({total / elapsed if elapsed else math.inf:,.0f}/s)")
+
+
+if __name__ == "__main__":
+    main()
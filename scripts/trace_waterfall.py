@@ -0,0 +1,130 @@
+"""
+Render a cross-service trace as a waterfall.
+
+Reads the span files the services write when TRACING_ENABLED=true
+(TRACE_DIR/<service>.jsonl, one span per line) and draws one trace: each
+span on its own row, indented under its parent, with a bar positioned on
+the trace's timeline.
+
+    hanachan          POST /v1/agent/stream       |██████████████████████████| 2310.4ms
+    hanachan            memory.retrieve_context   | ██████                   |  512.0ms
+    hanachan              GET /v1/context/snap... |  ███                     |  201.7ms
+    study-plan-service      GET /v1/context/sn... |  ██▊                     |  188.3ms
+
+The trace id is printed in the `traceresponse` response header of every
+traced request.
+
+Usage:
+    python scripts/trace_waterfall.py --list
+    python scripts/trace_waterfall.py 4bf92f3577b34da6a3ce929d0e0e4736
+    python scripts/trace_waterfall.py 4bf92f35 --dir /tmp/hanabira-traces --width 80
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+from collections import defaultdict
+from typing import Any, Dict, List
+
+DEFAULT_DIR = os.getenv("TRACE_DIR", "/tmp/hanabira-traces")
+BLOCKS = " ▏▎▍▌▋▊▉█"
+
+
+def load_spans(directory: str) -> List[Dict[str, Any]]:
+    spans = []
+    for path in sorted(glob.glob(os.path.join(directory, "*.jsonl"))):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    spans.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue  # a torn last line from a killed worker
+    return spans
+
+
+def list_traces(spans: List[Dict[str, Any]], limit: int):
+    traces = defaultdict(list)
+    for s in spans:
+        traces[s["traceId"]].append(s)
+    rows = []
+    for trace_id, members in traces.items():
+        start = min(s["startTimeUnixNano"] for s in members)
+        end = max(s["endTimeUnixNano"] for s in members)
+        root = min(members, key=lambda s: (s.get("parentSpanId") is not None, s["startTimeUnixNano"]))
+        rows.append((start, trace_id, (end - start) / 1e6, len(members),
+                     len({s["service"] for s in members}), f"{root['service']} {root['name']}"))
+    for start, trace_id, ms, count, services, root in sorted(rows, reverse=True)[:limit]:
+        print(f"{trace_id}  {ms:>9.1f}ms  {count:>3} spans  {services} svc  {root}")
+
+
+def bar(offset: float, length: float, width: int) -> str:
+    """Bar of `length` cells starting `offset` cells in; eighth-cell resolution at the end."""
+    start = int(offset)
+    eighths = max(1, round(length * 8))
+    full, rest = divmod(eighths, 8)
+    cells = " " * start + "█" * full + (BLOCKS[rest] if rest else "")
+    return cells[:width].ljust(width)
+
+
+def render(trace: List[Dict[str, Any]], width: int, label_width: int = 44):
+    ids = {s["spanId"] for s in trace}
+    children = defaultdict(list)
+    for s in trace:
+        parent = s.get("parentSpanId")
+        children[parent if parent in ids else None].append(s)
+
+    t0 = min(s["startTimeUnixNano"] for s in trace)
+    total = max(s["endTimeUnixNano"] for s in trace) - t0 or 1
+    service_width = max(len(s["service"]) for s in trace)
+
+    print(f"trace {trace[0]['traceId']}  {total / 1e6:.1f}ms  {len(trace)} spans  "
+          f"services: {', '.join(sorted({s['service'] for s in trace}))}\n")
+
+    def walk(span, depth):
+        duration = span["endTimeUnixNano"] - span["startTimeUnixNano"]
+        label = ("  " * depth + span["name"])
+        if len(label) > label_width:
+            label = label[:label_width - 3] + "..."
+        offset = (span["startTimeUnixNano"] - t0) / total * width
+        flag = " ✗" if span.get("status") == "error" else ""
+        print(f"{span['service']:<{service_width}}  {label:<{label_width}} "
+              f"|{bar(offset, duration / total * width, width)}| {duration / 1e6:>8.1f}ms{flag}")
+        for child in sorted(children[span["spanId"]], key=lambda s: s["startTimeUnixNano"]):
+            walk(child, depth + 1)
+
+    for root in sorted(children[None], key=lambda s: s["startTimeUnixNano"]):
+        walk(root, 0)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render a trace from the services' span files as a waterfall")
+    parser.add_argument("trace_id", nargs="?", help="Trace id (or a unique prefix)")
+    parser.add_argument("--dir", default=DEFAULT_DIR, help=f"Span directory (default: {DEFAULT_DIR})")
+    parser.add_argument("--list", nargs="?", type=int, const=20, metavar="N", help="List the N most recent traces")
+    parser.add_argument("--width", type=int, default=60, help="Timeline width in characters")
+    args = parser.parse_args()
+
+    spans = load_spans(args.dir)
+    if not spans:
+        sys.exit(f"No spans in {args.dir} (is TRACING_ENABLED=true on the services?)")
+
+    if args.list or not args.trace_id:
+        list_traces(spans, args.list or 20)
+        return
+
+    matches = {s["traceId"] for s in spans if s["traceId"].startswith(args.trace_id.lower())}
+    if not matches:
+        sys.exit(f"Trace {args.trace_id} not found in {args.dir}")
+    if len(matches) > 1:
+        sys.exit(f"Prefix {args.trace_id} is ambiguous: {', '.join(sorted(matches))}")
+    trace_id = matches.pop()
+    render([s for s in spans if s["traceId"] == trace_id], args.width)
+
+
+if __name__ == "__main__":
+    main()